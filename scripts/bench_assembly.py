@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark chapter assembly: concatenating loops vs the two-pass preallocated path.
+
+Times `abm.audio.assembly.assemble` (span WAVs on disk, float64 crossfades)
+and `abm.audio.concat.join_segments` (the voice renderer's micro-fade +
+crossfade join) against the previous implementations, which grew the chapter
+with one `np.concatenate` per segment.  Outputs are checked to be
+sample-identical.
+
+Example:
+    python scripts/bench_assembly.py --segments 2000 --seg-ms 400
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from abm.audio.assembly import assemble, ensure_mono, load_wav, silence
+from abm.audio.concat import equal_power_crossfade, join_segments, micro_fade
+
+
+def legacy_assemble(span_paths: list[Path], pauses_ms: list[int], crossfade_ms: int) -> tuple[np.ndarray, int]:
+    out, sr = load_wav(span_paths[0])
+    out = ensure_mono(out)
+    n = int(round(sr * crossfade_ms / 1000))
+    for idx in range(len(span_paths) - 1):
+        nxt = ensure_mono(load_wav(span_paths[idx + 1])[0])
+        if pauses_ms[idx] > 0:
+            out = np.concatenate([out, silence(pauses_ms[idx], sr), nxt])
+        elif n > 0 and len(out) >= n and len(nxt) >= n:
+            fade_out = np.sqrt(np.linspace(1.0, 0.0, n, endpoint=False))
+            fade_in = np.sqrt(np.linspace(0.0, 1.0, n, endpoint=False))
+            cross = out[-n:] * fade_out + nxt[:n] * fade_in
+            out = np.concatenate([out[:-n], cross, nxt[n:]])
+        else:
+            out = np.concatenate([out, nxt])
+    if pauses_ms[-1] > 0:
+        out = np.concatenate([out, silence(pauses_ms[-1], sr)])
+    return np.clip(out, -1.0, 1.0).astype(np.float32), sr
+
+
+def legacy_join(segments: list[np.ndarray], pauses_ms: list[int], sr: int, crossfade_ms: int) -> np.ndarray:
+    audio = [micro_fade(y, sr) for y in segments]
+    mix = audio[0]
+    for idx, y in enumerate(audio[1:], start=1):
+        p_ms = pauses_ms[idx - 1]
+        if p_ms > 0:
+            mix = np.concatenate([mix, np.zeros(int(sr * (p_ms / 1000.0)), dtype=np.float32)]).astype(np.float32)
+        mix = equal_power_crossfade(mix, y, sr, 0 if p_ms > 0 else crossfade_ms)
+    return mix
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--segments", type=int, default=2000)
+    p.add_argument("--seg-ms", type=int, default=400, help="Mean segment duration")
+    p.add_argument("--sr", type=int, default=24000)
+    p.add_argument("--crossfade-ms", type=int, default=15)
+    p.add_argument("--skip-legacy", action="store_true", help="Only time the preallocated path")
+    return p.parse_args()
+
+
+def timed(fn, *args):  # type: ignore[no-untyped-def]
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def main() -> None:
+    args = parse_args()
+    rng = random.Random(43)
+    gen = np.random.default_rng(43)
+    mean = int(args.sr * args.seg_ms / 1000)
+    segments = [
+        (0.3 * gen.standard_normal(rng.randint(mean // 4, 2 * mean))).astype(np.float32) for _ in range(args.segments)
+    ]
+    pauses = [rng.choice([0, 0, 120, 250]) for _ in segments]
+    total_s = sum(len(y) for y in segments) / args.sr
+    print(f"{args.segments} segments, {total_s / 60:.1f} min of audio at {args.sr} Hz")
+    print(f"{'path':>24} {'seconds':>8}")
+
+    new_join, t = timed(join_segments, segments, pauses, args.sr, args.crossfade_ms)
+    print(f"{'join_segments':>24} {t:>8.2f}")
+    if not args.skip_legacy:
+        old_join, t = timed(legacy_join, segments, pauses, args.sr, args.crossfade_ms)
+        print(f"{'join (concatenate loop)':>24} {t:>8.2f}")
+        assert np.array_equal(new_join, old_join)
+
+    with tempfile.TemporaryDirectory() as td:
+        paths = []
+        for i, y in enumerate(segments):
+            path = Path(td) / f"{i:05d}.wav"
+            sf.write(path, y, args.sr, subtype="PCM_16")
+            paths.append(path)
+        (new_asm, _), t = timed(lambda: assemble(paths, pauses, crossfade_ms=args.crossfade_ms))
+        print(f"{'assemble':>24} {t:>8.2f}")
+        if not args.skip_legacy:
+            (old_asm, _), t = timed(legacy_assemble, paths, pauses, args.crossfade_ms)
+            print(f"{'assemble (concatenate)':>24} {t:>8.2f}")
+            assert np.array_equal(new_asm, old_asm)
+
+
+if __name__ == "__main__":
+    main()
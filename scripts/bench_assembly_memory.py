@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark peak memory of chapter assembly: in-memory vs streaming to disk.
+
+Assembles chapters of increasing length from the same pool of span WAVs with
+`abm.audio.assembly.assemble` (whole chapter as one float32 array) and
+`abm.audio.assembly.assemble_to_file` (prefetched spans, crossfade-length
+carry-over, incremental `soundfile` writes), reporting wall time and the
+peak of numpy allocations traced by `tracemalloc`.  The streamed WAV is
+checked to be sample-identical to the in-memory result.
+
+Example:
+    python scripts/bench_assembly_memory.py --minutes 5 30 120 --sr 48000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+from abm.audio.assembly import assemble, assemble_to_file
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--minutes", type=float, nargs="+", default=[5.0, 30.0, 120.0], help="Chapter lengths")
+    p.add_argument("--sr", type=int, default=48000)
+    p.add_argument("--seg-ms", type=int, default=2500, help="Mean span duration")
+    p.add_argument("--pool", type=int, default=64, help="Distinct span files reused across the chapter")
+    p.add_argument("--crossfade-ms", type=int, default=15)
+    p.add_argument("--skip-check", action="store_true", help="Do not compare against in-memory output")
+    return p.parse_args()
+
+
+def traced(fn, *args, **kwargs):  # type: ignore[no-untyped-def]
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, elapsed, peak / 1e6
+
+
+def main() -> None:
+    args = parse_args()
+    rng = random.Random(44)
+    gen = np.random.default_rng(44)
+    mean = int(args.sr * args.seg_ms / 1000)
+    print(f"{'minutes':>8} {'spans':>6} {'path':>18} {'seconds':>8} {'peak_MB':>8}")
+    with tempfile.TemporaryDirectory() as td:
+        root = Path(td)
+        pool = []
+        for i in range(args.pool):
+            path = root / f"span_{i:03d}.wav"
+            sf.write(path, (0.3 * gen.standard_normal(rng.randint(mean // 4, 2 * mean))).astype(np.float32), args.sr)
+            pool.append((path, sf.info(str(path)).frames))
+        for minutes in args.minutes:
+            paths, pauses, total = [], [], 0
+            while total < minutes * 60 * args.sr:
+                path, frames = rng.choice(pool)
+                paths.append(path)
+                pauses.append(rng.choice([0, 0, 120, 250]))
+                total += frames
+            out = root / "chapter.wav"
+            _, t_stream, m_stream = traced(assemble_to_file, paths, pauses, out, crossfade_ms=args.crossfade_ms)
+            if not args.skip_check:
+                (y, _), t_mem, m_mem = traced(assemble, paths, pauses, crossfade_ms=args.crossfade_ms)
+                assert np.array_equal(sf.read(out, dtype="float32")[0], y)
+                del y
+                print(f"{minutes:>8.0f} {len(paths):>6} {'assemble':>18} {t_mem:>8.2f} {m_mem:>8.1f}")
+            print(f"{minutes:>8.0f} {len(paths):>6} {'assemble_to_file':>18} {t_stream:>8.2f} {m_stream:>8.1f}")
+            out.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark BookNLP quote matching (bnlp_refine._match_quotes) on synthetic chapters.
+
+Compares the sweep-line matcher with the previous O(spans × quotes) scan and
+checks that both produce the same mapping.
+
+Example:
+    python scripts/bench_bnlp_match.py --quotes 10000 --chapters 1
+"""
+
+import argparse
+import random
+import time
+from typing import Any
+
+from abm.annotate.bnlp_refine import _match_quotes
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--quotes", type=int, default=10_000, help="Synthetic quotes per chapter")
+    p.add_argument("--chapters", type=int, default=1, help="Number of synthetic chapters")
+    p.add_argument("--gap", type=int, default=40, help="max_char_gap passed to the matcher")
+    p.add_argument("--skip-naive", action="store_true", help="Only time the sweep matcher")
+    p.add_argument("--seed", type=int, default=0)
+    return p.parse_args()
+
+
+def make_chapter(n_quotes: int, rng: random.Random) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Return (spans, quotes): one dialogue span per quote with small offset drift."""
+    spans: list[dict[str, Any]] = []
+    quotes: list[dict[str, Any]] = []
+    pos = 0
+    for i in range(n_quotes):
+        pos += rng.randint(30, 400)
+        length = rng.randint(8, 200)
+        spans.append({"start": pos, "end": pos + length, "type": "Dialogue", "speaker": "Unknown"})
+        drift = rng.randint(-3, 3)
+        quotes.append({"start": pos + drift, "end": pos + length + drift, "speaker": f"C{i % 17}", "prob": 0.8})
+        spans.append({"start": pos + length + 1, "end": pos + length + 20, "type": "Narration"})
+        pos += length
+    rng.shuffle(quotes)
+    return spans, quotes
+
+
+def match_naive(spans: list[dict[str, Any]], bnlp: list[dict[str, Any]], gap: int) -> dict[Any, Any]:
+    """Previous implementation: every span scans every quote."""
+    index: dict[Any, Any] = {}
+    bnlp_sorted = sorted(bnlp, key=lambda q: (q["start"], q["end"]))
+    for s in spans:
+        if s.get("type") not in {"Dialogue", "Thought"}:
+            continue
+        a = (int(s["start"]), int(s["end"]))
+        best, best_ol = None, 0
+        for q in bnlp_sorted:
+            b = (int(q["start"]), int(q["end"]))
+            ol = max(0, min(a[1], b[1]) - max(a[0], b[0]))
+            if ol > best_ol or (ol == 0 and abs(a[0] - b[0]) <= gap):
+                best, best_ol = q, ol
+        if best is not None:
+            index[a] = best
+    return index
+
+
+def main() -> None:
+    args = parse_args()
+    rng = random.Random(args.seed)
+    t_sweep = 0.0
+    t_naive = 0.0
+    for ch in range(args.chapters):
+        spans, quotes = make_chapter(args.quotes, rng)
+        t0 = time.perf_counter()
+        fast = _match_quotes(spans, quotes, args.gap)
+        dt = time.perf_counter() - t0
+        t_sweep += dt
+        line = f"ch {ch}: {len(quotes)} quotes, sweep {dt * 1000:.1f} ms"
+        if not args.skip_naive:
+            t0 = time.perf_counter()
+            slow = match_naive(spans, quotes, args.gap)
+            dn = time.perf_counter() - t0
+            t_naive += dn
+            assert fast == slow, "sweep and naive matchers disagree"
+            line += f", naive {dn * 1000:.1f} ms ({dn / dt:.0f}x)"
+        print(line)
+    summary = f"total: sweep {t_sweep:.3f}s"
+    if not args.skip_naive:
+        summary += f", naive {t_naive:.3f}s, identical output"
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark TTS cache codecs: bytes on disk vs read throughput.
+
+Writes the same speech-like segments with every codec in
+`abm.audio.cache_codecs` (16-bit WAV, FLAC, float32 `.npy`) and reports the
+cache size and how fast the segments are read back and joined the way the
+voice renderer does (`join_segments`).  `.npy` is read both fully and
+memory-mapped (`np.load(mmap_mode="r")`).  Reads hit the OS page cache after
+the first pass; run with `--cold` as root to drop it before every pass.
+
+Example:
+    python scripts/bench_cache_codecs.py --segments 400 --sr 24000
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from abm.audio.cache_codecs import CODECS
+from abm.audio.concat import join_segments
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--segments", type=int, default=400)
+    p.add_argument("--sr", type=int, default=24000)
+    p.add_argument("--seg-ms", type=int, default=2500, help="Mean segment duration")
+    p.add_argument("--repeat", type=int, default=3, help="Read passes per codec (best is reported)")
+    p.add_argument("--cold", action="store_true", help="Drop the page cache before each pass (needs root)")
+    return p.parse_args()
+
+
+def speech_like(rng: np.random.Generator, n: int, sr: int) -> np.ndarray:
+    """Voiced harmonics with a wandering pitch, syllable envelope and breath noise."""
+    t = np.arange(n) / sr
+    f0 = 110 + 40 * np.sin(2 * np.pi * rng.uniform(0.5, 2.0) * t + rng.uniform(0, 6))
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    syllables = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * t), 0, None) ** 2
+    y = 0.25 * voiced * syllables + 0.005 * rng.standard_normal(n)
+    return (y / max(1.0, np.abs(y).max())).astype(np.float32)
+
+
+def drop_caches() -> None:
+    subprocess.run(["sync"], check=False)
+    Path("/proc/sys/vm/drop_caches").write_text("3\n")
+
+
+def main() -> None:
+    args = parse_args()
+    rng = np.random.default_rng(47)
+    mean = int(args.sr * args.seg_ms / 1000)
+    segments = [speech_like(rng, int(rng.integers(mean // 3, 2 * mean)), args.sr) for _ in range(args.segments)]
+    pauses = [int(p) for p in rng.choice([0, 0, 120, 250], size=len(segments))]
+    audio_s = sum(len(y) for y in segments) / args.sr
+    print(f"{args.segments} segments, {audio_s / 60:.1f} min of audio at {args.sr} Hz")
+    print(f"{'codec':>10} {'MB':>8} {'ratio':>6} {'write_s':>8} {'read_s':>7} {'x realtime':>11} {'MB/s':>7}")
+
+    with tempfile.TemporaryDirectory() as td:
+        wav_bytes = 0
+        for name, codec in CODECS.items():
+            root = Path(td) / name
+            root.mkdir()
+            paths = [root / f"{i:05d}{codec.suffix}" for i in range(len(segments))]
+            t0 = time.perf_counter()
+            for path, y in zip(paths, segments, strict=True):
+                codec.write(path, y, args.sr)
+            write_s = time.perf_counter() - t0
+            size = sum(os.path.getsize(p) for p in paths)
+            wav_bytes = wav_bytes or size
+            modes = [False, True] if name == "npy" else [False]
+            for mmap in modes:
+                best = float("inf")
+                for _ in range(args.repeat):
+                    if args.cold:
+                        drop_caches()
+                    t0 = time.perf_counter()
+                    mix = join_segments([codec.read(p, mmap=mmap)[0] for p in paths], pauses, args.sr, 15)
+                    best = min(best, time.perf_counter() - t0)
+                assert len(mix) > 0
+                label = f"{name}{' mmap' if mmap else ''}"
+                print(
+                    f"{label:>10} {size / 1e6:>8.1f} {size / wav_bytes:>6.2f} {write_s:>8.2f} {best:>7.3f} "
+                    f"{audio_s / best:>11.0f} {size / 1e6 / best:>7.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
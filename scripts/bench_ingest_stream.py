@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch vs streaming PdfIngestPipeline on a synthetic PDF.
+
+Reports wall time, Python heap peak (tracemalloc) and, for the streaming
+run, the time to the first JSONL record. Both runs use prod mode (no
+artifacts on disk) unless --dev is given.
+
+Example:
+    python scripts/bench_ingest_stream.py --pages 1500
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from bench_pdf_extract import make_pdf
+
+from abm.ingestion.ingest_pdf import PdfIngestPipeline, PipelineOptions
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--pages", type=int, default=1500, help="Pages in the synthetic PDF")
+    p.add_argument("--pdf", type=Path, default=None, help="Use an existing PDF instead of generating one")
+    p.add_argument("--dev", action="store_true", help="Write artifacts (dev mode) instead of prod mode")
+    return p.parse_args()
+
+
+def run(pdf: Path, out_dir: Path, opts: PipelineOptions) -> tuple[PdfIngestPipeline, float, int]:
+    pipeline = PdfIngestPipeline()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    pipeline.run(pdf, out_dir, opts)
+    wall = time.perf_counter() - t0
+    _cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pipeline, wall, peak
+
+
+def main() -> None:
+    args = parse_args()
+    mode = "dev" if args.dev else "prod"
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = args.pdf
+        if pdf is None:
+            pdf = Path(tmp) / "synthetic.pdf"
+            make_pdf(pdf, args.pages)
+        _, t_batch, peak_batch = run(pdf, Path(tmp) / "batch", PipelineOptions(mode=mode))
+        streaming, t_stream, peak_stream = run(pdf, Path(tmp) / "stream", PipelineOptions(mode=mode, streaming=True))
+    stats = streaming.stream_stats or {}
+    print(f"batch:     {t_batch:.2f}s, heap peak {peak_batch / 1e6:.1f} MB")
+    print(
+        f"streaming: {t_stream:.2f}s, heap peak {peak_stream / 1e6:.1f} MB, "
+        f"first record after {stats.get('first_record_s', 0) * 1000:.1f} ms, {stats.get('records')} records"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark Parler generation throughput: per-segment vs batched, with and
+without cached description encodings.
+
+Builds a tiny random-weight Parler-TTS model offline (small T5 text encoder,
+small decoder, the stock DAC audio codec) and a word-level tokenizer, so no
+download is needed.  Segments alternate between two voices and are rendered
+through `ParlerEngine.synthesize_batch` in three modes:
+
+- `single/no-cache`: one `generate` call per segment, description encoded
+  every time (the previous behaviour);
+- `single`: one call per segment, description encoder output reused;
+- `batched`: padded calls of up to `--max-batch` segments within
+  `--batch-tokens` padded tokens.
+
+Random weights rarely emit EOS, so every item generates `--steps` frames;
+absolute numbers say little about the real model, the ratios do.
+
+Example:
+    PYTHONPATH=src python scripts/bench_parler_batching.py --segments 32 --threads 4
+"""
+
+import argparse
+import time
+
+import numpy as np
+import torch
+from parler_tts import ParlerTTSConfig, ParlerTTSDecoderConfig, ParlerTTSForCausalLM, ParlerTTSForConditionalGeneration
+from parler_tts.dac_wrapper import DACConfig, DACModel
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+from transformers import PreTrainedTokenizerFast, T5Config, T5EncoderModel
+
+from abm.voice.engines import ParlerConfig, ParlerEngine
+
+WORDS = (
+    "the a voice is calm warm clear close mic studio audio slow fast quiet loud she he said asked "
+    "door night rain light road house river stone long short old young never always then again"
+).split()
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--segments", type=int, default=32)
+    p.add_argument("--steps", type=int, default=120, help="Decoder frames generated per segment")
+    p.add_argument("--max-batch", type=int, default=8)
+    p.add_argument("--batch-tokens", type=int, default=2048)
+    p.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    p.add_argument("--seed", type=int, default=50)
+    return p.parse_args()
+
+
+def tiny_tokenizer() -> PreTrainedTokenizerFast:
+    vocab = {w: i for i, w in enumerate(["<pad>", "</s>", "<unk>", *WORDS, "'s", ".", ","])}
+    tok = Tokenizer(WordLevel(vocab, unk_token="<unk>"))
+    tok.pre_tokenizer = Whitespace()
+    return PreTrainedTokenizerFast(tokenizer_object=tok, pad_token="<pad>", eos_token="</s>", unk_token="<unk>")
+
+
+def tiny_model(vocab_size: int, steps: int) -> ParlerTTSForConditionalGeneration:
+    audio_cfg = DACConfig()
+    codebook = audio_cfg.codebook_size
+    text_cfg = T5Config(vocab_size=vocab_size, d_model=128, d_kv=32, d_ff=256, num_layers=2, num_heads=4)
+    decoder_cfg = ParlerTTSDecoderConfig(
+        vocab_size=codebook + 64,
+        max_position_embeddings=max(1024, 2 * steps),
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        hidden_size=128,
+        ffn_dim=256,
+        num_codebooks=audio_cfg.num_codebooks,
+        pad_token_id=codebook,
+        eos_token_id=codebook,
+        bos_token_id=codebook + 1,
+    )
+    config = ParlerTTSConfig.from_sub_models_config(text_cfg, audio_cfg, decoder_cfg, vocab_size=vocab_size)
+    model = ParlerTTSForConditionalGeneration(
+        config=config,
+        text_encoder=T5EncoderModel(text_cfg),
+        audio_encoder=DACModel(audio_cfg),
+        decoder=ParlerTTSForCausalLM(decoder_cfg),
+    )
+    gen = model.generation_config
+    gen.decoder_start_token_id = codebook + 1
+    gen.pad_token_id = gen.eos_token_id = codebook
+    gen.max_length = steps + audio_cfg.num_codebooks  # delay pattern adds one frame per codebook
+    gen.do_sample = True
+    gen.guidance_scale = 1
+    return model.eval()
+
+
+def run(engine: ParlerEngine, jobs: dict[str, list[str]]) -> float:
+    t0 = time.perf_counter()
+    for voice, texts in jobs.items():
+        # Unseeded: seeded segments are never batched
+        waves = engine.synthesize_batch(texts, voice, description="is calm.")
+        assert len(waves) == len(texts) and all(len(y) for y in waves)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    args = parse_args()
+    torch.manual_seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+    tok = tiny_tokenizer()
+    model = tiny_model(len(tok), args.steps)
+    jobs: dict[str, list[str]] = {"Quinn": [], "Mara": []}
+    for i in range(args.segments):
+        words = rng.choice(WORDS, size=int(rng.integers(4, 40)))
+        jobs["Quinn" if i % 2 else "Mara"].append(" ".join(words) + ".")
+    print(f"{args.segments} segments, {args.steps} frames each, threads={args.threads or torch.get_num_threads()}")
+    print(f"{'mode':>16} {'seconds':>8} {'seg/s':>7} {'speedup':>8}")
+
+    modes = [("single/no-cache", 1, False), ("single", 1, True), ("batched", args.max_batch, True)]
+    base = None
+    for label, max_batch, reuse in modes:
+        cfg = ParlerConfig(
+            device="cpu",
+            max_batch_size=max_batch,
+            max_batch_tokens=args.batch_tokens,
+            num_threads=args.threads,
+        )
+        engine = ParlerEngine(cfg, model=model, tokenizer=tok)
+        if not reuse:  # generate() encodes the description on every call
+            engine._reuse_encoder = False
+            engine._description = _uncached(engine)  # type: ignore[method-assign]
+        engine.synthesize_to_array("the voice.", "Warmup")
+        seconds = run(engine, jobs)
+        base = base or seconds
+        print(f"{label:>16} {seconds:>8.2f} {args.segments / seconds:>7.2f} {base / seconds:>7.2f}x")
+
+
+def _uncached(engine: ParlerEngine):
+    """Wrap ``engine._description`` so every call tokenizes and encodes again."""
+    describe = engine._description
+
+    def fresh(voice_id, description):
+        engine._descriptions.pop(f"{voice_id}'s voice {description}", None)
+        return describe(voice_id, description)
+
+    return fresh
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark raw PDF page extraction (RawPdfTextExtractor) serial vs process pool.
+
+Generates a synthetic text-heavy PDF with PyMuPDF, extracts it serially and
+with N workers, checks the page texts are identical and reports pages/s and
+the slowest pages.
+
+Example:
+    python scripts/bench_pdf_extract.py --pages 800 --workers 4
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import fitz  # type: ignore
+
+from abm.ingestion.pdf_to_raw_text import RawPdfTextExtractor
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--pages", type=int, default=800, help="Pages in the synthetic PDF")
+    p.add_argument("--workers", type=int, default=4, help="Process pool size for the parallel run")
+    p.add_argument("--chunk-pages", type=int, default=0, help="Pages per worker task (0 = auto)")
+    p.add_argument("--pdf", type=Path, default=None, help="Use an existing PDF instead of generating one")
+    return p.parse_args()
+
+
+def make_pdf(path: Path, n_pages: int) -> None:
+    """Write a PDF with ~40 wrapped lines of prose per page in a few blocks."""
+    doc = fitz.open()
+    words = "the quick brown fox jumps over a lazy dog while rain falls on the old stone road".split()
+    for i in range(n_pages):
+        page = doc.new_page()
+        y = 60
+        for b in range(4):
+            lines = [" ".join(words[(i + b + k + j) % len(words)] for j in range(12)) for k in range(10)]
+            page.insert_text((60, y), "\n".join(lines), fontsize=10)
+            y += 10 * 14 + 24
+        page.insert_text((280, 820), str(i + 1), fontsize=9)
+    doc.save(str(path))
+    doc.close()
+
+
+def main() -> None:
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = args.pdf
+        if pdf is None:
+            pdf = Path(tmp) / "synthetic.pdf"
+            t0 = time.perf_counter()
+            make_pdf(pdf, args.pages)
+            print(f"generated {args.pages} pages in {time.perf_counter() - t0:.2f}s")
+
+        serial = RawPdfTextExtractor()
+        t0 = time.perf_counter()
+        expected = serial.extract_pages(pdf)
+        ts = time.perf_counter() - t0
+
+        parallel = RawPdfTextExtractor()
+        t0 = time.perf_counter()
+        pages = parallel.extract_pages(pdf, workers=args.workers, chunk_size=args.chunk_pages)
+        tp = time.perf_counter() - t0
+
+    assert pages == expected, "parallel extraction differs from serial"
+    n = len(pages)
+    print(f"serial:   {ts:.3f}s ({n / ts:.0f} pages/s)")
+    print(f"parallel: {tp:.3f}s ({n / tp:.0f} pages/s, {args.workers} workers, {ts / tp:.2f}x), identical output")
+    slowest = sorted(range(n), key=lambda i: serial.page_timings[i], reverse=True)[:5]
+    print("slowest pages (serial ms): " + ", ".join(f"{i}={serial.page_timings[i] * 1000:.1f}" for i in slowest))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark PgInserter block loading: executemany INSERTs vs binary COPY + upsert.
+
+Needs a throwaway Postgres; the welldone_* tables in that database are
+dropped before each run.
+
+Example:
+    python scripts/bench_pg_insert.py --dsn postgresql://postgres@localhost/abm_bench --rows 100000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import psycopg
+
+from abm.ingestion.db_insert import PgInserter
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--dsn", default=os.environ.get("ABM_TEST_PG_DSN", ""), help="Postgres DSN (or ABM_TEST_PG_DSN)")
+    p.add_argument("--rows", type=int, default=100_000, help="Blocks in the synthetic JSONL")
+    p.add_argument("--commit-every", type=int, default=0, help="Bulk path batch commit size (0 = one transaction)")
+    return p.parse_args()
+
+
+def write_inputs(tmp: Path, rows: int) -> tuple[Path, Path]:
+    jl = tmp / "bench_well_done.jsonl"
+    with jl.open("w", encoding="utf-8") as f:
+        for i in range(rows):
+            text = f"“Line {i},” she said, and the rain kept falling on the old stone road. " * 2
+            f.write(json.dumps({"index": i, "text": text}, ensure_ascii=False) + "\n")
+    meta = tmp / "bench_well_done_meta.json"
+    meta.write_text(
+        json.dumps({"block_count": rows, "created_at": "2024-01-01T00:00:00Z", "source_well_done": "bench.txt"}),
+        encoding="utf-8",
+    )
+    return jl, meta
+
+
+def reset(dsn: str) -> None:
+    with psycopg.connect(dsn, autocommit=True) as conn:
+        conn.execute("DROP TABLE IF EXISTS welldone_blocks, welldone_documents")
+
+
+def timed(ins: PgInserter, jl: Path, meta: Path) -> float:
+    t0 = time.perf_counter()
+    res = ins.insert_from_jsonl(jl, meta)
+    dt = time.perf_counter() - t0
+    assert res.status == "inserted", res
+    return dt
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.dsn:
+        raise SystemExit("--dsn or ABM_TEST_PG_DSN is required")
+    with tempfile.TemporaryDirectory() as tmp:
+        jl, meta = write_inputs(Path(tmp), args.rows)
+        reset(args.dsn)
+        t_insert = timed(PgInserter(args.dsn), jl, meta)
+        reset(args.dsn)
+        bulk = PgInserter(args.dsn, bulk_copy=True, commit_every=args.commit_every)
+        t_copy = timed(bulk, jl, meta)
+        t_reload = timed(bulk, jl, meta)
+    n = args.rows
+    print(f"executemany:     {t_insert:.2f}s ({n / t_insert:,.0f} rows/s)")
+    print(f"COPY + upsert:   {t_copy:.2f}s ({n / t_copy:,.0f} rows/s, {t_insert / t_copy:.1f}x)")
+    print(f"COPY reload:     {t_reload:.2f}s ({n / t_reload:,.0f} rows/s, unchanged rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark Piper segments/s: one `piper` process per segment vs resident workers.
+
+Synthesizes the same short dialogue-style segments through `PiperAdapter`
+twice: with `pool=False` (a CLI process per segment, paying start-up and
+model load every time) and with the shared worker pool (`--workers` resident
+`piper --json-input` processes).  Both runs must produce identical WAVs.
+
+Without `--model` a stand-in Piper is generated that sleeps `--startup-ms`
+at start (model load) and `--ms-per-char` per character (synthesis), so the
+comparison runs on machines without Piper installed.
+
+Example:
+    python scripts/bench_piper_pool.py --segments 100
+    python scripts/bench_piper_pool.py --model en_US-ryan-medium --binary piper --workers 2
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from abm.audio.piper_adapter import PiperAdapter
+from abm.audio.piper_pool import PiperPool, shared_pool
+from abm.audio.tts_base import TTSTask
+
+_FAKE_PIPER = """\
+import argparse, json, sys, time, wave
+
+p = argparse.ArgumentParser()
+p.add_argument("-m"); p.add_argument("-c"); p.add_argument("-i"); p.add_argument("-f")
+p.add_argument("--json-input", action="store_true")
+args = p.parse_args()
+time.sleep({startup_s})
+
+def synth(text, out):
+    time.sleep({per_char_s} * len(text))
+    with wave.open(out, "wb") as wf:
+        wf.setnchannels(1); wf.setsampwidth(2); wf.setframerate(22050)
+        wf.writeframes(bytes((ord(ch) % 251 for ch in text * 400)))
+
+if args.json_input:
+    for line in sys.stdin:
+        req = json.loads(line)
+        synth(req["text"], req["output_file"])
+        print(req["output_file"], flush=True)
+else:
+    synth(open(args.i, encoding="utf-8").read(), args.f)
+"""
+
+_LINES = [
+    '"Run!"',
+    "Quinn nodded.",
+    '"Are you sure about this?" Vorden asked.',
+    "<Level Up>",
+    "The corridor was silent except for the dripping water.",
+    '"Yes."',
+]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--segments", type=int, default=60, help="Segments per run")
+    p.add_argument("--workers", type=int, default=1, help="Resident workers per model")
+    p.add_argument("--model", default=None, help="Piper voice id or .onnx path (default: stand-in Piper)")
+    p.add_argument("--binary", default="piper", help="Piper executable for --model")
+    p.add_argument("--startup-ms", type=float, default=300.0, help="Stand-in model load time")
+    p.add_argument("--ms-per-char", type=float, default=0.2, help="Stand-in synthesis time per character")
+    return p.parse_args()
+
+
+def run(adapter: PiperAdapter, voice: str, out_dir: Path, n: int) -> tuple[float, list[bytes]]:
+    adapter._available = True
+    out_dir.mkdir(parents=True, exist_ok=True)
+    outs: list[bytes] = []
+    t0 = time.perf_counter()
+    for i in range(n):
+        out = out_dir / f"{i:05d}.wav"
+        adapter.synth(TTSTask(_LINES[i % len(_LINES)], "N", "piper", voice, None, [], out, 0, "neutral"))
+        outs.append(out.read_bytes())
+    return time.perf_counter() - t0, outs
+
+
+def main() -> None:
+    args = parse_args()
+    os.environ.pop("ABM_PIPER_DRYRUN", None)
+    os.environ["ABM_PIPER_WORKERS"] = str(args.workers)
+    with tempfile.TemporaryDirectory() as td:
+        root = Path(td)
+        binary, voice = args.binary, args.model
+        if voice is None:
+            fake = root / "piper"
+            code = _FAKE_PIPER.format(startup_s=args.startup_ms / 1000.0, per_char_s=args.ms_per_char / 1000.0)
+            fake.write_text(f"#!{sys.executable}\n{code}")
+            fake.chmod(0o755)
+            binary, voice = str(fake), "voice.onnx"
+
+        t_sub, wav_sub = run(PiperAdapter(binary=binary, pool=False), voice, root / "subprocess", args.segments)
+        t_pool, wav_pool = run(PiperAdapter(binary=binary, pool=True), voice, root / "pool", args.segments)
+        pool: PiperPool = shared_pool()
+        pool.close()
+        assert wav_sub == wav_pool, "pool output differs from the subprocess path"
+
+    print(f"{args.segments} segments, {args.workers} worker(s), processes started by pool: {pool.stats.started}")
+    print(f"{'path':>12} {'total_s':>8} {'segments/s':>11}")
+    print(f"{'subprocess':>12} {t_sub:>8.2f} {args.segments / t_sub:>11.1f}")
+    print(f"{'pool':>12} {t_pool:>8.2f} {args.segments / t_pool:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark section_classifier chapter matching as the chapter count grows.
+
+Builds synthetic books (TOC + N chapters of M body blocks, every fifth
+heading untitled so it matches by ordinal), writes them as JSONL and times
+`classify_blocks` end to end and `_match_chapters` alone.  With indexed
+heading lookup the per-chapter cost should stay flat as N grows.
+
+Example:
+    python scripts/bench_section_classifier.py --chapters 250 500 1000 2000 --paras 20
+"""
+
+import argparse
+import copy
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from abm.classifier.section_classifier import _load_jsonl_blocks, _match_chapters, classify_blocks
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument("--chapters", type=int, nargs="+", default=[250, 500, 1000, 2000], help="Chapter counts")
+    p.add_argument("--paras", type=int, default=20, help="Body blocks per chapter")
+    return p.parse_args()
+
+
+def make_book(path: Path, n_chapters: int, paras: int) -> None:
+    lines = ["Table of Contents"]
+    lines += [f"Chapter {i}: The Long Road {i}" for i in range(1, n_chapters + 1)]
+    lines.append("Preface text before the first chapter.")
+    for i in range(1, n_chapters + 1):
+        lines.append(f"Chapter {i}" if i % 5 == 0 else f"Chapter {i}: The Long Road {i}")
+        lines += [f"Paragraph {k} of chapter {i}, with some ordinary prose in it." for k in range(paras)]
+    with path.open("w", encoding="utf-8") as f:
+        for idx, text in enumerate(lines):
+            rec = {
+                "index": idx,
+                "text": text,
+                "line_count": 1,
+                "word_count": len(text.split()),
+                "char_count": len(text),
+            }
+            f.write(json.dumps(rec) + "\n")
+
+
+def main() -> None:
+    args = parse_args()
+    print(f"{'chapters':>8} {'blocks':>8} {'classify_s':>10} {'match_s':>8} {'match_us/ch':>11}")
+    with tempfile.TemporaryDirectory() as td:
+        for n in args.chapters:
+            path = Path(td) / f"book_{n}.jsonl"
+            make_book(path, n, args.paras)
+            t0 = time.perf_counter()
+            out = classify_blocks(str(path))
+            classify_s = time.perf_counter() - t0
+            assert len(out["chapters"]["chapters"]) == n
+
+            blocks = _load_jsonl_blocks(str(path))
+            entries: list[dict[str, Any]] = [
+                {"chapter_index": e["chapter_index"], "title": e["title"], "ordinal": e["chapter_index"] + 1}
+                for e in out["toc"]["entries"]
+            ]
+            t0 = time.perf_counter()
+            _match_chapters(blocks, copy.deepcopy(entries), n + 2)
+            match_s = time.perf_counter() - t0
+            print(f"{n:>8} {len(blocks):>8} {classify_s:>10.3f} {match_s:>8.3f} {match_s / n * 1e6:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
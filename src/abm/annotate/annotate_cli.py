@@ -10,6 +10,7 @@ from typing import Any, cast
 from abm.annotate.attribute import AttributeEngine
 from abm.annotate.metrics import ChapterMetrics, MetricsCollector, Timer
 from abm.annotate.normalize import ChapterNormalizer, NormalizerConfig
+from abm.annotate.para_cache import ParagraphAnnotationCache
 from abm.annotate.progress import ProgressReporter
 from abm.annotate.review import make_review_markdown
 from abm.annotate.roster import RosterBuilder, RosterConfig, merge_book_roster
@@ -52,6 +53,7 @@ class AnnotateRunner:
         parse_mode: str = "doc",
         doc_cache_dir: Path | None = None,
         pipe_batch_size: int = 8,
+        para_cache_dir: Path | None = None,
     ) -> None:
         self.verbose = verbose
         self.stages = list(stages or ["normalize", "roster", "segment", "attribute"])
@@ -79,6 +81,10 @@ class AnnotateRunner:
             force_spacy_model=spacy_model,
             use_coref=use_coref,
         )
+        # Paragraph-level reuse for re-runs after edits (window parse mode only)
+        self.para_cache = (
+            ParagraphAnnotationCache(self.segmenter, self.engine, para_cache_dir) if para_cache_dir else None
+        )
 
     def run_streaming(
         self,
@@ -244,12 +250,17 @@ class AnnotateRunner:
                         else:
                             roster = {}
 
+                    # Paragraph cache only when attribution runs in window mode (a full-doc parse is chapter-wide)
+                    para_cache = self.para_cache if not (use_doc and idx in doc_by_idx) else None
+
                     # Segment
                     with t_seg:
                         if "segment" in self.stages:
                             if self.verbose:
                                 print(f"[ch {idx}] segment: start")
-                            seg_spans: list[SegSpan] = self.segmenter.segment(ch_norm)
+                            seg_spans: list[SegSpan] = (
+                                para_cache.segment(ch_norm) if para_cache else self.segmenter.segment(ch_norm)
+                            )
                             if self.verbose:
                                 print(f"[ch {idx}] segment: done (spans={len(seg_spans)})")
                         else:
@@ -266,20 +277,24 @@ class AnnotateRunner:
                             def _lite(span: SegSpan) -> dict[str, int | str]:
                                 return {"start": span.start, "end": span.end, "type": span.type.value}
 
+                            cached = para_cache.attribute(ch_norm, seg_spans, roster) if para_cache else None
                             for i, s in enumerate(seg_spans):
-                                prev_s = _lite(seg_spans[i - 1]) if i > 0 else None
-                                next_s = _lite(seg_spans[i + 1]) if i + 1 < len(seg_spans) else None
-                                doc = doc_by_idx.get(idx) if use_doc else None
-                                kwargs: dict[str, Any] = {"neighbors": (prev_s, next_s)}
-                                if doc is not None:
-                                    kwargs["doc"] = doc
-                                speaker, method, conf = self.engine.attribute_span(
-                                    ch_norm["text"],
-                                    (s.start, s.end),
-                                    s.type.value,
-                                    roster,
-                                    **kwargs,
-                                )
+                                if cached is not None:
+                                    speaker, method, conf = cached[i]
+                                else:
+                                    prev_s = _lite(seg_spans[i - 1]) if i > 0 else None
+                                    next_s = _lite(seg_spans[i + 1]) if i + 1 < len(seg_spans) else None
+                                    doc = doc_by_idx.get(idx) if use_doc else None
+                                    kwargs: dict[str, Any] = {"neighbors": (prev_s, next_s)}
+                                    if doc is not None:
+                                        kwargs["doc"] = doc
+                                    speaker, method, conf = self.engine.attribute_span(
+                                        ch_norm["text"],
+                                        (s.start, s.end),
+                                        s.type.value,
+                                        roster,
+                                        **kwargs,
+                                    )
                                 spans_out.append(
                                     SpanOut(
                                         id=i + 1,
@@ -311,6 +326,12 @@ class AnnotateRunner:
                 cm.time_segment = t_seg.elapsed
                 cm.time_attribute = t_att.elapsed
                 cm.time_total = t_total.elapsed
+                if para_cache is not None:
+                    para_cache.save(idx)
+                    cm.extra["paragraphs_reused"] = para_cache.stats.attribute_reused
+                    cm.extra["paragraphs_reannotated"] = para_cache.stats.reannotated
+                    if self.verbose:
+                        print(f"[ch {idx}] paragraph cache: {para_cache.stats.reannotated} re-annotated")
 
                 # Span counts
                 cm.spans_total = len(spans_out)
@@ -458,6 +479,11 @@ def _parse_args() -> argparse.Namespace:
         default="data/.doccache",
         help="Directory to store .spacy DocBin caches for full-doc mode.",
     )
+    ap.add_argument(
+        "--para-cache",
+        default=None,
+        help="Directory for per-paragraph span/attribution caches; re-runs only re-annotate edited paragraphs.",
+    )
     ap.add_argument(
         "--pipe-batch-size",
         type=int,
@@ -494,6 +520,7 @@ def main() -> None:
         parse_mode=args.parse_mode,
         doc_cache_dir=Path(args.doc_cache),
         pipe_batch_size=args.pipe_batch_size,
+        para_cache_dir=Path(args.para_cache) if args.para_cache else None,
     )
 
     doc = _load_json(in_path)
@@ -1,10 +1,11 @@
 # src/abm/annotate/attribute.py
 from __future__ import annotations
 
+import json
 import os
 import re
 import warnings
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import Any, cast
 
 # --- Optional deps (handled gracefully) ---
@@ -161,6 +162,9 @@ RE_DESCRIPTOR = re.compile(
     r"(said|asked|replied|called|cried)\b",
     re.IGNORECASE,
 )
+# Characters searched on each side of a span for thought cues / voice descriptors
+THOUGHT_CUE_CHARS = 140
+DESCRIPTOR_CHARS = 160
 
 
 class AttributeEngine:
@@ -495,7 +499,7 @@ class AttributeEngine:
         if span_type != "Thought":
             return None, "", 0.0
         s, e = span_chars
-        for ctx in (text[e : min(len(text), e + 140)], text[max(0, s - 140) : s]):
+        for ctx in (text[e : min(len(text), e + THOUGHT_CUE_CHARS)], text[max(0, s - THOUGHT_CUE_CHARS) : s]):
             m = RE_THOUGHT_CUE.search(ctx)
             if not m:
                 continue
@@ -506,7 +510,7 @@ class AttributeEngine:
 
     def _try_descriptor(self, text: str, span_chars: tuple[int, int]) -> tuple[str | None, str, float]:
         s, e = span_chars
-        for ctx in (text[e : min(len(text), e + 160)], text[max(0, s - 160) : s]):
+        for ctx in (text[e : min(len(text), e + DESCRIPTOR_CHARS)], text[max(0, s - DESCRIPTOR_CHARS) : s]):
             m = RE_DESCRIPTOR.search(ctx)
             if not m:
                 continue
@@ -617,6 +621,37 @@ class AttributeEngine:
 
     # --------------------------- Utils ---------------------------
 
+    def context_reach(self) -> int | None:
+        """Return how many characters around a span `attribute_span` may read (window mode).
+
+        Results for a span depend only on the chapter text within this many
+        characters of it, its neighbour spans and the roster.  None means the
+        reach is unbounded (the LLM hook sees the whole text).
+        """
+        if self.llm_tag and self.cfg.llm_threshold > 0:
+            return None
+        return max(
+            self.cfg.min_context_chars,
+            self.cfg.mid_context_chars,
+            self.cfg.max_context_chars,
+            self.cfg.context_chars,
+            THOUGHT_CUE_CHARS,
+            DESCRIPTOR_CHARS,
+        )
+
+    def cache_fingerprint(self) -> str:
+        """Identify everything besides text and roster that can change an attribution."""
+        return json.dumps(
+            {
+                "engine": type(self).__name__,
+                "mode": self.mode,
+                "config": asdict(self.cfg),
+                "spacy_model": getattr(self.dep_nlp, "meta", {}).get("name") if self.dep_nlp is not None else None,
+                "coref": self.coref_nlp is not None,
+            },
+            sort_keys=True,
+        )
+
     @staticmethod
     def _canonical_from_roster(name: str, roster: dict[str, list[str]]) -> str | None:
         for canon, aliases in roster.items():
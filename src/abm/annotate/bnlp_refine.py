@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import bisect
 import json
 from dataclasses import dataclass
 from pathlib import Path
@@ -27,26 +28,88 @@ def _match_quotes(
     bnlp: list[dict[str, Any]],
     max_char_gap: int,
 ) -> dict[tuple[int, int], dict[str, Any]]:
-    """Greedy match BookNLP quotes to our spans by max char overlap / small gap."""
+    """Greedy match BookNLP quotes to our spans by max char overlap / small gap.
+
+    For each span, quotes are scanned in ``(start, end)`` order and the best
+    match is replaced by a quote that overlaps more, or by any non-overlapping
+    quote whose start lies within ``max_char_gap`` of the span start.  Only
+    quotes that overlap the span or start near it can trigger either rule, so
+    a sweep over spans sorted by start visits just those: quotes starting
+    inside ``[start - gap, max(end - 1, start + gap)]`` (found by bisection)
+    plus the few long quotes that began earlier and are still open.  The
+    result is identical to scanning every quote for every span, in
+    O((spans + quotes) log quotes) for non-nested quotes.
+    """
     index: dict[tuple[int, int], dict[str, Any]] = {}
     bnlp_sorted = sorted(bnlp, key=lambda q: (q["start"], q["end"]))
-    for s in spans:
-        if s.get("type") not in {"Dialogue", "Thought"}:
-            continue
-        a = (int(s["start"]), int(s["end"]))
+    q_bounds = [(int(q["start"]), int(q["end"])) for q in bnlp_sorted]
+    q_starts = [b[0] for b in q_bounds]
+    keys = sorted(
+        {(int(s["start"]), int(s["end"])) for s in spans if s.get("type") in {"Dialogue", "Thought"}},
+    )
+    lo = 0  # first quote not yet moved into ``open_q``
+    open_q: list[int] = []  # quotes starting before ``a0 - gap`` that may still overlap
+    for a in keys:
+        a0, a1 = a
+        while lo < len(q_bounds) and q_bounds[lo][0] < a0 - max_char_gap:
+            open_q.append(lo)
+            lo += 1
+        # ``a0`` only grows, so a quote ending at or before it never matters again.
+        open_q = [j for j in open_q if q_bounds[j][1] > a0]
+        hi = bisect.bisect_right(q_starts, max(a1 - 1, a0 + max_char_gap), lo=lo)
         best: dict[str, Any] | None = None
         best_ol = 0
-        for q in bnlp_sorted:
-            b = (int(q["start"]), int(q["end"]))
+        for j in [*open_q, *range(lo, hi)]:
+            b = q_bounds[j]
             ol = _overlap(a, b)
-            if ol > best_ol or (ol == 0 and abs(a[0] - b[0]) <= max_char_gap):
-                best = q
+            if ol > best_ol or (ol == 0 and abs(a0 - b[0]) <= max_char_gap):
+                best = bnlp_sorted[j]
                 best_ol = ol
         if best is not None:
             index[a] = best
     return index
 
 
+def _chapter_text(ch: dict[str, Any]) -> str:
+    return ch.get("text", "") or "\n".join(ch.get("paragraphs", []))
+
+
+def _fuse_chapter(spans: list[dict[str, Any]], quotes: list[dict[str, Any]], policy: BNLPRefinePolicy) -> int:
+    """Apply BookNLP quote attributions to one chapter's spans in place.
+
+    Returns the number of spans changed.
+    """
+    mapping = _match_quotes(spans, quotes, policy.max_char_gap)
+    changed = 0
+    for s in spans:
+        if s.get("type") not in {"Dialogue", "Thought"}:
+            continue
+        key = (int(s["start"]), int(s["end"]))
+        q = mapping.get(key)
+        if not q:
+            continue
+
+        b_speaker = (q.get("speaker") or "Unknown").strip() or "Unknown"
+        b_prob = float(q.get("prob") or 0.0)
+
+        rule_speaker = s.get("speaker", "Unknown")
+        rule_conf = float(s.get("confidence", 0.0))
+
+        if rule_speaker == "Unknown" and b_speaker != "Unknown" and b_prob >= policy.accept_when_rule_unknown_min_prob:
+            s["speaker"] = b_speaker
+            s["method"] = "neural:booknlp"
+            s["confidence"] = max(rule_conf, min(0.90, b_prob))
+            changed += 1
+        elif rule_speaker == b_speaker and b_speaker != "Unknown":
+            # agree → boost confidence (cap to 0.97)
+            if rule_conf < policy.boost_when_agree_to_conf:
+                s["method"] = "fuse:rule+booknlp"
+                s["confidence"] = policy.boost_when_agree_to_conf
+                changed += 1
+        # else: keep rule; Stage B (LLM) will arbitrate
+    return changed
+
+
 def refine_with_bnlp(
     tagged_path: Path,
     out_path: Path,
@@ -60,14 +123,27 @@ def refine_with_bnlp(
     bnlp_top_n: int = 0,
     bnlp_try_big: bool = False,
     bnlp_tmp_dir: str | None = None,
+    bnlp_cache_dir: str | None = None,
+    per_chapter: bool = False,
+    adapter: BookNLPAdapter | None = None,
 ) -> None:
+    """Fuse BookNLP quote attribution into a Stage-A ``combined.json``.
+
+    By default BookNLP runs once over the whole book (chapters concatenated,
+    see :meth:`BookNLPAdapter.annotate_book`) and its quotes are mapped back to
+    chapter offsets; ``per_chapter`` restores one run per gated chapter.
+    ``adapter`` lets callers inject a preconfigured or fake adapter.
+    """
     import time
 
     start_time = time.time()
     doc = json.loads(tagged_path.read_text(encoding="utf-8"))
 
     # Keep tmp artifacts when verbose so we can inspect BNLP outputs
-    adapter = BookNLPAdapter(BookNLPConfig(size=bnlp_size, pipeline=bnlp_pipeline, keep_tmp=verbose), verbose=verbose)
+    if adapter is None:
+        adapter = BookNLPAdapter(
+            BookNLPConfig(size=bnlp_size, pipeline=bnlp_pipeline, keep_tmp=verbose), verbose=verbose
+        )
     if not adapter.enabled():
         if verbose:
             print("[bnlp] BookNLP not available; copying input → output")
@@ -111,20 +187,34 @@ def refine_with_bnlp(
             f"[bnlp] gate: threshold {thr_s}, topN={bnlp_top_n} → {len(chosen)} chapters selected: "
             f"{chosen[:12]}{' …' if len(chosen) > 12 else ''}"
         )
-    # Try to keep a hot BookNLP instance in-process for speed
-    bnlp = None
-    try:
-        import importlib
-
-        booknlp_mod = importlib.import_module("booknlp.booknlp")
-        BookNLP = booknlp_mod.BookNLP
-        params = {"pipeline": bnlp_pipeline, "model": bnlp_size}
-        bnlp = BookNLP("en", params)
+    cache_dir = Path(bnlp_cache_dir) if bnlp_cache_dir else None
+    book_quotes: dict[int, list[dict[str, Any]]] | None = None
+    big_book_quotes: dict[int, list[dict[str, Any]]] | None = None
+    book_chapters = [(int(ch.get("chapter_index", -1)), _chapter_text(ch)) for ch in chapters]
+    book_run_s = 0.0
+    if not per_chapter and eligible_idx:
+        # One run over the whole book: one model load, cross-chapter coreference.
+        _tb = time.time()
+        book_quotes = adapter.annotate_book(book_chapters, cache_dir=cache_dir)
+        book_run_s = time.time() - _tb
         if verbose:
-            print(f"[bnlp] hot BookNLP session: pipeline={bnlp_pipeline}, size={bnlp_size}")
-    except Exception as e:
-        if verbose:
-            print(f"[bnlp] hot session unavailable, using adapter per-chapter: {e}")
+            print(f"[bnlp] whole-book run: {len(book_chapters)} chapters in {book_run_s:.2f}s ({adapter.backend})")
+
+    # Per-chapter mode: try to keep a hot BookNLP instance in-process for speed
+    bnlp = None
+    if per_chapter:
+        try:
+            import importlib
+
+            booknlp_mod = importlib.import_module("booknlp.booknlp")
+            BookNLP = booknlp_mod.BookNLP
+            params = {"pipeline": bnlp_pipeline, "model": bnlp_size}
+            bnlp = BookNLP("en", params)
+            if verbose:
+                print(f"[bnlp] hot BookNLP session: pipeline={bnlp_pipeline}, size={bnlp_size}")
+        except Exception as e:
+            if verbose:
+                print(f"[bnlp] hot session unavailable, using adapter per-chapter: {e}")
 
     # temp workspace reused when hot
     tmp_base: Path | None = None
@@ -149,12 +239,15 @@ def refine_with_bnlp(
                 continue
             if max_chapters is not None and processed >= max_chapters:
                 break
-            text = ch.get("text", "") or "\n".join(ch.get("paragraphs", []))
+            text = _chapter_text(ch)
             import time as _t
 
             _t0 = _t.time()
             work_id = f"ch_{ch.get('chapter_index', 'x')}"
-            if bnlp is None:
+            if book_quotes is not None:
+                bnlp_quotes = book_quotes.get(idx, [])
+                size_used = bnlp_size
+            elif bnlp is None:
                 bnlp_quotes = adapter.annotate_text(text, work_id=work_id)
                 size_used = adapter.cfg.size
             else:
@@ -175,79 +268,26 @@ def refine_with_bnlp(
                 bnlp_quotes = adapter._load_quotes(out_dir, work_id)
                 size_used = bnlp_size
 
-            mapping = _match_quotes(ch.get("spans", []), bnlp_quotes, policy.max_char_gap)
-
-            ch_changed = 0
-            for s in ch.get("spans", []):
-                if s.get("type") not in {"Dialogue", "Thought"}:
-                    continue
-                total += 1
-                key = (int(s["start"]), int(s["end"]))
-                q = mapping.get(key)
-                if not q:
-                    continue
-
-                b_speaker = (q.get("speaker") or "Unknown").strip() or "Unknown"
-                b_prob = float(q.get("prob") or 0.0)
-
-                rule_speaker = s.get("speaker", "Unknown")
-                rule_conf = float(s.get("confidence", 0.0))
-
-                if (
-                    rule_speaker == "Unknown"
-                    and b_speaker != "Unknown"
-                    and b_prob >= policy.accept_when_rule_unknown_min_prob
-                ):
-                    s["speaker"] = b_speaker
-                    s["method"] = "neural:booknlp"
-                    s["confidence"] = max(rule_conf, min(0.90, b_prob))
-                    changed += 1
-                    ch_changed += 1
-                elif rule_speaker == b_speaker and b_speaker != "Unknown":
-                    # agree → boost confidence (cap to 0.97)
-                    if rule_conf < policy.boost_when_agree_to_conf:
-                        s["method"] = "fuse:rule+booknlp"
-                        s["confidence"] = policy.boost_when_agree_to_conf
-                        changed += 1
-                        ch_changed += 1
-                # else: keep rule; Stage B (LLM) will arbitrate
+            spans = ch.get("spans", [])
+            total += sum(1 for s in spans if s.get("type") in {"Dialogue", "Thought"})
+            ch_changed = _fuse_chapter(spans, bnlp_quotes, policy)
+            changed += ch_changed
 
             # If stubborn and allowed, retry with big model just for this chapter
             if ch_changed == 0 and bnlp_try_big and bnlp_size != "big":
                 if verbose:
                     print(f"[bnlp] ch {idx}: no changes with size={bnlp_size}; retrying size=big")
-                big_adapter = BookNLPAdapter(
-                    BookNLPConfig(size="big", pipeline=bnlp_pipeline, keep_tmp=verbose), verbose=verbose
-                )
-                bnlp_quotes_big = big_adapter.annotate_text(text, work_id=work_id)
-                mapping_big = _match_quotes(ch.get("spans", []), bnlp_quotes_big, policy.max_char_gap)
-                for s in ch.get("spans", []):
-                    if s.get("type") not in {"Dialogue", "Thought"}:
-                        continue
-                    key = (int(s["start"]), int(s["end"]))
-                    q = mapping_big.get(key)
-                    if not q:
-                        continue
-                    b_speaker = (q.get("speaker") or "Unknown").strip() or "Unknown"
-                    b_prob = float(q.get("prob") or 0.0)
-                    rule_speaker = s.get("speaker", "Unknown")
-                    rule_conf = float(s.get("confidence", 0.0))
-                    if (
-                        rule_speaker == "Unknown"
-                        and b_speaker != "Unknown"
-                        and b_prob >= policy.accept_when_rule_unknown_min_prob
-                    ):
-                        s["speaker"] = b_speaker
-                        s["method"] = "neural:booknlp"
-                        s["confidence"] = max(rule_conf, min(0.90, b_prob))
-                        changed += 1
-                        ch_changed += 1
-                    elif rule_speaker == b_speaker and b_speaker != "Unknown":
-                        if rule_conf < policy.boost_when_agree_to_conf:
-                            s["method"] = "fuse:rule+booknlp"
-                            s["confidence"] = policy.boost_when_agree_to_conf
-                            changed += 1
-                            ch_changed += 1
+                big_adapter = adapter.variant(size="big")
+                if book_quotes is not None:
+                    # One big run for the whole book, shared by all stubborn chapters
+                    if big_book_quotes is None:
+                        big_book_quotes = big_adapter.annotate_book(book_chapters, cache_dir=cache_dir)
+                    bnlp_quotes_big = big_book_quotes.get(idx, [])
+                else:
+                    bnlp_quotes_big = big_adapter.annotate_text(text, work_id=work_id)
+                big_changed = _fuse_chapter(spans, bnlp_quotes_big, policy)
+                ch_changed += big_changed
+                changed += big_changed
                 if ch_changed > 0:
                     size_used = "big"
 
@@ -272,6 +312,9 @@ def refine_with_bnlp(
         bmeta = {
             "pipeline": bnlp_pipeline,
             "default_size": bnlp_size,
+            "mode": "chapter" if per_chapter else "book",
+            "backend": adapter.backend,
+            "book_run_seconds": round(book_run_s, 3),
             "gate_threshold": bnlp_gate_threshold,
             "top_n": bnlp_top_n,
             "try_big": bnlp_try_big,
@@ -323,6 +366,12 @@ def _parse_args() -> argparse.Namespace:
         help="If a chapter sees no changes, retry with size=big just for that chapter",
     )
     ap.add_argument("--bnlp-tmp-dir", default=None, help="Optional temp directory base (e.g., /dev/shm/abm_bnlp)")
+    ap.add_argument("--bnlp-cache-dir", default=None, help="Cache whole-book BookNLP results here (by text hash)")
+    ap.add_argument(
+        "--bnlp-per-chapter",
+        action="store_true",
+        help="Run BookNLP separately per gated chapter instead of once over the whole book",
+    )
     return ap.parse_args()
 
 
@@ -344,6 +393,8 @@ def main() -> None:
         bnlp_top_n=args.bnlp_top_n,
         bnlp_try_big=args.bnlp_try_big,
         bnlp_tmp_dir=args.bnlp_tmp_dir,
+        bnlp_cache_dir=args.bnlp_cache_dir,
+        per_chapter=args.bnlp_per_chapter,
     )
 
 
@@ -47,6 +47,7 @@ class LLMCache:
         right: str,
         span_type: str,
         model: str,
+        prompt_version: str = "",
     ) -> str:
         """Generate a deterministic hash for the given prompt context.
 
@@ -57,6 +58,8 @@ class LLMCache:
             right: Text immediately following the span.
             span_type: Type of span being attributed.
             model: Model identifier used for the request.
+            prompt_version: Hash of the prompt templates (see
+                :data:`abm.annotate.prompts.PROMPT_VERSION`).
 
         Returns:
             str: Hex digest uniquely identifying the prompt.
@@ -66,12 +69,18 @@ class LLMCache:
         """
 
         h = hashlib.sha256()
-        h.update(model.encode())
-        h.update(json.dumps(sorted(roster.keys()), ensure_ascii=False).encode())
-        h.update(span_type.encode())
-        h.update(left.encode())
-        h.update(mid.encode())
-        h.update(right.encode())
+        parts = [
+            model,
+            json.dumps(sorted(roster.keys()), ensure_ascii=False),
+            span_type,
+            left,
+            mid,
+            right,
+            prompt_version,
+        ]
+        # Delimit fields so context that shifts between left/mid/right (short
+        # chapters where the window covers everything) cannot collide.
+        h.update("\x1f".join(parts).encode())
         return h.hexdigest()
 
     def get(self, **kwargs: Any) -> dict[str, Any] | None:
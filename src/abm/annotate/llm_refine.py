@@ -7,6 +7,7 @@ import json
 import logging
 import subprocess
 import sys
+import time
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -15,9 +16,10 @@ from typing import Any, cast
 from abm.annotate.llm_cache import LLMCache
 from abm.annotate.llm_prep import LLMCandidateConfig, LLMCandidatePreparer
 from abm.annotate.progress import ProgressReporter
-from abm.annotate.prompts import SYSTEM_SPEAKER, speaker_user_prompt
+from abm.annotate.prompts import PROMPT_VERSION, SYSTEM_SPEAKER, speaker_user_prompt
 from abm.llm.client import OpenAICompatClient
-from abm.llm.manager import LLMBackend, LLMService
+from abm.llm.manager import DEFAULT_KEEP_ALIVE, LLMBackend, LLMService, WarmupResult
+from abm.llm.pool import EndpointPoolClient, PoolEndpoint
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +38,9 @@ class LLMRefineConfig:
         temperature: Sampling temperature passed to the LLM.
         top_p: Nucleus sampling parameter.
         max_tokens: Maximum tokens requested from the LLM.
+        warmup: Load the model (and ``pin_models``) before dispatching, even
+            when the service is not managed.  Managed services always warm up.
+        pin_models: Additional models (e.g. a cascade) to keep resident.
     """
 
     min_conf_for_skip: float = 0.90
@@ -48,6 +53,8 @@ class LLMRefineConfig:
     max_tokens: int = 128
     max_concurrency: int = 4
     verbose: bool = False
+    warmup: bool = False
+    pin_models: tuple[str, ...] = ()
 
 
 def _ctx(text: str, start: int, end: int, n: int) -> tuple[str, str, str]:
@@ -93,6 +100,67 @@ def _fuzzy_match(name: str, roster: dict[str, list[str]]) -> str | None:
     return None
 
 
+def _dispatch_order(cand: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Order candidates chapter by chapter, then by position.
+
+    Consecutive requests then share the same roster prefix, which lets servers
+    with prompt caching reuse it.
+
+    Args:
+        cand: Candidate descriptors from :class:`LLMCandidatePreparer`.
+
+    Returns:
+        list[dict[str, Any]]: Candidates sorted by ``(chapter_index, start)``.
+
+    Raises:
+        None
+    """
+
+    return sorted(cand, key=lambda c: (int(c.get("chapter_index") or 0), int(c["start"])))
+
+
+def _usage_summary(records: list[dict[str, Any]], wall_s: float | None = None) -> dict[str, Any]:
+    """Aggregate per-span usage metrics into run-level statistics.
+
+    Args:
+        records: Per-span metric records written by :func:`refine_document`.
+        wall_s: Wall-clock duration of the dispatch phase, used for
+            per-endpoint throughput.
+
+    Returns:
+        dict[str, Any]: ``requests``, ``prompt_tokens``, ``cached_tokens``,
+        ``prefix_hit_rate``, ``ttft_ms_median`` and ``endpoints`` (base URL ->
+        ``requests``, ``mean_latency_ms``, ``req_per_s``).  Rates are ``None``
+        when the server did not report the underlying counters.
+
+    Raises:
+        None
+    """
+
+    requests_n = sum(int(r.get("requests", 0)) for r in records)
+    reported = [r for r in records if r.get("cached_tokens") is not None and r.get("prompt_tokens")]
+    prompt_tokens = sum(int(r["prompt_tokens"]) for r in reported)
+    cached_tokens = sum(int(r["cached_tokens"]) for r in reported)
+    ttfts = sorted(t for r in records for t in (r.get("ttft_ms") or []))
+    endpoints: dict[str, dict[str, Any]] = {}
+    for r in records:
+        for url, ep in (r.get("endpoints") or {}).items():
+            agg = endpoints.setdefault(url, {"requests": 0, "latency_ms": 0.0})
+            agg["requests"] += int(ep["requests"])
+            agg["latency_ms"] += float(ep["latency_ms"])
+    for agg in endpoints.values():
+        agg["mean_latency_ms"] = agg.pop("latency_ms") / agg["requests"] if agg["requests"] else 0.0
+        agg["req_per_s"] = (agg["requests"] / wall_s) if wall_s else None
+    return {
+        "requests": requests_n,
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "prefix_hit_rate": (cached_tokens / prompt_tokens) if prompt_tokens else None,
+        "ttft_ms_median": ttfts[len(ttfts) // 2] if ttfts else None,
+        "endpoints": endpoints,
+    }
+
+
 def refine_document(
     tagged_path: Path,
     out_json: Path,
@@ -102,6 +170,8 @@ def refine_document(
     *,
     manage_service: bool = False,
     cache_path: Path | None = None,
+    metrics_path: Path | None = None,
+    endpoints: list[PoolEndpoint] | None = None,
 ) -> None:
     """Refine low-confidence spans in ``combined.json`` using an LLM.
 
@@ -113,6 +183,12 @@ def refine_document(
         cfg: Refinement policy settings.
         manage_service: If ``True``, start/stop the service automatically.
         cache_path: Optional SQLite cache file path.
+        metrics_path: Optional JSONL file receiving one record per candidate
+            (votes, cache hit, prompt tokens, prefix-cache tokens, TTFT,
+            endpoints used).
+        endpoints: Optional list of servers to load-balance over with
+            :class:`EndpointPoolClient`; ``backend.endpoint`` is used alone
+            when omitted.
 
     Returns:
         None
@@ -131,13 +207,32 @@ def refine_document(
         except Exception:
             # Pull may fail if the model is already present or the backend isn't Ollama.
             pass
-
-    client = OpenAICompatClient(base_url=backend.endpoint, model=backend.model)
+    warmups: list[WarmupResult] = []
+    if manage_service or cfg.warmup:
+        # Pay the cold model load up front instead of on the first span.
+        try:
+            warmups = svc.pin_models([backend.model, *cfg.pin_models])
+        except Exception as exc:
+            logger.warning("model warmup failed: %s", exc)
+        if cfg.verbose:
+            for w in warmups:
+                print(f"[llm] warmup {w.model}: {w.wall_ms:.0f} ms, resident={w.resident}")
+    keep_alive = backend.keep_alive if backend.kind == "ollama" else None
+
+    client: OpenAICompatClient | EndpointPoolClient
+    if endpoints:
+        client = EndpointPoolClient(endpoints, model=backend.model, keep_alive=keep_alive)
+        health = client.check_health()
+        if cfg.verbose:
+            print(f"[llm] endpoint health: {health}")
+    else:
+        client = OpenAICompatClient(base_url=backend.endpoint, model=backend.model, keep_alive=keep_alive)
     cache = LLMCache(cache_path or out_json.with_suffix(".cache.sqlite"))
 
     doc = json.loads(tagged_path.read_text(encoding="utf-8"))
     # Policy: only Unknown or conf < 0.85 are candidates regardless of skip-threshold.
     cand = LLMCandidatePreparer(LLMCandidateConfig(conf_threshold=0.85)).prepare(doc)
+    cand = _dispatch_order(cand)
     if cfg.verbose:
         print(f"[llm] candidates selected: {len(cand)} (Unknown or conf<0.85)")
 
@@ -149,13 +244,30 @@ def refine_document(
         int(ch["chapter_index"]): ch for ch in doc.get("chapters", []) if "chapter_index" in ch
     }
 
-    def process_one(c: dict[str, Any]) -> tuple[int, int, dict[str, Any] | None]:
+    def process_one(c: dict[str, Any]) -> tuple[int, int, dict[str, Any] | None, dict[str, Any]]:
         ch = chapters_by_idx.get(int(c["chapter_index"]))
         if not ch:
-            return (-1, -1, None)
+            return (-1, -1, None, {})
         text: str = ch.get("text", "") or ""
         roster: dict[str, list[str]] = c.get("roster") or {}
         left, mid, right = _ctx(text, c["start"], c["end"], cfg.context_chars)
+        spans = ch.get("spans", []) or []
+        span_index = next(
+            (i for i, s in enumerate(spans) if s.get("start") == c["start"] and s.get("end") == c["end"]),
+            -1,
+        )
+        record: dict[str, Any] = {
+            "chapter": c.get("chapter_index"),
+            "title": c.get("title"),
+            "span_index": span_index,
+            "cache_hit": True,
+            "votes": {},
+            "requests": 0,
+            "prompt_tokens": None,
+            "cached_tokens": None,
+            "ttft_ms": [],
+            "endpoints": {},
+        }
 
         cached = cache.get(
             roster=roster,
@@ -164,21 +276,22 @@ def refine_document(
             right=right,
             span_type=c["type"],
             model=backend.model,
+            prompt_version=PROMPT_VERSION,
         )
         if cached is None:
+            record["cache_hit"] = False
             votes_map: dict[str, float] = {}
+            vote_counts: dict[str, int] = {}
             uprompt = speaker_user_prompt(roster, left, mid, right, c["type"])
             # Continuation bias: look back one span
             prev_speaker = None
-            try:
-                spans = ch.get("spans", []) or []
-                idx = next(i for i, s in enumerate(spans) if s.get("start") == c["start"] and s.get("end") == c["end"])
-                if idx > 0:
-                    ps = spans[idx - 1]
+            if span_index > 0:
+                ps = spans[span_index - 1]
+                try:
                     if ps.get("speaker") not in (None, "Unknown") and float(ps.get("confidence", 0.0)) >= 0.90:
                         prev_speaker = str(ps.get("speaker"))
-            except Exception:
-                pass
+                except Exception:
+                    pass
 
             for _ in range(cfg.votes):
                 obj = cast(
@@ -191,12 +304,26 @@ def refine_document(
                         max_tokens=cfg.max_tokens,
                     ),
                 )
+                record["requests"] += 1
+                usage = client.last_usage
+                if usage is not None:
+                    if usage.prompt_tokens is not None:
+                        record["prompt_tokens"] = (record["prompt_tokens"] or 0) + usage.prompt_tokens
+                    if usage.cached_tokens is not None:
+                        record["cached_tokens"] = (record["cached_tokens"] or 0) + usage.cached_tokens
+                    if usage.ttft_ms is not None:
+                        record["ttft_ms"].append(usage.ttft_ms)
+                    ep = record["endpoints"].setdefault(usage.endpoint, {"requests": 0, "latency_ms": 0.0})
+                    ep["requests"] += 1
+                    ep["latency_ms"] += usage.latency_ms
                 spk = str(obj.get("speaker", "Unknown")).strip() or "Unknown"
                 # Enforce roster + fuzzy match
                 canon = _fuzzy_match(spk, roster)
                 spk = canon or ("Unknown" if spk.lower() != "unknown" else "Unknown")
                 conf = float(obj.get("confidence", 0.0))
                 votes_map[spk] = max(votes_map.get(spk, 0.0), conf)
+                vote_counts[spk] = vote_counts.get(spk, 0) + 1
+            record["votes"] = vote_counts
             # Continuation bias: slight boost
             if prev_speaker and prev_speaker in votes_map:
                 votes_map[prev_speaker] = max(votes_map[prev_speaker], min(0.96, votes_map[prev_speaker] + 0.03))
@@ -211,11 +338,13 @@ def refine_document(
                 right=right,
                 span_type=c["type"],
                 model=backend.model,
+                prompt_version=PROMPT_VERSION,
             )
-        return (int(c["start"]), int(c["end"]), cached)
+        return (int(c["start"]), int(c["end"]), cached, record)
 
-    results: list[tuple[int, int, dict[str, Any] | None]] = []
+    results: list[tuple[int, int, dict[str, Any] | None, dict[str, Any]]] = []
     status_mode = getattr(cfg, "status_mode", "auto")  # for forward-compat
+    t_dispatch = time.perf_counter()
     with ProgressReporter(total=len(cand), mode=status_mode, title="Stage B · LLM refine") as pr:
         if cfg.max_concurrency <= 1:
             for c in cand:
@@ -228,6 +357,7 @@ def refine_document(
                 )
         else:
             with futures.ThreadPoolExecutor(max_workers=int(cfg.max_concurrency)) as ex:
+                # Submission order is the chapter-grouped dispatch order.
                 futs = [ex.submit(process_one, c) for c in cand]
                 for f in futures.as_completed(futs):
                     results.append(f.result())
@@ -235,7 +365,7 @@ def refine_document(
                     pr.advance(1)
 
     # Apply updates back into doc
-    by_span = {(s, e): obj for (s, e, obj) in results if obj is not None and s >= 0}
+    by_span = {(s, e): obj for (s, e, obj, _rec) in results if obj is not None and s >= 0}
     for ch in doc.get("chapters", []) or []:
         for s in ch.get("spans", []) or []:
             key = (int(s.get("start", -1)), int(s.get("end", -1)))
@@ -255,14 +385,45 @@ def refine_document(
 
     out_json.write_text(json.dumps(doc, ensure_ascii=False, indent=2), encoding="utf-8")
 
+    records = [rec for (_s, _e, _obj, rec) in results if rec]
+    records.sort(key=lambda r: (int(r.get("chapter") or 0), int(r.get("span_index", -1))))
+    usage = _usage_summary(records, wall_s=time.perf_counter() - t_dispatch)
+    if metrics_path:
+        metrics_path.parent.mkdir(parents=True, exist_ok=True)
+        with metrics_path.open("w", encoding="utf-8") as fh:
+            for rec in records:
+                fh.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    if cfg.verbose:
+        print(f"[llm] prompt {PROMPT_VERSION}: {usage}")
+
     if out_md:
         lines = [
             "# LLM refinement summary",
             "",
             f"- candidates processed: {total}",
             f"- spans modified: {changed}",
-            "",
+            f"- prompt version: {PROMPT_VERSION}",
         ]
+        for w in warmups:
+            load = f", load {w.load_ms:.0f} ms" if w.load_ms is not None else ""
+            lines.append(f"- warmup {w.model}: {w.wall_ms:.0f} ms{load}, resident: {w.resident}")
+        if usage["prefix_hit_rate"] is not None:
+            lines.append(
+                f"- prompt prefix cache: {usage['cached_tokens']}/{usage['prompt_tokens']} tokens "
+                f"({usage['prefix_hit_rate']:.1%})"
+            )
+        if usage["ttft_ms_median"] is not None:
+            lines.append(f"- median time to first token: {usage['ttft_ms_median']:.0f} ms")
+        pool_stats = client.endpoint_stats() if isinstance(client, EndpointPoolClient) else {}
+        for url, ep in usage["endpoints"].items():
+            extra = ""
+            if url in pool_stats:
+                extra = f", failures {pool_stats[url]['failures']}, ejections {pool_stats[url]['ejections']}"
+            lines.append(
+                f"- endpoint {url}: {ep['requests']} requests, {ep['req_per_s']:.2f} req/s, "
+                f"mean latency {ep['mean_latency_ms']:.0f} ms{extra}"
+            )
+        lines.append("")
         for ch in doc.get("chapters", []) or []:
             ds = [s for s in (ch.get("spans", []) or []) if s.get("type") in {"Dialogue", "Thought"}]
             unk = sum(1 for s in ds if s.get("speaker") == "Unknown")
@@ -294,6 +455,27 @@ def _parse_args() -> argparse.Namespace:
         help="OpenAI-compatible base URL",
     )
     ap.add_argument("--model", default="llama3.1:8b-instruct-q6_K", help="Model id/name")
+    ap.add_argument(
+        "--keep-alive",
+        default=DEFAULT_KEEP_ALIVE,
+        help="Ollama keep_alive sent with warmup and every request ('30m'; bare numbers are seconds, '-1' pins)",
+    )
+    ap.add_argument("--warmup", action="store_true", help="Load the model before dispatch (implied by --manage-llm)")
+    ap.add_argument(
+        "--pin-model",
+        dest="pin_models",
+        action="append",
+        default=[],
+        help="Additional model to warm up and keep resident (repeatable)",
+    )
+    ap.add_argument(
+        "--pool-endpoint",
+        dest="pool_endpoints",
+        action="append",
+        default=None,
+        metavar="URL[@WEIGHT]",
+        help="Load-balance over several OpenAI-compatible endpoints (repeatable)",
+    )
     ap.add_argument(
         "--manage-llm",
         action="store_true",
@@ -333,12 +515,14 @@ def main() -> None:
     """
 
     args = _parse_args()
-    backend = LLMBackend(kind="ollama", endpoint=args.endpoint, model=args.model)
+    backend = LLMBackend(kind="ollama", endpoint=args.endpoint, model=args.model, keep_alive=args.keep_alive)
     cfg = LLMRefineConfig(
         min_conf_for_skip=args.skip_threshold,
         votes=args.votes,
         max_concurrency=args.max_concurrency,
         verbose=args.verbose,
+        warmup=args.warmup,
+        pin_models=tuple(args.pin_models),
     )
     refine_document(
         tagged_path=Path(args.tagged),
@@ -350,6 +534,8 @@ def main() -> None:
         cache_path=(
             Path(args.cache) if args.cache else (Path(args.cache_dir) / "llm.cache.sqlite" if args.cache_dir else None)
         ),
+        metrics_path=Path(args.metrics_jsonl) if args.metrics_jsonl else None,
+        endpoints=[PoolEndpoint.parse(e) for e in args.pool_endpoints] if args.pool_endpoints else None,
     )
 
     if args.eval_after:
@@ -81,21 +81,6 @@ class ChapterNormalizer:
     # --- Patterns (compiled once) ---
     RE_HEADING = re.compile(r"^Chapter\s+\d+[:\s]", re.IGNORECASE)
 
-    # Scene breaks and meta lines
-    RE_SCENE_BREAK = re.compile(r"^\s*\*{3,}\s*$")
-    RE_META = re.compile(
-        r"(patr?eon|p\.a\.t\.r\.e\.o\.n|instagram|author.?s note|vote|webnovel|discord|donate|paypal|privilege)",
-        re.IGNORECASE,
-    )
-
-    # System lines: single token with optional trailing punctuation
-    RE_SYSTEM_ANGLE_LINE = re.compile(r"^\s*<[^>]+>\s*[.?!]?\s*$")
-    RE_SYSTEM_SQUARE_LINE = re.compile(r"^\s*\[[^\]]+\]\s*[.?!]?\s*$")
-
-    # System lines: multiple tokens only
-    RE_SYSTEM_ANGLE_MULTI = re.compile(r"^\s*(<[^>]+>\s*){2,}\s*$")
-    RE_SYSTEM_SQUARE_MULTI = re.compile(r"^\s*(\[[^\]]+\]\s*){2,}\s*$")
-
     # Inline system tokens (inside normal lines)
     RE_INLINE_ANGLE = re.compile(r"<[^>]+>")
     RE_INLINE_SQUARE = re.compile(r"\[[^\]]+\]")
@@ -103,6 +88,28 @@ class ChapterNormalizer:
     # Control characters (including NBSP / BOM via unicode filter)
     RE_CONTROL = re.compile(r"[\u0000-\u001F\u007F\u0080-\u009F\uFEFF]")
 
+    # Line rules as one anchored alternation, in priority order: the first
+    # branch that matches wins.
+    #   SectionBreak: a line of three or more asterisks.
+    #   Meta: an author/platform keyword anywhere in the line (a lookahead;
+    #     the [padiwv] guard skips positions where no keyword can start).
+    #   SystemAngle / SystemSquare: one <...> or [...] token with optional
+    #     trailing punctuation, or several tokens.
+    #   Heading: "Chapter N" followed by a colon or space.
+    RE_LINE_RULES = re.compile(
+        r"(?P<SectionBreak>\s*\*{3,}\s*$)"
+        r"|(?P<Meta>(?=[\s\S]*?(?=[padiwv])"
+        r"(?:patr?eon|p\.a\.t\.r\.e\.o\.n|instagram|author.?s note|vote|webnovel|discord|donate|paypal|privilege)))"
+        r"|(?P<SystemAngle>\s*<[^>]+>\s*[.?!]?\s*$|\s*(?:<[^>]+>\s*){2,}\s*$)"
+        r"|(?P<SystemSquare>\s*\[[^\]]+\]\s*[.?!]?\s*$|\s*(?:\[[^\]]+\]\s*){2,}\s*$)"
+        r"|(?P<Heading>Chapter\s+\d+[:\s])",
+        re.IGNORECASE,
+    )
+
+    # Angle-edge fixes on system angle lines
+    RE_TRAILING_PUNCT = re.compile(r"^(.*?)([.?!])\s*$")
+    RE_ANGLE_TOKEN = re.compile(r"<\s*(.*?)\s*>")
+
     def __init__(self, config: NormalizerConfig | None = None) -> None:
         """Initialize the normalizer with an optional config."""
 
@@ -130,13 +137,8 @@ class ChapterNormalizer:
         title = chapter.get("title", "")
 
         # 1) Trim trailing spaces (safe; does not change offsets within line)
-        paragraphs = [p.rstrip() for p in paragraphs]
-
         # 2) Basic sanitization: control chars & optional unicode normalization
-        if self.config.strip_control_chars:
-            paragraphs = [self._strip_control_chars(p) for p in paragraphs]
-        if self.config.unicode_normalization:
-            paragraphs = [unicodedata.normalize(self.config.unicode_normalization, p) for p in paragraphs]
+        paragraphs = [self._sanitize(p) for p in paragraphs]
 
         report = NormalizeReport()
 
@@ -188,7 +190,8 @@ class ChapterNormalizer:
 
         # 5) Produce joined text with LF line endings
         text = self.config.join_with.join(paragraphs)
-        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
 
         # 6) Compose output chapter (non-destructive: keep original title; add display_title)
         out = dict(chapter)
@@ -209,17 +212,8 @@ class ChapterNormalizer:
     def _classify_line(self, line: str) -> LineTag:
         """Classify a single paragraph line into a structural tag."""
 
-        if self.RE_SCENE_BREAK.match(line):
-            return LineTag.SECTION_BREAK
-        if self.RE_META.search(line):
-            return LineTag.META
-        if self.RE_SYSTEM_ANGLE_LINE.match(line) or self.RE_SYSTEM_ANGLE_MULTI.match(line):
-            return LineTag.SYSTEM_ANGLE
-        if self.RE_SYSTEM_SQUARE_LINE.match(line) or self.RE_SYSTEM_SQUARE_MULTI.match(line):
-            return LineTag.SYSTEM_SQUARE
-        if self.RE_HEADING.match(line):
-            return LineTag.HEADING
-        return LineTag.NONE
+        m = self.RE_LINE_RULES.match(line)
+        return LineTag(m.lastgroup) if m else LineTag.NONE
 
     def _normalize_system_angle_line(self, line: str) -> tuple[str, int]:
         """Strip inner-edge spaces inside < ... > tokens on a system angle line.
@@ -236,7 +230,7 @@ class ChapterNormalizer:
 
         # Separate trailing punctuation (., ?, !) if present at the very end.
         trailing_punct = ""
-        m = re.match(r"^(.*?)([.?!])\s*$", line)
+        m = self.RE_TRAILING_PUNCT.match(line)
         core = line
         if m:
             core, trailing_punct = m.group(1), m.group(2)
@@ -250,7 +244,7 @@ class ChapterNormalizer:
                 fixes += 1
             return f"<{trimmed}>"
 
-        core_fixed = re.sub(r"<\s*(.*?)\s*>", _trim_token, core)
+        core_fixed = self.RE_ANGLE_TOKEN.sub(_trim_token, core)
 
         fixed_line = f"{core_fixed}{trailing_punct}"
         return fixed_line, fixes
@@ -258,16 +252,29 @@ class ChapterNormalizer:
     def _find_inline_system_tokens(self, line: str) -> list[InlineTag]:
         """Return inline system token spans inside a normal line."""
 
-        spans = [
-            InlineTag(start=m.start(), end=m.end(), tag="SystemInlineAngle")
-            for m in self.RE_INLINE_ANGLE.finditer(line)
-        ]
-        spans.extend(
-            InlineTag(start=m.start(), end=m.end(), tag="SystemInlineSquare")
-            for m in self.RE_INLINE_SQUARE.finditer(line)
-        )
+        spans: list[InlineTag] = []
+        if "<" in line:
+            spans.extend(
+                InlineTag(start=m.start(), end=m.end(), tag="SystemInlineAngle")
+                for m in self.RE_INLINE_ANGLE.finditer(line)
+            )
+        if "[" in line:
+            spans.extend(
+                InlineTag(start=m.start(), end=m.end(), tag="SystemInlineSquare")
+                for m in self.RE_INLINE_SQUARE.finditer(line)
+            )
         return spans
 
+    def _sanitize(self, p: str) -> str:
+        """Apply steps 1-2 of ``normalize`` to one paragraph."""
+
+        p = p.rstrip()
+        if self.config.strip_control_chars:
+            p = self._strip_control_chars(p)
+        if self.config.unicode_normalization:
+            p = unicodedata.normalize(self.config.unicode_normalization, p)
+        return p
+
     def _strip_control_chars(self, s: str) -> str:
         """Remove control characters and BOM/NBSP-like codepoints."""
 
@@ -0,0 +1,214 @@
+"""Paragraph-level cache for incremental re-annotation of edited chapters.
+
+Segmentation is cached per paragraph, keyed by the paragraph text and its
+normalizer tags.  Attribution is cached per paragraph, keyed by the paragraph
+text plus the surrounding chapter text within the engine's context reach,
+the paragraph's spans, the neighbour spans across its boundaries, the roster
+and the engine configuration.  After an edit only the changed paragraphs and
+the paragraphs whose context window overlaps them miss the cache; all other
+spans are reused with their offsets shifted to the paragraph's new start.
+
+Entries are stored per chapter as JSON (``ch_XXXX.json``) and pruned to the
+keys used by the latest run.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from abm.annotate.attribute import AttributeEngine
+from abm.annotate.segment import Segmenter, Span, SpanType
+
+CACHE_VERSION = 1
+
+Attribution = tuple[str, str, float]
+
+
+@dataclass
+class ParagraphCacheStats:
+    """Per-chapter counters from the latest segment/attribute calls."""
+
+    paragraphs: int = 0
+    segment_reused: int = 0
+    attribute_reused: int = 0
+
+    @property
+    def reannotated(self) -> int:
+        return self.paragraphs - self.attribute_reused
+
+
+def _digest(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _lite(span: Span) -> dict[str, int]:
+    """Return the neighbour bounds ``AttributeEngine.attribute_span`` expects."""
+    return {"start": span.start, "end": span.end}
+
+
+class ParagraphAnnotationCache:
+    """Reuse segmentation and attribution results of unchanged paragraphs.
+
+    Attributes:
+        cache_dir: Where per-chapter entries are persisted (None keeps them in memory).
+        stats: Counters for the most recent chapter.
+    """
+
+    def __init__(self, segmenter: Segmenter, engine: AttributeEngine, cache_dir: Path | None = None) -> None:
+        self.segmenter = segmenter
+        self.engine = engine
+        self.cache_dir = cache_dir
+        self.stats = ParagraphCacheStats()
+        self._store: dict[int, dict[str, dict[str, Any]]] = {}
+        self._used: dict[int, dict[str, set[str]]] = {}
+
+    # --------------------------- Public API ---------------------------
+
+    def segment(self, chapter: dict[str, Any]) -> list[Span]:
+        """Return the same spans as ``Segmenter.segment(chapter)``, reusing cached paragraphs."""
+
+        idx = int(chapter.get("chapter_index", -1))
+        paragraphs: list[str] = list(chapter.get("paragraphs") or [])
+        line_tags: list[str] = list(chapter.get("line_tags") or [])
+        inline_tags: dict[str, list[dict[str, Any]]] = dict(chapter.get("inline_tags") or {})
+        join_with = self.segmenter.config.join_with
+        self.stats = ParagraphCacheStats(paragraphs=len(paragraphs))
+        if not join_with:
+            # Spans may merge across paragraphs; only whole-chapter segmentation is exact.
+            return self.segmenter.segment(chapter)
+
+        store = self._chapter_store(idx)["segments"]
+        used = self._chapter_used(idx, "segments")
+        config_key = asdict(self.segmenter.config)
+        starts = Segmenter._compute_paragraph_starts(paragraphs, join_with)
+        spans: list[Span] = []
+        for pi, (ptext, tag) in enumerate(zip(paragraphs, line_tags, strict=True)):
+            p_inline = inline_tags.get(str(pi), [])
+            key = _digest([config_key, ptext, tag, p_inline])
+            used.add(key)
+            rel = store.get(key)
+            if rel is None:
+                rel = [
+                    [s.start, s.end, s.type.value, s.subtype, s.notes]
+                    for s in self.segmenter.segment_paragraph(pi, ptext, tag, p_inline)
+                ]
+                store[key] = rel
+            else:
+                self.stats.segment_reused += 1
+            base = starts[pi]
+            spans.extend(
+                Span(base + a, base + b, SpanType(t), ptext[a:b], pi, subtype=st, notes=nt) for a, b, t, st, nt in rel
+            )
+        return spans
+
+    def attribute(self, chapter: dict[str, Any], spans: list[Span], roster: dict[str, list[str]]) -> list[Attribution]:
+        """Return ``(speaker, method, confidence)`` per span, as the runner's window-mode loop computes them."""
+
+        idx = int(chapter.get("chapter_index", -1))
+        text: str = chapter["text"]
+        reach = self.engine.context_reach()
+        if reach is None or not self.segmenter.config.join_with:
+            return [self._attribute_one(text, spans, i, roster) for i in range(len(spans))]
+
+        store = self._chapter_store(idx)["attributions"]
+        used = self._chapter_used(idx, "attributions")
+        paragraphs: list[str] = list(chapter.get("paragraphs") or [])
+        starts = Segmenter._compute_paragraph_starts(paragraphs, self.segmenter.config.join_with)
+        # Roster order matters (first matching alias wins), so it is not key-sorted
+        fingerprint = [self.engine.cache_fingerprint(), json.dumps(roster, ensure_ascii=False)]
+        out: list[Attribution] = []
+        i = 0
+        for pi, ptext in enumerate(paragraphs):
+            j = i
+            while j < len(spans) and spans[j].para_index == pi:
+                j += 1
+            p0, p1 = starts[pi], starts[pi] + len(ptext)
+            lo, hi = max(0, p0 - reach), min(len(text), p1 + reach)
+            prev_n = _lite(spans[i - 1]) if i > 0 else None
+            next_n = _lite(spans[j]) if j < len(spans) else None
+            key = _digest(
+                [
+                    fingerprint,
+                    text[lo:p0],
+                    text[p0:p1],
+                    text[p1:hi],
+                    lo == 0,
+                    hi == len(text),
+                    [[s.start - p0, s.end - p0, s.type.value, s.subtype] for s in spans[i:j]],
+                    _shift(prev_n, p0),
+                    _shift(next_n, p0),
+                ]
+            )
+            used.add(key)
+            cached = store.get(key)
+            if cached is None:
+                results = [self._attribute_one(text, spans, k, roster) for k in range(i, j)]
+                store[key] = [list(r) for r in results]
+            else:
+                results = [(str(sp), str(m), float(c)) for sp, m, c in cached]
+                self.stats.attribute_reused += 1
+            out.extend(results)
+            i = j
+        return out
+
+    def save(self, chapter_index: int) -> None:
+        """Persist the entries used for ``chapter_index`` (dropping stale ones)."""
+
+        used = self._used.pop(chapter_index, None)
+        store = self._store.get(chapter_index)
+        if used is None or store is None:
+            return
+        # Kinds not touched this run (e.g. segment-only stages) are kept as they were
+        kept = {
+            kind: {k: entries[k] for k in used[kind] if k in entries} if kind in used else entries
+            for kind, entries in store.items()
+        }
+        self._store[chapter_index] = kept
+        if self.cache_dir is None:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(chapter_index)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"version": CACHE_VERSION, **kept}, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+
+    # --------------------------- Internals ---------------------------
+
+    def _attribute_one(self, text: str, spans: list[Span], i: int, roster: dict[str, list[str]]) -> Attribution:
+        s = spans[i]
+        prev_s = _lite(spans[i - 1]) if i > 0 else None
+        next_s = _lite(spans[i + 1]) if i + 1 < len(spans) else None
+        return self.engine.attribute_span(text, (s.start, s.end), s.type.value, roster, neighbors=(prev_s, next_s))
+
+    def _path(self, chapter_index: int) -> Path:
+        assert self.cache_dir is not None
+        return self.cache_dir / f"ch_{chapter_index:04d}.json"
+
+    def _chapter_store(self, chapter_index: int) -> dict[str, dict[str, Any]]:
+        store = self._store.get(chapter_index)
+        if store is None:
+            store = {"segments": {}, "attributions": {}}
+            if self.cache_dir is not None and self._path(chapter_index).exists():
+                try:
+                    data = json.loads(self._path(chapter_index).read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    data = {}
+                if data.get("version") == CACHE_VERSION:
+                    store = {"segments": data.get("segments", {}), "attributions": data.get("attributions", {})}
+            self._store[chapter_index] = store
+        return store
+
+    def _chapter_used(self, chapter_index: int, kind: str) -> set[str]:
+        return self._used.setdefault(chapter_index, {}).setdefault(kind, set())
+
+
+def _shift(lite: dict[str, int] | None, offset: int) -> list[int] | None:
+    """Return neighbour bounds relative to ``offset`` for a position-free cache key."""
+    if lite is None:
+        return None
+    return [lite["start"] - offset, lite["end"] - offset]
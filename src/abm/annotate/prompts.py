@@ -1,7 +1,16 @@
-"""Prompt helpers for LLM speaker attribution."""
+"""Prompt helpers for LLM speaker attribution.
+
+Prompts are laid out so that everything shared between requests comes first:
+the system instructions, then the chapter roster and the task instructions,
+and only then the span-specific fields.  Servers with prompt/KV caching
+(llama.cpp, Ollama, vLLM) can therefore reuse the whole prefix for every span
+of a chapter.
+"""
 
 from __future__ import annotations
 
+import hashlib
+
 SYSTEM_SPEAKER = (
     "You are a careful literary annotator. "
     "Given a dialogue or thought span and its local context, "
@@ -11,6 +20,31 @@ SYSTEM_SPEAKER = (
 )
 
 
+def speaker_prompt_prefix(roster: dict[str, list[str]]) -> str:
+    """Return the span-independent head of the user prompt.
+
+    The result depends only on the roster names (sorted), so it is
+    byte-identical for every span of a chapter.
+
+    Args:
+        roster: Mapping of speaker names to aliases.
+
+    Returns:
+        str: Roster line followed by the task instructions.
+
+    Raises:
+        None
+    """
+
+    roster_flat = sorted(roster.keys()) if roster else []
+    roster_str = ", ".join(roster_flat) if roster_flat else "[]"
+    return (
+        f"ROSTER: {roster_str}\n"
+        "Choose the SPEAKER from ROSTER or 'Unknown'. "
+        'Return JSON: {"speaker": <string>, "confidence": <0..1>}.\n\n'
+    )
+
+
 def speaker_user_prompt(
     roster: dict[str, list[str]],
     left: str,
@@ -34,14 +68,25 @@ def speaker_user_prompt(
         None
     """
 
-    roster_flat = sorted(roster.keys()) if roster else []
-    roster_str = ", ".join(roster_flat) if roster_flat else "[]"
-    return (
-        f"ROSTER: {roster_str}\n"
-        f"SPAN_TYPE: {span_type}\n"
-        f"LEFT: {left}\n"
-        f"SPAN: {mid}\n"
-        f"RIGHT: {right}\n\n"
-        "Choose the SPEAKER from ROSTER or 'Unknown'. "
-        'Return JSON: {"speaker": <string>, "confidence": <0..1>}.'
-    )
+    return speaker_prompt_prefix(roster) + f"SPAN_TYPE: {span_type}\nLEFT: {left}\nSPAN: {mid}\nRIGHT: {right}"
+
+
+def _prompt_version() -> str:
+    """Return a short hash identifying the current prompt templates.
+
+    Returns:
+        str: First 12 hex chars of a SHA-256 over the system prompt and an
+        empty rendering of the user template.
+
+    Raises:
+        None
+    """
+
+    h = hashlib.sha256()
+    h.update(SYSTEM_SPEAKER.encode("utf-8"))
+    h.update(speaker_user_prompt({}, "", "", "", "").encode("utf-8"))
+    return h.hexdigest()[:12]
+
+
+# Part of the LLM cache key: editing either template invalidates old decisions.
+PROMPT_VERSION = _prompt_version()
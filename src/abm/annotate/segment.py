@@ -90,24 +90,7 @@ class Segmenter:
         spans: list[Span] = []
 
         for pi, (ptext, tag) in enumerate(zip(paragraphs, line_tags, strict=True)):
-            abs_start = para_starts[pi]
-            abs_end = abs_start + len(ptext)
-
-            if tag == "Heading" and self.config.include_heading:
-                spans.append(Span(abs_start, abs_end, SpanType.HEADING, ptext, pi))
-                continue
-            if tag == "Meta" and self.config.include_meta:
-                spans.append(Span(abs_start, abs_end, SpanType.META, ptext, pi))
-                continue
-            if tag == "SectionBreak" and self.config.include_section_break:
-                spans.append(Span(abs_start, abs_end, SpanType.SECTION_BREAK, ptext, pi))
-                continue
-            if tag in {"SystemAngle", "SystemSquare"} and self.config.include_system_lines:
-                subtype = "LineAngle" if tag == "SystemAngle" else "LineSquare"
-                spans.append(Span(abs_start, abs_end, SpanType.SYSTEM, ptext, pi, subtype=subtype))
-                continue
-
-            spans.extend(self._segment_paragraph(pi, ptext, abs_start, inline_tags.get(str(pi), [])))
+            spans.extend(self._paragraph_spans(pi, ptext, tag, inline_tags.get(str(pi), []), para_starts[pi]))
 
         spans = sorted(spans, key=lambda s: (s.start, s.end))
         if self.config.merge_adjacent_same_type:
@@ -115,6 +98,51 @@ class Segmenter:
 
         return spans
 
+    def segment_paragraph(
+        self,
+        para_index: int,
+        ptext: str,
+        tag: str,
+        paragraph_inline_tags: list[dict[str, Any]],
+        abs_start: int = 0,
+    ) -> list[Span]:
+        """Segment one paragraph on its own (sorted and merged like `segment`).
+
+        With a non-empty `join_with`, spans never merge across paragraphs, so
+        concatenating the per-paragraph results (shifted to each paragraph's
+        start) equals `segment` on the whole chapter.
+        """
+
+        spans = sorted(
+            self._paragraph_spans(para_index, ptext, tag, paragraph_inline_tags, abs_start),
+            key=lambda s: (s.start, s.end),
+        )
+        if self.config.merge_adjacent_same_type:
+            spans = self._merge_adjacent(spans)
+        return spans
+
+    def _paragraph_spans(
+        self,
+        pi: int,
+        ptext: str,
+        tag: str,
+        paragraph_inline_tags: list[dict[str, Any]],
+        abs_start: int,
+    ) -> list[Span]:
+        """Return a paragraph's line-level span, or its Narration + overlay spans."""
+
+        abs_end = abs_start + len(ptext)
+        if tag == "Heading" and self.config.include_heading:
+            return [Span(abs_start, abs_end, SpanType.HEADING, ptext, pi)]
+        if tag == "Meta" and self.config.include_meta:
+            return [Span(abs_start, abs_end, SpanType.META, ptext, pi)]
+        if tag == "SectionBreak" and self.config.include_section_break:
+            return [Span(abs_start, abs_end, SpanType.SECTION_BREAK, ptext, pi)]
+        if tag in {"SystemAngle", "SystemSquare"} and self.config.include_system_lines:
+            subtype = "LineAngle" if tag == "SystemAngle" else "LineSquare"
+            return [Span(abs_start, abs_end, SpanType.SYSTEM, ptext, pi, subtype=subtype)]
+        return self._segment_paragraph(pi, ptext, abs_start, paragraph_inline_tags)
+
     def _segment_paragraph(
         self,
         para_index: int,
@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
 import soundfile as sf
 
-__all__ = ["load_wav", "ensure_mono", "silence", "assemble"]
+__all__ = ["Span", "load_wav", "ensure_mono", "silence", "assemble", "assemble_to_file"]
+
+#: A span to assemble: a WAV file, or ``(samples, sample_rate)`` already in memory.
+Span = Path | tuple[np.ndarray, int]
 
 
 def load_wav(path: Path) -> tuple[np.ndarray, int]:
@@ -39,8 +44,39 @@ def silence(duration_ms: int, sr: int) -> np.ndarray:
     return np.zeros(n, dtype=np.float32)
 
 
+def _maybe_resample(
+    y: np.ndarray, sr_in: int, sr_out: int, allow_resample: bool
+) -> np.ndarray:
+    if sr_in == sr_out:
+        return y
+    if not allow_resample:
+        raise ValueError("Sample rate mismatch; pass allow_resample=True")
+    try:  # pragma: no cover - optional dependency
+        from scipy import signal  # type: ignore
+
+        y = signal.resample_poly(y, sr_out, sr_in).astype(np.float32)
+        return y
+    except Exception as exc:  # pragma: no cover - scipy missing
+        raise ValueError("Sample rate mismatch and scipy unavailable") from exc
+
+
+def _span_info(span: Span) -> tuple[int, int]:
+    """Return ``(sample_rate, frames)`` of ``span`` without decoding a file."""
+
+    if isinstance(span, tuple):
+        y, sr = span
+        return int(sr), len(y)
+    info = sf.info(str(span))
+    return int(info.samplerate), int(info.frames)
+
+
+def _load_span(span: Span, sr: int, allow_resample: bool) -> np.ndarray:
+    y, sr_in = span if isinstance(span, tuple) else load_wav(span)
+    return ensure_mono(_maybe_resample(y, int(sr_in), sr, allow_resample))
+
+
 def assemble(
-    span_paths: list[Path],
+    span_paths: list[Span],
     pauses_ms: list[int],
     *,
     crossfade_ms: int = 15,
@@ -50,7 +86,8 @@ def assemble(
     """Stitch a sequence of span WAVs with pauses and crossfades.
 
     Args:
-        span_paths: Ordered list of WAV files to concatenate.
+        span_paths: Ordered list of WAV files to concatenate; in-memory
+            ``(samples, sample_rate)`` spans may be mixed in.
         pauses_ms: Silence duration to insert after each span; must have the
             same length as ``span_paths``.
         crossfade_ms: Duration of the equal-power crossfade at joins.
@@ -67,55 +104,174 @@ def assemble(
     if not span_paths:
         raise ValueError("No spans provided")
 
-    def _maybe_resample(y: np.ndarray, sr_in: int, sr_out: int) -> np.ndarray:
-        if sr_in == sr_out:
-            return y
-        if not allow_resample:
-            raise ValueError("Sample rate mismatch; pass allow_resample=True")
-        try:  # pragma: no cover - optional dependency
-            from scipy import signal  # type: ignore
+    def _load(span: Span) -> np.ndarray:
+        return _load_span(span, sr, allow_resample)
 
-            y = signal.resample_poly(y, sr_out, sr_in).astype(np.float32)
-            return y
-        except Exception as exc:  # pragma: no cover - scipy missing
-            raise ValueError("Sample rate mismatch and scipy unavailable") from exc
-
-    first, sr0 = load_wav(span_paths[0])
-    sr = sr_hint or sr0
-    first = _maybe_resample(first, sr0, sr)
-    out = ensure_mono(first)
+    # Pass 1: segment lengths, joins and the exact output size. Lengths come
+    # from the WAV headers; only inputs that need resampling are loaded here.
+    infos = [_span_info(p) for p in span_paths]
+    sr = sr_hint or infos[0][0]
+    preloaded: dict[int, np.ndarray] = {}
+    lengths: list[int] = []
+    for idx, (span_sr, frames) in enumerate(infos):
+        if span_sr != sr:
+            preloaded[idx] = _load(span_paths[idx])
+            lengths.append(len(preloaded[idx]))
+        else:
+            lengths.append(frames)
 
     crossfade_samples = int(round(sr * crossfade_ms / 1000))
-
-    for idx in range(len(span_paths) - 1):
-        pause = pauses_ms[idx]
-        nxt, sr2 = load_wav(span_paths[idx + 1])
-        nxt = _maybe_resample(nxt, sr2, sr)
-        nxt = ensure_mono(nxt)
-
-        if pause > 0:
-            out = np.concatenate([out, silence(pause, sr), nxt])
-            continue
-
-        if (
+    starts = [0]
+    overlaps = [0]
+    pos = lengths[0]
+    for idx in range(1, len(span_paths)):
+        overlap = 0
+        if pauses_ms[idx - 1] > 0:
+            pos += len(silence(pauses_ms[idx - 1], sr))
+        elif (
             crossfade_samples > 0
-            and len(out) >= crossfade_samples
-            and len(nxt) >= crossfade_samples
+            and pos >= crossfade_samples
+            and lengths[idx] >= crossfade_samples
         ):
-            fade_out = np.sqrt(np.linspace(1.0, 0.0, crossfade_samples, endpoint=False))
-            fade_in = np.sqrt(np.linspace(0.0, 1.0, crossfade_samples, endpoint=False))
-            tail = out[-crossfade_samples:]
-            head = nxt[:crossfade_samples]
-            cross = tail * fade_out + head * fade_in
-            out = np.concatenate(
-                [out[:-crossfade_samples], cross, nxt[crossfade_samples:]]
-            )
-        else:
-            out = np.concatenate([out, nxt])
+            overlap = crossfade_samples
+            pos -= overlap
+        starts.append(pos)
+        overlaps.append(overlap)
+        pos += lengths[idx]
+    if pauses_ms[-1] > 0:
+        pos += len(silence(pauses_ms[-1], sr))
 
-    final_pause = pauses_ms[-1]
-    if final_pause > 0:
-        out = np.concatenate([out, silence(final_pause, sr)])
+    # Pass 2: write every span into one preallocated buffer. Crossfades are
+    # computed in float64 and rounded once on store; the latest one is kept in
+    # float64 because a short next span can crossfade over part of it again.
+    out = np.zeros(pos, dtype=np.float32)
+    n = crossfade_samples
+    fade_out = np.sqrt(np.linspace(1.0, 0.0, n, endpoint=False)) if n > 0 else None
+    fade_in = np.sqrt(np.linspace(0.0, 1.0, n, endpoint=False)) if n > 0 else None
+    cross: np.ndarray | None = None
+    cross_at = 0
+    for idx, path in enumerate(span_paths):
+        y = preloaded.pop(idx) if idx in preloaded else _load(path)
+        if len(y) != lengths[idx]:
+            raise ValueError(f"Unexpected frame count in span {idx}")
+        start, overlap = starts[idx], overlaps[idx]
+        if overlap:
+            tail = out[start : start + n].astype(np.float64)
+            if cross is not None and start < cross_at + n:
+                lo = start - cross_at
+                tail[: n - lo] = cross[lo:]
+            cross = tail * fade_out + y[:n] * fade_in
+            cross_at = start
+            out[start : start + n] = cross
+            out[start + n : start + len(y)] = y[n:]
+        else:
+            out[start : start + len(y)] = y
 
-    out = np.clip(out, -1.0, 1.0).astype(np.float32)
+    np.clip(out, -1.0, 1.0, out=out)
     return out, sr
+
+
+def assemble_to_file(
+    span_paths: list[Span],
+    pauses_ms: list[int],
+    out_path: Path,
+    *,
+    crossfade_ms: int = 15,
+    sr_hint: int | None = None,
+    allow_resample: bool = False,
+    subtype: str = "FLOAT",
+    prefetch: int = 2,
+) -> tuple[Path, int]:
+    """Stream span WAVs into ``out_path`` without holding the chapter in memory.
+
+    Produces the same samples as :func:`assemble` (written as ``float32`` by
+    default) while keeping only the span being joined, up to ``prefetch``
+    decoded spans read ahead by a background thread, and a crossfade-length
+    carry-over in memory. Peak memory therefore depends on the longest span,
+    not on the chapter length.
+
+    Args:
+        span_paths: Ordered list of WAV files to concatenate; in-memory
+            ``(samples, sample_rate)`` spans may be mixed in.
+        pauses_ms: Silence duration to insert after each span; must have the
+            same length as ``span_paths``.
+        out_path: Destination WAV file; removed again if assembly fails.
+        crossfade_ms: Duration of the equal-power crossfade at joins.
+        sr_hint: If provided, enforce that all input files use this sample rate.
+        allow_resample: Resample mismatched inputs if ``True`` and ``scipy`` is
+            available; otherwise raise a ``ValueError``.
+        subtype: ``soundfile`` subtype of the output; ``"FLOAT"`` keeps the
+            assembled samples bit-exact.
+        prefetch: Number of spans decoded ahead of the one being written.
+
+    Returns:
+        Tuple ``(out_path, sr)``.
+    """
+
+    if len(span_paths) != len(pauses_ms):
+        raise ValueError("pauses_ms must match span_paths length")
+    if not span_paths:
+        raise ValueError("No spans provided")
+
+    sr = sr_hint or _span_info(span_paths[0])[0]
+    n = int(round(sr * crossfade_ms / 1000))
+    fade_out = np.sqrt(np.linspace(1.0, 0.0, n, endpoint=False)) if n > 0 else None
+    fade_in = np.sqrt(np.linspace(0.0, 1.0, n, endpoint=False)) if n > 0 else None
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # The last ``n`` output samples stay unwritten in float64: the next span
+    # may crossfade over them, and crossfaded samples must not be rounded
+    # before a following crossfade reuses them (see ``assemble``).
+    carry = np.zeros(0, dtype=np.float64)
+
+    def _write(f: sf.SoundFile, block: np.ndarray) -> None:
+        f.write(np.clip(block, -1.0, 1.0).astype(np.float32))
+
+    def _push(f: sf.SoundFile, block: np.ndarray) -> None:
+        nonlocal carry
+        if len(block) >= n:
+            _write(f, carry)
+            _write(f, block[: len(block) - n])
+            carry = block[len(block) - n :].astype(np.float64)
+            return
+        buf = np.concatenate([carry, block])
+        cut = max(len(buf) - n, 0)
+        _write(f, buf[:cut])
+        carry = buf[cut:]
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="abm-assemble") as pool:
+        pending: deque[Future[np.ndarray]] = deque()
+        ahead = iter(span_paths)
+
+        def _fill() -> None:
+            while len(pending) <= max(prefetch, 0):
+                path = next(ahead, None)
+                if path is None:
+                    return
+                pending.append(pool.submit(_load_span, path, sr, allow_resample))
+
+        try:
+            with sf.SoundFile(
+                str(out_path), "w", samplerate=sr, channels=1, subtype=subtype
+            ) as f:
+                for idx in range(len(span_paths)):
+                    _fill()
+                    y = pending.popleft().result()
+                    pause = pauses_ms[idx - 1] if idx else 0
+                    if pause > 0:
+                        _push(f, silence(pause, sr))
+                        _push(f, y)
+                    elif n > 0 and len(carry) == n and len(y) >= n:
+                        carry = carry * fade_out + y[:n] * fade_in
+                        _push(f, y[n:])
+                    else:
+                        _push(f, y)
+                if pauses_ms[-1] > 0:
+                    _push(f, silence(pauses_ms[-1], sr))
+                _write(f, carry)
+        except BaseException:
+            for fut in pending:
+                fut.cancel()
+            out_path.unlink(missing_ok=True)
+            raise
+    return out_path, sr
@@ -0,0 +1,301 @@
+"""Storage codecs for cached TTS segments.
+
+Three codecs are available, selected by name:
+
+- ``wav``: 16-bit PCM WAV, the historical format (default).
+- ``flac``: lossless FLAC at the same bit depth; typically 30-60% smaller for
+  speech, at the cost of decoding on every read.
+- ``npy``: raw ``float32`` NumPy arrays; largest on disk but read zero-copy
+  as read-only memory maps.
+
+An entry's codec follows from its suffix, so a cache written with one codec
+keeps working after switching to another: lookups try the configured codec
+first and then the others (see :func:`find_entry`). ``.npy`` files carry no
+sample rate; it is recorded in the cache index (:mod:`abm.audio.tts_cache`)
+or implied by the cache key.
+"""
+
+from __future__ import annotations
+
+import io
+import math
+import os
+import struct
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, BinaryIO, Literal
+
+import numpy as np
+import soundfile as sf
+
+__all__ = [
+    "CODECS",
+    "CacheCodec",
+    "FlacCodec",
+    "NpyCodec",
+    "WavCodec",
+    "check_wav",
+    "codec_for_path",
+    "find_entry",
+    "get_codec",
+]
+
+
+def check_wav(path: Path) -> tuple[str | None, int, int]:
+    """Validate the RIFF/WAVE header of ``path`` against the file's length.
+
+    Only the chunk headers are read, so the check is cheap enough to run on
+    every cache hit.
+
+    Args:
+        path: WAV file to inspect.
+
+    Returns:
+        Tuple ``(problem, frames, samplerate)``; ``problem`` is ``None`` for a
+        usable file, otherwise a short description (e.g. a truncated data
+        chunk left by a killed render).
+    """
+
+    try:
+        size = path.stat().st_size
+        with path.open("rb") as f:
+            head = f.read(12)
+            if len(head) < 12 or head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+                return "not a RIFF/WAVE file", 0, 0
+            block_align = samplerate = 0
+            while True:
+                chunk = f.read(8)
+                if len(chunk) < 8:
+                    return "missing data chunk", 0, samplerate
+                cid, csize = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+                if cid == b"fmt ":
+                    fmt = f.read(csize)
+                    if len(fmt) < 16:
+                        return "truncated fmt chunk", 0, 0
+                    samplerate = struct.unpack("<I", fmt[4:8])[0]
+                    block_align = struct.unpack("<H", fmt[12:14])[0]
+                    if csize % 2:
+                        f.seek(1, os.SEEK_CUR)
+                elif cid == b"data":
+                    if not block_align or not samplerate:
+                        return "data chunk before fmt chunk", 0, samplerate
+                    available = size - f.tell()
+                    if csize > available:
+                        return f"truncated: header declares {csize} data bytes, file has {available}", 0, samplerate
+                    frames = csize // block_align
+                    if frames == 0:
+                        return "no audio frames", 0, samplerate
+                    return None, frames, samplerate
+                else:
+                    f.seek(csize + csize % 2, os.SEEK_CUR)
+    except OSError as exc:
+        return f"unreadable: {exc}", 0, 0
+
+
+def _pcm16(y: np.ndarray, sr: int) -> np.ndarray:
+    """Return ``y`` as the ``int16`` samples libsndfile stores in a PCM_16 WAV."""
+
+    if y.dtype == np.int16:
+        return y
+    buf = io.BytesIO()
+    sf.write(buf, y, sr, subtype="PCM_16", format="WAV")
+    buf.seek(0)
+    pcm, _ = sf.read(buf, dtype="int16")
+    return np.asarray(pcm)
+
+
+_NPY_HEADER_LOCK = threading.Lock()
+# (shape, fortran_order, dtype) from the header that follows the magic string
+_NPY_HEADER_READERS: dict[tuple[int, int], Callable[[BinaryIO], tuple[tuple[int, ...], bool, np.dtype[Any]]]] = {
+    (1, 0): np.lib.format.read_array_header_1_0,
+    (2, 0): np.lib.format.read_array_header_2_0,
+}
+
+
+def _load_npy(path: Path, *, mmap: bool = False) -> np.ndarray:
+    """Thread-safe ``np.load`` for ``.npy`` cache entries.
+
+    NumPy parses the header with ``ast.literal_eval``, which on Python 3.11
+    can fail with ``SystemError: AST constructor recursion depth mismatch``
+    when several threads parse at once. Only the header is parsed under a
+    lock; the data is then mapped or read at the known offset.
+
+    Raises:
+        ValueError: On a bad header or data shorter than the header declares.
+    """
+
+    with open(path, "rb") as f:
+        with _NPY_HEADER_LOCK:
+            version = np.lib.format.read_magic(f)  # type: ignore[no-untyped-call]
+            reader = _NPY_HEADER_READERS.get(version)
+            if reader is None:
+                raise ValueError(f"unsupported .npy format version {version}")
+            shape, fortran, dtype = reader(f)
+        if dtype.hasobject:
+            raise ValueError("object arrays are not valid cache entries")
+        offset = f.tell()
+        order: Literal["C", "F"] = "F" if fortran else "C"
+        if mmap:
+            return np.memmap(path, dtype=dtype, mode="r", shape=shape, order=order, offset=offset)
+        count = math.prod(shape)
+        data = np.fromfile(f, dtype=dtype, count=count)
+    if data.size != count:
+        raise ValueError(f"truncated .npy data: {data.size} of {count} items")
+    return data.reshape(shape, order=order)
+
+
+class CacheCodec:
+    """Encode, decode and validate one cache file format.
+
+    Attributes:
+        name: Codec name used in configuration and the cache index.
+        suffix: File suffix of entries written with this codec.
+        wav_subtype: ``soundfile`` subtype that reproduces decoded samples
+            exactly when an entry has to be materialized as a WAV span.
+        stores_rate: Whether files record their own sample rate.
+    """
+
+    name = ""
+    suffix = ""
+    wav_subtype = "PCM_16"
+    stores_rate = True
+
+    def write(self, path: Path, y: np.ndarray, sr: int) -> None:
+        """Write mono samples ``y`` at ``sr`` Hz to ``path``."""
+
+        raise NotImplementedError
+
+    def read(self, path: Path, *, mmap: bool = False) -> tuple[np.ndarray, int | None]:
+        """Return ``(samples, sample_rate)``; the rate is ``None`` if not stored.
+
+        With ``mmap`` the codec may return a read-only memory-mapped array.
+        """
+
+        raise NotImplementedError
+
+    def check(self, path: Path) -> tuple[str | None, int, int]:
+        """Return ``(problem, frames, samplerate)`` like :func:`check_wav`."""
+
+        raise NotImplementedError
+
+    def quantize(self, y: np.ndarray, sr: int) -> np.ndarray:
+        """Return the samples reading a freshly written entry of ``y`` would give.
+
+        Lets callers that keep audio in memory hand out exactly what a later
+        cache hit returns, without a round-trip through the file.
+        """
+
+        raise NotImplementedError
+
+
+class WavCodec(CacheCodec):
+    """16-bit PCM WAV (the historical cache format)."""
+
+    name = "wav"
+    suffix = ".wav"
+
+    def write(self, path: Path, y: np.ndarray, sr: int) -> None:
+        sf.write(path, y, sr, subtype="PCM_16", format="WAV")
+
+    def read(self, path: Path, *, mmap: bool = False) -> tuple[np.ndarray, int | None]:
+        y, sr = sf.read(path, dtype="float32")
+        return y, int(sr)
+
+    def check(self, path: Path) -> tuple[str | None, int, int]:
+        return check_wav(path)
+
+    def quantize(self, y: np.ndarray, sr: int) -> np.ndarray:
+        return _pcm16(y, sr).astype(np.float32) / np.float32(32768.0)
+
+
+class FlacCodec(WavCodec):
+    """Lossless FLAC at 16 bits, matching the samples a WAV entry would hold."""
+
+    name = "flac"
+    suffix = ".flac"
+
+    def write(self, path: Path, y: np.ndarray, sr: int) -> None:
+        # libsndfile quantizes float input differently for FLAC than for WAV;
+        # go through the WAV encoder so both hold the same samples.
+        sf.write(path, _pcm16(y, sr), sr, subtype="PCM_16", format="FLAC")
+
+    def check(self, path: Path) -> tuple[str | None, int, int]:
+        # STREAMINFO declares the length up front, so a truncated file only
+        # shows when decoding its last frame (one seek, not a full decode).
+        try:
+            with sf.SoundFile(str(path)) as f:
+                frames, samplerate = int(f.frames), int(f.samplerate)
+                if frames <= 0:
+                    return "no audio frames", 0, samplerate
+                f.seek(frames - 1)
+                if len(f.read(1)) != 1:
+                    return "truncated: last frame missing", 0, samplerate
+        except (RuntimeError, OSError) as exc:  # soundfile raises LibsndfileError(RuntimeError)
+            return f"unreadable: {exc}", 0, 0
+        return None, frames, samplerate
+
+
+class NpyCodec(CacheCodec):
+    """Raw ``float32`` samples in ``.npy`` format for memory-mapped reads."""
+
+    name = "npy"
+    suffix = ".npy"
+    wav_subtype = "FLOAT"
+    stores_rate = False
+
+    def write(self, path: Path, y: np.ndarray, sr: int) -> None:
+        with open(path, "wb") as f:  # a file object stops np.save appending ".npy"
+            np.save(f, np.ascontiguousarray(y, dtype=np.float32))
+
+    def read(self, path: Path, *, mmap: bool = False) -> tuple[np.ndarray, int | None]:
+        return _load_npy(path, mmap=mmap), None
+
+    def quantize(self, y: np.ndarray, sr: int) -> np.ndarray:
+        return np.ascontiguousarray(y, dtype=np.float32)
+
+    def check(self, path: Path) -> tuple[str | None, int, int]:
+        try:
+            y = _load_npy(path, mmap=True)
+        except (ValueError, OSError) as exc:  # bad header or data shorter than declared
+            return f"unreadable: {exc}", 0, 0
+        if y.dtype != np.float32 or y.ndim != 1:
+            return f"unexpected array {y.dtype}{list(y.shape)}", 0, 0
+        if y.size == 0:
+            return "no audio frames", 0, 0
+        return None, int(y.size), 0
+
+
+CODECS: dict[str, CacheCodec] = {c.name: c for c in (WavCodec(), FlacCodec(), NpyCodec())}
+_BY_SUFFIX = {c.suffix: c for c in CODECS.values()}
+
+
+def get_codec(name: str | CacheCodec) -> CacheCodec:
+    """Return the codec called ``name`` (codec instances pass through).
+
+    Raises:
+        ValueError: If ``name`` is not a known codec.
+    """
+
+    if isinstance(name, CacheCodec):
+        return name
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"unknown cache codec {name!r}; expected one of {sorted(CODECS)}") from None
+
+
+def codec_for_path(path: Path) -> CacheCodec | None:
+    """Return the codec that wrote ``path``, judged by its suffix."""
+
+    return _BY_SUFFIX.get(Path(path).suffix)
+
+
+def find_entry(path: Path, preferred: CacheCodec) -> Path | None:
+    """Locate an existing entry for ``path`` in any codec, ``preferred`` first."""
+
+    for codec in (preferred, *(c for c in CODECS.values() if c is not preferred)):
+        candidate = Path(path).with_suffix(codec.suffix)
+        if candidate.exists():
+            return candidate
+    return None
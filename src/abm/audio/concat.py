@@ -4,7 +4,35 @@ from __future__ import annotations
 
 import numpy as np
 
-__all__ = ["equal_power_crossfade", "micro_fade"]
+__all__ = [
+    "crossfade_overlap",
+    "equal_power_crossfade",
+    "equal_power_crossfade_into",
+    "join_segments",
+    "micro_fade",
+    "micro_fade_inplace",
+]
+
+
+def crossfade_overlap(len_a: int, len_b: int, sr: int, crossfade_ms: int) -> int:
+    """Return how many samples :func:`equal_power_crossfade` overlaps for these lengths.
+
+    Args:
+        len_a: Length of the first signal.
+        len_b: Length of the second signal.
+        sr: Sample rate in Hz.
+        crossfade_ms: Duration of the crossfade in milliseconds.
+
+    Returns:
+        Overlap in samples; ``0`` means the signals are simply concatenated.
+    """
+
+    if crossfade_ms <= 0:
+        return 0
+    n = int(sr * crossfade_ms / 1000)
+    if n <= 0 or n > len_a or n > len_b:
+        return 0
+    return n
 
 
 def equal_power_crossfade(
@@ -22,10 +50,8 @@ def equal_power_crossfade(
         Concatenated signal.
     """
 
-    if crossfade_ms <= 0:
-        return np.concatenate([a, b]).astype(np.float32)
-    n = int(sr * crossfade_ms / 1000)
-    if n <= 0 or n > len(a) or n > len(b):
+    n = crossfade_overlap(len(a), len(b), sr, crossfade_ms)
+    if n == 0:
         return np.concatenate([a, b]).astype(np.float32)
     t = np.linspace(0.0, 1.0, n, endpoint=False, dtype=np.float32)
     fade_out = np.sqrt(1.0 - t)
@@ -35,6 +61,26 @@ def equal_power_crossfade(
     return joined
 
 
+def equal_power_crossfade_into(buf: np.ndarray, pos: int, a_tail: np.ndarray) -> None:
+    """In-place :func:`equal_power_crossfade` inside a preallocated buffer.
+
+    ``buf[pos:pos + n]`` must already hold the head of the second signal and
+    ``a_tail`` the last ``n`` samples of the first one (saved before they were
+    overwritten). The mixed samples equal those of :func:`equal_power_crossfade`.
+
+    Args:
+        buf: Output buffer (``float32``), modified in place.
+        pos: Start of the overlap in ``buf``.
+        a_tail: Last ``n`` samples of the first signal.
+    """
+
+    n = len(a_tail)
+    t = np.linspace(0.0, 1.0, n, endpoint=False, dtype=np.float32)
+    fade_out = np.sqrt(1.0 - t)
+    fade_in = np.sqrt(t)
+    buf[pos : pos + n] = a_tail * fade_out + buf[pos : pos + n] * fade_in
+
+
 def micro_fade(
     signal: np.ndarray, sr: int, head_ms: int = 5, tail_ms: int = 5
 ) -> np.ndarray:
@@ -50,13 +96,73 @@ def micro_fade(
         Faded signal in float32.
     """
 
-    out = signal.astype(np.float32).copy()
+    return micro_fade_inplace(signal.astype(np.float32).copy(), sr, head_ms, tail_ms)
+
+
+def micro_fade_inplace(
+    signal: np.ndarray, sr: int, head_ms: int = 5, tail_ms: int = 5
+) -> np.ndarray:
+    """Apply :func:`micro_fade` to a ``float32`` array (or buffer view) in place.
+
+    Returns:
+        ``signal`` itself.
+    """
+
     n_head = int(sr * head_ms / 1000)
     n_tail = int(sr * tail_ms / 1000)
     if n_head > 0:
         fade = np.linspace(0.0, 1.0, n_head, endpoint=False, dtype=np.float32)
-        out[:n_head] *= fade
+        signal[:n_head] *= fade
     if n_tail > 0:
         fade = np.linspace(1.0, 0.0, n_tail, endpoint=False, dtype=np.float32)
-        out[-n_tail:] *= fade
+        signal[-n_tail:] *= fade
+    return signal
+
+
+def join_segments(
+    segments: list[np.ndarray], pauses_ms: list[int], sr: int, crossfade_ms: int
+) -> np.ndarray:
+    """Micro-fade each segment and join them with pauses or crossfades.
+
+    A pause after a segment inserts silence and disables the crossfade of that
+    join; the pause after the last segment is not rendered. Two passes over
+    one preallocated ``float32`` buffer: the first sizes it from the segment
+    lengths, pauses and crossfade overlaps, the second writes each segment,
+    fades it in place and crossfades it with the saved tail of the previous
+    one. Samples equal those of joining ``micro_fade(y)`` one at a time with
+    :func:`equal_power_crossfade`, in linear instead of quadratic time.
+
+    Args:
+        segments: Mono signals in order.
+        pauses_ms: Pause after each segment in milliseconds.
+        sr: Sample rate in Hz.
+        crossfade_ms: Crossfade duration for joins without a pause.
+
+    Returns:
+        Joined ``float32`` signal.
+    """
+
+    starts: list[int] = []
+    overlaps: list[int] = []
+    pos = 0
+    for idx, y in enumerate(segments):
+        overlap = 0
+        if idx > 0:
+            p_ms = int(pauses_ms[idx - 1])
+            if p_ms > 0:
+                pos += max(0, int(sr * (p_ms / 1000.0)))
+            else:
+                overlap = crossfade_overlap(pos, len(y), sr, crossfade_ms)
+        pos -= overlap
+        starts.append(pos)
+        overlaps.append(overlap)
+        pos += len(y)
+
+    out = np.zeros(pos, dtype=np.float32)
+    for y, start, overlap in zip(segments, starts, overlaps, strict=True):
+        a_tail = out[start : start + overlap].copy()
+        out[start : start + len(y)] = y
+        micro_fade_inplace(out[start : start + len(y)], sr)
+        if overlap:
+            equal_power_crossfade_into(out, start, a_tail)
     return out
@@ -1,5 +1,10 @@
 """Piper TTS adapter (CLI-based, CPU-friendly).
 
+Synthesis goes through the resident worker pool of :mod:`abm.audio.piper_pool`
+(one long-lived ``piper --json-input`` process per voice model) unless the pool
+is disabled with ``pool=False`` or env ``ABM_PIPER_POOL=0``, in which case the
+``piper`` CLI is started per request.
+
 Supports a dry-run mode (env ABM_PIPER_DRYRUN=1) that writes a short silence WAV
 so unit tests can run without Piper installed.
 
@@ -16,6 +21,9 @@ import tempfile
 import wave
 from pathlib import Path
 
+import numpy as np
+
+from abm.audio.piper_pool import PiperModel, shared_pool
 from abm.audio.tts_base import SynthesisError, TTSAdapter, TTSTask
 
 
@@ -37,17 +45,20 @@ def _write_silence_wav(path: Path, duration_ms: int = 250, sr: int = 22050) -> N
 
 
 class PiperAdapter(TTSAdapter):
-    """Adapter that calls the `piper` CLI per synthesis request.
+    """Adapter that synthesizes through resident Piper workers (or the CLI per request).
 
     Attributes:
         voice: Piper voice identifier (e.g., 'en_US-ryan-medium').
         binary: Piper executable or full path. Defaults to 'piper'.
         quiet: Whether to request reduced CLI output.
+        use_pool: Whether to use the shared resident worker pool.
         _dryrun: Internal flag to emit silence WAVs instead of calling Piper.
         _available: Cached boolean indicating if the Piper binary is found.
     """
 
-    def __init__(self, voice: str | None = None, *, binary: str | None = None, quiet: bool = True) -> None:
+    def __init__(
+        self, voice: str | None = None, *, binary: str | None = None, quiet: bool = True, pool: bool | None = None
+    ) -> None:
         """Initialize the Piper adapter.
 
         Args:
@@ -55,10 +66,13 @@ class PiperAdapter(TTSAdapter):
                 TTSTask must provide ``task.voice``.
             binary: Binary name or absolute path to the Piper executable.
             quiet: Suppress CLI output where supported.
+            pool: Use the shared resident worker pool. Defaults to True unless
+                env ``ABM_PIPER_POOL=0``.
         """
         self.voice = voice
         self.binary = binary or os.environ.get("ABM_PIPER_BIN", "piper")
         self.quiet = quiet
+        self.use_pool = pool if pool is not None else os.environ.get("ABM_PIPER_POOL", "1") != "0"
         self._dryrun = os.environ.get("ABM_PIPER_DRYRUN", "") == "1"
         self._available: bool | None = None
 
@@ -136,12 +150,65 @@ class PiperAdapter(TTSAdapter):
 
         task.out_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Determine voice to use for this task
+        voice_id = self._voice_id(task)
+        if self.use_pool:
+            return self._synth_pool(voice_id, task)
+        return self._synth_subprocess(voice_id, task)
+
+    def synth_array(self, task: TTSTask) -> tuple[np.ndarray, int]:
+        """Synthesize ``task`` in memory through the resident worker pool.
+
+        Returns the samples :meth:`synth` would write, as ``float32``. The
+        per-request CLI can only write files, so without the pool this falls
+        back to :meth:`TTSAdapter.synth_array`.
+
+        Raises:
+            SynthesisError: If Piper is missing (non-dry-run) or the process fails.
+        """
+        if self._dryrun:
+            return np.zeros(int(22050 * 0.25), dtype=np.float32), 22050
+        if not self._available:
+            raise SynthesisError("Piper binary not found. Install Piper or set ABM_PIPER_DRYRUN=1 for tests.")
+        voice_id = self._voice_id(task)
+        if not self.use_pool:
+            return super().synth_array(task)
+        pcm, sr = self._pool_pcm(voice_id, task)
+        return pcm.astype(np.float32) / 32768.0, sr
+
+    def _voice_id(self, task: TTSTask) -> str:
+        """Return the voice for ``task``, falling back to the adapter default."""
         voice_id = (task.voice or self.voice or "").strip()
         if not voice_id:
             raise SynthesisError(
                 "Piper voice not specified. Provide TTSTask.voice or set a default when creating the adapter."
             )
+        return voice_id
+
+    def _model_spec(self, voice_id: str) -> PiperModel:
+        """Return the pool key of ``voice_id`` (resolved model and config paths)."""
+        model, cfg = self._resolve_model_paths(voice_id)
+        return PiperModel(
+            binary=self.binary or "piper",
+            model=str(model) if model is not None else str(voice_id),
+            config=str(cfg) if cfg is not None else None,
+        )
+
+    def _pool_pcm(self, voice_id: str, task: TTSTask) -> tuple[np.ndarray, int]:
+        pcm, sr = shared_pool().synth(self._model_spec(voice_id), task.text)
+        if pcm.size == 0:
+            raise SynthesisError("Piper failed: empty output")
+        return pcm, sr
+
+    def _synth_pool(self, voice_id: str, task: TTSTask) -> Path:
+        pcm, sr = self._pool_pcm(voice_id, task)
+        with wave.open(str(task.out_path), "wb") as wf:
+            wf.setnchannels(1 if pcm.ndim == 1 else pcm.shape[1])
+            wf.setsampwidth(2)
+            wf.setframerate(sr)
+            wf.writeframes(np.ascontiguousarray(pcm, dtype="<i2").tobytes())
+        return task.out_path
+
+    def _synth_subprocess(self, voice_id: str, task: TTSTask) -> Path:
         with tempfile.NamedTemporaryFile("w", delete=False, encoding="utf-8") as tf:
             tf.write(task.text)
             tf.flush()
@@ -0,0 +1,338 @@
+"""Resident Piper worker pool shared by the Piper adapter and engine.
+
+Starting ``piper`` per span pays process start-up and ONNX model load on every
+segment, which for short dialogue lines costs more than the synthesis itself.
+The pool keeps long-lived ``piper --json-input`` processes per voice model:
+each request is one JSON line (``{"text": ..., "output_file": ...}``) on the
+worker's stdin, and Piper answers with the path of the written WAV on stdout.
+The WAV is read back and returned as 16-bit PCM.
+
+Tasks for a model go through a queue served by ``workers`` threads, each
+owning one process. A worker that exits mid-task is restarted and the task is
+retried once; a worker that exceeds the timeout is killed and restarted, and
+the task fails with :class:`SynthesisError`.
+
+:func:`shared_pool` returns the process-wide pool used by
+:class:`abm.audio.piper_adapter.PiperAdapter` and
+:class:`abm.voice.engines.piper_engine.PiperEngine`.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO
+
+import numpy as np
+import soundfile as sf
+
+from abm.audio.tts_base import SynthesisError
+
+__all__ = ["PiperModel", "PiperPool", "PiperPoolStats", "shared_pool"]
+
+DEFAULT_TIMEOUT_S = 60.0
+
+Pcm = tuple[np.ndarray, int]
+
+
+@dataclass(frozen=True)
+class PiperModel:
+    """Identity of a resident Piper process: binary, model and config paths."""
+
+    binary: str
+    model: str
+    config: str | None = None
+
+    def command(self) -> list[str]:
+        """Return the command line of a JSON-input worker for this model."""
+        cmd = [self.binary, "-m", self.model]
+        if self.config:
+            cmd.extend(["-c", self.config])
+        cmd.append("--json-input")
+        return cmd
+
+
+@dataclass
+class PiperPoolStats:
+    """Counters across all models of a pool."""
+
+    started: int = 0
+    restarts: int = 0
+    tasks: int = 0
+    failures: int = 0
+
+
+class _WorkerCrashed(Exception):
+    pass
+
+
+class _WorkerTimeout(Exception):
+    pass
+
+
+class _PiperProcess:
+    """One resident ``piper --json-input`` process and its scratch directory."""
+
+    def __init__(self, model: PiperModel) -> None:
+        self.model = model
+        self._dir = Path(tempfile.mkdtemp(prefix="abm_piper_"))
+        self._log: IO[bytes] = (self._dir / "stderr.log").open("wb")
+        self._seq = 0
+        self._lines: queue.Queue[str | None] = queue.Queue()
+        try:
+            self.proc = subprocess.Popen(
+                model.command(),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=self._log,
+                text=True,
+                encoding="utf-8",
+                bufsize=1,
+                cwd=self._dir,
+            )
+        except OSError as exc:
+            self.close()
+            raise SynthesisError(f"Piper worker failed to start ({model.binary}): {exc}") from exc
+        self._reader = threading.Thread(target=self._read_stdout, name="piper-stdout", daemon=True)
+        self._reader.start()
+
+    def _read_stdout(self) -> None:
+        assert self.proc.stdout is not None
+        for line in self.proc.stdout:
+            self._lines.put(line.strip())
+        self._lines.put(None)
+
+    def synth(self, text: str, timeout: float) -> Pcm:
+        self._seq += 1
+        out = self._dir / f"{self._seq:06d}.wav"
+        assert self.proc.stdin is not None
+        try:
+            self.proc.stdin.write(json.dumps({"text": text, "output_file": str(out)}, ensure_ascii=False) + "\n")
+            self.proc.stdin.flush()
+        except OSError as exc:
+            raise _WorkerCrashed(self.error_tail()) from exc
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise _WorkerTimeout
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                raise _WorkerTimeout from None
+            if line is None:
+                raise _WorkerCrashed(self.error_tail())
+            # Piper prints the written path; anything else on stdout is ignored
+            written = self._dir / line  # absolute paths replace the base
+            if line.endswith(".wav") and written.exists():
+                break
+        try:
+            data, sr = sf.read(str(written), dtype="int16")
+        finally:
+            written.unlink(missing_ok=True)
+        return np.asarray(data, dtype=np.int16), int(sr)
+
+    def error_tail(self) -> str:
+        try:
+            self._log.flush()
+            lines = (self._dir / "stderr.log").read_text(encoding="utf-8", errors="replace").splitlines()
+        except OSError:
+            return "unknown error"
+        return "\n".join(lines[-10:]).strip() or f"exit code {self.proc.poll()}"
+
+    def close(self, *, kill: bool = False) -> None:
+        proc = getattr(self, "proc", None)
+        if proc is not None and proc.poll() is None:
+            if kill:
+                proc.kill()
+            else:
+                try:
+                    assert proc.stdin is not None
+                    proc.stdin.close()
+                    proc.wait(timeout=5)
+                except (OSError, subprocess.TimeoutExpired):
+                    proc.kill()
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:  # pragma: no cover - unkillable process
+                pass
+        if proc is not None:
+            # Close both pipes even after a kill or crash; the reader sees EOF
+            # once the process is gone and must finish before stdout closes.
+            try:
+                if proc.stdin is not None:
+                    proc.stdin.close()
+            except OSError:  # unflushed input to a dead process
+                pass
+            reader = getattr(self, "_reader", None)
+            if reader is not None:
+                reader.join(timeout=5)
+            if proc.stdout is not None and (reader is None or not reader.is_alive()):
+                proc.stdout.close()
+        self._log.close()
+        shutil.rmtree(self._dir, ignore_errors=True)
+
+
+@dataclass
+class _ModelWorkers:
+    tasks: queue.Queue[tuple[str, Future[Pcm]] | None] = field(default_factory=queue.Queue)
+    threads: list[threading.Thread] = field(default_factory=list)
+
+
+class PiperPool:
+    """Long-lived Piper workers per voice model, fed through a task queue.
+
+    Attributes:
+        workers: Resident processes (and serving threads) per model.
+        timeout_s: Per-task timeout before the worker is killed and restarted.
+        stats: Start/restart/task counters.
+    """
+
+    def __init__(self, workers: int = 1, *, timeout_s: float = DEFAULT_TIMEOUT_S) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        self.workers = workers
+        self.timeout_s = timeout_s
+        self.stats = PiperPoolStats()
+        self._models: dict[PiperModel, _ModelWorkers] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, model: PiperModel, text: str) -> Future[Pcm]:
+        """Queue ``text`` for ``model`` and return a future of ``(pcm_int16, sample_rate)``."""
+        fut: Future[Pcm] = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("PiperPool is closed")
+            entry = self._models.get(model)
+            if entry is None:
+                entry = self._models[model] = _ModelWorkers()
+                self._spawn(model, entry)
+        entry.tasks.put((text, fut))
+        return fut
+
+    def grow(self, workers: int) -> None:
+        """Raise the per-model worker count to at least ``workers`` (never shrinks)."""
+        with self._lock:
+            if workers <= self.workers or self._closed:
+                return
+            self.workers = workers
+            for model, entry in self._models.items():
+                self._spawn(model, entry)
+
+    def synth(self, model: PiperModel, text: str) -> Pcm:
+        """Synthesize ``text`` with ``model`` and wait for the PCM result."""
+        return self.submit(model, text).result()
+
+    def close(self) -> None:
+        """Stop all workers; queued tasks are still served first."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            entries = list(self._models.values())
+        for entry in entries:
+            for _ in entry.threads:
+                entry.tasks.put(None)
+        for entry in entries:
+            for t in entry.threads:
+                t.join()
+
+    # --------------------------- Internals ---------------------------
+
+    def _spawn(self, model: PiperModel, entry: _ModelWorkers) -> None:
+        # Called with the lock held: start serving threads up to ``self.workers``
+        for i in range(len(entry.threads), self.workers):
+            t = threading.Thread(target=self._serve, args=(model, entry), name=f"piper-{i}", daemon=True)
+            entry.threads.append(t)
+            t.start()
+
+    def _start(self, model: PiperModel) -> _PiperProcess:
+        proc = _PiperProcess(model)
+        with self._lock:
+            self.stats.started += 1
+        return proc
+
+    def _serve(self, model: PiperModel, entry: _ModelWorkers) -> None:
+        proc: _PiperProcess | None = None
+        try:
+            while True:
+                item = entry.tasks.get()
+                if item is None:
+                    return
+                text, fut = item
+                if fut.set_running_or_notify_cancel():
+                    proc = self._run(model, proc, text, fut)
+        finally:
+            if proc is not None:
+                proc.close()
+
+    def _run(self, model: PiperModel, proc: _PiperProcess | None, text: str, fut: Future[Pcm]) -> _PiperProcess | None:
+        """Serve one task on ``proc`` and return the process to keep using (None after a failure)."""
+        with self._lock:
+            self.stats.tasks += 1
+        error: Exception
+        for attempt in range(2):
+            try:
+                if proc is None:
+                    proc = self._start(model)
+                fut.set_result(proc.synth(text, self.timeout_s))
+                return proc
+            except _WorkerTimeout:
+                error = SynthesisError(f"Piper timed out after {self.timeout_s}s")
+            except _WorkerCrashed as exc:
+                error = SynthesisError(f"Piper worker crashed: {exc}")
+                if attempt == 0:
+                    self._discard(proc)
+                    proc = None
+                    continue
+            except Exception as exc:  # noqa: BLE001 - delivered to the caller
+                error = exc
+            break
+        self._discard(proc)
+        with self._lock:
+            self.stats.failures += 1
+        fut.set_exception(error)
+        return None
+
+    def _discard(self, proc: _PiperProcess | None) -> None:
+        if proc is None:
+            return
+        proc.close(kill=True)
+        with self._lock:
+            self.stats.restarts += 1
+
+
+_SHARED: PiperPool | None = None
+_SHARED_PID: int | None = None
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_pool(min_workers: int | None = None) -> PiperPool:
+    """Return the process-wide pool (created lazily, recreated after fork).
+
+    Sized by ``ABM_PIPER_WORKERS`` (default 1), grown to ``min_workers`` when
+    given, with a per-task timeout of ``ABM_PIPER_TIMEOUT`` seconds (default 60).
+    """
+    global _SHARED, _SHARED_PID
+    with _SHARED_LOCK:
+        if _SHARED is None or _SHARED_PID != os.getpid():
+            _SHARED = PiperPool(
+                int(os.environ.get("ABM_PIPER_WORKERS", "1")),
+                timeout_s=float(os.environ.get("ABM_PIPER_TIMEOUT", str(DEFAULT_TIMEOUT_S))),
+            )
+            _SHARED_PID = os.getpid()
+            atexit.register(_SHARED.close)
+        if min_workers is not None:
+            _SHARED.grow(min_workers)
+        return _SHARED
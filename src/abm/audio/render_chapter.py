@@ -1,4 +1,11 @@
-"""Render an audiobook chapter from a synthesis script."""
+"""Render an audiobook chapter from a synthesis script.
+
+Spans are rendered in memory and handed straight to assembly: a cached span
+costs one cache read and a synthesized one none, while new cache entries are
+written in the background. ``--keep-spans`` writes every span to
+``<tmp-dir>/spans/cNNN.wav`` instead, for inspection or partial re-runs;
+span files already there are reused in either mode.
+"""
 
 from __future__ import annotations
 
@@ -12,12 +19,14 @@ from typing import Any
 import soundfile as sf
 
 from abm.audio import register_builtins
-from abm.audio.assembly import assemble
+from abm.audio.assembly import Span, assemble
+from abm.audio.cache_codecs import CODECS
 from abm.audio.engine_registry import EngineRegistry
 from abm.audio.mastering import master
 from abm.audio.qc_report import qc_report, write_qc_json
 from abm.audio.tts_base import TTSTask
 from abm.audio.tts_manager import TTSManager
+from abm.profiles.character_profiles import CharacterProfilesDB
 
 try:  # pragma: no cover - optional dependency
     from pydub.exceptions import CouldntDecodeError
@@ -38,12 +47,30 @@ def _load_script(path: Path) -> tuple[int, str | None, list[dict[str, Any]]]:
     return index, title, items
 
 
+def _engine_options(engine: str, tasks: list[TTSTask], cache_dir: Path, profiles: Path | None) -> dict[str, Any]:
+    """Return adapter options for ``engine`` derived from the chapter's casting.
+
+    XTTS gets a persistent speaker-latent directory next to the segment cache
+    and the reference WAVs of every cloned voice (from ``--profiles`` and the
+    chapter's own tasks) to warm in ``preload``.
+    """
+
+    if engine != "xtts":
+        return {}
+    voices: dict[str, list[str]] = {}
+    if profiles is not None:
+        db = CharacterProfilesDB.load(profiles)
+        voices.update({p.id: p.refs for p in db.profiles.values() if p.engine == "xtts" and p.refs})
+    voices.update({t.profile_id or "": t.refs for t in tasks if t.refs})
+    return {"latent_dir": cache_dir / "xtts_latents", "voices": voices}
+
+
 def main(argv: list[str] | None = None) -> int:
     """Entry point for the ``render_chapter`` CLI."""
 
     parser = argparse.ArgumentParser(prog="render_chapter")
     parser.add_argument("--script", type=Path, required=True)
-    parser.add_argument("--profiles", type=Path)
+    parser.add_argument("--profiles", type=Path, help="Casting file; XTTS warms the latents of its cloned voices")
     parser.add_argument("--out-dir", type=Path, required=True)
     parser.add_argument("--tmp-dir", type=Path, default=Path(tempfile.gettempdir()))
     parser.add_argument("--lufs", type=float, default=-18.0)
@@ -59,6 +86,18 @@ def main(argv: list[str] | None = None) -> int:
     parser.add_argument("--show-progress", action=argparse.BooleanOptionalAction, default=True)
     parser.add_argument("--save-master-wav", action=argparse.BooleanOptionalAction, default=True)
     parser.add_argument("--save-mp3", action=argparse.BooleanOptionalAction, default=False)
+    parser.add_argument(
+        "--cache-codec",
+        choices=sorted(CODECS),
+        default="wav",
+        help="Storage format for new TTS cache entries; existing entries in any format are reused",
+    )
+    parser.add_argument(
+        "--keep-spans",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Write each span to <tmp-dir>/spans (default: render spans in memory)",
+    )
     args = parser.parse_args(argv)
 
     # Ensure built-in engines (e.g., Piper, XTTS) are registered
@@ -71,7 +110,8 @@ def main(argv: list[str] | None = None) -> int:
     (out_dir / "qc").mkdir(parents=True, exist_ok=True)
     (out_dir / "manifests").mkdir(parents=True, exist_ok=True)
     spans_dir = tmp_dir / "spans"
-    spans_dir.mkdir(parents=True, exist_ok=True)
+    if args.keep_spans:
+        spans_dir.mkdir(parents=True, exist_ok=True)
     cache_dir = tmp_dir / "cache"
     cache_dir.mkdir(parents=True, exist_ok=True)
 
@@ -100,25 +140,42 @@ def main(argv: list[str] | None = None) -> int:
             eng, n = w.split("=", 1)
             engine_workers[eng] = int(n)
     managers: dict[str, TTSManager] = {}
-    grouped: dict[str, list[TTSTask]] = {}
-    for task in tasks:
-        grouped.setdefault(task.engine, []).append(task)
-    for engine, eng_tasks in grouped.items():
-        adapter = EngineRegistry.create(engine)
+    grouped: dict[str, list[int]] = {}
+    for idx, task in enumerate(tasks):
+        grouped.setdefault(task.engine, []).append(idx)
+    spans: list[Span] = [t.out_path for t in tasks]
+    for engine, eng_idx in grouped.items():
+        options = _engine_options(engine, [tasks[i] for i in eng_idx], cache_dir, args.profiles)
+        adapter = EngineRegistry.create(engine, **options)
         workers = int(engine_workers.get(engine, 2))
         managers[engine] = TTSManager(
             adapter,
             max_workers=workers,
             cache_dir=cache_dir,
             show_progress=args.show_progress,
+            codec=args.cache_codec,
         )
-        to_render = [t for t in eng_tasks if not t.out_path.exists()]
-        if to_render:
-            managers[engine].render_batch(to_render)
+        to_render = [i for i in eng_idx if not tasks[i].out_path.exists()]
+        if to_render and args.keep_spans:
+            managers[engine].render_batch([tasks[i] for i in to_render])
+        elif to_render:
+            for i, audio in zip(to_render, managers[engine].render_arrays([tasks[i] for i in to_render]), strict=True):
+                spans[i] = audio
+        stats = managers[engine].stats
+        if stats.tasks:
+            logging.getLogger(__name__).info(
+                "%s: %d spans, %d cached, %d synthesized, %d deduplicated (%.0f%%)",
+                engine,
+                stats.tasks,
+                stats.cache_hits,
+                stats.synthesized,
+                stats.deduplicated,
+                100 * stats.dedup_rate,
+            )
 
-    span_paths = [t.out_path for t in tasks]
     pauses = [t.pause_ms for t in tasks]
-    y, sr = assemble(span_paths, pauses, crossfade_ms=args.crossfade_ms)
+    y, sr = assemble(spans, pauses, crossfade_ms=args.crossfade_ms)
+    del spans
     y = master(y, sr, target_lufs=args.lufs, peak_dbfs=args.peak)
 
     chapter_id = f"ch_{chapter_index:03d}"
@@ -147,6 +204,11 @@ def main(argv: list[str] | None = None) -> int:
     qc_path = out_dir / "qc" / f"{chapter_id}.qc.json"
     write_qc_json(report, qc_path)
 
+    # Background cache writes overlapped assembly and mastering; the manifest
+    # below references the entries, so they must be on disk first.
+    for m in managers.values():
+        m.flush()
+
     manifest_path = out_dir / "manifests" / "book_manifest.json"
     manifest: dict[str, Any]
     if manifest_path.exists():
@@ -160,6 +222,9 @@ def main(argv: list[str] | None = None) -> int:
         "peak_dbfs": args.peak,
         "engine_workers": engine_workers,
         "cache_dir": str(cache_dir),
+        "cache_codec": args.cache_codec,
+        "keep_spans": args.keep_spans,
+        "render_stats": {engine: m.stats.as_dict() for engine, m in managers.items()},
     }
     entry = {
         "index": chapter_index,
@@ -169,6 +234,9 @@ def main(argv: list[str] | None = None) -> int:
         "duration_s": report["duration_s"],
         "integrated_lufs": report["integrated_lufs"],
         "peak_dbfs": report["peak_dbfs"],
+        # Cache entries this chapter was built from; `abm.audio.tts_cache gc
+        # --manifest` keeps them while the manifest is live.
+        "cache_keys": sorted({managers[t.engine].cache_key(t) for t in tasks if t.engine in managers}),
     }
     if mp3_path:
         entry["mp3_path"] = str(mp3_path.relative_to(out_dir))
@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import tempfile
+from dataclasses import dataclass, replace
 from pathlib import Path
 
+import numpy as np
+import soundfile as sf
+
 
 class SynthesisError(RuntimeError):
     """Raised when a TTS engine fails to synthesize audio."""
@@ -40,7 +44,9 @@ class TTSTask:
 class TTSAdapter:
     """Abstract base class for all TTS engine adapters.
 
-    Subclasses must implement :meth:`preload` and :meth:`synth`.
+    Subclasses must implement :meth:`preload` and :meth:`synth`. Engines that
+    produce samples in memory should also override :meth:`synth_array`, which
+    lets callers skip the WAV round-trip through ``task.out_path``.
     """
 
     def preload(self) -> None:
@@ -70,3 +76,27 @@ class TTSAdapter:
         """
 
         raise NotImplementedError
+
+    def synth_array(self, task: TTSTask) -> tuple[np.ndarray, int]:
+        """Synthesize speech and return the samples instead of writing a file.
+
+        ``task.out_path`` is not written. The default implementation renders
+        through :meth:`synth` into a temporary file and reads it back, so
+        overriding is an optimization, not a requirement.
+
+        Args:
+            task: The synthesis request.
+
+        Returns:
+            Tuple ``(samples, sample_rate)`` with ``float32`` samples in
+            ``[-1, 1]``, equal to what reading the file :meth:`synth` would
+            have written returns.
+
+        Raises:
+            SynthesisError: If the engine fails to render audio.
+        """
+
+        with tempfile.TemporaryDirectory(prefix="abm-synth-") as td:
+            path = self.synth(replace(task, out_path=Path(td) / "span.wav"))
+            y, sr = sf.read(path, dtype="float32")
+        return y, int(sr)
@@ -0,0 +1,595 @@
+"""Index, verification and garbage collection for synthesized-audio caches.
+
+Two on-disk layouts are indexed:
+
+- :class:`~abm.audio.tts_manager.TTSManager`: ``<root>/<engine>/<sha[:2]>/<sha>.<ext>``
+- :mod:`abm.voice.cache`: ``<root>/<engine>/<voice>/<sha>.<ext>``
+
+where ``<ext>`` depends on the entry's codec (:mod:`abm.audio.cache_codecs`).
+The index (``<root>/.index.sqlite``) records each entry's codec, size, write
+time, last access, the SHA-256 of the bytes that were written, the frame
+count and sample rate, plus how many live render manifests reference it. It
+is advisory: :meth:`TTSCacheIndex.sync` rebuilds it from the files on disk,
+so deleting it only loses access times, write-side checksums and the sample
+rate of ``.npy`` entries.
+
+Usage::
+
+    python -m abm.audio.tts_cache report --cache-dir data/cache
+    python -m abm.audio.tts_cache verify --cache-dir data/cache
+    python -m abm.audio.tts_cache gc --cache-dir data/cache --max-bytes 20G \\
+        --manifest data/out/manifests/book_manifest.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from abm.audio.cache_codecs import CODECS, check_wav, codec_for_path
+
+__all__ = [
+    "CacheEntry",
+    "GCReport",
+    "TTSCacheIndex",
+    "VerifyReport",
+    "check_wav",
+    "main",
+    "manifest_keys",
+    "parse_bytes",
+]
+
+INDEX_NAME = ".index.sqlite"
+QUARANTINE_DIR = ".quarantine"
+
+_KEY_RE = re.compile(r"\b[0-9a-f]{64}\b")
+_HEX2_RE = re.compile(r"^[0-9a-f]{2}$")
+_SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmgt]?)i?b?\s*$", re.IGNORECASE)
+_COLUMNS = "path, engine, voice, size, created, last_access, refcount, sha256, frames, samplerate, codec"
+
+
+@dataclass
+class CacheEntry:
+    """One indexed cache file.
+
+    Attributes:
+        path: Path relative to the cache root (POSIX separators).
+        engine: Engine directory the entry lives under.
+        voice: Voice id, or ``""`` if the layout does not record it.
+        size: File size in bytes.
+        created: Write time (UNIX seconds).
+        last_access: Last cache hit or write (UNIX seconds).
+        refcount: Number of live manifests referencing the entry.
+        sha256: Checksum recorded when the entry was written, if known.
+        frames: Frame count recorded when the entry was written or indexed.
+        samplerate: Sample rate from the header, or as recorded on write for
+            codecs that do not store one.
+        codec: Name of the codec that wrote the entry.
+    """
+
+    path: str
+    engine: str
+    voice: str
+    size: int
+    created: float
+    last_access: float
+    refcount: int = 0
+    sha256: str | None = None
+    frames: int | None = None
+    samplerate: int | None = None
+    codec: str = "wav"
+
+    @property
+    def key(self) -> str:
+        """The cache key (file stem)."""
+
+        return Path(self.path).stem
+
+
+@dataclass
+class GCReport:
+    """Outcome of :meth:`TTSCacheIndex.evict`."""
+
+    evicted: list[str] = field(default_factory=list)
+    freed_bytes: int = 0
+    kept_referenced: int = 0
+    remaining_bytes: int = 0
+
+
+@dataclass
+class VerifyReport:
+    """Outcome of :meth:`TTSCacheIndex.verify`."""
+
+    checked: int = 0
+    quarantined: list[tuple[str, str]] = field(default_factory=list)
+
+
+def _sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def manifest_keys(paths: Iterable[Path]) -> dict[str, int]:
+    """Count, per cache key, how many of the manifest files mention it.
+
+    Any 64-digit hex string in a manifest counts as a reference, so render
+    manifests and QC files may list keys or cache paths in any field.
+    """
+
+    counts: dict[str, int] = {}
+    for path in paths:
+        for key in set(_KEY_RE.findall(Path(path).read_text(encoding="utf-8"))):
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def parse_bytes(text: str) -> int:
+    """Parse a byte budget such as ``"500M"``, ``"20G"`` or ``"1048576"``."""
+
+    m = _SIZE_RE.match(text)
+    if not m:
+        raise ValueError(f"invalid size: {text!r}")
+    scale = 1024 ** " kmgt".index(m.group(2).lower() or " ")
+    return int(float(m.group(1)) * scale)
+
+
+class TTSCacheIndex:
+    """SQLite index over a synthesized-audio cache directory.
+
+    The connection is shared between threads and guarded by a lock, like
+    :class:`~abm.annotate.llm_cache.LLMCache`.
+
+    Attributes:
+        root: Cache root directory.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.root / INDEX_NAME, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "path TEXT PRIMARY KEY, engine TEXT NOT NULL, voice TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, last_access REAL NOT NULL, refcount INTEGER NOT NULL DEFAULT 0, "
+            "sha256 TEXT, frames INTEGER, samplerate INTEGER, codec TEXT NOT NULL DEFAULT 'wav')"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(entries)")}
+        if "codec" not in columns:  # index created before cache codecs existed
+            self._db.execute("ALTER TABLE entries ADD COLUMN codec TEXT NOT NULL DEFAULT 'wav'")
+        self._db.commit()
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    def _rel(self, path: Path) -> str:
+        return Path(path).resolve().relative_to(self.root.resolve()).as_posix()
+
+    @staticmethod
+    def _layout(rel: str) -> tuple[str, str]:
+        parts = rel.split("/")
+        engine = parts[0] if len(parts) > 1 else ""
+        voice = parts[1] if len(parts) > 2 else ""
+        if _HEX2_RE.match(voice) and parts[-1].startswith(voice):
+            voice = ""  # TTSManager shard directory, not a voice
+        return engine, voice
+
+    @staticmethod
+    def _check(path: Path) -> tuple[str | None, int, int]:
+        codec = codec_for_path(path)
+        if codec is None:
+            return f"unknown cache file type {Path(path).suffix!r}", 0, 0
+        return codec.check(Path(path))
+
+    def _execute(self, sql: str, params: Iterable[Any] = ()) -> sqlite3.Cursor:
+        with self._lock:
+            cur = self._db.execute(sql, tuple(params))
+            self._db.commit()
+        return cur
+
+    def _remove(self, entry: CacheEntry) -> None:
+        path = self.root / entry.path
+        path.unlink(missing_ok=True)
+        self._execute("DELETE FROM entries WHERE path=?", (entry.path,))
+        try:
+            path.parent.rmdir()  # drop emptied shard/voice directories
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------------
+    # Recording
+    def record_write(
+        self,
+        path: Path,
+        *,
+        engine: str | None = None,
+        voice: str | None = None,
+        samplerate: int | None = None,
+    ) -> CacheEntry:
+        """Index a freshly written entry with its checksum and frame count.
+
+        Args:
+            path: Cache file that was just written (under :attr:`root`).
+            engine: Engine id; defaults to the one implied by the layout.
+            voice: Voice id; defaults to the one implied by the layout.
+            samplerate: Sample rate, for codecs whose files do not store it.
+
+        Returns:
+            The stored :class:`CacheEntry`.
+        """
+
+        rel = self._rel(path)
+        layout_engine, layout_voice = self._layout(rel)
+        _, frames, header_rate = self._check(Path(path))
+        now = time.time()
+        entry = CacheEntry(
+            path=rel,
+            engine=engine or layout_engine,
+            voice=voice or layout_voice,
+            size=Path(path).stat().st_size,
+            created=now,
+            last_access=now,
+            sha256=_sha256_file(Path(path)),
+            frames=frames or None,
+            samplerate=header_rate or samplerate or None,
+            codec=codec_for_path(Path(path)).name,  # type: ignore[union-attr]
+        )
+        self._execute(
+            f"INSERT INTO entries ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET engine=excluded.engine, voice=excluded.voice, size=excluded.size, "
+            "created=excluded.created, last_access=excluded.last_access, sha256=excluded.sha256, "
+            "frames=excluded.frames, samplerate=excluded.samplerate, codec=excluded.codec",
+            (
+                entry.path,
+                entry.engine,
+                entry.voice,
+                entry.size,
+                entry.created,
+                entry.last_access,
+                entry.sha256,
+                entry.frames,
+                entry.samplerate,
+                entry.codec,
+            ),
+        )
+        return entry
+
+    def lookup(self, path: Path) -> CacheEntry | None:
+        """Return the index row for ``path``, if any."""
+
+        with self._lock:
+            row = self._db.execute(f"SELECT {_COLUMNS} FROM entries WHERE path=?", (self._rel(path),)).fetchone()
+        return CacheEntry(*row) if row else None
+
+    def touch(self, path: Path) -> None:
+        """Record a cache hit on ``path`` (indexing it if it is unknown)."""
+
+        rel = self._rel(path)
+        cur = self._execute("UPDATE entries SET last_access=? WHERE path=?", (time.time(), rel))
+        if cur.rowcount == 0:
+            self._add_unindexed(rel, access=time.time())
+
+    def _add_unindexed(self, rel: str, *, access: float | None = None) -> None:
+        path = self.root / rel
+        st = path.stat()
+        engine, voice = self._layout(rel)
+        _, frames, samplerate = self._check(path)
+        codec = codec_for_path(path).name  # type: ignore[union-attr]
+        self._execute(
+            f"INSERT OR IGNORE INTO entries ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, 0, NULL, ?, ?, ?)",
+            (
+                rel,
+                engine,
+                voice,
+                st.st_size,
+                st.st_mtime,
+                access or st.st_mtime,
+                frames or None,
+                samplerate or None,
+                codec,
+            ),
+        )
+
+    def validate(self, path: Path) -> bool:
+        """Cheap header check for a cache hit; quarantines the entry if bad.
+
+        Returns:
+            ``True`` if the entry can be used, ``False`` if it was moved to
+            quarantine and must be re-synthesized.
+        """
+
+        problem, _, _ = self._check(Path(path))
+        if problem is None:
+            return True
+        self.quarantine(Path(path), problem)
+        return False
+
+    def quarantine(self, path: Path, reason: str) -> Path:
+        """Move ``path`` under ``<root>/.quarantine`` and drop it from the index."""
+
+        rel = self._rel(path)
+        dest = self.root / QUARANTINE_DIR / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(path, dest)
+        except FileNotFoundError:  # another worker got there first
+            pass
+        dest.with_name(dest.name + ".reason").write_text(reason + "\n", encoding="utf-8")
+        self._execute("DELETE FROM entries WHERE path=?", (rel,))
+        return dest
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    def sync(self) -> int:
+        """Reconcile the index with the files on disk.
+
+        Unindexed entries of any codec are added (without a write-side
+        checksum) and rows for files that no longer exist are removed.
+
+        Returns:
+            Number of rows added plus rows removed.
+        """
+
+        on_disk = {
+            p.relative_to(self.root).as_posix()
+            for codec in CODECS.values()
+            for p in self.root.rglob(f"*{codec.suffix}")
+            if not p.name.endswith(f".tmp{codec.suffix}") and not p.name.startswith(".")
+        }
+        on_disk = {rel for rel in on_disk if not rel.startswith(QUARANTINE_DIR + "/")}
+        with self._lock:
+            indexed = {row[0] for row in self._db.execute("SELECT path FROM entries")}
+        for rel in sorted(on_disk - indexed):
+            self._add_unindexed(rel)
+        gone = indexed - on_disk
+        for rel in gone:
+            self._execute("DELETE FROM entries WHERE path=?", (rel,))
+        return len(on_disk - indexed) + len(gone)
+
+    def entries(self) -> list[CacheEntry]:
+        """Return every indexed entry."""
+
+        with self._lock:
+            rows = self._db.execute(f"SELECT {_COLUMNS} FROM entries ORDER BY path").fetchall()
+        return [CacheEntry(*row) for row in rows]
+
+    def set_references(self, manifests: Iterable[Path]) -> int:
+        """Recompute every entry's ``refcount`` from the given live manifests.
+
+        Returns:
+            Number of entries referenced by at least one manifest.
+        """
+
+        counts = manifest_keys(manifests)
+        updates = [(counts.get(e.key, 0), e.path) for e in self.entries()]
+        with self._lock:
+            self._db.executemany("UPDATE entries SET refcount=? WHERE path=?", updates)
+            self._db.commit()
+        return sum(1 for n, _ in updates if n)
+
+    def usage(self) -> list[dict[str, Any]]:
+        """Aggregate entries, bytes, referenced entries and codecs per engine and voice."""
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT engine, voice, COUNT(*), SUM(size), SUM(refcount > 0), MIN(last_access), MAX(last_access), "
+                "GROUP_CONCAT(DISTINCT codec) FROM entries GROUP BY engine, voice ORDER BY engine, voice"
+            ).fetchall()
+        return [
+            {
+                "engine": engine,
+                "voice": voice,
+                "entries": n,
+                "bytes": int(size or 0),
+                "referenced": int(refs or 0),
+                "oldest_access": oldest,
+                "newest_access": newest,
+                "codecs": sorted((codecs or "").split(",")),
+            }
+            for engine, voice, n, size, refs, oldest, newest, codecs in rows
+        ]
+
+    def evict(
+        self,
+        *,
+        max_bytes: int | None = None,
+        max_age_s: float | None = None,
+        policy: str = "lru",
+        dry_run: bool = False,
+        now: float | None = None,
+    ) -> GCReport:
+        """Delete unreferenced entries by age and/or to fit a byte budget.
+
+        Entries with a non-zero ``refcount`` (see :meth:`set_references`) are
+        never deleted, but still count towards the budget.
+
+        Args:
+            max_bytes: Evict until the cache totals at most this many bytes.
+            max_age_s: Evict entries older than this many seconds.
+            policy: ``"lru"`` orders and ages entries by last access, ``"age"``
+                by write time.
+            dry_run: Report what would be evicted without deleting anything.
+            now: Reference time for ``max_age_s`` (defaults to now).
+
+        Returns:
+            A :class:`GCReport`.
+
+        Raises:
+            ValueError: If ``policy`` is unknown.
+        """
+
+        if policy not in ("lru", "age"):
+            raise ValueError(f"unknown eviction policy {policy!r}")
+        now = time.time() if now is None else now
+        entries = self.entries()
+
+        def stamp(e: CacheEntry) -> float:
+            return e.last_access if policy == "lru" else e.created
+
+        report = GCReport(kept_referenced=sum(1 for e in entries if e.refcount))
+        total = sum(e.size for e in entries)
+        victims: list[CacheEntry] = []
+        candidates = sorted((e for e in entries if not e.refcount), key=stamp)
+        for e in candidates:
+            expired = max_age_s is not None and now - stamp(e) > max_age_s
+            over = max_bytes is not None and total > max_bytes
+            if not (expired or over):
+                break  # candidates are oldest first, so no later one qualifies
+            victims.append(e)
+            total -= e.size
+        for e in victims:
+            if not dry_run:
+                self._remove(e)
+            report.evicted.append(e.path)
+            report.freed_bytes += e.size
+        report.remaining_bytes = total
+        return report
+
+    def verify(self, *, checksums: bool = True) -> VerifyReport:
+        """Check every entry's header, duration and checksum; quarantine bad ones.
+
+        An entry is bad if its header is invalid or its data is truncated
+        (see :meth:`~abm.audio.cache_codecs.CacheCodec.check`), if its frame count differs from the one indexed at write
+        time, or (with ``checksums``) if its bytes no longer match the
+        write-side SHA-256.
+
+        Returns:
+            A :class:`VerifyReport`.
+        """
+
+        self.sync()
+        report = VerifyReport()
+        for e in self.entries():
+            path = self.root / e.path
+            report.checked += 1
+            problem, frames, _ = self._check(path)
+            if problem is None and e.frames is not None and frames != e.frames:
+                problem = f"duration changed: {frames} frames, {e.frames} when written"
+            if problem is None and checksums and e.sha256 and _sha256_file(path) != e.sha256:
+                problem = "checksum mismatch"
+            if problem is not None:
+                self.quarantine(path, problem)
+                report.quarantined.append((e.path, problem))
+        return report
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+
+        try:
+            self._db.close()
+        except Exception:
+            pass
+
+
+def _format_bytes(n: int) -> str:
+    size = float(n)
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Entry point for ``python -m abm.audio.tts_cache``."""
+
+    parser = argparse.ArgumentParser(prog="tts_cache", description="Inspect and maintain a TTS audio cache.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    for name, help_text in (
+        ("report", "Usage per engine and voice"),
+        ("verify", "Quarantine truncated, corrupt or modified entries"),
+        ("gc", "Evict unreferenced entries by LRU/age under a byte budget"),
+    ):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--cache-dir", type=Path, required=True)
+        p.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+        p.add_argument(
+            "--manifest",
+            type=Path,
+            action="append",
+            default=[],
+            help="Live render manifest/QC JSON whose cache keys must be kept (repeatable); "
+            "entries referenced only by manifests of earlier runs are not kept",
+        )
+    verify = sub.choices["verify"]
+    verify.add_argument("--no-checksums", action="store_true", help="Only check headers and durations")
+    gc = sub.choices["gc"]
+    gc.add_argument("--max-bytes", type=parse_bytes, default=None, help="Byte budget, e.g. 500M or 20G")
+    gc.add_argument("--max-age-days", type=float, default=None)
+    gc.add_argument("--policy", choices=["lru", "age"], default="lru")
+    gc.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    index = TTSCacheIndex(args.cache_dir)
+    try:
+        index.sync()
+        # References are recomputed on every run, so entries pinned by
+        # manifests that are no longer passed become evictable again.
+        index.set_references(args.manifest)
+        result: dict[str, Any]
+        if args.cmd == "report":
+            rows = index.usage()
+            result = {"cache_dir": str(args.cache_dir), "usage": rows}
+            if not args.json:
+                print(f"{'engine':<12} {'voice':<24} {'entries':>8} {'size':>10} {'refs':>6}  codecs")
+                for r in rows:
+                    print(
+                        f"{r['engine']:<12} {r['voice'] or '-':<24} {r['entries']:>8} "
+                        f"{_format_bytes(r['bytes']):>10} {r['referenced']:>6}  {','.join(r['codecs'])}"
+                    )
+                total = sum(r["bytes"] for r in rows)
+                print(f"{'total':<37} {sum(r['entries'] for r in rows):>8} {_format_bytes(total):>10}")
+        elif args.cmd == "verify":
+            vr = index.verify(checksums=not args.no_checksums)
+            result = {"checked": vr.checked, "quarantined": [{"path": p, "reason": r} for p, r in vr.quarantined]}
+            if not args.json:
+                for path, reason in vr.quarantined:
+                    print(f"quarantined {path}: {reason}")
+                print(f"checked {vr.checked} entries, quarantined {len(vr.quarantined)}")
+        else:
+            if args.max_bytes is None and args.max_age_days is None:
+                parser.error("gc needs --max-bytes and/or --max-age-days")
+            gr = index.evict(
+                max_bytes=args.max_bytes,
+                max_age_s=args.max_age_days * 86400 if args.max_age_days is not None else None,
+                policy=args.policy,
+                dry_run=args.dry_run,
+            )
+            result = {
+                "evicted": len(gr.evicted),
+                "freed_bytes": gr.freed_bytes,
+                "kept_referenced": gr.kept_referenced,
+                "remaining_bytes": gr.remaining_bytes,
+                "dry_run": args.dry_run,
+            }
+            if not args.json:
+                verb = "would evict" if args.dry_run else "evicted"
+                print(
+                    f"{verb} {len(gr.evicted)} entries ({_format_bytes(gr.freed_bytes)}); "
+                    f"kept {gr.kept_referenced} referenced; {_format_bytes(gr.remaining_bytes)} remaining"
+                )
+        if args.json:
+            json.dump(result, sys.stdout, indent=2)
+            print()
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry
+    raise SystemExit(main())
@@ -3,15 +3,58 @@
 from __future__ import annotations
 
 import hashlib
+import logging
 import os
 import shutil
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from typing import Any
 
+import numpy as np
+import soundfile as sf
+
+from abm.audio.cache_codecs import CacheCodec, codec_for_path, find_entry, get_codec
 from abm.audio.text_normalizer import TextNormalizer
 from abm.audio.tts_base import TTSAdapter, TTSTask
+from abm.audio.tts_cache import TTSCacheIndex
+
+__all__ = ["RenderStats", "TTSManager"]
+
+logger = logging.getLogger(__name__)
+
+Audio = tuple[np.ndarray, int]
 
-__all__ = ["TTSManager"]
+
+@dataclass
+class RenderStats:
+    """Counters describing how rendered tasks were satisfied.
+
+    Attributes:
+        tasks: Number of tasks rendered.
+        cache_hits: Tasks served from an existing cache file.
+        synthesized: Tasks that invoked the adapter.
+        deduplicated: Tasks that reused the result of an identical task
+            rendered in the same batch or in flight on another thread.
+    """
+
+    tasks: int = 0
+    cache_hits: int = 0
+    synthesized: int = 0
+    deduplicated: int = 0
+
+    @property
+    def dedup_rate(self) -> float:
+        """Fraction of tasks satisfied by in-flight deduplication."""
+
+        return self.deduplicated / self.tasks if self.tasks else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters and ``dedup_rate`` as a JSON-ready dict."""
+
+        return {**asdict(self), "dedup_rate": round(self.dedup_rate, 4)}
 
 
 class TTSManager:
@@ -19,20 +62,39 @@ class TTSManager:
 
     The manager deduplicates synthesis requests using a content-addressable
     cache. Audio is rendered concurrently via a thread pool and progress can be
-    displayed using ``tqdm`` if available. Cached files are stored as::
+    displayed using ``tqdm`` if available. Identical requests are synthesized
+    once: concurrent duplicates wait on the in-flight render instead of racing
+    to write the same cache file. Cached files are stored as::
 
-        cache/<engine>/<sha[:2]>/<sha>.wav
+        cache/<engine>/<sha[:2]>/<sha>.<ext>
 
     where ``sha`` is a SHA-256 fingerprint over engine name, adapter and
     normalizer versions, normalized text, voice, style, profile id, references
-    and engine-specific parameters.
+    and engine-specific parameters, and ``ext`` depends on the cache ``codec``
+    (:mod:`abm.audio.cache_codecs`). Entries written with another codec are
+    still found and reused; non-WAV entries are decoded into the WAV span at
+    ``task.out_path``.
+
+    Entries are tracked in a :class:`~abm.audio.tts_cache.TTSCacheIndex`
+    (size, last access, write-side checksum). A hit whose header is invalid
+    or truncated is quarantined and synthesized again.
+
+    :meth:`render_arrays` is the in-memory counterpart of :meth:`render_batch`:
+    it returns ``(samples, sample_rate)`` per task without writing spans,
+    using :meth:`TTSAdapter.synth_array` on a miss and reading each hit from
+    the cache once. New entries are written behind by a background thread;
+    call :meth:`flush` before relying on them being on disk.
 
     Attributes:
         adapter: Concrete :class:`TTSAdapter` used for synthesis.
         max_workers: Maximum number of worker threads.
-        cache_dir: Directory for cached WAV files. ``None`` disables caching.
+        cache_dir: Directory for cached segments. ``None`` disables caching.
+        codec: :class:`~abm.audio.cache_codecs.CacheCodec` for new entries
+            (``"wav"``, ``"flac"`` or ``"npy"`` when constructing).
+        index: Cache index for ``cache_dir`` (``None`` without a cache).
         show_progress: Whether to display a ``tqdm`` progress bar when rendering
             batches.
+        stats: Cumulative :class:`RenderStats` for this manager.
     """
 
     def __init__(
@@ -41,20 +103,27 @@ class TTSManager:
         max_workers: int = 2,
         cache_dir: Path | None = None,
         show_progress: bool = True,
+        codec: str | CacheCodec = "wav",
     ) -> None:
         self.adapter = adapter
         self.max_workers = int(max_workers)
         self.cache_dir = cache_dir
         self.show_progress = show_progress
         self._tqdm = None  # lazily imported
+        self.stats = RenderStats()
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future[Path]] = {}
+        self._inflight_audio: dict[str, Future[Audio]] = {}
+        self._unwritten: dict[str, Audio] = {}
+        self._writer: ThreadPoolExecutor | None = None
+        self._writes: list[Future[None]] = []
+        self.index = TTSCacheIndex(cache_dir) if cache_dir is not None else None
+        self.codec = get_codec(codec)
 
     # ------------------------------------------------------------------
     # Internal helpers
-    def _cache_path(self, task: TTSTask) -> Path:
-        """Compute the cache file path for ``task``."""
-
-        if self.cache_dir is None:
-            return Path()
+    def cache_key(self, task: TTSTask) -> str:
+        """Compute the SHA-256 fingerprint identifying ``task``'s audio."""
 
         norm_text = TextNormalizer.normalize(task.text)
         tn_ver = getattr(TextNormalizer, "version", lambda: "0")()
@@ -77,19 +146,183 @@ class TTSManager:
             parts.extend(f"{k}={v}" for k, v in sorted(params.items()))
         h = hashlib.sha256()
         h.update("|".join(parts).encode("utf-8"))
-        digest = h.hexdigest()
-        return self.cache_dir / task.engine / digest[:2] / f"{digest}.wav"
+        return h.hexdigest()
+
+    def _cache_path(self, task: TTSTask, digest: str | None = None) -> Path:
+        """Compute the cache file path for ``task``."""
+
+        if self.cache_dir is None:
+            return Path()
+        digest = digest or self.cache_key(task)
+        return self.cache_dir / task.engine / digest[:2] / f"{digest}{self.codec.suffix}"
+
+    def _cached(self, cache_path: Path) -> tuple[Path, int | None] | None:
+        """Find a usable entry for ``cache_path`` in any codec and record the access.
+
+        Returns:
+            ``(entry, sample_rate)`` where the rate comes from the index for
+            codecs that do not store it, or ``None`` on a miss.
+        """
+
+        if self.index is None:
+            return None
+        found = find_entry(cache_path, self.codec)
+        if found is None or not self.index.validate(found):
+            return None
+        sr = None
+        if not codec_for_path(found).stores_rate:  # type: ignore[union-attr]
+            entry = self.index.lookup(found)
+            if entry is None or not entry.samplerate:
+                self.index.quarantine(found, "sample rate not recorded")
+                return None
+            sr = entry.samplerate
+        self.index.touch(found)
+        return found, sr
+
+    def _materialize(self, entry: Path, sr: int | None, out_path: Path) -> None:
+        """Provide cache ``entry`` as the WAV span ``out_path``."""
+
+        codec = codec_for_path(entry)
+        assert codec is not None
+        if codec.suffix == ".wav":
+            self._link_or_copy(entry, out_path)
+            return
+        y, file_sr = codec.read(entry)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out_path.with_name(f".{out_path.stem}.{uuid.uuid4().hex[:8]}.tmp.wav")
+        try:
+            sf.write(tmp, y, file_sr or sr, subtype=codec.wav_subtype, format="WAV")
+            os.replace(tmp, out_path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _count(self, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self.stats, name, getattr(self.stats, name) + delta)
 
     def _link_or_copy(self, src: Path, dst: Path) -> None:
-        """Hardlink ``src`` to ``dst`` if possible, otherwise copy."""
+        """Hardlink ``src`` to ``dst`` if possible, otherwise copy.
 
+        The link or copy is made under a temporary name and renamed over
+        ``dst`` so readers never observe a partial file.
+        """
+
+        if src == dst:
+            return
         dst.parent.mkdir(parents=True, exist_ok=True)
-        if dst.exists():
-            dst.unlink()
+        tmp = dst.with_name(f".{dst.stem}.{uuid.uuid4().hex[:8]}.tmp{dst.suffix}")
+        try:
+            try:
+                os.link(src, tmp)
+            except OSError:
+                shutil.copy2(src, tmp)
+            os.replace(tmp, dst)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _synth_to_cache(self, task: TTSTask, cache_path: Path, out_path: Path) -> None:
+        """Synthesize ``task`` into ``cache_path`` and ``out_path``.
+
+        The adapter writes a temporary WAV in the cache directory; it becomes
+        the entry by rename (WAV codec) or is encoded into a staged file that
+        is renamed into place, so the cache never holds a partial entry.
+        """
+
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_name(f"{cache_path.stem}.{uuid.uuid4().hex[:8]}.tmp.wav")
+        tmp_task = TTSTask(
+            text=task.text,
+            speaker=task.speaker,
+            engine=task.engine,
+            voice=task.voice,
+            profile_id=task.profile_id,
+            refs=task.refs,
+            out_path=tmp,
+            pause_ms=task.pause_ms,
+            style=task.style,
+        )
+        assert self.index is not None
+        try:
+            result = self.adapter.synth(tmp_task)
+            if self.codec.suffix == ".wav":
+                os.replace(result, cache_path)
+                self.index.record_write(cache_path, engine=task.engine, voice=task.voice or task.speaker)
+                self._link_or_copy(cache_path, out_path)
+                return
+            y, sr = sf.read(result, dtype="float32")
+            self._store(task, cache_path, y, sr)
+            self._link_or_copy(result, out_path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _store(self, task: TTSTask, cache_path: Path, y: np.ndarray, sr: int) -> None:
+        """Encode ``y`` with the cache codec into a staged file renamed to ``cache_path``."""
+
+        assert self.index is not None
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        staged = cache_path.with_name(f"{cache_path.stem}.{uuid.uuid4().hex[:8]}.tmp{cache_path.suffix}")
         try:
-            os.link(src, dst)
-        except OSError:
-            shutil.copy2(src, dst)
+            self.codec.write(staged, y, sr)
+            os.replace(staged, cache_path)
+        finally:
+            staged.unlink(missing_ok=True)
+        self.index.record_write(cache_path, engine=task.engine, voice=task.voice or task.speaker, samplerate=sr)
+
+    def _cached_audio(self, digest: str, cache_path: Path) -> Audio | None:
+        """Return the audio for ``digest`` from a pending write or the cache."""
+
+        with self._lock:
+            pending = self._unwritten.get(digest)
+        if pending is not None:
+            return pending
+        hit = self._cached(cache_path)
+        if hit is None:
+            return None
+        entry, sr = hit
+        y, file_sr = codec_for_path(entry).read(entry, mmap=True)  # type: ignore[union-attr]
+        return y, int(file_sr or sr)  # type: ignore[arg-type]
+
+    def _write_behind(self, task: TTSTask, digest: str, cache_path: Path, audio: Audio) -> None:
+        """Queue ``audio`` for the cache; it is served from memory until written."""
+
+        def _write() -> None:
+            try:
+                self._store(task, cache_path, *audio)
+            except Exception as exc:  # the cache is an optimization; the render has its audio
+                logger.warning("Cache write for %s failed: %s", cache_path.name, exc)
+            finally:
+                with self._lock:
+                    self._unwritten.pop(digest, None)
+
+        with self._lock:
+            self._unwritten[digest] = audio
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="abm-cache-write")
+            self._writes.append(self._writer.submit(_write))
+
+    def _progress(self, total: int) -> Any:
+        """Return a ``tqdm`` bar over ``total`` tasks, or ``None`` when disabled."""
+
+        if self.show_progress and self._tqdm is None:  # pragma: no cover - import guard
+            try:
+                from tqdm import tqdm  # type: ignore
+
+                self._tqdm = tqdm
+            except Exception:  # pragma: no cover
+                self._tqdm = None
+        return self._tqdm(total=total) if self._tqdm and self.show_progress else None
+
+    def _leaders(self, tasks: list[TTSTask]) -> tuple[dict[str, int], list[tuple[int, int]]]:
+        """Split ``tasks`` into the first task per cache key and ``(duplicate, leader)`` pairs."""
+
+        first: dict[str, int] = {}
+        duplicates: list[tuple[int, int]] = []
+        for i, t in enumerate(tasks):
+            leader = first.setdefault(self.cache_key(t), i)
+            if leader != i:
+                duplicates.append((i, leader))
+        return first, duplicates
 
     # ------------------------------------------------------------------
     # Public API
@@ -106,38 +339,55 @@ class TTSManager:
             SynthesisError: If the underlying adapter fails to synthesize.
         """
 
-        cache_path = self._cache_path(task)
+        digest = self.cache_key(task)
+        cache_path = self._cache_path(task, digest)
         out_path = task.out_path
 
-        if self.cache_dir and cache_path.exists():
-            self._link_or_copy(cache_path, out_path)
+        hit = self._cached(cache_path)
+        if hit is not None:
+            self._materialize(*hit, out_path)
+            self._count(tasks=1, cache_hits=1)
             return out_path
 
-        if self.cache_dir:
-            cache_path.parent.mkdir(parents=True, exist_ok=True)
-            tmp = cache_path.with_suffix(".tmp.wav")
-            tmp_task = TTSTask(
-                text=task.text,
-                speaker=task.speaker,
-                engine=task.engine,
-                voice=task.voice,
-                profile_id=task.profile_id,
-                refs=task.refs,
-                out_path=tmp,
-                pause_ms=task.pause_ms,
-                style=task.style,
-            )
-            result = self.adapter.synth(tmp_task)
-            os.replace(result, cache_path)
-            self._link_or_copy(cache_path, out_path)
+        with self._lock:
+            leader = self._inflight.get(digest)
+            if leader is None:
+                fut: Future[Path] = Future()
+                self._inflight[digest] = fut
+        if leader is not None:
+            self._link_or_copy(leader.result(), out_path)
+            self._count(tasks=1, deduplicated=1)
             return out_path
 
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        return self.adapter.synth(task)
+        try:
+            hit = self._cached(cache_path)  # may have finished since the first check
+            if hit is not None:
+                self._materialize(*hit, out_path)
+                self._count(tasks=1, cache_hits=1)
+            elif self.index is not None:
+                self._synth_to_cache(task, cache_path, out_path)
+                self._count(tasks=1, synthesized=1)
+            else:
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                out_path = self.adapter.synth(task)
+                self._count(tasks=1, synthesized=1)
+        except BaseException as exc:
+            fut.set_exception(exc)
+            raise
+        else:
+            fut.set_result(out_path)
+        finally:
+            with self._lock:
+                del self._inflight[digest]
+        return out_path
 
     def render_batch(self, tasks: list[TTSTask]) -> list[Path]:
         """Render many tasks concurrently.
 
+        Tasks sharing a cache key are synthesized once; the duplicates are
+        linked to the first one's output after it completes, so they never
+        occupy a worker while waiting.
+
         Args:
             tasks: A list of synthesis jobs.
 
@@ -153,29 +403,137 @@ class TTSManager:
 
         self.adapter.preload()
 
-        if self.show_progress and self._tqdm is None:  # pragma: no cover - import guard
-            try:
-                from tqdm import tqdm  # type: ignore
-
-                self._tqdm = tqdm
-            except Exception:  # pragma: no cover
-                self._tqdm = None
-
         results: list[Path] = [Path()] * len(tasks)
+        first, duplicates = self._leaders(tasks)
         with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
-            future_map = {ex.submit(self.render_one, t): i for i, t in enumerate(tasks)}
-            pbar = (
-                self._tqdm(total=len(tasks))
-                if self._tqdm and self.show_progress
-                else None
-            )
+            future_map = {ex.submit(self.render_one, tasks[i]): i for i in first.values()}
+            pbar = self._progress(len(tasks))
             try:
                 for fut in as_completed(future_map):
                     idx = future_map[fut]
                     results[idx] = fut.result()
                     if pbar is not None:
                         pbar.update(1)
+                for idx, leader in duplicates:
+                    self._link_or_copy(results[leader], tasks[idx].out_path)
+                    results[idx] = tasks[idx].out_path
+                    if pbar is not None:
+                        pbar.update(1)
             finally:
                 if pbar is not None:
                     pbar.close()
+        self._count(tasks=len(duplicates), deduplicated=len(duplicates))
         return results
+
+    def render_array(self, task: TTSTask) -> Audio:
+        """Render a single task in memory, using the cache when available.
+
+        ``task.out_path`` is not written. On a miss the samples are quantized
+        as the cache codec stores them, so a later hit returns the same audio,
+        and the entry is written in the background.
+
+        Args:
+            task: The synthesis request to render.
+
+        Returns:
+            Tuple ``(samples, sample_rate)``. Arrays read from ``.npy``
+            entries are read-only memory maps.
+
+        Raises:
+            SynthesisError: If the underlying adapter fails to synthesize.
+        """
+
+        digest = self.cache_key(task)
+        cache_path = self._cache_path(task, digest)
+
+        audio = self._cached_audio(digest, cache_path)
+        if audio is not None:
+            self._count(tasks=1, cache_hits=1)
+            return audio
+
+        with self._lock:
+            leader = self._inflight_audio.get(digest)
+            if leader is None:
+                fut: Future[Audio] = Future()
+                self._inflight_audio[digest] = fut
+        if leader is not None:
+            audio = leader.result()
+            self._count(tasks=1, deduplicated=1)
+            return audio
+
+        try:
+            audio = self._cached_audio(digest, cache_path)  # may have finished since the first check
+            if audio is not None:
+                self._count(tasks=1, cache_hits=1)
+            else:
+                y, sr = self.adapter.synth_array(task)
+                if self.index is not None:
+                    y = self.codec.quantize(y, sr)
+                    self._write_behind(task, digest, cache_path, (y, sr))
+                audio = (y, int(sr))
+                self._count(tasks=1, synthesized=1)
+        except BaseException as exc:
+            fut.set_exception(exc)
+            raise
+        else:
+            fut.set_result(audio)
+        finally:
+            with self._lock:
+                del self._inflight_audio[digest]
+        return audio
+
+    def render_arrays(self, tasks: list[TTSTask]) -> list[Audio]:
+        """Render many tasks concurrently in memory (see :meth:`render_array`).
+
+        Tasks sharing a cache key are synthesized once and share the same
+        array. Cache writes may still be pending on return; see :meth:`flush`.
+
+        Args:
+            tasks: A list of synthesis jobs.
+
+        Returns:
+            List of ``(samples, sample_rate)`` in the order of ``tasks``.
+
+        Raises:
+            SynthesisError: If any task fails to synthesize.
+        """
+
+        if not tasks:
+            return []
+
+        self.adapter.preload()
+
+        results: list[Audio | None] = [None] * len(tasks)
+        first, duplicates = self._leaders(tasks)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as ex:
+            future_map = {ex.submit(self.render_array, tasks[i]): i for i in first.values()}
+            pbar = self._progress(len(tasks))
+            try:
+                for fut in as_completed(future_map):
+                    results[future_map[fut]] = fut.result()
+                    if pbar is not None:
+                        pbar.update(1)
+                for idx, leader in duplicates:
+                    results[idx] = results[leader]
+                    if pbar is not None:
+                        pbar.update(1)
+            finally:
+                if pbar is not None:
+                    pbar.close()
+        self._count(tasks=len(duplicates), deduplicated=len(duplicates))
+        return results  # type: ignore[return-value]
+
+    def flush(self) -> None:
+        """Wait for pending background cache writes and stop the writer thread.
+
+        Failed writes are logged and skipped; the next render synthesizes the
+        affected tasks again.
+        """
+
+        with self._lock:
+            writer, self._writer = self._writer, None
+            writes, self._writes = self._writes, []
+        for fut in writes:
+            fut.result()
+        if writer is not None:
+            writer.shutdown(wait=True)
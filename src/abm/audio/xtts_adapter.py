@@ -2,6 +2,9 @@
 
 - Uses the `TTS` library at runtime if available.
 - Supports dry-run via env ABM_XTTS_DRYRUN=1 to emit a short sine WAV for tests.
+- Speaker conditioning latents for tasks with reference WAVs are computed once
+  per profile and reference content (:mod:`abm.audio.xtts_latents`) and
+  persisted under ``latent_dir`` / env ABM_XTTS_LATENT_DIR when set.
 
 Registration happens via :func:`abm.audio.register_builtins` under the key
 ``"xtts"``.
@@ -12,28 +15,64 @@ from __future__ import annotations
 import math
 import os
 import wave
+from collections.abc import Mapping, Sequence
 from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 from abm.audio.tts_base import SynthesisError, TTSAdapter, TTSTask
+from abm.audio.xtts_latents import SpeakerLatentCache
+
+# Coqui's full_inference reads these from the model config; passing the same
+# values keeps cached-latent synthesis identical to ``tts_to_file``.
+_LATENT_ARGS = {
+    "gpt_cond_len": "gpt_cond_len",
+    "gpt_cond_chunk_len": "gpt_cond_chunk_len",
+    "max_ref_length": "max_ref_len",
+    "sound_norm_refs": "sound_norm_refs",
+}
+_INFERENCE_ARGS = (
+    "temperature",
+    "length_penalty",
+    "repetition_penalty",
+    "top_k",
+    "top_p",
+)
+# Silence Coqui's Synthesizer appends after every sentence
+_SENTENCE_GAP = 10000
+
+
+def _sine_pcm(
+    duration_ms: int = 300, sr: int = 22050, freq: float = 440.0
+) -> np.ndarray:
+    """Return the 16-bit samples of the dry-run sine."""
+    nframes = int(sr * (duration_ms / 1000.0))
+    amp = 0.2
+    return np.array(
+        [
+            int(amp * 32767 * math.sin(2 * math.pi * freq * (n / sr)))
+            for n in range(nframes)
+        ],
+        dtype=np.int16,
+    )
 
 
 def _write_sine_wav(
     path: Path, duration_ms: int = 300, sr: int = 22050, freq: float = 440.0
 ) -> None:
     """Write a short 16-bit PCM mono sine WAV for dry-run tests."""
-    nframes = int(sr * (duration_ms / 1000.0))
-    amp = 0.2
+    _write_pcm(path, _sine_pcm(duration_ms, sr, freq), sr)
+
+
+def _write_pcm(path: Path, pcm: np.ndarray, sr: int) -> None:
+    """Write mono 16-bit samples as a WAV file."""
     path.parent.mkdir(parents=True, exist_ok=True)
     with wave.open(str(path), "wb") as wf:
         wf.setnchannels(1)
         wf.setsampwidth(2)
         wf.setframerate(sr)
-        frames = bytearray()
-        for n in range(nframes):
-            val = int(amp * 32767 * math.sin(2 * math.pi * freq * (n / sr)))
-            frames += val.to_bytes(2, "little", signed=True)
-        wf.writeframes(frames)
+        wf.writeframes(np.ascontiguousarray(pcm, dtype="<i2").tobytes())
 
 
 class XTTSAdapter(TTSAdapter):
@@ -45,11 +84,17 @@ class XTTSAdapter(TTSAdapter):
         device: Execution device. Defaults to ``ABM_XTTS_DEVICE`` env var or
             ``'cuda'``.
         denoiser_strength: Optional denoiser parameter passed through to TTS.
+        latent_dir: Directory for persisted speaker latents. Defaults to
+            ``ABM_XTTS_LATENT_DIR``; unset keeps latents in memory only.
+        voices: Casting to warm in :meth:`preload`, mapping profile id to
+            reference WAV paths.
 
     Attributes:
         model_name: Resolved model identifier.
         device: Chosen device.
         denoiser_strength: Denoiser strength if used.
+        voices: Profiles whose latents :meth:`preload` computes or loads.
+        latents: :class:`~abm.audio.xtts_latents.SpeakerLatentCache` in use.
         _tts: Internal TTS object (lazy).
         _dryrun: If True, writes a sine WAV instead of calling TTS.
     """
@@ -62,26 +107,93 @@ class XTTSAdapter(TTSAdapter):
         *,
         device: str | None = None,
         denoiser_strength: float | None = None,
+        latent_dir: Path | str | None = None,
+        voices: Mapping[str, Sequence[str]] | None = None,
     ) -> None:
         env_model = os.environ.get("ABM_XTTS_MODEL")
         env_device = os.environ.get("ABM_XTTS_DEVICE")
         self.model_name = model_name or env_model or self.DEFAULT_MODEL
         self.device = device or env_device or "cuda"
         self.denoiser_strength = denoiser_strength
+        self.voices = {pid: list(refs) for pid, refs in (voices or {}).items()}
+        self.latents = SpeakerLatentCache(
+            latent_dir or os.environ.get("ABM_XTTS_LATENT_DIR") or None,
+            device=self.device,
+        )
         self._dryrun = os.environ.get("ABM_XTTS_DRYRUN", "") == "1"
         self._tts: Any | None = None
 
     def preload(self) -> None:
-        """Load the XTTS model unless running in dry-run mode."""
+        """Load the XTTS model and warm the latents of ``voices``.
+
+        Does nothing in dry-run mode. The model is loaded once; latents
+        already in memory are not recomputed, so repeated calls are cheap.
+        """
         if self._dryrun:
             return
+        if self._tts is None:
+            try:
+                from TTS.api import TTS  # type: ignore
+            except Exception as exc:  # pragma: no cover (covered in real env)
+                raise SynthesisError(
+                    "Coqui TTS not installed. Install `TTS` or set ABM_XTTS_DRYRUN=1 for tests."
+                ) from exc
+            self._tts = TTS(self.model_name).to(self.device)
+        for profile_id, refs in self.voices.items():
+            if refs:
+                self._speaker_latents(profile_id, refs)
+
+    def _speaker_latents(
+        self, profile_id: str | None, refs: Sequence[str]
+    ) -> tuple[Any, Any]:
+        """Return cached ``(gpt_cond_latent, speaker_embedding)`` for ``refs``."""
+        assert self._tts is not None
+        model = self._tts.synthesizer.tts_model
+        kwargs = {
+            arg: getattr(model.config, attr)
+            for arg, attr in _LATENT_ARGS.items()
+            if hasattr(model.config, attr)
+        }
         try:
-            from TTS.api import TTS  # type: ignore
+            return self.latents.get(
+                model, profile_id, refs, model_id=self.model_name, **kwargs
+            )
+        except OSError as exc:
+            raise SynthesisError(f"XTTS reference audio unreadable: {exc}") from exc
+
+    def _render_cloned(self, task: TTSTask) -> tuple[np.ndarray, int]:
+        """Synthesize ``task`` from cached latents as 16-bit samples.
+
+        Mirrors ``tts_to_file``: sentences are inferred one by one, each
+        followed by Coqui's inter-sentence silence, and the result is
+        peak-normalized to ``int16``.
+        """
+        assert self._tts is not None
+        synthesizer = self._tts.synthesizer
+        model = synthesizer.tts_model
+        latent, embedding = self._speaker_latents(task.profile_id, task.refs)
+        settings = {
+            k: getattr(model.config, k)
+            for k in _INFERENCE_ARGS
+            if hasattr(model.config, k)
+        }
+        parts: list[np.ndarray] = []
+        try:
+            for sentence in synthesizer.split_into_sentences(task.text.strip()):
+                wav = model.inference(sentence, "en", latent, embedding, **settings)[
+                    "wav"
+                ]
+                if hasattr(wav, "cpu"):
+                    wav = wav.cpu().numpy()
+                parts.append(np.asarray(wav, dtype=np.float64).reshape(-1))
+                parts.append(np.zeros(_SENTENCE_GAP))
         except Exception as exc:  # pragma: no cover (covered in real env)
-            raise SynthesisError(
-                "Coqui TTS not installed. Install `TTS` or set ABM_XTTS_DRYRUN=1 for tests."
-            ) from exc
-        self._tts = TTS(self.model_name).to(self.device)
+            raise SynthesisError(f"XTTS synthesis failed: {exc}") from exc
+        if not parts:
+            raise SynthesisError("XTTS produced no audio.")
+        wav = np.concatenate(parts)
+        pcm = (wav * (32767 / max(0.01, float(np.max(np.abs(wav)))))).astype(np.int16)
+        return pcm, int(synthesizer.output_sample_rate)
 
     def _speaker_kwargs(self, task: TTSTask) -> dict[str, Any]:
         """Prepare speaker cloning arguments for XTTS."""
@@ -116,15 +228,45 @@ class XTTSAdapter(TTSAdapter):
             _write_sine_wav(task.out_path, duration_ms=50)
             return task.out_path
 
-        speaker_args = self._speaker_kwargs(task)
-        try:
-            # Render directly to file; language fixed to English for this project.
-            self._tts.tts_to_file(
-                text=text, file_path=str(task.out_path), language="en", **speaker_args
-            )
-        except Exception as exc:  # pragma: no cover (covered in real env)
-            raise SynthesisError(f"XTTS synthesis failed: {exc}") from exc
+        if task.refs:
+            # Cloned voice: reuse the profile's cached conditioning latents.
+            pcm, sr = self._render_cloned(task)
+            _write_pcm(task.out_path, pcm, sr)
+        else:
+            speaker_args = self._speaker_kwargs(task)
+            try:
+                # Render directly to file; language fixed to English for this project.
+                self._tts.tts_to_file(
+                    text=text,
+                    file_path=str(task.out_path),
+                    language="en",
+                    **speaker_args,
+                )
+            except Exception as exc:  # pragma: no cover (covered in real env)
+                raise SynthesisError(f"XTTS synthesis failed: {exc}") from exc
 
         if not task.out_path.exists() or task.out_path.stat().st_size < 200:
             raise SynthesisError("XTTS produced an empty or missing file.")
         return task.out_path
+
+    def synth_array(self, task: TTSTask) -> tuple[np.ndarray, int]:
+        """Return the samples :meth:`synth` would write, without a file.
+
+        Dry-run, empty-text and cloned-voice output is produced in memory.
+        Tasks without references still go through :meth:`synth` because
+        Coqui's file writer peak-normalizes the waveform that ``tts()``
+        returns.
+
+        Raises:
+            SynthesisError: If the model isn't loaded or synthesis fails.
+        """
+        if self._dryrun:
+            return _sine_pcm().astype(np.float32) / 32768.0, 22050
+        if self._tts is None:
+            raise SynthesisError("XTTS model not loaded. Call preload() first.")
+        if not task.text.strip():
+            return _sine_pcm(duration_ms=50).astype(np.float32) / 32768.0, 22050
+        if task.refs:
+            pcm, sr = self._render_cloned(task)
+            return pcm.astype(np.float32) / 32768.0, sr
+        return super().synth_array(task)
@@ -0,0 +1,199 @@
+"""Cache of XTTS speaker conditioning latents.
+
+XTTS conditions every utterance on a ``gpt_cond_latent`` and a speaker
+embedding computed from the reference WAVs. Coqui's ``tts_to_file`` computes
+both again for every sentence of every call. :class:`SpeakerLatentCache`
+computes them once per profile and reference content, keeps them in memory
+and persists them with ``torch.save`` so later runs skip the computation.
+
+Entries are keyed by the model, the conditioning arguments, the profile id
+and the SHA-256 of each reference file's bytes in the order given (the
+latents depend on that order). Re-recording a reference under the same name
+or switching models invalidates the entry; renaming or moving a reference
+does not.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import uuid
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+__all__ = ["LatentStats", "SpeakerLatentCache", "ref_digest"]
+
+logger = logging.getLogger(__name__)
+
+_FILE_HASHES: dict[tuple[str, int, int], str] = {}
+_FILE_HASHES_LOCK = threading.Lock()
+
+
+def _file_sha256(path: Path) -> str:
+    """Return the SHA-256 of ``path``, memoized on (path, size, mtime)."""
+
+    st = path.stat()
+    key = (str(path.resolve()), st.st_size, st.st_mtime_ns)
+    with _FILE_HASHES_LOCK:
+        cached = _FILE_HASHES.get(key)
+    if cached is None:
+        h = hashlib.sha256()
+        with path.open("rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        cached = h.hexdigest()
+        with _FILE_HASHES_LOCK:
+            _FILE_HASHES[key] = cached
+    return cached
+
+
+def ref_digest(
+    profile_id: str | None,
+    refs: Sequence[str | Path],
+    *,
+    model_id: str = "",
+    params: Mapping[str, Any] | None = None,
+) -> str:
+    """Return the cache key for ``profile_id`` conditioned on ``refs``.
+
+    Args:
+        profile_id: Profile the references belong to.
+        refs: Reference WAV paths, in conditioning order.
+        model_id: Identifier of the model computing the latents.
+        params: Keyword arguments for ``get_conditioning_latents``.
+
+    Raises:
+        OSError: If a reference file cannot be read.
+    """
+
+    h = hashlib.sha256()
+    header = {"model": model_id, "params": dict(params or {}), "profile": profile_id or ""}
+    h.update(json.dumps(header, sort_keys=True, default=repr).encode("utf-8"))
+    for r in refs:
+        h.update(b"|" + _file_sha256(Path(r)).encode("ascii"))
+    return h.hexdigest()
+
+
+@dataclass
+class LatentStats:
+    """Counters for :class:`SpeakerLatentCache`.
+
+    Attributes:
+        computed: Latents computed by the model.
+        loaded: Latents read from the on-disk cache.
+        hits: Lookups served from memory.
+    """
+
+    computed: int = 0
+    loaded: int = 0
+    hits: int = 0
+
+
+class SpeakerLatentCache:
+    """Compute-once store of ``(gpt_cond_latent, speaker_embedding)`` pairs.
+
+    Args:
+        root: Directory for persisted ``.pt`` files; ``None`` keeps latents in
+            memory only.
+        device: Device latents are loaded onto (``map_location``).
+
+    Attributes:
+        root: Persistence directory or ``None``.
+        device: Target device for loaded tensors.
+        stats: Cumulative :class:`LatentStats`.
+    """
+
+    def __init__(self, root: Path | str | None = None, *, device: str = "cpu") -> None:
+        self.root = Path(root) if root is not None else None
+        self.device = device
+        self.stats = LatentStats()
+        self._mem: dict[str, tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
+
+    def path_for(self, profile_id: str | None, digest: str) -> Path | None:
+        """Return the file holding ``digest``'s latents (``None`` without ``root``)."""
+
+        if self.root is None:
+            return None
+        label = re.sub(r"[^A-Za-z0-9_.-]+", "_", profile_id or "refs")
+        return self.root / f"{label}-{digest[:16]}.pt"
+
+    def get(
+        self,
+        model: Any,
+        profile_id: str | None,
+        refs: Sequence[str | Path],
+        *,
+        model_id: str = "",
+        **kwargs: Any,
+    ) -> tuple[Any, Any]:
+        """Return the latents for ``profile_id``/``refs``, computing them at most once.
+
+        Args:
+            model: Coqui ``Xtts`` model providing ``get_conditioning_latents``.
+            profile_id: Profile the references belong to.
+            refs: Reference WAV paths, in conditioning order.
+            model_id: Model identifier (e.g. the Coqui model name); part of
+                the key so latents of another model are never reused.
+            **kwargs: Forwarded to ``model.get_conditioning_latents`` on a
+                miss; also part of the key.
+
+        Returns:
+            Tuple ``(gpt_cond_latent, speaker_embedding)``.
+        """
+
+        digest = ref_digest(profile_id, refs, model_id=model_id, params=kwargs)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(digest, threading.Lock())
+        with key_lock:  # one computation per key; concurrent callers wait for it
+            found = self._mem.get(digest)
+            if found is not None:
+                self._count("hits")
+                return found
+            path = self.path_for(profile_id, digest)
+            found = self._load(path)
+            if found is not None:
+                self._count("loaded")
+            else:
+                latent, embedding = model.get_conditioning_latents(audio_path=[str(r) for r in refs], **kwargs)
+                found = (latent, embedding)
+                self._count("computed")
+                self._save(path, found)
+            self._mem[digest] = found
+        return found
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def _load(self, path: Path | None) -> tuple[Any, Any] | None:
+        if path is None or not path.exists():
+            return None
+        import torch
+
+        try:
+            data = torch.load(path, map_location=self.device, weights_only=True)
+            return data["gpt_cond_latent"], data["speaker_embedding"]
+        except Exception as exc:  # truncated or foreign file: recompute and overwrite
+            logger.warning("Ignoring unreadable XTTS latents %s: %s", path, exc)
+            return None
+
+    def _save(self, path: Path | None, latents: tuple[Any, Any]) -> None:
+        if path is None:
+            return
+        import torch
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            torch.save({"gpt_cond_latent": latents[0], "speaker_embedding": latents[1]}, tmp)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
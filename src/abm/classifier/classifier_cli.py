@@ -6,7 +6,11 @@ import os
 import tempfile
 from pathlib import Path
 
-from abm.classifier.section_classifier import classify_blocks
+from abm.classifier.section_classifier import classify_blocks, classify_blocks_incremental
+
+_ARTIFACTS = ("toc", "chapters", "front_matter", "back_matter")
+STATE_FILE = "classify_state.json"
+CHANGES_FILE = "changes.json"
 
 
 def _iter_blocks_from_text(text: str) -> list[dict]:
@@ -43,10 +47,30 @@ def _write_json(path: Path, data: object) -> None:
     path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
 
 
+def _read_json(path: Path) -> object | None:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _load_previous(out_dir: Path) -> tuple[dict | None, dict | None]:
+    """Return the previous artifacts and state from ``out_dir`` (None when incomplete)."""
+    state = _read_json(out_dir / STATE_FILE)
+    parts = {name: _read_json(out_dir / f"{name}.json") for name in _ARTIFACTS}
+    if not isinstance(state, dict) or any(v is None for v in parts.values()):
+        return None, None
+    return parts, state
+
+
 def main(argv: list[str] | None = None) -> int:
     p = argparse.ArgumentParser(description="Section classifier CLI (text or JSONL)")
     p.add_argument("input_path", help="Input .txt (paragraphs) or .jsonl (blocks)")
     p.add_argument("output_dir", help="Output directory for artifacts")
+    p.add_argument(
+        "--incremental",
+        action="store_true",
+        help=f"Classify only blocks appended since the last --incremental run; writes {CHANGES_FILE}",
+    )
     args = p.parse_args(argv)
 
     in_path = Path(args.input_path)
@@ -70,12 +94,20 @@ def main(argv: list[str] | None = None) -> int:
                     f.write(json.dumps(obj, ensure_ascii=False) + "\n")
             jsonl_path = tmp_jsonl
 
-        result = classify_blocks(str(jsonl_path))
+        if args.incremental:
+            previous, state = _load_previous(out_dir)
+            result, changes, new_state = classify_blocks_incremental(str(jsonl_path), previous, state)
+        else:
+            result = classify_blocks(str(jsonl_path))
 
         _write_json(out_dir / "toc.json", result["toc"])  # type: ignore[index]
         _write_json(out_dir / "chapters.json", result["chapters"])  # type: ignore[index]
         _write_json(out_dir / "front_matter.json", result["front_matter"])  # type: ignore[index]
         _write_json(out_dir / "back_matter.json", result["back_matter"])  # type: ignore[index]
+        if args.incremental:
+            _write_json(out_dir / CHANGES_FILE, changes)
+            _write_json(out_dir / STATE_FILE, new_state)
+            print(f"{changes['mode']}: {len(changes['reprocess'])} chapter(s) to reprocess")
 
         # Tiny summary for interactive usage
         print(f"Wrote artifacts to {out_dir}")
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import copy
 import json
 import re
 import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+from hashlib import sha256
 from typing import Any
 
 TOC_HEADING_RE = re.compile(r"^\s*(table of contents|contents)\b", re.I)
@@ -30,6 +34,8 @@ BODY_HEADING_RE = re.compile(
     ),
     re.I,
 )
+# Dotted leaders followed by a page number at the end of a TOC line
+DOTTED_LEADER_RE = re.compile(r"\.{2,}\s*\d+\s*$")
 
 # Heuristics for heading candidates using enriched JSONL fields
 MAX_HEADING_WORDS = 12
@@ -117,7 +123,7 @@ def _parse_toc_items(
         if not m:
             # Try fallback only if it resembles a typical TOC line with dotted leaders
             m2 = TOC_ITEM_RE_FALLBACK.match(text)
-            dotted = bool(re.search(r"\.{2,}\s*\d+\s*$", text))
+            dotted = bool(DOTTED_LEADER_RE.search(text))
             if not m2 or not dotted:
                 i += 1
                 continue
@@ -128,7 +134,7 @@ def _parse_toc_items(
             digits = m.group("digits")
         # Clean up TOC title: drop dotted leaders and trailing page numbers if present
         if title:
-            title = re.sub(r"\.{2,}\s*\d+\s*$", "", title).strip()
+            title = DOTTED_LEADER_RE.sub("", title).strip()
         # Filter out lines that look like numeric-only sequences (e.g., '1..2..3..4..5')
         canon_no_space = re.sub(r"\s+", "", canon_title(title))
         digits_only_pattern = re.compile(r"^(?:\d+[\.]*)+$")
@@ -185,10 +191,11 @@ def _is_body_heading_block(block: dict[str, Any]) -> re.Match[str] | None:
         return None
     if cc is not None and isinstance(cc, int) and cc > MAX_HEADING_CHARS:
         return None
+    m = BODY_HEADING_RE.match(text)
     # Exclude likely TOC item lines that have dotted leaders and trailing page numbers
-    if re.search(r"\.{2,}\s*\d+\s*$", text):
+    if m is None or DOTTED_LEADER_RE.search(text):
         return None
-    return BODY_HEADING_RE.match(text)
+    return m
 
 
 def _looks_like_toc_item_line(text: str) -> bool:
@@ -196,9 +203,78 @@ def _looks_like_toc_item_line(text: str) -> bool:
     return bool(TOC_ITEM_RE_STRICT.match(text) or TOC_ITEM_RE_FALLBACK.match(text))
 
 
+@dataclass(frozen=True)
+class _HeadingCandidate:
+    pos: int
+    title: str
+    canon: str
+    digits: str | None
+    start_line: int | None
+    src_index: int | None
+
+
+class _HeadingIndex:
+    """Body heading candidates keyed by canonical title and by ``Chapter N`` number.
+
+    Built in one pass over the blocks; each key maps to ascending block
+    positions so a lookup is a bisect plus a short skip over candidates that
+    the caller's position constraints reject.
+    """
+
+    def __init__(self, blocks: list[dict[str, Any]], start: int) -> None:
+        self.candidates: dict[int, _HeadingCandidate] = {}
+        self.by_canon: dict[str, list[int]] = {}
+        self.by_ordinal: dict[int, list[int]] = {}
+        for i in range(start, len(blocks)):
+            blk = blocks[i]
+            m = _is_body_heading_block(blk)
+            if not m:
+                continue
+            h_title = (m.group("title") or "").strip()
+            h_digits = m.group("digits")
+            sl = blk.get("start_line")
+            src = blk.get("index")
+            cand = _HeadingCandidate(
+                pos=i,
+                title=h_title,
+                canon=canon_title(h_title),
+                digits=h_digits,
+                start_line=sl if isinstance(sl, int) else None,
+                src_index=src if isinstance(src, int) else None,
+            )
+            self.candidates[i] = cand
+            # Headings without a title ("Chapter 3", "Prologue") only match by ordinal
+            if h_title:
+                self.by_canon.setdefault(cand.canon, []).append(i)
+            if h_digits:
+                self.by_ordinal.setdefault(int(h_digits), []).append(i)
+
+    def first(
+        self, positions: list[int] | None, search_pos: int, min_start_line: int, claimed_src: set[int]
+    ) -> int | None:
+        """Return the first position >= ``search_pos`` that passes the line/source constraints."""
+        if not positions:
+            return None
+        for k in range(bisect_left(positions, search_pos), len(positions)):
+            cand = self.candidates[positions[k]]
+            if cand.start_line is not None and cand.start_line <= min_start_line:
+                continue
+            if cand.src_index is not None and cand.src_index in claimed_src:
+                continue
+            return cand.pos
+        return None
+
+
 def _match_chapters(
     blocks: list[dict[str, Any]], toc_entries: list[dict[str, Any]], start_search: int
 ) -> tuple[list[dict[str, Any]], list[str]]:
+    """Assign ``start_block``/``end_block`` to each TOC entry from the body headings.
+
+    Each entry takes the first heading after the previous match whose title
+    equals the entry title (exactly or after canon_title) or whose chapter
+    number equals the entry ordinal.  Headings are indexed once up front, so
+    matching costs a lookup per entry instead of a scan over the blocks.
+    """
     warnings: list[str] = []
     claimed_heading_indices: set[int] = set()
     # Prevent using two headings that originated from the same source block index
@@ -211,57 +287,41 @@ def _match_chapters(
         prev_end_line = prev.get("end_line")
         if isinstance(prev_end_line, int):
             min_start_line = prev_end_line
+    index = _HeadingIndex(blocks, search_pos)
     for entry in toc_entries:
         title = entry["title"]
         ctitle = canon_title(title)
         ordinal = entry.get("ordinal")
-        found_idx: int | None = None
-        mode = ""
-        i = search_pos
-        while i < len(blocks):
-            blk = blocks[i]
-            # Respect line bounds if available
-            sl = blk.get("start_line")
-            if isinstance(sl, int) and sl <= min_start_line:
-                i += 1
-                continue
-            m = _is_body_heading_block(blk)
-            if m:
-                # If this heading candidate comes from the same source block index
-                # as a previously claimed heading, skip it to avoid ambiguous multi-heading blocks
-                src_idx = blk.get("index")
-                if isinstance(src_idx, int) and src_idx in claimed_heading_src_indices:
-                    i += 1
-                    continue
-                if i in claimed_heading_indices:
-                    raise ValueError(f"Duplicate chapter heading match at block {i}")
-                h_title = (m.group("title") or "").strip()
-                h_canon = canon_title(h_title)
-                h_digits = m.group("digits")
-                if h_title and h_title.strip() == title.strip():
-                    found_idx = i
-                    mode = "exact"
-                    break
-                if h_title and h_canon == ctitle:
-                    found_idx = i
-                    mode = "normalized"
-                    break
-                if ordinal is not None and h_digits and int(h_digits) == ordinal:
-                    found_idx = i
-                    mode = "ordinal"
-                    break
-            i += 1
-        if found_idx is None:
+        hits = [
+            index.first(index.by_canon.get(ctitle), search_pos, min_start_line, claimed_heading_src_indices),
+            index.first(
+                index.by_ordinal.get(ordinal) if ordinal is not None else None,
+                search_pos,
+                min_start_line,
+                claimed_heading_src_indices,
+            ),
+        ]
+        found = [h for h in hits if h is not None]
+        if not found:
             raise ValueError(f"Chapter heading not found for TOC entry: '{title}'")
+        found_idx = min(found)
+        if found_idx in claimed_heading_indices:
+            raise ValueError(f"Duplicate chapter heading match at block {found_idx}")
+        cand = index.candidates[found_idx]
+        # Same precedence as comparing the heading in place: exact, then normalized, then ordinal
+        if cand.title and cand.title == title.strip():
+            mode = "exact"
+        elif cand.title and cand.canon == ctitle:
+            mode = "normalized"
+        else:
+            mode = "ordinal"
         entry["start_block"] = found_idx
         claimed_heading_indices.add(found_idx)
-        src_idx2 = blocks[found_idx].get("index")
-        if isinstance(src_idx2, int):
-            claimed_heading_src_indices.add(src_idx2)
+        if cand.src_index is not None:
+            claimed_heading_src_indices.add(cand.src_index)
         # Update min_start_line to enforce forward-only matching by original line number
-        next_min_sl = blocks[found_idx].get("start_line")
-        if isinstance(next_min_sl, int):
-            min_start_line = max(min_start_line, next_min_sl)
+        if cand.start_line is not None:
+            min_start_line = max(min_start_line, cand.start_line)
         if mode == "normalized":
             warnings.append(f"title normalized match used for TOC entry '{title}' matched at block {found_idx}")
         elif mode == "ordinal":
@@ -278,7 +338,10 @@ def _match_chapters(
 
 
 def classify_blocks(jsonl_path: str) -> dict[str, Any]:
-    blocks = _load_jsonl_blocks(jsonl_path)
+    return _classify_loaded(_load_jsonl_blocks(jsonl_path))
+
+
+def _classify_loaded(blocks: list[dict[str, Any]]) -> dict[str, Any]:
     toc_start = _find_toc_heading(blocks)
     # Find the first body heading to bound TOC parsing window
     first_body_heading_idx = None
@@ -358,3 +421,135 @@ def classify_blocks(jsonl_path: str) -> dict[str, Any]:
         "front_matter": front_json,
         "back_matter": back_json,
     }
+
+
+def _block_digest(blocks: list[dict[str, Any]], start: int, end: int, h: Any = None) -> Any:
+    """Feed blocks ``[start, end)`` into a sha256 (new one unless ``h`` is given) and return it."""
+    h = h or sha256()
+    for b in blocks[start:end]:
+        h.update(json.dumps(b, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        h.update(b"\n")
+    return h
+
+
+def classification_state(blocks: list[dict[str, Any]]) -> dict[str, Any]:
+    """Return what an incremental run needs to recognise an extension of ``blocks``."""
+    return {"block_count": len(blocks), "blocks_sha256": _block_digest(blocks, 0, len(blocks)).hexdigest()}
+
+
+def classify_blocks_incremental(
+    jsonl_path: str, previous: dict[str, Any] | None, state: dict[str, Any] | None
+) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]]:
+    """Classify only the blocks appended since the previous run, when possible.
+
+    ``previous`` is the earlier classify_blocks result and ``state`` the
+    classification_state saved with it.  When the first ``block_count``
+    blocks of the new JSONL hash to ``blocks_sha256`` the book only grew:
+    earlier chapters keep their indices and spans, the last chapter absorbs
+    appended blocks up to the first new body heading, and every appended body
+    heading starts a new chapter (recorded in the TOC with a warning, since
+    the TOC itself is part of the unchanged prefix).  Otherwise the whole book
+    is classified again and chapters are compared with the previous ones.
+
+    Returns ``(result, change_manifest, new_state)``.
+    """
+    blocks = _load_jsonl_blocks(jsonl_path)
+    prev_count = int(state.get("block_count", -1)) if state else -1
+    prev_chapters = (previous or {}).get("chapters", {}).get("chapters", [])
+    # The last chapter always runs to the final block, so this catches artifacts and state out of step
+    in_step = bool(prev_chapters) and prev_chapters[-1]["end_block"] == prev_count - 1
+    if previous is not None and state is not None and in_step and 0 < prev_count <= len(blocks):
+        prefix = _block_digest(blocks, 0, prev_count)
+        if prefix.hexdigest() == state.get("blocks_sha256"):
+            result, new_idx, extended = _classify_appended(blocks, prev_count, previous)
+            new_state = {
+                "block_count": len(blocks),
+                "blocks_sha256": _block_digest(blocks, prev_count, len(blocks), prefix).hexdigest(),
+            }
+            mode = "append" if len(blocks) > prev_count else "unchanged"
+            return result, _change_manifest(mode, prev_count, len(blocks), new_idx, extended, []), new_state
+    result = _classify_loaded(blocks)
+    old = {c["chapter_index"]: c for c in prev_chapters}
+    new_idx, changed = [], []
+    for ch in result["chapters"]["chapters"]:
+        before = old.get(ch["chapter_index"])
+        if before is None:
+            new_idx.append(ch["chapter_index"])
+        elif (before["title"], before["paragraphs"]) != (ch["title"], ch["paragraphs"]):
+            changed.append(ch["chapter_index"])
+    current = {c["chapter_index"] for c in result["chapters"]["chapters"]}
+    removed = sorted(i for i in old if i not in current)
+    manifest = _change_manifest("full", prev_count, len(blocks), new_idx, changed, removed)
+    return result, manifest, classification_state(blocks)
+
+
+def _classify_appended(
+    blocks: list[dict[str, Any]], prev_count: int, previous: dict[str, Any]
+) -> tuple[dict[str, Any], list[int], list[int]]:
+    result = copy.deepcopy(previous)
+    chapters: list[dict[str, Any]] = result["chapters"]["chapters"]
+    toc: dict[str, Any] = result["toc"]
+    if prev_count == len(blocks):
+        return result, [], []
+    claimed_src = {
+        blocks[c["start_block"]].get("index")
+        for c in chapters
+        if 0 <= c["start_block"] < prev_count and isinstance(blocks[c["start_block"]].get("index"), int)
+    }
+    starts: list[tuple[int, str]] = []
+    for i in range(prev_count, len(blocks)):
+        m = _is_body_heading_block(blocks[i])
+        if not m:
+            continue
+        src = blocks[i].get("index")
+        if isinstance(src, int):
+            if src in claimed_src:
+                continue
+            claimed_src.add(src)
+        starts.append((i, (m.group("title") or "").strip() or blocks[i]["text"].strip()))
+    last = chapters[-1]
+    tail_end = (starts[0][0] if starts else len(blocks)) - 1
+    extended = []
+    if tail_end > last["end_block"]:
+        last["paragraphs"].extend(blocks[bi]["text"] for bi in range(last["end_block"] + 1, tail_end + 1))
+        last["end_block"] = tail_end
+        extended.append(last["chapter_index"])
+    new_idx = []
+    next_index = max(c["chapter_index"] for c in chapters) + 1
+    for k, (s, title) in enumerate(starts):
+        e = (starts[k + 1][0] if k + 1 < len(starts) else len(blocks)) - 1
+        chapters.append(
+            {
+                "chapter_index": next_index,
+                "title": title,
+                "start_block": s,
+                "end_block": e,
+                "paragraphs": [blocks[bi]["text"] for bi in range(s, e + 1)],
+            }
+        )
+        toc["warnings"].append(f"appended chapter '{title}' at block {s} has no TOC entry")
+        new_idx.append(next_index)
+        next_index += 1
+    entries = {e["chapter_index"]: e for e in toc["entries"]}
+    for ch in chapters:
+        entry = entries.get(ch["chapter_index"])
+        if entry is None:
+            toc["entries"].append({k: ch[k] for k in ("chapter_index", "title", "start_block", "end_block")})
+        else:
+            entry["end_block"] = ch["end_block"]
+    return result, new_idx, extended
+
+
+def _change_manifest(
+    mode: str, prev_count: int, count: int, new: list[int], changed: list[int], removed: list[int]
+) -> dict[str, Any]:
+    return {
+        "mode": mode,
+        "previous_block_count": prev_count if prev_count >= 0 else None,
+        "block_count": count,
+        "new_chapters": new,
+        "changed_chapters": changed,
+        "removed_chapters": removed,
+        # chapters later stages need to (re)process, in order
+        "reprocess": sorted(set(new) | set(changed)),
+    }
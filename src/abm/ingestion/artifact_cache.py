@@ -0,0 +1,123 @@
+"""Content-addressed cache for ingestion step outputs.
+
+Every step output (raw text, well-done text, JSONL body, single extracted
+pages) is stored under a key derived from:
+
+- the step name,
+- the hash of the step input (PDF bytes, raw text, page content, ...),
+- the step options,
+- the code version of the implementing module (hash of its source file).
+
+Changing any of these yields a new key, so stale entries are never reused;
+they are simply left behind and can be deleted with the directory.
+
+Layout: ``<root>/<step>/<key[:2]>/<key>.txt``.
+"""
+
+from __future__ import annotations
+
+import inspect
+import json
+import os
+from dataclasses import dataclass
+from functools import cache
+from hashlib import sha256
+from pathlib import Path
+from typing import Any
+
+CACHE_SCHEMA = 1
+
+
+def sha256_text(text: str) -> str:
+    return sha256(text.encode("utf-8")).hexdigest()
+
+
+def sha256_file(path: str | Path) -> str:
+    h = sha256()
+    with Path(path).open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@cache
+def _file_version(path: str) -> str:
+    return sha256(Path(path).read_bytes()).hexdigest()[:16]
+
+
+def code_version(obj: Any) -> str:
+    """Return a short hash of the source file defining ``obj`` ("" if unknown)."""
+    try:
+        src = inspect.getsourcefile(obj)
+    except TypeError:
+        src = None
+    return _file_version(src) if src else ""
+
+
+@dataclass
+class StepStats:
+    hits: int = 0
+    misses: int = 0
+
+
+class ArtifactCache:
+    """Text artifacts keyed by step, input hash, options and code version."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.stats: dict[str, StepStats] = {}
+
+    @staticmethod
+    def key(step: str, input_hash: str, options: dict[str, Any] | None, version: str) -> str:
+        payload = {
+            "schema": CACHE_SCHEMA,
+            "step": step,
+            "input": input_hash,
+            "options": options or {},
+            "code": version,
+        }
+        return sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _path(self, step: str, key: str) -> Path:
+        return self.root / step / key[:2] / f"{key}.txt"
+
+    def get_text(self, step: str, key: str) -> str | None:
+        """Return the cached text or None, counting a hit or miss for ``step``."""
+        stats = self.stats.setdefault(step, StepStats())
+        p = self._path(step, key)
+        try:
+            with p.open("r", encoding="utf-8", newline="") as f:
+                text = f.read()
+        except FileNotFoundError:
+            stats.misses += 1
+            return None
+        stats.hits += 1
+        return text
+
+    def put_text(self, step: str, key: str, text: str) -> Path:
+        p = self._path(step, key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f"{p.name}.{os.getpid()}.tmp")
+        # newline="" keeps "\r\n" and lone "\r" intact across a round trip
+        with tmp.open("w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        tmp.replace(p)
+        return p
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "cache_dir": str(self.root),
+            "steps": {step: {"hits": s.hits, "misses": s.misses} for step, s in sorted(self.stats.items())},
+        }
+
+    def format_report(self) -> str:
+        """One-line human summary, e.g. ``raw=hit well_done=miss page=3/120 re-extracted``."""
+        parts: list[str] = []
+        for step, s in sorted(self.stats.items()):
+            if step == "page":
+                parts.append(f"page={s.misses}/{s.hits + s.misses} re-extracted")
+            elif s.hits + s.misses == 1:
+                parts.append(f"{step}={'hit' if s.hits else 'miss'}")
+            else:
+                parts.append(f"{step}={s.hits} hit/{s.misses} miss")
+        return " ".join(parts) if parts else "no cached steps"
@@ -11,6 +11,13 @@ Schema (auto‑created if missing):
         ingested_from, options, ingest_meta
     )
 - welldone_blocks(doc_id, block_index, text)
+
+Bulk path (``bulk_copy=True``): blocks are streamed with binary
+``COPY ... FROM STDIN`` into a temporary staging table and merged into
+welldone_blocks with an upsert, so reloading the same document is
+idempotent and picks up changed text; blocks the file no longer has are
+deleted.  Everything runs in one transaction unless ``commit_every`` asks
+for a commit every N rows.
 """
 
 from __future__ import annotations
@@ -31,9 +38,16 @@ class InsertResult:
     inserted_blocks: int | None = None
 
 
+STAGE_TABLE = "welldone_blocks_stage"
+
+
 class PgInserter:
-    def __init__(self, dsn: str | None = None) -> None:
+    def __init__(self, dsn: str | None = None, *, bulk_copy: bool = False, commit_every: int = 0) -> None:
         self._dsn = dsn or os.environ.get("DATABASE_URL") or ""
+        # COPY into a staging table + upsert instead of executemany INSERTs
+        self.bulk_copy = bulk_copy
+        # bulk path: commit after every N block rows (0 = one transaction for the whole document)
+        self.commit_every = commit_every
 
     def available(self) -> bool:
         # Accept postgres[ql]:// DSN; reject others (e.g., sqlite)
@@ -95,13 +109,19 @@ class PgInserter:
                         block_count,
                         created_at,
                         ingested_from,
-                        options if options is not None else None,
-                        json.loads(mt_p.read_text(encoding="utf-8")),
+                        # JSONB columns: send JSON text (psycopg cannot adapt a bare dict)
+                        json.dumps(options) if options is not None else None,
+                        json.dumps(meta),
                     ),
                 )
                 row = cur.fetchone()
                 doc_id = int(row[0]) if row else None
 
+                if self.bulk_copy:
+                    inserted_blocks = self._copy_blocks(conn, cur, doc_id, _iter_blocks())
+                    conn.commit()
+                    return InsertResult(status="inserted", doc_id=doc_id, inserted_blocks=inserted_blocks)
+
                 # Insert blocks idempotently
                 inserted_blocks = 0
                 ins_sql = (
@@ -117,6 +137,52 @@ class PgInserter:
             conn.commit()
             return InsertResult(status="inserted", doc_id=doc_id, inserted_blocks=inserted_blocks)
 
+    def _copy_blocks(self, conn: Any, cur: Any, doc_id: int | None, blocks: Iterable[tuple[int, str]]) -> int:
+        """Binary COPY blocks into the staging table and upsert them in batches; return row count.
+
+        Rows of ``doc_id`` that are no longer in ``blocks`` are deleted: each batch prunes the
+        index range it newly covers, and rows past the last index go at the end.
+        """
+        cur.execute(f"CREATE TEMP TABLE IF NOT EXISTS {STAGE_TABLE} (block_index INTEGER, text TEXT)")
+        merge_sql = f"""
+            INSERT INTO welldone_blocks (doc_id, block_index, text)
+            SELECT %s, block_index, text FROM {STAGE_TABLE}
+            ON CONFLICT (doc_id, block_index) DO UPDATE SET text = EXCLUDED.text
+            WHERE welldone_blocks.text IS DISTINCT FROM EXCLUDED.text
+        """
+        prune_sql = f"""
+            DELETE FROM welldone_blocks b
+            WHERE b.doc_id = %s AND b.block_index > %s AND b.block_index <= %s
+            AND NOT EXISTS (SELECT 1 FROM {STAGE_TABLE} s WHERE s.block_index = b.block_index)
+        """
+        batch = self.commit_every if self.commit_every > 0 else None
+        total = 0
+        # Highest index merged so far; rows at or below it are settled
+        covered = -(2**31) - 1
+        it = iter(blocks)
+        while True:
+            n = 0
+            hi = covered
+            with cur.copy(f"COPY {STAGE_TABLE} (block_index, text) FROM STDIN (FORMAT BINARY)") as copy:
+                copy.set_types(["int4", "text"])
+                for row in it:
+                    copy.write_row(row)
+                    hi = max(hi, row[0])
+                    n += 1
+                    if batch is not None and n >= batch:
+                        break
+            if n:
+                cur.execute(merge_sql, (doc_id,))
+                if hi > covered:
+                    cur.execute(prune_sql, (doc_id, covered, hi))
+                    covered = hi
+                cur.execute(f"TRUNCATE {STAGE_TABLE}")
+                total += n
+            if batch is None or n < batch:
+                cur.execute("DELETE FROM welldone_blocks WHERE doc_id = %s AND block_index > %s", (doc_id, covered))
+                return total
+            conn.commit()
+
     def _ensure_schema(self, conn: Any) -> None:
         # Create tables if they do not exist. Keep simple and portable.
         ddl_docs = """
@@ -0,0 +1,253 @@
+"""Batch driver: ingest many PDFs with a bounded worker pool.
+
+Books come from a directory (every ``*.pdf`` below it) or a manifest:
+- ``.json``: a list of PDF paths or ``{"pdf": ..., "out_dir": ...}`` objects;
+- anything else: one PDF path per line (``#`` comments allowed).
+
+Each book runs PdfIngestPipeline in a worker process (processes are reused,
+so Python/PyMuPDF start-up is paid once per worker, not per book). A failing
+book is recorded and does not stop the others. A worker that dies takes its
+pool down; the books that were in flight are then re-run one per process, so
+only the book that crashed is recorded as failed. The summary JSON lists per
+book: status, failed step and error, step timings, cache report and output
+paths; it is rewritten after every book.
+
+Resume: all books share an ArtifactCache (``--cache-dir``), so re-running
+with ``--resume`` skips books already marked ok and re-runs failed ones,
+whose completed steps are served from the cache; the book restarts at the
+step that failed.
+
+CLI:
+  python -m abm.ingestion.ingest_batch (--dir DIR | --manifest FILE) --out-root OUT
+      [--workers N] [--summary OUT/ingest_summary.json] [--resume]
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+import traceback
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from abm.ingestion.ingest_pdf import PdfIngestPipeline, PipelineOptions
+
+
+@dataclass(frozen=True)
+class BookTask:
+    pdf: str
+    out_dir: str
+
+
+def discover_books(
+    *, directory: str | Path | None = None, manifest: str | Path | None = None, out_root: str | Path
+) -> list[BookTask]:
+    """Return tasks from a directory scan or a manifest; out dirs default to ``out_root/<pdf stem>``."""
+    if (directory is None) == (manifest is None):
+        raise ValueError("pass exactly one of directory or manifest")
+    root = Path(out_root)
+    entries: list[dict[str, Any]] = []
+    if directory is not None:
+        d = Path(directory)
+        if not d.is_dir():
+            raise FileNotFoundError(str(d))
+        entries = [{"pdf": str(p)} for p in sorted(d.rglob("*.pdf"))]
+    else:
+        m = Path(manifest)  # type: ignore[arg-type]
+        base = m.parent
+        if m.suffix == ".json":
+            raw = json.loads(m.read_text(encoding="utf-8"))
+            entries = [e if isinstance(e, dict) else {"pdf": e} for e in raw]
+        else:
+            lines = m.read_text(encoding="utf-8").splitlines()
+            entries = [{"pdf": ln.strip()} for ln in lines if ln.strip() and not ln.strip().startswith("#")]
+        for e in entries:
+            e["pdf"] = str(base / e["pdf"]) if not Path(e["pdf"]).is_absolute() else e["pdf"]
+    tasks = [BookTask(pdf=e["pdf"], out_dir=str(e.get("out_dir") or root / Path(e["pdf"]).stem)) for e in entries]
+    out_dirs = [Path(t.out_dir) for t in tasks]
+    if len(set(out_dirs)) != len(out_dirs):
+        raise ValueError("two books map to the same out_dir; give explicit out_dir entries in a manifest")
+    return tasks
+
+
+def ingest_one(task: BookTask, opts: PipelineOptions) -> dict[str, Any]:
+    """Run one book; never raises (failures become a ``status: failed`` record)."""
+    pipeline = PdfIngestPipeline()
+    rec: dict[str, Any] = {"pdf": task.pdf, "out_dir": task.out_dir}
+    t0 = time.perf_counter()
+    try:
+        written = pipeline.run(task.pdf, task.out_dir, opts)
+    except Exception as exc:
+        rec.update(
+            status="failed",
+            failed_step=pipeline.current_step,
+            error=f"{type(exc).__name__}: {exc}",
+            traceback=traceback.format_exc(limit=8),
+        )
+    else:
+        rec.update(status="ok", failed_step=None, error=None, outputs={k: str(p) for k, p in written.items()})
+    rec.update(
+        total_s=round(time.perf_counter() - t0, 4),
+        step_timings={k: round(v, 4) for k, v in pipeline.step_timings.items()},
+        cache=pipeline.cache_report,
+    )
+    return rec
+
+
+def _crashed(task: BookTask, exc: BaseException) -> dict[str, Any]:
+    return {
+        "pdf": task.pdf,
+        "out_dir": task.out_dir,
+        "status": "failed",
+        "failed_step": None,
+        "error": f"worker crashed: {type(exc).__name__}: {exc}",
+    }
+
+
+class BatchIngestor:
+    def __init__(self, opts: PipelineOptions, *, workers: int = 2, summary_path: str | Path) -> None:
+        if opts.streaming:
+            raise ValueError("batch ingestion needs the cached (non-streaming) pipeline to resume")
+        self.opts = opts
+        self.workers = max(1, workers)
+        self.summary_path = Path(summary_path)
+
+    def run(self, tasks: list[BookTask], *, resume: bool = False) -> dict[str, Any]:
+        previous = self._load_previous() if resume else {}
+        books: dict[str, dict[str, Any]] = {}
+        todo: list[BookTask] = []
+        for t in tasks:
+            prev = previous.get(t.pdf)
+            if prev is not None and prev.get("status") == "ok":
+                books[t.pdf] = {**prev, "skipped": True}
+            else:
+                todo.append(t)
+        summary: dict[str, Any] = {
+            "started_at": datetime.now(UTC).isoformat(),
+            "workers": self.workers,
+            "options": asdict(self.opts),
+            "books": [],
+        }
+        t0 = time.perf_counter()
+
+        def record(rec: dict[str, Any]) -> None:
+            prev = previous.get(rec["pdf"])
+            if prev is not None and prev.get("status") == "failed":
+                rec["resumed_from"] = prev.get("failed_step")
+            books[rec["pdf"]] = rec
+            self._write(summary, tasks, books, time.perf_counter() - t0)
+
+        if self.workers == 1 or len(todo) <= 1:
+            for t in todo:
+                record(ingest_one(t, self.opts))
+        else:
+            queue = deque(todo)
+            isolate: deque[BookTask] = deque()
+            while queue or isolate:
+                # Books that shared a pool with a crash run alone until the culprit is found
+                lost = self._run_pool(isolate, 1, record) if isolate else self._run_pool(queue, self.workers, record)
+                if len(lost) == 1:
+                    t, exc = lost[0]
+                    record(_crashed(t, exc))
+                else:
+                    isolate.extend(t for t, _ in lost)
+        summary["finished_at"] = datetime.now(UTC).isoformat()
+        return self._write(summary, tasks, books, time.perf_counter() - t0)
+
+    def _run_pool(
+        self, queue: deque[BookTask], workers: int, record: Callable[[dict[str, Any]], None]
+    ) -> list[tuple[BookTask, BaseException]]:
+        """Run books from ``queue`` on ``workers`` processes until it is empty or a worker dies.
+
+        At most ``workers`` books are submitted at once, so when a worker dies every book still in
+        flight is a suspect; those are returned (with the error) instead of being recorded.
+        """
+        lost: list[tuple[BookTask, BaseException]] = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(queue))) as ex:
+            in_flight: dict[Future[dict[str, Any]], BookTask] = {}
+            while queue or in_flight:
+                while queue and len(in_flight) < workers:
+                    t = queue.popleft()
+                    in_flight[ex.submit(ingest_one, t, self.opts)] = t
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    t = in_flight.pop(fut)
+                    try:
+                        rec = fut.result()
+                    except BrokenProcessPool as exc:  # worker process died (e.g. a crash inside MuPDF)
+                        lost.append((t, exc))
+                        continue
+                    except Exception as exc:
+                        rec = _crashed(t, exc)
+                    record(rec)
+                if lost:
+                    lost.extend((t, lost[0][1]) for t in in_flight.values())
+                    return lost
+        return lost
+
+    def _load_previous(self) -> dict[str, dict[str, Any]]:
+        if not self.summary_path.exists():
+            return {}
+        data = json.loads(self.summary_path.read_text(encoding="utf-8"))
+        return {b["pdf"]: b for b in data.get("books", [])}
+
+    def _write(
+        self, summary: dict[str, Any], tasks: list[BookTask], books: dict[str, dict[str, Any]], wall_s: float
+    ) -> dict[str, Any]:
+        ordered = [books[t.pdf] for t in tasks if t.pdf in books]
+        summary["books"] = ordered
+        summary["counts"] = {
+            "total": len(tasks),
+            "ok": sum(1 for b in ordered if b["status"] == "ok"),
+            "failed": sum(1 for b in ordered if b["status"] == "failed"),
+            "pending": len(tasks) - len(ordered),
+        }
+        summary["wall_s"] = round(wall_s, 3)
+        self.summary_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.summary_path.with_name(f"{self.summary_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(summary, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        tmp.replace(self.summary_path)
+        return summary
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Ingest many PDFs with a worker pool")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--dir", help="Directory scanned recursively for *.pdf")
+    src.add_argument("--manifest", help="JSON list or text file with one PDF path per line")
+    parser.add_argument("--out-root", required=True, help="Per-book outputs go to <out-root>/<pdf stem>/")
+    parser.add_argument("--workers", type=int, default=max(1, min(4, os.cpu_count() or 1)))
+    parser.add_argument("--summary", help="Summary JSON path (default <out-root>/ingest_summary.json)")
+    parser.add_argument("--cache-dir", help="Shared step cache (default <out-root>/.ingest_cache)")
+    parser.add_argument("--resume", action="store_true", help="Skip books marked ok in the summary; retry failed")
+    parser.add_argument("--mode", choices=["dev", "prod"], default="dev")
+    parser.add_argument("--extract-workers", type=int, default=1, help="Page-extraction processes per book")
+    args = parser.parse_args()
+
+    out_root = Path(args.out_root)
+    try:
+        tasks = discover_books(directory=args.dir, manifest=args.manifest, out_root=out_root)
+    except (FileNotFoundError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(2)
+    opts = PipelineOptions(
+        mode=args.mode,
+        extract_workers=args.extract_workers,
+        cache_dir=args.cache_dir or str(out_root / ".ingest_cache"),
+    )
+    summary_path = Path(args.summary) if args.summary else out_root / "ingest_summary.json"
+    result = BatchIngestor(opts, workers=args.workers, summary_path=summary_path).run(tasks, resume=args.resume)
+    counts = result["counts"]
+    print(f"ingested {counts['ok']}/{counts['total']} books ({counts['failed']} failed) in {result['wall_s']:.1f}s")
+    print(f"summary: {summary_path}")
+    sys.exit(0 if counts["failed"] == 0 else 1)
@@ -7,18 +7,32 @@ This module composes:
 Modes:
 - dev: write raw + well-done + meta + JSONL; stub DB insert logs to stdout.
 - prod: write nothing to disk; process in-memory and stub DB insert logs "in-memory".
+
+With ``cache_dir`` set, raw text, well-done text, JSONL and individual
+extracted pages are stored in an ArtifactCache keyed by input hash, options
+and code version; steps whose key is already cached are skipped.
+
+With ``streaming`` set, pages flow through extraction, reflow, block
+splitting and JSONL writing in one pass of chained generators; memory is
+bounded by the current page/paragraph, intermediates (raw, well-done) are
+optional, and the time to the first JSONL record is reported.
 """
 
 from __future__ import annotations
 
+import json
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
 from hashlib import sha256
 from pathlib import Path
 from typing import Any
 
+from abm.ingestion.artifact_cache import ArtifactCache, code_version, sha256_file, sha256_text
 from abm.ingestion.pdf_to_raw_text import RawExtractOptions, RawPdfTextExtractor
-from abm.ingestion.raw_to_welldone import RawToWellDone, WellDoneOptions
+from abm.ingestion.raw_to_welldone import RawToWellDone, WellDoneOptions, iter_lines
 from abm.ingestion.welldone_to_json import WellDoneToJSONL
 
 
@@ -35,31 +49,69 @@ class PipelineOptions:
     strip_trailing_spaces: bool = True
     # When true, generate JSONL and insert into Postgres if DATABASE_URL is Postgres
     insert_to_pg: bool = False
+    # raw extraction: >1 spreads page ranges over a process pool
+    extract_workers: int = 1
+    # pages per extraction task; 0 picks a size from page count and workers
+    extract_chunk_pages: int = 0
+    # content-addressed step cache (see artifact_cache); None disables caching
+    cache_dir: str | None = None
+    # single-pass generator pipeline (serial extraction, no step cache)
+    streaming: bool = False
+    # streaming dev mode: also write the raw and well-done text files
+    keep_intermediates: bool = True
 
 
 class PdfIngestPipeline:
+    def __init__(self) -> None:
+        # hits/misses per step of the last run with a cache_dir
+        self.cache_report: dict[str, Any] | None = None
+        # pages/records/first_record_s/total_s of the last streaming run
+        self.stream_stats: dict[str, Any] | None = None
+        # step being executed (left set when a step raises) and seconds per finished step
+        self.current_step: str | None = None
+        self.step_timings: dict[str, float] = {}
+        self._step_t0 = 0.0
+
+    def _begin_step(self, name: str | None) -> None:
+        """Close the timing of the running step and start ``name`` (None ends the run)."""
+        now = time.perf_counter()
+        if self.current_step is not None:
+            self.step_timings[self.current_step] = now - self._step_t0
+        self.current_step = name
+        self._step_t0 = now
+
     def run(self, pdf_path: str | Path, out_dir: str | Path, opts: PipelineOptions | None = None) -> dict[str, Path]:
         opts = opts or PipelineOptions()
         pdf_p = Path(pdf_path)
         out_d = Path(out_dir)
+        self.current_step = None
+        self.step_timings = {}
         # Only ensure output directory in dev where we write files
         if opts.mode == "dev":
             out_d.mkdir(parents=True, exist_ok=True)
+        if opts.streaming:
+            return self._run_streaming(pdf_p, out_d, opts)
+
+        cache = ArtifactCache(opts.cache_dir) if opts.cache_dir else None
 
         # Extract raw (in-memory)
-        extractor = RawPdfTextExtractor()
-        raw_pages = extractor.extract_pages(pdf_p)
-        raw_text = extractor.assemble_output(
-            raw_pages,
-            RawExtractOptions(
-                newline="\n",
-                preserve_form_feeds=opts.preserve_form_feeds,
-                strip_trailing_spaces=True,
-                dedupe_inline_spaces=False,
-                fix_short_wraps=False,
-                artifact_compat=False,
-            ),
-        )
+        self._begin_step("extract")
+        raw_opts = _raw_options(opts)
+        raw_text: str | None = None
+        if cache is not None:
+            raw_key = cache.key("raw", sha256_file(pdf_p), asdict(raw_opts), code_version(RawPdfTextExtractor))
+            raw_text = cache.get_text("raw", raw_key)
+        if raw_text is None:
+            extractor = RawPdfTextExtractor()
+            extract_kwargs: dict[str, Any] = {}
+            if opts.extract_workers > 1:
+                extract_kwargs.update(workers=opts.extract_workers, chunk_size=opts.extract_chunk_pages)
+            if cache is not None:
+                extract_kwargs["page_cache"] = cache
+            raw_pages = extractor.extract_pages(pdf_p, **extract_kwargs)
+            raw_text = extractor.assemble_output(raw_pages, raw_opts)
+            if cache is not None:
+                cache.put_text("raw", raw_key, raw_text)
 
         written: dict[str, Path] = {}
         raw_path: Path | None = None
@@ -69,23 +121,24 @@ class PdfIngestPipeline:
             written["raw"] = raw_path
 
         # Always compute well-done in memory; in dev mode we also persist the intermediate file
+        self._begin_step("well_done")
         wd_path: Path | None = None
-        processor = RawToWellDone()
-        well = processor.process_text(
-            raw_text,
-            WellDoneOptions(
-                reflow_paragraphs=opts.reflow_paragraphs,
-                dehyphenate_wraps=opts.dehyphenate_wraps,
-                dedupe_inline_spaces=opts.dedupe_inline_spaces,
-                strip_trailing_spaces=opts.strip_trailing_spaces,
-            ),
-        )
+        wd_opts = _welldone_options(opts)
+        well: str | None = None
+        if cache is not None:
+            wd_key = cache.key("well_done", sha256_text(raw_text), asdict(wd_opts), code_version(RawToWellDone))
+            well = cache.get_text("well_done", wd_key)
+        if well is None:
+            well = RawToWellDone().process_text(raw_text, wd_opts)
+            if cache is not None:
+                cache.put_text("well_done", wd_key, well)
         if opts.mode == "dev":
             wd_path = out_d / (pdf_p.stem + "_well_done.txt")
             wd_path.write_text(well, encoding="utf-8")
             written["well_done"] = wd_path
 
         # Meta handling depends on mode
+        self._begin_step("meta")
         if opts.mode == "dev":
             assert raw_path is not None  # for type-checkers
             meta = _build_meta(pdf_p, out_d, raw_path, wd_path, opts)
@@ -97,19 +150,137 @@ class PdfIngestPipeline:
             meta_path = None
 
         # JSONL + DB insert (stubbed)
+        self._begin_step("jsonl")
         base_name = f"{pdf_p.stem}_well_done"
         if opts.mode == "dev":
             # Produce JSONL artifacts on disk
             conv = WellDoneToJSONL()
-            out_paths = conv.convert_text(well, base_name=base_name, out_dir=out_d, ingest_meta_path=meta_path)
+            convert_kwargs: dict[str, Any] = {"cache": cache} if cache is not None else {}
+            out_paths = conv.convert_text(
+                well, base_name=base_name, out_dir=out_d, ingest_meta_path=meta_path, **convert_kwargs
+            )
             written["jsonl"] = out_paths["jsonl"]
             written["jsonl_meta"] = out_paths["meta"]
             _stub_db_insert(mode="dev", base_name=base_name, jsonl_path=out_paths["jsonl"], meta_path=out_paths["meta"])
         else:  # prod: no files, stub insert with in-memory payloads
             _stub_db_insert(mode="prod", base_name=base_name, well_text=well, meta=meta)
+        self._begin_step(None)
 
+        if cache is not None:
+            self.cache_report = cache.report()
+            print(f"[CACHE] {cache.format_report()}")
         return written
 
+    def _run_streaming(self, pdf_p: Path, out_d: Path, opts: PipelineOptions) -> dict[str, Path]:
+        if opts.cache_dir or opts.extract_workers > 1:
+            raise ValueError("streaming mode does not support cache_dir or extract_workers > 1")
+        self._begin_step("stream")
+        dev = opts.mode == "dev"
+        keep = dev and opts.keep_intermediates
+        base_name = f"{pdf_p.stem}_well_done"
+        written: dict[str, Path] = {}
+        raw_path = out_d / (pdf_p.stem + "_raw.txt") if keep else None
+        wd_path = out_d / (pdf_p.stem + "_well_done.txt") if keep else None
+        raw_hash, wd_hash = sha256(), sha256()
+        t0 = time.perf_counter()
+        first_record_s: float | None = None
+
+        extractor = RawPdfTextExtractor()
+        conv = WellDoneToJSONL()
+
+        def records(raw_sink: Any, wd_sink: Any) -> Iterator[dict[str, Any]]:
+            nonlocal first_record_s
+            raw_chunks = _tee(
+                extractor.iter_assembled(extractor.iter_pages(pdf_p), _raw_options(opts)), raw_hash, raw_sink
+            )
+            well_chunks = RawToWellDone().iter_processed(iter_lines(raw_chunks), _welldone_options(opts))
+            for rec in conv.iter_records(iter_lines(_tee(well_chunks, wd_hash, wd_sink))):
+                if first_record_s is None:
+                    first_record_s = time.perf_counter() - t0
+                yield rec
+
+        n_records = 0
+        with _open_optional(raw_path) as raw_f, _open_optional(wd_path) as wd_f:
+            if dev:
+                jsonl_path = out_d / (base_name + ".jsonl")
+                with jsonl_path.open("w", encoding="utf-8", newline="") as f:
+                    for rec in records(raw_f, wd_f):
+                        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+                        n_records += 1
+            else:
+                n_records = _stub_db_insert(mode="prod", base_name=base_name, records=records(None, None))
+
+        meta = _build_meta_ephemeral(pdf_p, out_d, opts)
+        meta.update(
+            {
+                "created_at": datetime.now(UTC).isoformat(),
+                "raw_sha256": raw_hash.hexdigest(),
+                "well_done_sha256": wd_hash.hexdigest(),
+            }
+        )
+        if raw_path is not None and wd_path is not None:
+            meta.update({"raw_path": str(raw_path), "well_done_path": str(wd_path)})
+            written.update(raw=raw_path, well_done=wd_path)
+        if dev:
+            meta_path = out_d / (pdf_p.stem + "_ingest_meta.json")
+            meta_path.write_text(_json_dumps(meta) + "\n", encoding="utf-8")
+            written["meta"] = meta_path
+            written["jsonl"] = jsonl_path
+            written["jsonl_meta"] = conv.write_meta(base_name, out_d, n_records, ingest_meta_path=meta_path)
+            _stub_db_insert(mode="dev", base_name=base_name, jsonl_path=jsonl_path, meta_path=written["jsonl_meta"])
+
+        self._begin_step(None)
+        self.stream_stats = {
+            "pages": len(extractor.page_timings),
+            "records": n_records,
+            "first_record_s": first_record_s,
+            "total_s": time.perf_counter() - t0,
+        }
+        first = f"{first_record_s * 1000:.1f} ms" if first_record_s is not None else "n/a"
+        print(
+            f"[STREAM] first JSONL record after {first}; {n_records} records from "
+            f"{self.stream_stats['pages']} pages in {self.stream_stats['total_s']:.2f} s"
+        )
+        return written
+
+
+def _raw_options(opts: PipelineOptions) -> RawExtractOptions:
+    return RawExtractOptions(
+        newline="\n",
+        preserve_form_feeds=opts.preserve_form_feeds,
+        strip_trailing_spaces=True,
+        dedupe_inline_spaces=False,
+        fix_short_wraps=False,
+        artifact_compat=False,
+    )
+
+
+def _welldone_options(opts: PipelineOptions) -> WellDoneOptions:
+    return WellDoneOptions(
+        reflow_paragraphs=opts.reflow_paragraphs,
+        dehyphenate_wraps=opts.dehyphenate_wraps,
+        dedupe_inline_spaces=opts.dedupe_inline_spaces,
+        strip_trailing_spaces=opts.strip_trailing_spaces,
+    )
+
+
+def _tee(chunks: Iterable[str], digest: Any, sink: Any) -> Iterator[str]:
+    """Pass chunks through, hashing them and copying them to ``sink`` if given."""
+    for chunk in chunks:
+        digest.update(chunk.encode("utf-8"))
+        if sink is not None:
+            sink.write(chunk)
+        yield chunk
+
+
+@contextmanager
+def _open_optional(path: Path | None) -> Iterator[Any]:
+    if path is None:
+        yield None
+        return
+    with path.open("w", encoding="utf-8", newline="") as f:
+        yield f
+
 
 def _build_meta(
     pdf_p: Path,
@@ -143,13 +314,10 @@ def _build_meta(
 
 
 def _sha256_file(p: Path) -> str:
-    data = p.read_bytes()
-    return sha256(data).hexdigest()
+    return sha256_file(p)
 
 
 def _json_dumps(obj: Any) -> str:
-    import json
-
     return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
 
 
@@ -195,20 +363,31 @@ def _stub_db_insert(
     meta_path: Path | None = None,
     well_text: str | None = None,
     meta: dict[str, Any] | None = None,
-) -> None:
+    records: Iterable[dict[str, Any]] | None = None,
+) -> int:
     """Print a friendly DB stub message. Swallow print errors.
 
     - In dev mode, expects jsonl_path/meta_path (written on disk).
-    - In prod mode, expects in-memory well_text/meta.
+    - In prod mode, expects in-memory well_text/meta, or a streaming
+      ``records`` iterator which is drained as an insert would.
+
+    Returns the number of streamed records consumed (0 otherwise).
     """
+    n = 0
+    if records is not None:
+        for _rec in records:
+            n += 1
     try:
         if mode == "dev":
             print(f"[DB STUB] Would insert JSONL '{base_name}' from {jsonl_path} with meta {meta_path}")
+        elif records is not None:
+            print(f"[DB STUB] Would insert '{base_name}' from {n} streamed records; meta=in-memory")
         else:
             print(f"[DB STUB] Would insert '{base_name}' from in-memory well-done text; meta=in-memory")
     except Exception:
         # Ensure tests confirm we swallow print exceptions
         pass
+    return n
 
 
 if __name__ == "__main__":
@@ -226,6 +405,13 @@ if __name__ == "__main__":
     parser.add_argument("--no-strip-trailing", action="store_true")
     # insert-pg is unused now; JSONL generation and DB insert are stubbed
     parser.add_argument("--insert-pg", action="store_true", help="(no-op) legacy flag")
+    parser.add_argument("--workers", type=int, default=1, help="Extract PDF pages in N processes")
+    parser.add_argument("--chunk-pages", type=int, default=0, help="Pages per extraction task (0 = auto)")
+    parser.add_argument("--cache-dir", help="Reuse unchanged step outputs and pages from this cache directory")
+    parser.add_argument("--streaming", action="store_true", help="Single-pass generator pipeline (bounded memory)")
+    parser.add_argument(
+        "--no-intermediates", action="store_true", help="With --streaming, skip writing raw/well-done text files"
+    )
     args = parser.parse_args()
 
     pdf_p = Path(args.input)
@@ -239,6 +425,11 @@ if __name__ == "__main__":
         dedupe_inline_spaces=not args.no_dedupe_spaces,
         strip_trailing_spaces=not args.no_strip_trailing,
         insert_to_pg=False,
+        extract_workers=args.workers,
+        extract_chunk_pages=args.chunk_pages,
+        cache_dir=args.cache_dir,
+        streaming=args.streaming,
+        keep_intermediates=not args.no_intermediates,
     )
     try:
         written = PdfIngestPipeline().run(pdf_p, out_dir, opts)
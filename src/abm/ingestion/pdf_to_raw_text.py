@@ -4,20 +4,29 @@
 - Reconstructs lines from raw spans to reduce mid-word splits.
 - Normalizes trailing spaces and dedupes justification gaps.
 - Optional form feed between pages; ensures trailing newline.
+- Optional process pool: page ranges are extracted in parallel, each worker
+  opening its own document; output is identical to serial extraction.
 
 CLI:
-  python -m abm.ingestion.pdf_to_raw_text <input.pdf> [output.txt]
+  python -m abm.ingestion.pdf_to_raw_text <input.pdf> [output.txt] [--workers N]
 """
 
 from __future__ import annotations
 
+import math
 import re
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from hashlib import sha256
 from pathlib import Path
 from typing import Any
 
 import fitz  # PyMuPDF
 
+from abm.ingestion.artifact_cache import ArtifactCache, code_version
+
 
 @dataclass(frozen=True)
 class RawExtractOptions:
@@ -39,30 +48,114 @@ class RawPdfTextExtractor:
 
     Use `extract_pages` + `assemble_output` if you need an in-memory object
     for further processing before writing.
+
+    After `extract_pages`, `page_timings` holds the seconds spent on each page.
     """
 
-    def extract(self, pdf_path: str | Path, out_path: str | Path, options: RawExtractOptions | None = None) -> None:
+    def __init__(self) -> None:
+        self.page_timings: list[float] = []
+
+    def extract(
+        self,
+        pdf_path: str | Path,
+        out_path: str | Path,
+        options: RawExtractOptions | None = None,
+        *,
+        workers: int = 1,
+        chunk_size: int = 0,
+    ) -> None:
         opts = options or RawExtractOptions()
         if opts.newline not in ("\n", "\r\n"):
             raise ValueError("newline must be \\n or \\r\\n")
         pdf_p, out_p = Path(pdf_path), Path(out_path)
         if not pdf_p.exists():
             raise FileNotFoundError(str(pdf_p))
-        pages = self.extract_pages(pdf_p)
+        pages = self.extract_pages(pdf_p, workers=workers, chunk_size=chunk_size)
         text = self.assemble_output(pages, opts)
         self._write(out_p, text)
 
-    def extract_pages(self, pdf_path: str | Path) -> list[str]:
-        """Return list of per-page raw texts (minimal processing)."""
+    def extract_pages(
+        self,
+        pdf_path: str | Path,
+        *,
+        workers: int = 1,
+        chunk_size: int = 0,
+        page_cache: ArtifactCache | None = None,
+    ) -> list[str]:
+        """Return list of per-page raw texts (minimal processing).
+
+        With ``workers > 1`` the page range is split into chunks of
+        ``chunk_size`` pages (auto-sized when 0) and extracted in a process
+        pool; each worker opens its own ``fitz.Document``.  Page order and
+        text are the same as in serial mode.
+
+        With ``page_cache`` each page is looked up by a fingerprint of its
+        content stream and fonts, so a PDF with a few replaced pages only
+        re-extracts those pages.  Cached pages get a timing of 0.0.
+        """
+        if workers <= 1 and page_cache is None:
+            return list(self.iter_pages(pdf_path))
         pdf_path = Path(pdf_path)
         try:
             doc = fitz.open(str(pdf_path))
         except Exception as exc:  # pragma: no cover
             raise ValueError(f"Cannot open PDF: {pdf_path}") from exc
         try:
-            return [self._extract_page_text_blocks(page) for page in doc]
+            n_pages = int(doc.page_count)
+            keys: list[str] = []
+            texts: list[str | None] = [None] * n_pages
+            if page_cache is not None:
+                version = code_version(RawPdfTextExtractor)
+                for i in range(n_pages):
+                    key = page_cache.key("page", _page_fingerprint(doc.load_page(i)), None, version)
+                    keys.append(key)
+                    texts[i] = page_cache.get_text("page", key)
+            todo = [i for i, t in enumerate(texts) if t is None]
+            if workers > 1 and len(todo) > 1:
+                extracted = self._extract_pages_parallel(pdf_path, todo, workers, chunk_size)
+            else:
+                extracted = _extract_page_list(self, doc, todo)
         finally:
             doc.close()
+        timings = [0.0] * n_pages
+        for i, (text, dt) in zip(todo, extracted, strict=True):
+            texts[i] = text
+            timings[i] = dt
+            if page_cache is not None:
+                page_cache.put_text("page", keys[i], text)
+        self.page_timings = timings
+        return [t or "" for t in texts]
+
+    def iter_pages(self, pdf_path: str | Path) -> Iterator[str]:
+        """Yield per-page raw texts one at a time (serial; the document stays open while iterating)."""
+        pdf_path = Path(pdf_path)
+        try:
+            doc = fitz.open(str(pdf_path))
+        except Exception as exc:  # pragma: no cover
+            raise ValueError(f"Cannot open PDF: {pdf_path}") from exc
+        self.page_timings = []
+        try:
+            for page in doc:
+                t0 = time.perf_counter()
+                text = self._extract_page_text_blocks(page)
+                self.page_timings.append(time.perf_counter() - t0)
+                yield text
+        finally:
+            doc.close()
+
+    def _extract_pages_parallel(
+        self, pdf_path: Path, indices: list[int], workers: int, chunk_size: int
+    ) -> list[tuple[str, float]]:
+        if chunk_size <= 0:
+            # A few chunks per worker keeps the pool busy when page costs vary.
+            chunk_size = max(1, math.ceil(len(indices) / (workers * 4)))
+        chunks = [indices[k : k + chunk_size] for k in range(0, len(indices), chunk_size)]
+        out: list[tuple[str, float]] = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as ex:
+            # map() yields chunk results in submission order, preserving page order
+            for chunk in ex.map(_extract_pages_worker, [str(pdf_path)] * len(chunks), chunks):
+                out.extend(chunk)
+        return out
 
     def _extract_page_text_blocks(self, page: Any) -> str:
         try:
@@ -87,40 +180,114 @@ class RawPdfTextExtractor:
         return "\n".join(out_lines)
 
     def assemble_output(self, pages: list[str], opts: RawExtractOptions) -> str:
-        norm_pages: list[str] = []
-        for raw in pages:
-            raw = raw.replace("\r\n", "\n").replace("\r", "\n")
-
-            # Optional wrap-fix normalizations; artifact-compat must preserve all newlines
-            if opts.fix_short_wraps:
-                # Dehyphenate words split at EOL: "some-\nthing" -> "something"
-                raw = re.sub(r"(\w)-\n(\w)", r"\1\2", raw)
-                # Join short fragments across hard wrap when next starts lowercase
-                raw = re.sub(r"(?<=\b[A-Za-z])\n(?=[a-z])", "", raw)
-                raw = re.sub(r"(?<=\b[A-Za-z]{2})\n(?=[a-z])", "", raw)
-
-            lines = raw.split("\n")
-            if opts.strip_trailing_spaces:
-                lines = [ln.rstrip() for ln in lines]
-            if opts.dedupe_inline_spaces:
-                # Deduplicate justification gaps into single spaces per line
-                lines = [re.sub(r" {2,}", " ", ln) for ln in lines]
-
-            # Avoid aggressive reflow: preserve original line/blank-line fidelity
-            norm_pages.append("\n".join(lines))
+        return "".join(self.iter_assembled(pages, opts))
+
+    def iter_assembled(self, pages: Iterable[str], opts: RawExtractOptions) -> Iterator[str]:
+        """Yield the output of `assemble_output` page by page (separator first, then page)."""
         page_sep = "\f" if opts.preserve_form_feeds else "\n\n"
-        joined = page_sep.join(norm_pages)
         if opts.newline != "\n":
-            joined = joined.replace("\n", opts.newline)
-        if not joined.endswith(opts.newline):
-            joined += opts.newline
-        return joined
+            page_sep = page_sep.replace("\n", opts.newline)
+        tail = ""
+        for i, raw in enumerate(pages):
+            chunk = self._normalize_page(raw, opts)
+            if opts.newline != "\n":
+                chunk = chunk.replace("\n", opts.newline)
+            if i:
+                chunk = page_sep + chunk
+            if chunk:
+                tail = chunk
+                yield chunk
+        if not tail.endswith(opts.newline):
+            yield opts.newline
+
+    def _normalize_page(self, raw: str, opts: RawExtractOptions) -> str:
+        raw = raw.replace("\r\n", "\n").replace("\r", "\n")
+
+        # Optional wrap-fix normalizations; artifact-compat must preserve all newlines
+        if opts.fix_short_wraps:
+            # Dehyphenate words split at EOL: "some-\nthing" -> "something"
+            raw = re.sub(r"(\w)-\n(\w)", r"\1\2", raw)
+            # Join short fragments across hard wrap when next starts lowercase
+            raw = re.sub(r"(?<=\b[A-Za-z])\n(?=[a-z])", "", raw)
+            raw = re.sub(r"(?<=\b[A-Za-z]{2})\n(?=[a-z])", "", raw)
+
+        lines = raw.split("\n")
+        if opts.strip_trailing_spaces:
+            lines = [ln.rstrip() for ln in lines]
+        if opts.dedupe_inline_spaces:
+            # Deduplicate justification gaps into single spaces per line
+            lines = [re.sub(r" {2,}", " ", ln) for ln in lines]
+
+        # Avoid aggressive reflow: preserve original line/blank-line fidelity
+        return "\n".join(lines)
 
     def _write(self, out_path: Path, text: str) -> None:
         out_path.parent.mkdir(parents=True, exist_ok=True)
         out_path.write_text(text, encoding="utf-8", newline="")
 
 
+def _extract_page_list(extractor: RawPdfTextExtractor, doc: Any, indices: list[int]) -> list[tuple[str, float]]:
+    out: list[tuple[str, float]] = []
+    for i in indices:
+        t0 = time.perf_counter()
+        text = extractor._extract_page_text_blocks(doc.load_page(i))
+        out.append((text, time.perf_counter() - t0))
+    return out
+
+
+def _extract_pages_worker(pdf_path: str, indices: list[int]) -> list[tuple[str, float]]:
+    """Process-pool worker: extract the given pages with per-page seconds."""
+    doc = fitz.open(pdf_path)
+    try:
+        return _extract_page_list(RawPdfTextExtractor(), doc, indices)
+    finally:
+        doc.close()
+
+
+_XREF_RE = re.compile(rb"(\d+) 0 R\b")
+
+
+def _page_fingerprint(page: Any) -> str:
+    """Hash what page text depends on: content streams, page box and resources.
+
+    The resources are hashed as their full object closure (fonts with their
+    encodings and ToUnicode maps, Form XObjects and the resources those use,
+    ...). Objects are renumbered in traversal order so that a rewritten file
+    with renumbered objects still matches.
+    """
+    h = sha256(page.read_contents())
+    h.update(repr(tuple(page.rect)).encode())
+    doc = page.parent
+    node = page.xref
+    kind, value = doc.xref_get_key(node, "Resources")
+    while kind == "null":  # inherited from an ancestor /Pages node
+        kind, parent = doc.xref_get_key(node, "Parent")
+        if kind != "xref":
+            break
+        node = int(parent.split()[0])
+        kind, value = doc.xref_get_key(node, "Resources")
+    order: dict[int, int] = {}
+    pending: list[int] = []
+
+    def canonical(source: bytes) -> bytes:
+        def renumber(m: re.Match[bytes]) -> bytes:
+            xref = int(m.group(1))
+            if xref not in order:
+                order[xref] = len(order)
+                pending.append(xref)
+            return b"@%d" % order[xref]
+
+        return _XREF_RE.sub(renumber, source)
+
+    h.update(canonical(value.encode()))
+    while pending:
+        xref = pending.pop(0)
+        h.update(b"\0obj" + canonical(doc.xref_object(xref, compressed=True).encode()))
+        if doc.xref_is_stream(xref):
+            h.update(b"\0stream" + (doc.xref_stream_raw(xref) or b""))
+    return h.hexdigest()
+
+
 def _default_output_for_input(p: Path) -> Path:
     return p.with_suffix(".txt")
 
@@ -142,6 +309,8 @@ if __name__ == "__main__":  # pragma: no cover
         action="store_true",
         help="Enable a set of normalizations to match known artifact formatting",
     )
+    parser.add_argument("--workers", type=int, default=1, help="Extract pages in N processes")
+    parser.add_argument("--chunk-pages", type=int, default=0, help="Pages per worker task (0 = auto)")
     args = parser.parse_args()
     in_p = Path(args.input)
     out_p = Path(args.output) if args.output else _default_output_for_input(in_p)
@@ -154,7 +323,7 @@ if __name__ == "__main__":  # pragma: no cover
         artifact_compat=args.artifact_compat,
     )
     try:
-        RawPdfTextExtractor().extract(in_p, out_p, opts)
+        RawPdfTextExtractor().extract(in_p, out_p, opts, workers=args.workers, chunk_size=args.chunk_pages)
         sys.exit(0)
     except FileNotFoundError as exc:
         print(f"Error: {exc}", file=sys.stderr)
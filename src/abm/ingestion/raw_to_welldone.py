@@ -10,14 +10,61 @@ Key invariants:
     no new line breaks are ever inserted inside a paragraph.
 - No semantic changes; only whitespace and hyphenation are altered.
 
+Processing is streaming: input lines are consumed one at a time and each
+paragraph is emitted as soon as its terminating blank line is seen, so only
+the current paragraph is held in memory (`process_file` works on files larger
+than memory).  Paragraph rewrites use module-level precompiled patterns.
+
 CLI:
   python -m abm.ingestion.raw_to_welldone <input.txt> [output.txt]
 """
 
 from __future__ import annotations
 
+import io
 import re
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
+from pathlib import Path
+
+# Heading-like lines: Chapter, Chap., Ch., Prologue, Epilogue (+ optional numbers/titles).
+# Conservative and anchored at line start; see _HEADING_MAX_LEN for the length guard.
+_HEADING_RE = re.compile(
+    r"^\s*(?:chapter|chap\.?|ch\.?|prologue|epilogue)\b[\s.:IVXLCDM0-9-]*.*$",
+    re.IGNORECASE,
+)
+_HEADING_MAX_LEN = 120
+# Patterns start with a literal so the regex engine can skip ahead instead of trying
+# every position (a leading \w or lookbehind is several times slower on book text).
+# token-\nnext → tokennext
+_HYPHEN_WRAP_RE = re.compile(r"-\n(?<=\w-\n)(?=\w)")
+# "a-\nb-\nc": the reference rule (\w)-\n(\w) consumes "b" on the first match, so the
+# second wrap stays; such chains fall back to the consuming pattern.
+_HYPHEN_CHAIN_RE = re.compile(r"-\n\w-\n(?<=\w-\n\w-\n)(?=\w)")
+_HYPHEN_WRAP_CONSUMING_RE = re.compile(r"(\w)-\n(\w)")
+# single newline between non-space characters: a wrap, not a paragraph break
+_WRAP_JOIN_RE = re.compile(r"\n(?<=\S\n)(?=\S)")
+_MULTI_SPACE_RE = re.compile(r"  +")
+_LINE_RE = re.compile(r"[^\r\n]*(?:\r\n?|\n)")
+
+
+def iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Re-split text chunks into lines that keep their endings (like ``newline=""`` files).
+
+    A chunk ending in ``\\r`` is held back until the next chunk shows whether
+    it is part of ``\\r\\n``.
+    """
+    pending = ""
+    for chunk in chunks:
+        data = pending + chunk if pending else chunk
+        # only complete lines go through the regex; a held "\r" is not complete yet
+        end = len(data) - 1 if data.endswith("\r") else len(data)
+        cut = max(data.rfind("\n", 0, end), data.rfind("\r", 0, end)) + 1
+        if cut:
+            yield from _LINE_RE.findall(data, 0, cut)
+        pending = data[cut:]
+    if pending:
+        yield pending
 
 
 @dataclass(frozen=True)
@@ -38,32 +85,77 @@ class WellDoneOptions:
 
 class RawToWellDone:
     def process_text(self, text: str, opts: WellDoneOptions | None = None) -> str:
+        return "".join(self.iter_processed(io.StringIO(text, newline=""), opts))
+
+    def process_file(self, in_path: str | Path, out_path: str | Path, opts: WellDoneOptions | None = None) -> None:
+        """Stream ``in_path`` → ``out_path`` holding one paragraph at a time."""
+        with (
+            Path(in_path).open("r", encoding="utf-8", newline="") as src,
+            Path(out_path).open("w", encoding="utf-8", newline="") as dst,
+        ):
+            for chunk in self.iter_processed(src, opts):
+                dst.write(chunk)
+
+    def iter_processed(self, lines: Iterable[str], opts: WellDoneOptions | None = None) -> Iterator[str]:
+        """Yield output chunks for raw ``lines`` that keep their line endings.
+
+        ``lines`` is what a text file opened with ``newline=""`` yields; any
+        of \\n, \\r\\n or \\r ends a line.
+        """
         opts = opts or WellDoneOptions()
-        paragraphs = self._split_paragraphs(text)
-        # First, optionally split heading-like lines out as their own paragraphs
-        if opts.split_headings:
-            paragraphs = self._apply_split_headings(paragraphs, opts)
-        # Optionally explode each line into its own paragraph unit
+        first = True
+        ends_with_newline = False
+        for para in self._iter_paragraphs(lines):
+            ends_with_newline = para.ends_with_newline
+            if not para.text:
+                continue
+            for out in self._expand_paragraph(para.text, opts):
+                if not first:
+                    yield "\n\n"
+                first = False
+                yield out
+        if ends_with_newline:
+            yield "\n"
+
+    def _expand_paragraph(self, para: str, opts: WellDoneOptions) -> Iterator[str]:
+        paragraphs = self._apply_split_headings([para], opts) if opts.split_headings else [para]
         if opts.split_each_line:
-            exploded = [
-                (ln.rstrip() if opts.strip_trailing_spaces else ln)
-                for para in paragraphs
-                for ln in para.replace("\r\n", "\n").replace("\r", "\n").split("\n")
-                if ln and ln.strip()
-            ]
-            out = [self._process_paragraph(p, opts) for p in exploded]
+            for p in paragraphs:
+                for ln in p.split("\n"):
+                    if ln and ln.strip():
+                        yield self._process_paragraph(ln.rstrip() if opts.strip_trailing_spaces else ln, opts)
         else:
-            out = [self._process_paragraph(p, opts) for p in paragraphs]
-        return "\n\n".join(out) + ("\n" if text.endswith("\n") else "")
+            for p in paragraphs:
+                yield self._process_paragraph(p, opts)
+
+    def _iter_paragraphs(self, lines: Iterable[str]) -> Iterator[_Paragraph]:
+        """Group lines into blank-line separated paragraphs.
+
+        A whitespace-only line closes the current paragraph when a newline
+        precedes and follows it; otherwise (first line of the input, or an
+        unterminated last line) it stays part of the paragraph.  Whitespace-only
+        paragraphs are reported with empty text.  The last paragraph keeps the
+        input's final newline (only a blank line consumes it) and carries
+        whether the input ended with ``\\n``.
+        """
+        buf: list[str] = []
+        line_no = 0
+        last_ending = ""
+        for raw in lines:
+            # newline="" yields at most one ending per line, so rstrip is exact
+            line = raw.rstrip("\r\n")
+            last_ending = ending = raw[len(line) :]
+            if line_no > 0 and ending and not line.strip():
+                yield _Paragraph(_para_text(buf), False)
+                buf = []
+            else:
+                buf.append(line)
+            line_no += 1
+        if buf and last_ending:
+            buf.append("")
+        yield _Paragraph(_para_text(buf), last_ending.endswith("\n"))
 
     def _apply_split_headings(self, paragraphs: list[str], opts: WellDoneOptions) -> list[str]:
-        # Detect heading-like lines: Chapter, Chap., Ch., Prologue, Epilogue (+ optional numbers/titles)
-        # Keep it conservative and anchored at line start; apply a modest length guard.
-        heading_re = re.compile(
-            r"^\s*(?:chapter|chap\.?|ch\.?|prologue|epilogue)\b[\s.:IVXLCDM0-9-]*.*$",
-            re.IGNORECASE,
-        )
-        max_len = 120
         result: list[str] = []
         for para in paragraphs:
             # Normalize newlines and optionally strip trailing spaces per option
@@ -84,7 +176,7 @@ class RawToWellDone:
 
             for ln in lines:
                 s = ln.strip()
-                if s and len(s) <= max_len and heading_re.match(s):
+                if s and len(s) <= _HEADING_MAX_LEN and _HEADING_RE.match(s):
                     # Found a heading-like line; flush any accumulated text as its own paragraph
                     flush_buf()
                     result.append(ln)
@@ -93,38 +185,67 @@ class RawToWellDone:
             flush_buf()
         return result
 
-    def _split_paragraphs(self, text: str) -> list[str]:
-        parts = re.split(r"\n\s*\n+", text.replace("\r\n", "\n").replace("\r", "\n"))
-        return [p for p in parts if p and p.strip()]
-
     def _process_paragraph(self, para: str, opts: WellDoneOptions) -> str:
         lines = [ln.rstrip() if opts.strip_trailing_spaces else ln for ln in para.splitlines()]
-        if opts.dehyphenate_wraps:
-            # Merge hyphenated line-break splits: token-\nnext → tokennext
-            joined = re.sub(r"(\w)-\n(\w)", r"\1\2", "\n".join(lines))
-        else:
-            joined = "\n".join(lines)
+        joined = "\n".join(lines)
+
+        if opts.dehyphenate_wraps and "-\n" in joined:
+            joined = _dehyphenate(joined)
 
         # Heuristic: if this looks like a TOC/list with many bullets, split into individual items
         # Treat '•' bullets as list item starts. If 3+ bullets found, explode into separate paragraphs.
-        bullet_count = joined.count("•")
-        if bullet_count >= 3:
+        if joined.count("•") >= 3:
             parts = [seg.strip() for seg in joined.split("•")]
             items = [f"• {seg}" for seg in parts if seg]
             if items:
                 text = "\n\n".join(items)
                 # Optionally normalize spaces inside items
                 if opts.dedupe_inline_spaces:
-                    text = re.sub(r" {2,}", " ", text)
+                    text = _MULTI_SPACE_RE.sub(" ", text)
                 return text
 
         if opts.reflow_paragraphs:
             # Join single newlines that likely represent wraps, not paragraph breaks
-            joined = re.sub(r"(?<=\S)\n(?=\S)", " ", joined)
+            joined = _WRAP_JOIN_RE.sub(" ", joined)
             # Deduplicate spaces after joining
             if opts.dedupe_inline_spaces:
-                joined = re.sub(r" {2,}", " ", joined)
+                joined = _MULTI_SPACE_RE.sub(" ", joined)
         else:
             if opts.dedupe_inline_spaces:
-                joined = "\n".join(re.sub(r" {2,}", " ", ln) for ln in joined.splitlines())
+                joined = "\n".join(_MULTI_SPACE_RE.sub(" ", ln) for ln in joined.splitlines())
         return joined
+
+
+@dataclass(frozen=True)
+class _Paragraph:
+    text: str
+    ends_with_newline: bool
+
+
+def _para_text(lines: list[str]) -> str:
+    text = "\n".join(lines)
+    return text if text.strip() else ""
+
+
+def _dehyphenate(text: str) -> str:
+    if _HYPHEN_CHAIN_RE.search(text):
+        return _HYPHEN_WRAP_CONSUMING_RE.sub(r"\1\2", text)
+    return _HYPHEN_WRAP_RE.sub("", text)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Raw text → well-done text (streaming reflow)")
+    parser.add_argument("input", help="Path to raw .txt")
+    parser.add_argument("output", nargs="?", help="Output path (defaults to <stem>_well_done.txt)")
+    args = parser.parse_args()
+    in_p = Path(args.input)
+    if not in_p.exists():
+        print(f"Error: {in_p} not found", file=sys.stderr)
+        sys.exit(2)
+    out_p = Path(args.output) if args.output else in_p.with_name(in_p.stem.removesuffix("_raw") + "_well_done.txt")
+    RawToWellDone().process_file(in_p, out_p)
+    print(f"wrote well_done: {out_p}")
+    sys.exit(0)
@@ -28,11 +28,14 @@ from __future__ import annotations
 
 import json
 import re
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+from abm.ingestion.artifact_cache import ArtifactCache, code_version, sha256_text
+
 
 @dataclass(frozen=True)
 class WDToJSONOptions:
@@ -47,33 +50,60 @@ class WellDoneToJSONL:
         base_name: str,
         out_dir: str | Path,
         ingest_meta_path: str | Path | None = None,
+        cache: ArtifactCache | None = None,
     ) -> dict[str, Path]:
         out_d = Path(out_dir)
         out_d.mkdir(parents=True, exist_ok=True)
-        blocks = _split_paragraphs_with_lines(text)
+        body: str | None = None
+        key = ""
+        if cache is not None:
+            key = cache.key("jsonl", sha256_text(text), None, code_version(WellDoneToJSONL))
+            body = cache.get_text("jsonl", key)
+        if body is None:
+            body = self.render_jsonl(text)
+            if cache is not None:
+                cache.put_text("jsonl", key, body)
 
         jsonl_path = out_d / (base_name + ".jsonl")
         with jsonl_path.open("w", encoding="utf-8", newline="") as f:
-            for i, blk in enumerate(blocks):
-                rec = {
-                    "index": i,
-                    "text": blk["text"],
-                    "line_count": blk["line_count"],
-                    "char_count": blk["char_count"],
-                    "word_count": blk["word_count"],
-                    "start_line": blk["start_line"],
-                    "end_line": blk["end_line"],
-                }
-                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-
-        meta = _build_meta_for_wd(out_d / (base_name + ".txt"), blocks, ingest_meta_path=ingest_meta_path)
+            f.write(body)
+
+        meta_path = self.write_meta(base_name, out_d, body.count("\n"), ingest_meta_path=ingest_meta_path)
+        return {"jsonl": jsonl_path, "meta": meta_path}
+
+    def render_jsonl(self, text: str) -> str:
+        """Return the JSONL body (one record per paragraph block, newline-terminated)."""
+        lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        return "".join(json.dumps(rec, ensure_ascii=False) + "\n" for rec in self.iter_records(lines))
+
+    def iter_records(self, lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+        """Yield JSONL records from well-done lines (endings optional), one paragraph at a time."""
+        for i, blk in enumerate(_iter_blocks(lines)):
+            yield {
+                "index": i,
+                "text": blk["text"],
+                "line_count": blk["line_count"],
+                "char_count": blk["char_count"],
+                "word_count": blk["word_count"],
+                "start_line": blk["start_line"],
+                "end_line": blk["end_line"],
+            }
+
+    def write_meta(
+        self,
+        base_name: str,
+        out_dir: str | Path,
+        block_count: int,
+        ingest_meta_path: str | Path | None = None,
+    ) -> Path:
+        out_d = Path(out_dir)
+        meta = _build_meta_for_wd(out_d / (base_name + ".txt"), block_count, ingest_meta_path=ingest_meta_path)
         meta_path = out_d / (base_name + "_meta.json")
         meta_path.write_text(
             json.dumps(meta, ensure_ascii=False, separators=(",", ":")) + "\n",
             encoding="utf-8",
         )
-
-        return {"jsonl": jsonl_path, "meta": meta_path}
+        return meta_path
 
     def convert(
         self,
@@ -101,40 +131,40 @@ def _split_paragraphs_with_lines(text: str) -> list[dict[str, Any]]:
     }
     """
     norm = text.replace("\r\n", "\n").replace("\r", "\n")
-    lines = norm.split("\n")
-    out: list[dict[str, Any]] = []
-    i = 0
-    L = len(lines)
-    line_no = 1  # 1-based numbering for original doc
-    while i < L:
-        # skip blank lines between paragraphs
-        while i < L and (lines[i].strip() == ""):
-            i += 1
-            line_no += 1
-        if i >= L:
-            break
-        start_ln = line_no
-        buf: list[str] = []
-        while i < L and (lines[i].strip() != ""):
-            buf.append(lines[i])
-            i += 1
-            line_no += 1
-        end_ln = line_no - 1
-        text_block = "\n".join(buf)
-        if text_block.strip():
-            out.append(
-                {
-                    "text": text_block,
-                    "lines": buf,
-                    "start_line": start_ln,
-                    "end_line": end_ln,
-                    "line_count": len(buf),
-                    "char_count": len(text_block),
-                    "word_count": _word_count(text_block),
-                }
-            )
-        # loop continues; i points at a blank line or end; consume separator blanks in next iteration
-    return out
+    return list(_iter_blocks(norm.split("\n")))
+
+
+def _iter_blocks(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """Streaming core of `_split_paragraphs_with_lines`; trailing \\r/\\n on lines are ignored."""
+    buf: list[str] = []
+    start_ln = 0
+    line_no = 0  # 1-based numbering for original doc
+    for raw in lines:
+        line_no += 1
+        line = raw.rstrip("\r\n")
+        if line.strip() == "":
+            if buf:
+                yield _block(buf, start_ln)
+                buf = []
+            continue
+        if not buf:
+            start_ln = line_no
+        buf.append(line)
+    if buf:
+        yield _block(buf, start_ln)
+
+
+def _block(buf: list[str], start_ln: int) -> dict[str, Any]:
+    text_block = "\n".join(buf)
+    return {
+        "text": text_block,
+        "lines": buf,
+        "start_line": start_ln,
+        "end_line": start_ln + len(buf) - 1,
+        "line_count": len(buf),
+        "char_count": len(text_block),
+        "word_count": _word_count(text_block),
+    }
 
 
 def _word_count(s: str) -> int:
@@ -142,7 +172,7 @@ def _word_count(s: str) -> int:
     return len(re.findall(r"\S+", s))
 
 
-def _build_meta_for_wd(wd_p: Path, blocks: list[Any], ingest_meta_path: str | Path | None = None) -> dict[str, Any]:
+def _build_meta_for_wd(wd_p: Path, block_count: int, ingest_meta_path: str | Path | None = None) -> dict[str, Any]:
     # Attempt to find book name from directory structure if under data/clean/<book>/
     parts = list(wd_p.parts)
     book = None
@@ -179,7 +209,7 @@ def _build_meta_for_wd(wd_p: Path, blocks: list[Any], ingest_meta_path: str | Pa
     return {
         "book": book,
         "source_well_done": str(wd_p),
-        "block_count": len(blocks),
+        "block_count": block_count,
         "created_at": datetime.now(UTC).isoformat(),
         "immutable": True,
         "ingested_from": str(ingest_meta) if ingest_meta else None,
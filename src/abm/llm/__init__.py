@@ -2,5 +2,6 @@
 
 from abm.llm.client import OpenAICompatClient
 from abm.llm.manager import LLMBackend, LLMService
+from abm.llm.pool import EndpointPoolClient, PoolEndpoint
 
-__all__ = ["LLMBackend", "LLMService", "OpenAICompatClient"]
+__all__ = ["EndpointPoolClient", "LLMBackend", "LLMService", "OpenAICompatClient", "PoolEndpoint"]
@@ -2,20 +2,120 @@
 
 This module intentionally implements only the minimal pieces required for the
 refinement pipeline.  It sends a chat completion request and expects the model
-to return JSON content.
+to return JSON content.  Token counts and prompt timings reported by the server
+are kept per thread in :attr:`OpenAICompatClient.last_usage`.
 """
 
 from __future__ import annotations
 
 import json
 import logging
-from dataclasses import dataclass
+import re
+import threading
+import time
+from dataclasses import dataclass, field
 from typing import Any
 
 import requests
 
 logger = logging.getLogger(__name__)
 
+_SECONDS_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+@dataclass
+class ChatUsage:
+    """Server-reported usage and timings for a single chat request.
+
+    Fields the server does not expose stay ``None``.
+
+    Attributes:
+        route: API route that answered (``"openai"``, ``"ollama_chat"`` or
+            ``"ollama_generate"``).
+        endpoint: Base URL of the server that answered.
+        latency_ms: Wall-clock request latency measured by the client.
+        prompt_tokens: Prompt tokens processed for the request.
+        cached_tokens: Prompt tokens served from the server's prefix/KV cache.
+        completion_tokens: Tokens generated in the reply.
+        ttft_ms: Time to first token, i.e. model load plus prompt processing.
+    """
+
+    route: str = "openai"
+    endpoint: str = ""
+    latency_ms: float = 0.0
+    prompt_tokens: int | None = None
+    cached_tokens: int | None = None
+    completion_tokens: int | None = None
+    ttft_ms: float | None = None
+
+
+def _usage_from_body(body: dict[str, Any], route: str, latency_ms: float) -> ChatUsage:
+    """Extract token counts and timings from a response body.
+
+    Understands the OpenAI ``usage`` block (with vLLM/OpenAI
+    ``prompt_tokens_details.cached_tokens``), llama.cpp ``timings`` and
+    Ollama's native ``prompt_eval_*``/``load_duration`` counters.
+
+    Args:
+        body: Decoded JSON response.
+        route: Route that produced ``body``.
+        latency_ms: Client-side latency of the request.
+
+    Returns:
+        ChatUsage: Parsed statistics.
+
+    Raises:
+        None
+    """
+
+    u = ChatUsage(route=route, latency_ms=latency_ms)
+    if route == "openai":
+        usage = body.get("usage") or {}
+        u.prompt_tokens = usage.get("prompt_tokens")
+        u.completion_tokens = usage.get("completion_tokens")
+        details = usage.get("prompt_tokens_details") or {}
+        u.cached_tokens = details.get("cached_tokens")
+        timings = body.get("timings") or {}
+        if timings:
+            # llama.cpp server: cache_n tokens reused, prompt_n evaluated.
+            if u.cached_tokens is None and timings.get("cache_n") is not None:
+                u.cached_tokens = int(timings["cache_n"])
+            if timings.get("prompt_ms") is not None:
+                u.ttft_ms = float(timings["prompt_ms"])
+        return u
+    if body.get("prompt_eval_count") is not None:
+        u.prompt_tokens = int(body["prompt_eval_count"])
+    if body.get("eval_count") is not None:
+        u.completion_tokens = int(body["eval_count"])
+    if body.get("prompt_eval_duration") is not None:
+        # Durations are reported in nanoseconds.
+        ns = int(body.get("load_duration") or 0) + int(body["prompt_eval_duration"])
+        u.ttft_ms = ns / 1e6
+    return u
+
+
+def ollama_keep_alive(value: str) -> str | int | float:
+    """Return ``value`` in the JSON form Ollama accepts for ``keep_alive``.
+
+    Ollama parses strings as Go durations, which need a unit (``"30m"``), so a
+    bare ``"-1"`` or ``"300"`` is rejected.  Unit-less numbers are therefore
+    sent as JSON numbers, meaning seconds (negative pins the model).
+
+    Args:
+        value: Duration such as ``"30m"``, ``"-1"`` or ``"300"``.
+
+    Returns:
+        str | int | float: ``value`` as a number when it has no unit,
+        otherwise unchanged.
+
+    Raises:
+        None
+    """
+
+    if not _SECONDS_RE.fullmatch(value.strip()):
+        return value
+    return float(value) if "." in value else int(value)
+
 
 @dataclass
 class OpenAICompatClient:
@@ -26,12 +126,30 @@ class OpenAICompatClient:
         api_key: API key for remote services.  Ignored by ``ollama``.
         model: Model identifier to query.
         timeout_s: Request timeout in seconds.
+        keep_alive: Ollama ``keep_alive`` sent with every request so the
+            model stays loaded between bursts (see :func:`ollama_keep_alive`);
+            ``None`` omits the field.
     """
 
     base_url: str
     api_key: str = "EMPTY"  # ignored by Ollama
     model: str = "llama3.1:8b-instruct-q6_K"
     timeout_s: int = 120
+    keep_alive: str | None = None
+    _local: threading.local = field(default_factory=threading.local, init=False, repr=False, compare=False)
+
+    @property
+    def last_usage(self) -> ChatUsage | None:
+        """Usage of the most recent :meth:`chat_json` call on this thread.
+
+        Returns:
+            ChatUsage | None: Statistics, or ``None`` before the first call.
+
+        Raises:
+            None
+        """
+
+        return getattr(self._local, "usage", None)
 
     def _headers(self) -> dict[str, str]:
         """Return authorization headers for a request.
@@ -45,6 +163,23 @@ class OpenAICompatClient:
 
         return {"Authorization": f"Bearer {self.api_key}"}
 
+    def _with_keep_alive(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Add ``keep_alive`` to ``payload`` when configured.
+
+        Args:
+            payload: Request body.
+
+        Returns:
+            dict[str, Any]: The same payload, for chaining.
+
+        Raises:
+            None
+        """
+
+        if self.keep_alive is not None:
+            payload["keep_alive"] = ollama_keep_alive(self.keep_alive)
+        return payload
+
     def _post_openai_v1(self, payload: dict[str, Any]) -> requests.Response:
         """POST to an OpenAI v1-compatible endpoint.
 
@@ -63,7 +198,7 @@ class OpenAICompatClient:
         r = requests.post(
             f"{self.base_url}/chat/completions",
             headers=self._headers(),
-            json=payload,
+            json=self._with_keep_alive(payload),
             timeout=self.timeout_s,
         )
         r.raise_for_status()
@@ -107,7 +242,7 @@ class OpenAICompatClient:
         r = requests.post(
             f"{base}/api/chat",
             headers=self._headers(),
-            json=payload,
+            json=self._with_keep_alive(payload),
             timeout=self.timeout_s,
         )
         r.raise_for_status()
@@ -146,7 +281,7 @@ class OpenAICompatClient:
         r = requests.post(
             f"{base}/api/generate",
             headers=self._headers(),
-            json=payload,
+            json=self._with_keep_alive(payload),
             timeout=self.timeout_s,
         )
         r.raise_for_status()
@@ -190,6 +325,8 @@ class OpenAICompatClient:
             "max_tokens": max_tokens,
             "response_format": {"type": "json_object"},
         }
+        t0 = time.perf_counter()
+        route = "openai"
         # First, try OpenAI v1-compatible route.
         try:
             r = self._post_openai_v1(payload)
@@ -208,6 +345,7 @@ class OpenAICompatClient:
                         max_tokens=max_tokens,
                     )
                     content = r.json().get("message", {}).get("content", "")
+                    route = "ollama_chat"
                 except requests.HTTPError as http_err2:
                     status2 = getattr(http_err2.response, "status_code", None)
                     if status2 in (404, 405):
@@ -219,6 +357,7 @@ class OpenAICompatClient:
                             max_tokens=max_tokens,
                         )
                         content = r.json().get("response", "")
+                        route = "ollama_generate"
                     else:
                         raise
             else:
@@ -234,6 +373,7 @@ class OpenAICompatClient:
                     max_tokens=max_tokens,
                 )
                 content = r.json().get("message", {}).get("content", "")
+                route = "ollama_chat"
             except requests.RequestException:
                 r = self._post_ollama_generate(
                     system_prompt,
@@ -243,6 +383,14 @@ class OpenAICompatClient:
                     max_tokens=max_tokens,
                 )
                 content = r.json().get("response", "")
+                route = "ollama_generate"
+        try:
+            usage = _usage_from_body(r.json(), route, (time.perf_counter() - t0) * 1000.0)
+        except Exception as exc:
+            logger.debug("Failed to read usage stats: %s", exc)
+            usage = ChatUsage(route=route, latency_ms=(time.perf_counter() - t0) * 1000.0)
+        usage.endpoint = self.base_url
+        self._local.usage = usage
         try:
             obj = json.loads(content)
             # Be tolerant: ensure we return a dict[str, Any].
@@ -2,8 +2,8 @@
 
 This module provides a small wrapper around an OpenAI-compatible endpoint
 such as `ollama`.  It exposes a dataclass :class:`LLMBackend` describing the
-service and :class:`LLMService` helpers for starting, stopping and probing the
-server.
+service and :class:`LLMService` helpers for starting, stopping, probing and
+warming up the server.
 """
 
 from __future__ import annotations
@@ -14,10 +14,15 @@ import signal
 import subprocess
 import time
 from dataclasses import dataclass
+from typing import Any
 
 import requests
 
+from abm.llm.client import ollama_keep_alive
+
 DEFAULT_ENDPOINT = "http://127.0.0.1:11434/v1"
+# Long enough to keep the model resident across a whole Stage B run.
+DEFAULT_KEEP_ALIVE = "30m"
 
 logger = logging.getLogger(__name__)
 
@@ -31,12 +36,31 @@ class LLMBackend:
         endpoint: Base URL of the service.
         model: Default model identifier to pull or query.
         env: Optional environment overrides used when spawning a local service.
+        keep_alive: Ollama ``keep_alive`` duration (e.g. ``"30m"``, or ``"-1"``
+            to pin) sent with warmup and every request so the model is not
+            unloaded between bursts.  Unit-less values are sent as seconds.
+            ``None`` leaves the server default.
     """
 
     kind: str = "ollama"
     endpoint: str = DEFAULT_ENDPOINT
     model: str = "llama3.1:8b-instruct-q6_K"
     env: dict[str, str] | None = None
+    keep_alive: str | None = DEFAULT_KEEP_ALIVE
+
+    @property
+    def native_base(self) -> str:
+        """Return the endpoint without a trailing ``/v1`` for Ollama's native API.
+
+        Returns:
+            str: Base URL such as ``http://127.0.0.1:11434``.
+
+        Raises:
+            None
+        """
+
+        base = self.endpoint[:-3] if self.endpoint.endswith("/v1") else self.endpoint
+        return base.rstrip("/")
 
     def headers(self) -> dict[str, str]:
         """Build HTTP headers for OpenAI-compatible requests.
@@ -54,6 +78,24 @@ class LLMBackend:
         return {"Authorization": f"Bearer {api_key}"}
 
 
+@dataclass
+class WarmupResult:
+    """Outcome of :meth:`LLMService.warmup` for one model.
+
+    Attributes:
+        model: Model that was loaded.
+        wall_ms: Client-side duration of the warmup request.
+        load_ms: Server-reported model load time (``None`` if not reported).
+        resident: Whether ``/api/ps`` lists the model afterwards (``None`` when
+            the backend cannot report it).
+    """
+
+    model: str
+    wall_ms: float
+    load_ms: float | None = None
+    resident: bool | None = None
+
+
 class LLMService:
     """Manage the lifecycle of a local LLM server.
 
@@ -97,8 +139,7 @@ class LLMService:
             pass
         try:
             # Fallback: Ollama native models route (strip trailing /v1 if present).
-            base = self.backend.endpoint[:-3] if self.backend.endpoint.endswith("/v1") else self.backend.endpoint
-            r = requests.get(f"{base}/api/tags", timeout=2)
+            r = requests.get(f"{self.backend.native_base}/api/tags", timeout=2)
             return r.status_code == 200
         except Exception:
             return False
@@ -194,3 +235,116 @@ class LLMService:
             return
         name = model or self.backend.model
         subprocess.run(["ollama", "pull", name], check=True)
+
+    def loaded_models(self) -> list[dict[str, Any]]:
+        """Return the models currently resident in Ollama (``/api/ps``).
+
+        Returns:
+            list[dict[str, Any]]: Entries with ``name``/``model``,
+            ``expires_at`` and ``size_vram``; empty on error.
+
+        Raises:
+            None: Network errors are logged and yield an empty list.
+        """
+
+        try:
+            r = requests.get(f"{self.backend.native_base}/api/ps", timeout=5)
+            r.raise_for_status()
+            return list(r.json().get("models", []) or [])
+        except Exception as exc:
+            logger.debug("Failed to list loaded models: %s", exc)
+            return []
+
+    def is_resident(self, model: str | None = None) -> bool:
+        """Check whether ``model`` is loaded according to ``/api/ps``.
+
+        Args:
+            model: Model name; defaults to :attr:`LLMBackend.model`.
+
+        Returns:
+            bool: ``True`` if the model is listed as loaded.
+
+        Raises:
+            None
+        """
+
+        name = model or self.backend.model
+        return any(name in (m.get("name"), m.get("model")) for m in self.loaded_models())
+
+    def warmup(
+        self,
+        model: str | None = None,
+        *,
+        keep_alive: str | None = None,
+        timeout_s: float = 600.0,
+    ) -> WarmupResult:
+        """Load ``model`` ahead of the first real request and keep it resident.
+
+        Issues a minimal Ollama generate (empty prompt, which only loads the
+        model) with ``keep_alive`` set, then confirms residency via
+        ``/api/ps``.  Non-Ollama backends are left untouched.
+
+        Args:
+            model: Model name; defaults to :attr:`LLMBackend.model`.
+            keep_alive: Override for :attr:`LLMBackend.keep_alive`.
+            timeout_s: Seconds allowed for the model load.
+
+        Returns:
+            WarmupResult: Load timings and residency.
+
+        Raises:
+            requests.HTTPError: If the generate request fails.
+        """
+
+        name = model or self.backend.model
+        if self.backend.kind != "ollama":
+            return WarmupResult(model=name, wall_ms=0.0)
+        payload: dict[str, Any] = {"model": name, "prompt": "", "stream": False}
+        ka = keep_alive if keep_alive is not None else self.backend.keep_alive
+        if ka is not None:
+            payload["keep_alive"] = ollama_keep_alive(ka)
+        t0 = time.perf_counter()
+        r = requests.post(
+            f"{self.backend.native_base}/api/generate",
+            headers=self.backend.headers(),
+            json=payload,
+            timeout=timeout_s,
+        )
+        r.raise_for_status()
+        wall_ms = (time.perf_counter() - t0) * 1000.0
+        load_ns = r.json().get("load_duration")
+        result = WarmupResult(
+            model=name,
+            wall_ms=wall_ms,
+            load_ms=(int(load_ns) / 1e6) if load_ns is not None else None,
+            resident=self.is_resident(name),
+        )
+        if not result.resident:
+            logger.warning("model %s not resident after warmup", name)
+        logger.info("warmed up %s in %.0f ms (load %s ms)", name, wall_ms, result.load_ms)
+        return result
+
+    def pin_models(self, models: list[str], *, keep_alive: str | None = None) -> list[WarmupResult]:
+        """Warm up and keep several models resident (e.g. a model cascade).
+
+        Ollama keeps at most ``OLLAMA_MAX_LOADED_MODELS`` models loaded; a
+        model evicted by a later warmup is reported with ``resident=False``.
+
+        Args:
+            models: Model names to load, in order.
+            keep_alive: Override for :attr:`LLMBackend.keep_alive`.
+
+        Returns:
+            list[WarmupResult]: One result per model, residency re-checked
+            after all models were loaded.
+
+        Raises:
+            requests.HTTPError: If a warmup request fails.
+        """
+
+        results = [self.warmup(m, keep_alive=keep_alive) for m in models]
+        if self.backend.kind == "ollama":
+            loaded = {n for m in self.loaded_models() for n in (m.get("name"), m.get("model")) if n}
+            for res in results:
+                res.resident = res.model in loaded
+        return results
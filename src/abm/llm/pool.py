@@ -0,0 +1,320 @@
+"""Client that spreads chat requests over several OpenAI-compatible servers.
+
+Each endpoint (typically one Ollama instance per workstation) carries a
+weight.  Requests go to the healthy endpoint with the fewest outstanding
+requests relative to its weight.  Endpoints that fail ``max_failures`` times in
+a row are ejected for ``cooldown_s`` seconds and then re-admitted on
+probation: one more failure ejects them again.  Chat requests are idempotent,
+so a failed request is retried on another endpoint.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import requests
+
+from abm.llm.client import ChatUsage, OpenAICompatClient
+from abm.llm.manager import LLMBackend, LLMService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolEndpoint:
+    """One server in an :class:`EndpointPoolClient`.
+
+    Attributes:
+        base_url: OpenAI-compatible base URL, e.g. ``http://host:11434/v1``.
+        weight: Relative capacity; an endpoint with weight 2 receives about
+            twice as many concurrent requests as one with weight 1.
+    """
+
+    base_url: str
+    weight: float = 1.0
+
+    @classmethod
+    def parse(cls, spec: str) -> PoolEndpoint:
+        """Parse ``URL`` or ``URL@WEIGHT`` into an endpoint.
+
+        The text after the last ``@`` is a weight only when it is a number, so
+        URLs with credentials (``http://user:pw@host:11434/v1``) parse as a
+        plain URL.
+
+        Args:
+            spec: Endpoint specification from the command line.
+
+        Returns:
+            PoolEndpoint: Parsed endpoint.
+
+        Raises:
+            ValueError: If the weight is not a positive number.
+        """
+
+        url, sep, weight = spec.rpartition("@")
+        if not sep or "/" in weight or ":" in weight:
+            return cls(base_url=spec)
+        try:
+            w = float(weight)
+        except ValueError:
+            return cls(base_url=spec)  # userinfo@host without port or path
+        if not w > 0:  # also rejects nan
+            raise ValueError(f"endpoint weight must be positive: {spec}")
+        return cls(base_url=url, weight=w)
+
+
+@dataclass
+class _EndpointState:
+    """Mutable bookkeeping for one endpoint; guarded by the pool lock."""
+
+    endpoint: PoolEndpoint
+    client: OpenAICompatClient
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    ejected_until: float | None = None
+    requests: int = 0
+    failures: int = 0
+    ejections: int = 0
+    busy_s: float = 0.0
+
+
+class EndpointPoolClient:
+    """Load-balancing drop-in for :class:`OpenAICompatClient`.
+
+    Attributes:
+        model: Model identifier sent to every endpoint.
+        max_failures: Consecutive failures before an endpoint is ejected.
+        cooldown_s: Seconds an ejected endpoint stays out of rotation.
+        max_attempts: Endpoints tried per request before giving up.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[PoolEndpoint],
+        *,
+        model: str,
+        api_key: str = "EMPTY",
+        timeout_s: int = 120,
+        max_failures: int = 3,
+        cooldown_s: float = 30.0,
+        max_attempts: int | None = None,
+        keep_alive: str | None = None,
+    ) -> None:
+        """Create the pool.
+
+        Args:
+            endpoints: Servers to balance over; must not be empty.
+            model: Model identifier sent to every endpoint.
+            api_key: API key forwarded to each endpoint.
+            timeout_s: Per-request timeout in seconds.
+            max_failures: Consecutive failures before ejection.
+            cooldown_s: Seconds an ejected endpoint is skipped.
+            max_attempts: Endpoints tried per request; defaults to all.
+            keep_alive: Ollama ``keep_alive`` forwarded with every request.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If ``endpoints`` is empty.
+        """
+
+        if not endpoints:
+            raise ValueError("EndpointPoolClient needs at least one endpoint")
+        self.model = model
+        self.max_failures = max_failures
+        self.cooldown_s = cooldown_s
+        self.max_attempts = max_attempts or len(endpoints)
+        self._states = [
+            _EndpointState(
+                endpoint=ep,
+                client=OpenAICompatClient(
+                    base_url=ep.base_url, api_key=api_key, model=model, timeout_s=timeout_s, keep_alive=keep_alive
+                ),
+            )
+            for ep in endpoints
+        ]
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def last_usage(self) -> ChatUsage | None:
+        """Usage of the most recent :meth:`chat_json` call on this thread.
+
+        Returns:
+            ChatUsage | None: Statistics, or ``None`` before the first call.
+
+        Raises:
+            None
+        """
+
+        return getattr(self._local, "usage", None)
+
+    def _eject(self, st: _EndpointState, now: float) -> None:
+        """Take ``st`` out of rotation for :attr:`cooldown_s` seconds."""
+
+        st.ejected_until = now + self.cooldown_s
+        st.ejections += 1
+        logger.warning("LLM endpoint %s ejected for %.0fs", st.endpoint.base_url, self.cooldown_s)
+
+    def _acquire(self, tried: set[int]) -> tuple[int, _EndpointState] | None:
+        """Reserve the least-loaded eligible endpoint not in ``tried``.
+
+        Args:
+            tried: Indices already attempted for the current request.
+
+        Returns:
+            tuple[int, _EndpointState] | None: Chosen endpoint, or ``None`` if
+            every endpoint is ejected or already tried.
+
+        Raises:
+            None
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            best: tuple[float, int] | None = None
+            for i, st in enumerate(self._states):
+                if i in tried:
+                    continue
+                if st.ejected_until is not None:
+                    if now < st.ejected_until:
+                        continue
+                    # Cooldown over: re-admit on probation.
+                    st.ejected_until = None
+                    st.consecutive_failures = self.max_failures - 1
+                    logger.info("LLM endpoint %s re-admitted", st.endpoint.base_url)
+                load = (st.outstanding + 1) / st.endpoint.weight
+                if best is None or load < best[0]:
+                    best = (load, i)
+            if best is None:
+                return None
+            st = self._states[best[1]]
+            st.outstanding += 1
+            return best[1], st
+
+    def _release(self, st: _EndpointState, *, ok: bool, elapsed_s: float) -> None:
+        """Return a reservation and update health counters."""
+
+        with self._lock:
+            st.outstanding -= 1
+            st.requests += 1
+            st.busy_s += elapsed_s
+            if ok:
+                st.consecutive_failures = 0
+                return
+            st.failures += 1
+            st.consecutive_failures += 1
+            if st.consecutive_failures >= self.max_failures and st.ejected_until is None:
+                self._eject(st, time.monotonic())
+
+    def check_health(self) -> dict[str, bool]:
+        """Probe every endpoint, ejecting dead ones and re-admitting live ones.
+
+        Returns:
+            dict[str, bool]: Mapping base URL -> alive.
+
+        Raises:
+            None
+        """
+
+        out: dict[str, bool] = {}
+        for st in self._states:
+            alive = LLMService(LLMBackend(kind="openai_compatible", endpoint=st.endpoint.base_url)).is_alive()
+            out[st.endpoint.base_url] = alive
+            with self._lock:
+                if alive:
+                    st.ejected_until = None
+                    st.consecutive_failures = 0
+                elif st.ejected_until is None:
+                    self._eject(st, time.monotonic())
+        return out
+
+    def chat_json(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        temperature: float = 0.2,
+        top_p: float = 0.9,
+        max_tokens: int = 128,
+    ) -> dict[str, Any]:
+        """Send a chat request to the pool and return the parsed JSON reply.
+
+        Args:
+            system_prompt: Instructional system message.
+            user_prompt: User message containing the task.
+            temperature: Sampling temperature for the model.
+            top_p: Nucleus sampling parameter.
+            max_tokens: Maximum tokens in the response.
+
+        Returns:
+            dict[str, Any]: Parsed JSON response, as from
+            :meth:`OpenAICompatClient.chat_json`.
+
+        Raises:
+            requests.RequestException: If every attempted endpoint fails, or
+                no endpoint is currently in rotation.
+        """
+
+        tried: set[int] = set()
+        last_exc: requests.RequestException | None = None
+        for _ in range(self.max_attempts):
+            picked = self._acquire(tried)
+            if picked is None:
+                break
+            idx, st = picked
+            tried.add(idx)
+            t0 = time.perf_counter()
+            try:
+                obj = st.client.chat_json(
+                    system_prompt,
+                    user_prompt,
+                    temperature=temperature,
+                    top_p=top_p,
+                    max_tokens=max_tokens,
+                )
+            except requests.RequestException as exc:
+                self._release(st, ok=False, elapsed_s=time.perf_counter() - t0)
+                logger.debug("LLM endpoint %s failed: %s", st.endpoint.base_url, exc)
+                last_exc = exc
+                continue
+            self._release(st, ok=True, elapsed_s=time.perf_counter() - t0)
+            self._local.usage = st.client.last_usage
+            return obj
+        if last_exc is not None:
+            raise last_exc
+        raise requests.ConnectionError("no LLM endpoint in rotation")
+
+    def endpoint_stats(self) -> dict[str, dict[str, Any]]:
+        """Return per-endpoint counters.
+
+        Returns:
+            dict[str, dict[str, Any]]: Mapping base URL -> ``requests``,
+            ``failures``, ``ejections``, ``busy_s``, ``weight`` and
+            ``ejected`` flag.
+
+        Raises:
+            None
+        """
+
+        now = time.monotonic()
+        with self._lock:
+            return {
+                st.endpoint.base_url: {
+                    "weight": st.endpoint.weight,
+                    "requests": st.requests,
+                    "failures": st.failures,
+                    "ejections": st.ejections,
+                    "busy_s": round(st.busy_s, 3),
+                    "ejected": st.ejected_until is not None and now < st.ejected_until,
+                }
+                for st in self._states
+            }
+
+
+__all__ = ["EndpointPoolClient", "PoolEndpoint"]
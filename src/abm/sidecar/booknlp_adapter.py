@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import bisect
+import hashlib
 import json
 import os
 import shutil
 import subprocess
 import tempfile
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
 from typing import Any
 
+# Separator inserted between chapters when a whole book is annotated in one run.
+BOOK_CHAPTER_SEP = "\n\n\n"
+
 
 @dataclass
 class BookNLPConfig:
@@ -23,6 +28,67 @@ class BookNLPConfig:
     keep_tmp: bool = False  # for debugging; writes run artifacts if True
 
 
+@dataclass
+class ChapterOffset:
+    """Position of one chapter inside the concatenated book text."""
+
+    chapter_index: int
+    start: int  # book offset of the chapter's first char
+    end: int  # book offset one past the chapter's last char
+
+
+def build_book_text(chapters: list[tuple[int, str]]) -> tuple[str, list[ChapterOffset]]:
+    """Concatenate chapter texts and return the book text plus its offset table.
+
+    Args:
+        chapters: ``(chapter_index, text)`` pairs in reading order.
+
+    Returns:
+        The joined text (chapters separated by :data:`BOOK_CHAPTER_SEP`) and one
+        :class:`ChapterOffset` per chapter.
+    """
+    parts: list[str] = []
+    offsets: list[ChapterOffset] = []
+    pos = 0
+    for i, (idx, text) in enumerate(chapters):
+        if i:
+            parts.append(BOOK_CHAPTER_SEP)
+            pos += len(BOOK_CHAPTER_SEP)
+        parts.append(text)
+        offsets.append(ChapterOffset(chapter_index=idx, start=pos, end=pos + len(text)))
+        pos += len(text)
+    return "".join(parts), offsets
+
+
+def split_book_quotes(quotes: list[dict[str, Any]], offsets: list[ChapterOffset]) -> dict[int, list[dict[str, Any]]]:
+    """Map book-level quotes back to chapter-relative offsets.
+
+    A quote belongs to the chapter containing its start; its end is clamped to
+    that chapter.  Quotes starting inside a chapter separator are dropped.
+
+    Args:
+        quotes: Quote dicts with book offsets (see :class:`BookNLPAdapter`).
+        offsets: Offset table from :func:`build_book_text`.
+
+    Returns:
+        Mapping ``chapter_index`` -> quotes with chapter-relative offsets.
+    """
+    out: dict[int, list[dict[str, Any]]] = {o.chapter_index: [] for o in offsets}
+    starts = [o.start for o in offsets]
+    for q in quotes:
+        i = bisect.bisect_right(starts, int(q["start"])) - 1
+        if i < 0:
+            continue
+        o = offsets[i]
+        if int(q["start"]) >= o.end:
+            continue
+        local = dict(q)
+        local["start"] = int(q["start"]) - o.start
+        local["end"] = min(int(q["end"]), o.end) - o.start
+        out[o.chapter_index].append(local)
+    return out
+
+
 class BookNLPAdapter:
     """Thin wrapper that runs BookNLP on raw text and returns quote attributions.
 
@@ -39,6 +105,18 @@ class BookNLPAdapter:
         self.cfg = cfg or BookNLPConfig()
         self.verbose = verbose
         self._booknlp_available = self._probe_available()
+        # "api" or "cli" once a run succeeded; tried first from then on.
+        self.backend: str | None = None
+
+    def variant(self, **changes: Any) -> BookNLPAdapter:
+        """Return an adapter of the same type with config fields replaced.
+
+        The remembered backend carries over, so a ``size="big"`` retry does not
+        probe the Python API again after it already failed.
+        """
+        other = type(self)(replace(self.cfg, **changes), verbose=self.verbose)
+        other.backend = self.backend
+        return other
 
     # ---------------------- public API ---------------------- #
 
@@ -68,25 +146,7 @@ class BookNLPAdapter:
         in_txt.write_text(text, encoding="utf-8")
 
         try:
-            if self.cfg.prefer_python_api:
-                try:
-                    return self._run_python_api(in_txt, out_dir, work_id)
-                except Exception as e:
-                    if self.verbose:
-                        print(f"[booknlp] python API failed, falling back to CLI: {e}")
-                    try:
-                        return self._run_cli(in_txt, out_dir, work_id)
-                    except Exception as e2:
-                        if self.verbose:
-                            print(f"[booknlp] CLI also failed: {e2}")
-                        return []
-            else:
-                try:
-                    return self._run_cli(in_txt, out_dir, work_id)
-                except Exception as e2:
-                    if self.verbose:
-                        print(f"[booknlp] CLI failed: {e2}")
-                    return []
+            return self._run_backends(in_txt, out_dir, work_id)
         finally:
             if not self.cfg.keep_tmp:
                 try:
@@ -94,8 +154,79 @@ class BookNLPAdapter:
                 except Exception:
                     pass
 
+    def annotate_book(
+        self,
+        chapters: list[tuple[int, str]],
+        *,
+        work_id: str = "book",
+        cache_dir: Path | None = None,
+    ) -> dict[int, list[dict[str, Any]]]:
+        """Run BookNLP once over a whole book and split quotes per chapter.
+
+        One run pays the model load once and lets coreference follow
+        characters across chapter boundaries.  Book-level results are cached
+        under ``cache_dir`` by a hash of the book text and the BookNLP
+        settings, so re-running an unchanged book skips BookNLP entirely.
+
+        Args:
+            chapters: ``(chapter_index, text)`` pairs in reading order.
+            work_id: Identifier used in BookNLP outputs.
+            cache_dir: Optional directory for cached results.
+
+        Returns:
+            Mapping ``chapter_index`` -> quote dicts with chapter-relative
+            offsets.  Chapters without quotes map to ``[]``.
+        """
+        book_text, offsets = build_book_text(chapters)
+        cache_path = cache_dir / f"{self.cache_key(book_text)}.json" if cache_dir else None
+        quotes: list[dict[str, Any]] | None = None
+        if cache_path is not None and cache_path.exists():
+            try:
+                quotes = json.loads(cache_path.read_text(encoding="utf-8"))["quotes"]
+                if self.verbose:
+                    print(f"[booknlp] cache hit: {cache_path.name}")
+            except Exception:
+                quotes = None
+        if quotes is None:
+            quotes = self.annotate_text(book_text, work_id=work_id)
+            if cache_path is not None and self.backend is not None:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                payload = {"config": asdict(self.cfg), "backend": self.backend, "quotes": quotes}
+                tmp = cache_path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+                tmp.replace(cache_path)
+        return split_book_quotes(quotes, offsets)
+
+    def cache_key(self, text: str) -> str:
+        """Return the result-cache key for ``text`` under the current settings."""
+        h = hashlib.sha256()
+        for part in (self.cfg.model, self.cfg.size, self.cfg.pipeline, text):
+            h.update(part.encode("utf-8"))
+            h.update(b"\x1f")
+        return h.hexdigest()
+
     # ---------------------- internals ----------------------- #
 
+    def _run_backends(self, in_txt: Path, out_dir: Path, work_id: str) -> list[dict[str, Any]]:
+        """Run the remembered backend first, then the others; [] if all fail."""
+        order = ["api", "cli"] if self.cfg.prefer_python_api else ["cli"]
+        if self.backend in order:
+            order.remove(self.backend)
+            order.insert(0, self.backend)
+        runners = {"api": self._run_python_api, "cli": self._run_cli}
+        for name in order:
+            try:
+                quotes = runners[name](in_txt, out_dir, work_id)
+            except Exception as e:
+                if self.verbose:
+                    print(f"[booknlp] {name} backend failed: {e}")
+                continue
+            if self.backend != name and self.verbose:
+                print(f"[booknlp] using {name} backend from now on")
+            self.backend = name
+            return quotes
+        return []
+
     def _probe_available(self) -> bool:
         """Check for Python API or CLI availability, with verbose logging."""
         try:
@@ -519,7 +650,12 @@ class BookNLPAdapter:
                     # Fallback: we don't have token char mapping; we cannot compute offsets reliably
                     start_char = 0
                     end_char = 0
-                out.append({"start": int(start_char), "end": int(end_char), "speaker": speaker, "prob": 0.0})
+                quote = {"start": int(start_char), "end": int(end_char), "speaker": speaker, "prob": 0.0}
+                # BookNLP character id: book-global when the whole book is one run
+                char_id = qcol(r, "char_id", "").strip()
+                if char_id.lstrip("-").isdigit():
+                    quote["char_id"] = int(char_id)
+                out.append(quote)
             except Exception:
                 continue
         return out
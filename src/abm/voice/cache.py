@@ -1,4 +1,8 @@
-"""Cache utilities for synthesized segments."""
+"""Cache utilities for synthesized segments.
+
+Entries are indexed, verified and garbage-collected by
+:mod:`abm.audio.tts_cache`.
+"""
 
 from __future__ import annotations
 
@@ -1,9 +1,25 @@
-"""TTS engine adapters for the ``abm.voice`` pipeline."""
+"""TTS engine adapters for the ``abm.voice`` pipeline.
+
+``ParlerEngine`` and ``ParlerConfig`` are imported on first access, so the
+Piper and XTTS engines work without ``parler_tts``/``transformers``.
+"""
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING, Any
+
 from abm.voice.engines.piper_engine import PiperEngine
 from abm.voice.engines.xtts_engine import XTTSEngine
-from abm.voice.engines.parler_engine import ParlerEngine, ParlerConfig
+
+if TYPE_CHECKING:
+    from abm.voice.engines.parler_engine import ParlerConfig, ParlerEngine
 
 __all__ = ["PiperEngine", "XTTSEngine", "ParlerEngine", "ParlerConfig"]
+
+
+def __getattr__(name: str) -> Any:
+    if name in ("ParlerEngine", "ParlerConfig"):
+        from abm.voice.engines import parler_engine
+
+        return getattr(parler_engine, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,53 +1,210 @@
+"""Parler-TTS engine with batched generation and cached voice descriptions.
+
+A Parler voice is a natural-language description ("Quinn's voice is calm
+...") that conditions generation through the model's text encoder. The
+description of a character never changes, so its tokenization and encoder
+output are computed once per description and reused for every segment.
+Segments that share a description are generated together in padded
+``generate`` calls; each item's audio is trimmed to its own length
+afterwards. Batches are formed dynamically so that ``batch size x longest
+prompt`` stays within ``ParlerConfig.max_batch_tokens``.
+
+Sampling draws from PyTorch's global random stream, which ``generate`` shares
+among all rows of a batch. A seeded segment would therefore depend on the
+segments batched with it, so seeded segments are generated one at a time
+with the seed set just before each, exactly as without batching; only
+unseeded segments are batched.
+"""
+
 from __future__ import annotations
 
+import logging
+import threading
+from collections.abc import Sequence
 from dataclasses import dataclass
+from typing import Any
 
 import numpy as np
+import soundfile as sf  # noqa: F401 - parity with other engines
 import torch
 import torchaudio
-import soundfile as sf  # noqa: F401 - parity with other engines
-from parler_tts import ParlerTTSForConditionalGeneration
-from transformers import AutoTokenizer
+
+__all__ = ["ParlerConfig", "ParlerEngine", "plan_batches"]
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_DESCRIPTION = "is neutral, close-mic, and very clear audio."
+_INTEROP_LOCK = threading.Lock()
 
 
 @dataclass
 class ParlerConfig:
+    """Model and runtime settings for :class:`ParlerEngine`.
+
+    Attributes:
+        model_name: Hugging Face model id or local path.
+        device: ``"auto"``, ``"cuda"`` or ``"cpu"``.
+        dtype: ``"auto"``, ``"float16"`` or ``"bfloat16"`` (CUDA only).
+        max_batch_tokens: Upper bound on ``batch size x longest prompt``
+            (in tokens) for one ``generate`` call.
+        max_batch_size: Upper bound on unseeded segments per ``generate``
+            call; ``1`` disables batching. Seeded segments are never batched.
+        num_threads: CPU intra-op threads (``torch.set_num_threads``);
+            ``None`` keeps the PyTorch default.
+        num_interop_threads: CPU inter-op threads; PyTorch accepts this only
+            once per process, before any parallel work.
+    """
+
     model_name: str = "parler-tts/parler-tts-mini-v1"
     device: str = "auto"  # "auto"|"cuda"|"cpu"
-    dtype: str = "auto"   # "auto"|"float16"|"bfloat16"
+    dtype: str = "auto"  # "auto"|"float16"|"bfloat16"
+    max_batch_tokens: int = 2048
+    max_batch_size: int = 16
+    num_threads: int | None = None
+    num_interop_threads: int | None = None
+
+
+@dataclass
+class _Description:
+    """Tokenized description and, when supported, its encoder output."""
+
+    input_ids: torch.Tensor  # (1, L)
+    attention_mask: torch.Tensor  # (1, L)
+    encoder_outputs: Any | None  # model output with ``last_hidden_state`` (1, L, H)
+
+
+def plan_batches(lengths: Sequence[int], max_tokens: int, max_batch: int) -> list[list[int]]:
+    """Group item indices into batches bounded by padded token count.
+
+    Items are taken longest first so that each batch holds similar lengths
+    and little padding. A batch grows while ``len(batch) x longest item``
+    stays within ``max_tokens`` and ``len(batch) <= max_batch``; an item
+    longer than ``max_tokens`` gets a batch of its own.
+
+    Args:
+        lengths: Token length of each item.
+        max_tokens: Padded-token budget per batch.
+        max_batch: Maximum number of items per batch.
+
+    Returns:
+        Lists of indices into ``lengths``; every index appears exactly once.
+    """
+
+    order = sorted(range(len(lengths)), key=lambda i: (-lengths[i], i))
+    batches: list[list[int]] = []
+    for i in order:
+        if batches:
+            batch = batches[-1]
+            longest = lengths[batch[0]]  # first item is the longest
+            if len(batch) < max_batch and (len(batch) + 1) * longest <= max_tokens:
+                batch.append(i)
+                continue
+        batches.append([i])
+    return batches
 
 
 class ParlerEngine:
-    """Minimal wrapper around Parler-TTS models."""
+    """Wrapper around Parler-TTS models.
+
+    Args:
+        cfg: Model and runtime settings.
+        model: Already constructed model to use instead of loading
+            ``cfg.model_name`` (e.g. a small random-weight model).
+        tokenizer: Tokenizer to use with ``model``.
 
-    def __init__(self, cfg: ParlerConfig | None = None):
+    ``parler_tts`` and ``transformers`` are imported only to load what was
+    not passed in.
+    """
+
+    def __init__(
+        self,
+        cfg: ParlerConfig | None = None,
+        *,
+        model: Any | None = None,
+        tokenizer: Any | None = None,
+    ):
         self.cfg = cfg or ParlerConfig()
+        self._configure_threads()
         device = (
-            "cuda:0" if self.cfg.device == "auto" and torch.cuda.is_available()
+            "cuda:0"
+            if self.cfg.device == "auto" and torch.cuda.is_available()
             else ("cpu" if self.cfg.device == "auto" else self.cfg.device)
         )
         self.device = torch.device(device)
         try:
-            self.model = ParlerTTSForConditionalGeneration.from_pretrained(
-                self.cfg.model_name
-            )
+            if model is None:
+                # Imported here so injected models/tokenizers need neither package
+                from parler_tts import ParlerTTSForConditionalGeneration
+
+                model = ParlerTTSForConditionalGeneration.from_pretrained(self.cfg.model_name)
+            if tokenizer is None:
+                from transformers import AutoTokenizer
+
+                tokenizer = AutoTokenizer.from_pretrained(self.cfg.model_name)
+            self.model = model
             if self.cfg.dtype in ("float16", "bfloat16") and self.device.type == "cuda":
-                dtype = (
-                    torch.float16
-                    if self.cfg.dtype == "float16"
-                    else torch.bfloat16
-                )
+                dtype = torch.float16 if self.cfg.dtype == "float16" else torch.bfloat16
                 self.model = self.model.to(device=self.device, dtype=dtype)
             else:
                 self.model = self.model.to(self.device)
             self.model.eval()
-            self.tok = AutoTokenizer.from_pretrained(self.cfg.model_name)
+            self.tok = tokenizer
         except Exception as exc:  # pragma: no cover - initialization
-            raise RuntimeError(
-                f"failed to load Parler-TTS model {self.cfg.model_name}"
-            ) from exc
+            raise RuntimeError(f"failed to load Parler-TTS model {self.cfg.model_name}") from exc
         self.native_sr = int(getattr(self.model.config, "sampling_rate", 24000))
         self.target_sr = 48000
+        self._descriptions: dict[str, _Description] = {}
+        self._desc_lock = threading.Lock()
+        # Encoder outputs can only be reused when generation does not add a
+        # classifier-free-guidance copy of the batch.
+        guidance = getattr(getattr(self.model, "generation_config", None), "guidance_scale", None)
+        self._reuse_encoder = (guidance or 1) <= 1 and hasattr(
+            self.model, "_prepare_text_encoder_kwargs_for_generation"
+        )
+        # Padded rows can only be trimmed when generate() reports per-item
+        # lengths; cleared on the first batch without them.
+        self._can_batch = True
+
+    def _configure_threads(self) -> None:
+        if self.cfg.num_threads:
+            torch.set_num_threads(int(self.cfg.num_threads))
+        if self.cfg.num_interop_threads:
+            with _INTEROP_LOCK:
+                if torch.get_num_interop_threads() != self.cfg.num_interop_threads:
+                    try:
+                        torch.set_num_interop_threads(int(self.cfg.num_interop_threads))
+                    except RuntimeError as exc:  # already fixed for this process
+                        logger.warning("Parler inter-op threads unchanged: %s", exc)
+
+    def _description(self, voice_id: str, description: str | None) -> _Description:
+        """Return the cached tokenization and encoder output for a voice description."""
+
+        desc = f"{voice_id}'s voice {description or _DEFAULT_DESCRIPTION}"
+        with self._desc_lock:
+            found = self._descriptions.get(desc)
+            if found is not None:
+                return found
+            enc = self.tok(desc, return_tensors="pt")
+            input_ids = enc.input_ids.to(self.device)
+            attention_mask = enc.attention_mask.to(self.device)
+            encoder_outputs = None
+            if self._reuse_encoder:
+                try:
+                    with torch.inference_mode():
+                        prepared = self.model._prepare_text_encoder_kwargs_for_generation(
+                            input_ids,
+                            {"attention_mask": attention_mask},
+                            "input_ids",
+                            self.model.generation_config,
+                        )
+                    encoder_outputs = prepared["encoder_outputs"]
+                except (TypeError, KeyError, AttributeError) as exc:
+                    # Private API of parler_tts; fall back to letting generate() encode.
+                    logger.warning("Parler encoder outputs not cached: %s", exc)
+                    self._reuse_encoder = False
+            found = _Description(input_ids, attention_mask, encoder_outputs)
+            self._descriptions[desc] = found
+            return found
 
     def synthesize(
         self,
@@ -77,24 +234,89 @@ class ParlerEngine:
     ) -> np.ndarray:
         """Synthesize ``text`` with ``voice_id`` into a mono float32 waveform."""
 
-        if seed is not None:
-            torch.manual_seed(int(seed))
-        desc = (
-            f"{voice_id}'s voice "
-            f"{description or 'is neutral, close-mic, and very clear audio.'}"
+        return self.synthesize_batch([text], voice_id, description=description, seed=seed)[0]
+
+    def synthesize_batch(
+        self,
+        texts: Sequence[str],
+        voice_id: str,
+        *,
+        description: str | None = None,
+        seed: int | None = None,
+    ) -> list[np.ndarray]:
+        """Synthesize several ``texts`` in one voice with batched ``generate`` calls.
+
+        Args:
+            texts: Segment texts; all share ``voice_id`` and ``description``.
+            voice_id: Character name used in the description prompt.
+            description: Voice description; a neutral default when omitted.
+            seed: Seeds the sampler before each text; seeded texts are
+                generated one at a time so each is reproducible on its own.
+
+        Returns:
+            One mono float32 waveform at ``target_sr`` per text, in order.
+        """
+
+        if not texts:
+            return []
+        desc = self._description(voice_id, description)
+        try:
+            prompts = [self.tok(t, return_tensors="pt").input_ids[0] for t in texts]
+        except Exception as exc:  # pragma: no cover - tokenizer errors
+            raise RuntimeError("parler synthesis failed during tokenization") from exc
+        out: list[np.ndarray | None] = [None] * len(texts)
+        batched = seed is None and self._can_batch
+        batches = plan_batches(
+            [len(p) for p in prompts],
+            max(1, self.cfg.max_batch_tokens),
+            max(1, self.cfg.max_batch_size) if batched else 1,
         )
+        for batch in batches:
+            if seed is not None:
+                torch.manual_seed(int(seed))
+            for i, wav in zip(batch, self._generate(desc, [prompts[i] for i in batch]), strict=True):
+                out[i] = wav
+        return [y for y in out if y is not None]
+
+    def _generate(self, desc: _Description, prompts: list[torch.Tensor]) -> list[np.ndarray]:
+        """Run one padded ``generate`` call and return each item's trimmed audio."""
+
+        b = len(prompts)
+        width = max(len(p) for p in prompts)
+        pad_id = getattr(self.tok, "pad_token_id", None) or 0
+        prompt_ids = torch.full((b, width), pad_id, dtype=prompts[0].dtype)
+        prompt_mask = torch.zeros((b, width), dtype=torch.long)
+        for row, p in enumerate(prompts):  # right padding, as the tokenizer pads
+            prompt_ids[row, : len(p)] = p
+            prompt_mask[row, : len(p)] = 1
+        kwargs: dict[str, Any] = {
+            "input_ids": desc.input_ids.repeat(b, 1),
+            "attention_mask": desc.attention_mask.repeat(b, 1),
+            "prompt_input_ids": prompt_ids.to(self.device),
+            "prompt_attention_mask": prompt_mask.to(self.device),
+            "return_dict_in_generate": True,
+        }
+        if desc.encoder_outputs is not None:
+            hidden = desc.encoder_outputs.last_hidden_state
+            kwargs["encoder_outputs"] = type(desc.encoder_outputs)(last_hidden_state=hidden.repeat(b, 1, 1))
         try:
-            input_ids = self.tok(desc, return_tensors="pt").input_ids.to(self.device)
-            prompt_ids = self.tok(text, return_tensors="pt").input_ids.to(
-                self.device
-            )
             with torch.inference_mode():
-                audio = self.model.generate(
-                    input_ids=input_ids, prompt_input_ids=prompt_ids
-                )
+                generation = self.model.generate(**kwargs)
         except Exception as exc:  # pragma: no cover - generation errors
             raise RuntimeError("parler synthesis failed during generation") from exc
-        wav = audio.squeeze().detach().to(torch.float32).cpu().view(-1)
-        if self.native_sr != self.target_sr:
-            wav = torchaudio.functional.resample(wav, self.native_sr, self.target_sr)
-        return wav.numpy().astype(np.float32, copy=False)
+        audio = generation.sequences
+        lengths = getattr(generation, "audios_length", None)
+        if lengths is None and b > 1:
+            # Without per-item lengths the padded tails cannot be trimmed.
+            logger.warning("Parler generate() reports no audios_length; generating one segment at a time")
+            self._can_batch = False
+            return [self._generate(desc, [p])[0] for p in prompts]
+        waves: list[np.ndarray] = []
+        for row in range(b):
+            wav = audio[row].detach().to(torch.float32).cpu().reshape(-1)
+            if lengths is not None:
+                wav = wav[: int(lengths[row])]
+            if self.native_sr != self.target_sr:
+                wav = torchaudio.functional.resample(wav, self.native_sr, self.target_sr)
+            waves.append(wav.numpy().astype(np.float32, copy=False))
+        return waves
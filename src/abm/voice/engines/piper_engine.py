@@ -12,6 +12,8 @@ from typing import Any, cast
 import numpy as np
 import soundfile as sf
 
+from abm.audio.piper_pool import PiperModel, shared_pool
+
 __all__ = ["PiperEngine"]
 
 
@@ -20,8 +22,9 @@ class PiperEngine:
 
     The implementation intentionally keeps features to a bare minimum for unit
     testing. It attempts to use the :command:`piper` binary if available,
-    otherwise falls back to a simple synthetic tone. The real project integrates
-    Piper via subprocess or :mod:`pydub`.
+    otherwise falls back to a simple synthetic tone. Requests go to the resident
+    workers of :func:`abm.audio.piper_pool.shared_pool` (shared with
+    :class:`abm.audio.piper_adapter.PiperAdapter`) unless ``pool`` is disabled.
     """
 
     def __init__(
@@ -30,6 +33,7 @@ class PiperEngine:
         sample_rate: int | None = None,
         *,
         use_subprocess: bool | None = None,
+        pool: bool | None = None,
     ) -> None:
         """Initialize Piper engine.
 
@@ -37,12 +41,15 @@ class PiperEngine:
           is available on PATH.
         - ``voices_dir`` is optional; when omitted, common locations are searched.
         - ``sample_rate`` is advisory only; output uses the model's native rate.
+        - ``pool`` selects the shared resident worker pool over one ``piper``
+          process per call; defaults to True unless env ``ABM_PIPER_POOL=0``.
         """
         self.voices_dir = Path(voices_dir) if voices_dir else None
         self.sample_rate = sample_rate
         self.last_sample_rate: int | None = None
         self._piper_bin = shutil.which("piper")
         self.use_subprocess = use_subprocess if use_subprocess is not None else (self._piper_bin is not None)
+        self.use_pool = pool if pool is not None else os.environ.get("ABM_PIPER_POOL", "1") != "0"
 
     def _candidate_dirs(self) -> list[Path]:
         if self.voices_dir:
@@ -104,6 +111,11 @@ class PiperEngine:
             # This keeps unit tests simple and still works when callers provide
             # an explicit .onnx path.
             selected_model = str(model_path) if model_path is not None else str(voice_id)
+            if self.use_pool:
+                spec = PiperModel(self._piper_bin, selected_model, str(cfg_path) if cfg_path is not None else None)
+                pcm, sr = shared_pool().synth(spec, text)
+                # Same scaling as reading the 16-bit WAV with soundfile as float32
+                return self._at_target_rate(pcm.astype(np.float32) / 32768.0, sr)
             with (
                 tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_wav,
                 tempfile.NamedTemporaryFile(suffix=".txt", delete=False, mode="w", encoding="utf-8") as tmp_txt,
@@ -118,18 +130,12 @@ class PiperEngine:
                 tail = "\n".join(proc.stderr.decode().splitlines()[-10:])
                 raise RuntimeError(f"piper synthesis failed: {tail}")
             data, sr = sf.read(tmp_wav.name, dtype="float32")
-            self.last_sample_rate = int(sr)
             Path(tmp_wav.name).unlink(missing_ok=True)
             try:
                 Path(tmp_txt.name).unlink(missing_ok=True)
             except Exception:
                 pass
-            # Optionally resample to requested sample_rate
-            target_sr = int(self.sample_rate) if self.sample_rate else None
-            if target_sr and target_sr != int(sr):
-                data = _resample_audio(cast(np.ndarray, data), int(sr), target_sr)
-            # Return at (possibly resampled) SR
-            return cast(np.ndarray, data)
+            return self._at_target_rate(cast(np.ndarray, data), int(sr))
 
         # Fallback: emit a short tone to keep tests deterministic.
         sr = int(self.sample_rate) if self.sample_rate is not None else 48000
@@ -137,6 +143,16 @@ class PiperEngine:
         t = np.linspace(0, 0.2, int(sr * 0.2), endpoint=False)
         return (0.1 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
 
+    def _at_target_rate(self, data: np.ndarray, sr: int) -> np.ndarray:
+        """Record the native rate and optionally resample to ``sample_rate``."""
+
+        self.last_sample_rate = int(sr)
+        target_sr = int(self.sample_rate) if self.sample_rate else None
+        if target_sr and target_sr != int(sr):
+            data = _resample_audio(data, int(sr), target_sr)
+        # Return at (possibly resampled) SR
+        return data
+
 
 def _resample_audio(y: np.ndarray, sr_in: int, sr_out: int) -> np.ndarray:
     """Resample y from sr_in to sr_out using high-quality polyphase if available.
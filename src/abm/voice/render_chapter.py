@@ -1,4 +1,14 @@
-"""Render a chapter plan to audio using local TTS engines."""
+"""Render a chapter plan to audio using local TTS engines.
+
+Cached segments are read up front; the remaining ones are synthesized by a
+bounded pool of ``workers`` threads (Piper shares the resident worker pool,
+other engines lend one pooled instance to each busy worker, reused across
+renders) and reassembled in plan order, so the rendered audio does not
+depend on the worker count. Unseeded Parler segments that share a voice and
+description are generated together in token-bounded batches; seeded ones
+stay one per call so that they remain reproducible (see
+:mod:`abm.voice.engines.parler_engine`).
+"""
 
 from __future__ import annotations
 
@@ -7,22 +17,32 @@ import hashlib
 import json
 import os
 import shutil
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, cast
 
 import numpy as np
 import soundfile as sf
 
-from abm.audio.concat import equal_power_crossfade, micro_fade
+from abm.audio.cache_codecs import CODECS, CacheCodec, codec_for_path, find_entry, get_codec
+from abm.audio.concat import join_segments
+from abm.audio.piper_pool import shared_pool
 from abm.audio.qc import duration_s, measure_lufs, peak_dbfs, write_qc_json
+from abm.audio.tts_cache import TTSCacheIndex
 from abm.voice.cache import cache_path, make_cache_key
-from abm.voice.engines import ParlerConfig, ParlerEngine, PiperEngine, XTTSEngine
+from abm.voice.engines import PiperEngine, XTTSEngine
 
 __all__ = ["render_chapter", "main"]
 
 
-_ENGINE_CACHE: dict[tuple[Any, ...], Any] = {}
-_ENGINE_CACHE_PID = os.getpid()
+_ENGINE_POOLS: dict[tuple[Any, ...], list[Any]] = {}  # idle engine instances per configuration
+_ENGINE_POOLS_PID = os.getpid()
+_ENGINE_LOCK = threading.Lock()
 
 
 def _load_engine(
@@ -31,43 +51,68 @@ def _load_engine(
     sample_rate: int | None = None,
     parler_model: str | None = None,
     parler_dtype: str = "auto",
+    parler_opts: tuple[tuple[str, Any], ...] = (),
 ) -> Any:
-    global _ENGINE_CACHE_PID
-    pid = os.getpid()
-    if pid != _ENGINE_CACHE_PID:
-        _ENGINE_CACHE.clear()
-        _ENGINE_CACHE_PID = pid
-    key = (name, sample_rate, parler_model, parler_dtype)
-    if key in _ENGINE_CACHE:
-        return _ENGINE_CACHE[key]
+    """Construct a new engine instance (see :func:`_engine_lease` for reuse)."""
     if name == "piper":
-        eng = PiperEngine(sample_rate=sample_rate, use_subprocess=True)
-    elif name == "xtts":
-        eng = XTTSEngine(allow_stub=True, sample_rate=sample_rate or 48000)
-    elif name == "parler":
+        return PiperEngine(sample_rate=sample_rate, use_subprocess=True)
+    if name == "xtts":
+        return XTTSEngine(allow_stub=True, sample_rate=sample_rate or 48000)
+    if name == "parler":
+        from abm.voice.engines import ParlerConfig, ParlerEngine
+
         default_cfg = ParlerConfig()
         cfg = ParlerConfig(
             model_name=parler_model or default_cfg.model_name,
             dtype=parler_dtype,
+            **dict(parler_opts),
         )
-        eng = ParlerEngine(cfg=cfg)
-    else:
-        raise KeyError(f"unknown engine {name}")
-    _ENGINE_CACHE[key] = eng
-    return eng
+        return ParlerEngine(cfg=cfg)
+    raise KeyError(f"unknown engine {name}")
 
 
-def _synth_segment(
+@contextmanager
+def _engine_lease(name: str, **options: Any) -> Iterator[Any]:
+    """Check out an idle engine instance for ``name``/``options`` while rendering.
+
+    Piper instances are thread-safe (requests go through the shared pool), so
+    one is shared by every caller. Other engines hand out one instance per
+    concurrent caller and take it back afterwards; a configuration therefore
+    holds at most as many instances as the highest worker count used, and
+    later renders reuse them.
+    """
+    global _ENGINE_POOLS_PID
+    key = (name, *sorted(options.items()))
+    shared = name == "piper"
+    with _ENGINE_LOCK:
+        if os.getpid() != _ENGINE_POOLS_PID:  # forked: instances belong to the parent
+            _ENGINE_POOLS.clear()
+            _ENGINE_POOLS_PID = os.getpid()
+        idle = _ENGINE_POOLS.setdefault(key, [])
+        if idle:
+            engine = idle[0] if shared else idle.pop()
+        else:
+            engine = _load_engine(name, **options)
+            if shared:
+                idle.append(engine)
+    try:
+        yield engine
+    finally:
+        if not shared:
+            with _ENGINE_LOCK:
+                if _ENGINE_POOLS.get(key) is idle:
+                    idle.append(engine)
+
+
+def _segment_cache_fp(
     seg: dict[str, Any],
     sr: int,
     cache_dir: Path,
-    tmp_dir: Path,
     *,
     engine_name: str,
     parler_model: str,
-    parler_dtype: str,
     parler_seed: int | None,
-) -> np.ndarray:
+) -> Path:
     payload = {
         "engine": engine_name,
         "voice": seg["voice"],
@@ -75,49 +120,258 @@ def _synth_segment(
         "style": seg.get("style", {}),
         "sr": sr,
     }
-    desc = seg.get("description") or ""
-    seed = seg.get("seed", parler_seed)
-    desc_hash: str | None = None
     if engine_name == "parler":
-        desc_hash = hashlib.sha256(desc.encode("utf-8")).hexdigest()
+        desc = seg.get("description") or ""
         payload.update(
             {
                 "model_name": parler_model,
-                "seed": seed,
-                "description_sha": desc_hash,
+                "seed": seg.get("seed", parler_seed),
+                "description_sha": hashlib.sha256(desc.encode("utf-8")).hexdigest(),
             }
         )
     key = make_cache_key(payload)
-    cache_fp = cache_path(cache_dir, engine_name, seg["voice"], key)
-    if cache_fp.exists():
-        y, _ = sf.read(cache_fp, dtype="float32")
-        return y
-    engine = _load_engine(
+    return cache_path(cache_dir, engine_name, seg["voice"], key)
+
+
+def _synth_segment(
+    seg: dict[str, Any],
+    sr: int,
+    cache_fp: Path,
+    tmp_fp: Path,
+    *,
+    engine_name: str,
+    parler_model: str,
+    parler_dtype: str,
+    parler_seed: int | None,
+    parler_opts: tuple[tuple[str, Any], ...] = (),
+    index: TTSCacheIndex | None = None,
+    codec: CacheCodec | None = None,
+) -> np.ndarray:
+    """Synthesize a segment that missed the cache and store it at ``cache_fp``."""
+    with _engine_lease(
         engine_name,
         sample_rate=sr,
         parler_model=parler_model,
         parler_dtype=parler_dtype,
-    )
-    if engine_name == "parler":
-        y = engine.synthesize(
-            seg["text"],
-            seg["voice"],
-            description=desc,
-            seed=seed,
-            style=seg.get("style", {}),
-        )
-    else:
-        y = engine.synthesize(seg["text"], seg["voice"], seg.get("style", {}))
+        parler_opts=parler_opts,
+    ) as engine:
+        if engine_name == "parler":
+            y = np.asarray(
+                engine.synthesize(
+                    seg["text"],
+                    seg["voice"],
+                    description=seg.get("description") or "",
+                    seed=seg.get("seed", parler_seed),
+                    style=seg.get("style", {}),
+                )
+            )
+        else:
+            y = np.asarray(engine.synthesize(seg["text"], seg["voice"], seg.get("style", {})))
+    _store_segment(y, seg, sr, cache_fp, tmp_fp, engine_name=engine_name, index=index, codec=codec)
+    return y
+
+
+def _synth_parler_group(
+    segs: list[dict[str, Any]],
+    sr: int,
+    cache_fps: list[Path],
+    tmp_fps: list[Path],
+    *,
+    parler_model: str,
+    parler_dtype: str,
+    parler_seed: int | None,
+    parler_opts: tuple[tuple[str, Any], ...] = (),
+    index: TTSCacheIndex | None = None,
+    codec: CacheCodec | None = None,
+) -> list[np.ndarray]:
+    """Synthesize unseeded Parler segments sharing voice and description in batches."""
+    first = segs[0]
+    with _engine_lease(
+        "parler",
+        sample_rate=sr,
+        parler_model=parler_model,
+        parler_dtype=parler_dtype,
+        parler_opts=parler_opts,
+    ) as engine:
+        ys = [
+            np.asarray(y)
+            for y in engine.synthesize_batch(
+                [seg["text"] for seg in segs],
+                first["voice"],
+                description=first.get("description") or "",
+                seed=first.get("seed", parler_seed),
+            )
+        ]
+    for y, seg, cache_fp, tmp_fp in zip(ys, segs, cache_fps, tmp_fps, strict=True):
+        _store_segment(y, seg, sr, cache_fp, tmp_fp, engine_name="parler", index=index, codec=codec)
+    return ys
+
+
+def _store_segment(
+    y: np.ndarray,
+    seg: dict[str, Any],
+    sr: int,
+    cache_fp: Path,
+    tmp_fp: Path,
+    *,
+    engine_name: str,
+    index: TTSCacheIndex | None = None,
+    codec: CacheCodec | None = None,
+) -> None:
+    """Write synthesized audio ``y`` to the cache at ``cache_fp``.
+
+    The entry is encoded with ``codec`` (WAV by default) under a temporary
+    name and renamed into place, so a killed render never leaves a partial
+    entry behind.
+    """
     if np.max(np.abs(y)) > 1.0:
         raise RuntimeError("audio clipping detected")
-    tmp_fp = tmp_dir / f"{seg['id']}.wav"
     tmp_fp.parent.mkdir(parents=True, exist_ok=True)
     sf.write(tmp_fp, y, sr)
     cache_fp.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy(tmp_fp, cache_fp)
+    staged = cache_fp.with_name(f"{cache_fp.stem}.{uuid.uuid4().hex[:8]}.tmp{cache_fp.suffix}")
+    try:
+        if codec is None or codec.suffix == tmp_fp.suffix:
+            shutil.copy(tmp_fp, staged)
+        else:
+            codec.write(staged, y, sr)
+        os.replace(staged, cache_fp)
+    finally:
+        staged.unlink(missing_ok=True)
+    if index is not None:
+        index.record_write(cache_fp, engine=engine_name, voice=seg["voice"], samplerate=sr)
+
+
+def _read_cached(fp: Path, codec: CacheCodec, index: TTSCacheIndex | None) -> np.ndarray | None:
+    """Return the cached audio for ``fp`` stored in any codec, or ``None``.
+
+    ``.npy`` entries come back memory-mapped (read-only); the sample rate is
+    part of the cache key, so entries need not record it.
+    """
+    found = find_entry(fp, codec)
+    if found is None or (index is not None and not index.validate(found)):
+        return None
+    y, _ = codec_for_path(found).read(found, mmap=True)  # type: ignore[union-attr]
+    if index is not None:
+        index.touch(found)
     return y
 
 
+def _synth_segments(
+    segments: list[dict[str, Any]],
+    engine_names: list[str],
+    sr: int,
+    cache_dir: Path,
+    tmp_dir: Path,
+    *,
+    workers: int,
+    parler_model: str,
+    parler_dtype: str,
+    parler_seed: int | None,
+    timing: dict[str, Any],
+    index: TTSCacheIndex | None = None,
+    codec: CacheCodec | None = None,
+    parler_opts: tuple[tuple[str, Any], ...] = (),
+) -> list[np.ndarray]:
+    """Return the raw audio of every segment in plan order.
+
+    Cache hits are read before any worker is scheduled. Each distinct miss is
+    synthesized once; later segments with the same cache key read the cached
+    file back, exactly as a sequential render would, or reuse the first
+    render's audio if that entry cannot be read. With an ``index``, hits
+    are recorded and entries with a broken header are quarantined and
+    synthesized again. New entries are written with ``codec``; existing ones
+    are read in whichever codec wrote them. Unseeded Parler misses with the
+    same voice and description form one unit of work, generated in batches.
+    """
+    codec = codec or get_codec("wav")
+    results: list[np.ndarray | None] = [None] * len(segments)
+    fps: list[Path] = []
+    first_miss: dict[Path, int] = {}
+    repeats: list[int] = []
+    tmp_names: set[str] = set()
+    jobs: list[tuple[int, Path]] = []
+    for i, (seg, engine_name) in enumerate(zip(segments, engine_names, strict=True)):
+        fp = _segment_cache_fp(
+            seg, sr, cache_dir, engine_name=engine_name, parler_model=parler_model, parler_seed=parler_seed
+        ).with_suffix(codec.suffix)
+        fps.append(fp)
+        if fp in first_miss:
+            repeats.append(i)
+        elif (cached := _read_cached(fp, codec, index)) is not None:
+            results[i] = cached
+        else:
+            first_miss[fp] = i
+            name = f"{seg['id']}.wav"
+            if name in tmp_names:  # keep concurrent workers off the same temp file
+                name = f"{seg['id']}.{i}.wav"
+            tmp_names.add(name)
+            jobs.append((i, tmp_dir / name))
+    timing["cache_hits"] = len(segments) - len(jobs) - len(repeats)
+    timing["synthesized"] = len(jobs)
+    timing["repeats"] = len(repeats)
+
+    units: list[list[tuple[int, Path]]] = []
+    parler_groups: dict[tuple[Any, ...], list[tuple[int, Path]]] = {}
+    for job in jobs:
+        seg = segments[job[0]]
+        if engine_names[job[0]] != "parler":
+            units.append([job])
+            continue
+        seed = seg.get("seed", parler_seed)
+        if seed is not None:  # seeded segments are generated one at a time anyway
+            units.append([job])
+            continue
+        group_key = (seg["voice"], seg.get("description") or "")
+        if group_key not in parler_groups:
+            parler_groups[group_key] = []
+            units.append(parler_groups[group_key])
+        parler_groups[group_key].append(job)
+    timing["synth_units"] = len(units)
+
+    def run(unit: list[tuple[int, Path]]) -> list[np.ndarray]:
+        common: dict[str, Any] = {
+            "parler_model": parler_model,
+            "parler_dtype": parler_dtype,
+            "parler_seed": parler_seed,
+            "parler_opts": parler_opts,
+            "index": index,
+            "codec": codec,
+        }
+        if len(unit) > 1:
+            return _synth_parler_group(
+                [segments[i] for i, _ in unit], sr, [fps[i] for i, _ in unit], [fp for _, fp in unit], **common
+            )
+        i, tmp_fp = unit[0]
+        return [_synth_segment(segments[i], sr, fps[i], tmp_fp, engine_name=engine_names[i], **common)]
+
+    t0 = time.perf_counter()
+    if workers <= 1 or len(units) <= 1:
+        for unit in units:
+            for (i, _), y in zip(unit, run(unit), strict=True):
+                results[i] = y
+    else:
+        if any(engine_names[i] == "piper" for i, _ in jobs):
+            shared_pool(min_workers=workers)
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render")
+        try:
+            futures: list[Future[list[np.ndarray]]] = [pool.submit(run, unit) for unit in units]
+            for unit, fut in zip(units, futures, strict=True):
+                for (i, _), y in zip(unit, fut.result(), strict=True):
+                    results[i] = y
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    timing["synth_s"] = round(time.perf_counter() - t0, 3)
+    for i in repeats:
+        hit = _read_cached(fps[i], codec, None)
+        # The first render's entry can be missing (write failed, evicted meanwhile): reuse its audio
+        results[i] = hit if hit is not None else results[first_miss[fps[i]]]
+    missing = [segments[i]["id"] for i, y in enumerate(results) if y is None]
+    if missing:
+        raise RuntimeError(f"no audio for segments {missing}")
+    return cast(list[np.ndarray], results)
+
+
 def render_chapter(
     plan_path: Path,
     out_wav: Path,
@@ -130,35 +384,70 @@ def render_chapter(
     parler_seed: int | None = None,
     prefer_engine: str | None = None,
     add_pause_ms: int = 0,
+    workers: int = 1,
+    timing_out: dict[str, Any] | None = None,
+    cache_codec: str = "wav",
+    parler_batch_tokens: int = 2048,
+    parler_max_batch: int = 16,
+    parler_threads: int | None = None,
 ) -> Path:
+    """Render ``plan_path`` to ``out_wav`` (plus ``.qc.json``) and return the WAV path.
+
+    ``workers`` bounds concurrent segment synthesis. Per-chapter timings
+    (cache hits, synthesized segments, synthesis/assembly/total seconds) are
+    recorded under ``timing`` in the QC JSON and copied into ``timing_out``.
+    New cache entries are stored with ``cache_codec`` (``wav``, ``flac`` or
+    ``npy``; see :mod:`abm.audio.cache_codecs`). ``parler_batch_tokens`` and
+    ``parler_max_batch`` bound Parler's batched generation of unseeded
+    segments (``1`` disables batching); ``parler_threads`` sets its CPU
+    thread count.
+    """
     plan = json.loads(plan_path.read_text(encoding="utf-8"))
     sr = int(plan.get("sample_rate", 48000))
     crossfade_ms = int(plan.get("crossfade_ms", 0))
     if out_wav.exists() and not force:
         return out_wav
+    t_start = time.perf_counter()
     segments = plan.get("segments", [])
-    audio: list[np.ndarray] = []
-    pauses: list[int] = []  # pause after each segment (ms); length == len(audio)
-    utterances: list[dict[str, Any]] = []
+    engine_names: list[str] = []
     for seg in segments:
         engine_name = seg.get("engine") or prefer_engine or "piper"
         seg.setdefault("engine", engine_name)
-        y = _synth_segment(
-            seg,
+        engine_names.append(engine_name)
+    timing: dict[str, Any] = {"workers": max(1, workers), "segments": len(segments)}
+    index = TTSCacheIndex(cache_dir)
+    try:
+        raw = _synth_segments(
+            segments,
+            engine_names,
             sr,
             cache_dir,
             tmp_dir,
-            engine_name=engine_name,
+            workers=workers,
             parler_model=parler_model,
             parler_dtype=parler_dtype,
             parler_seed=parler_seed,
+            timing=timing,
+            index=index,
+            codec=get_codec(cache_codec),
+            parler_opts=(
+                ("max_batch_tokens", parler_batch_tokens),
+                ("max_batch_size", parler_max_batch),
+                ("num_threads", parler_threads),
+            ),
         )
-        y = micro_fade(y, sr)
-        audio.append(y)
+    finally:
+        index.close()
+    pauses: list[int] = []  # pause after each segment (ms); length == len(raw)
+    utterances: list[dict[str, Any]] = []
+    for seg, engine_name in zip(segments, engine_names, strict=True):
         # record the requested pause after this spoken segment
         pause_ms = int(seg.get("pause_ms", 0) or 0) + int(add_pause_ms or 0)
         pauses.append(max(0, pause_ms))
-        # track utterance metadata for QC
+        # track utterance metadata for QC; cache keys let `tts_cache gc` keep live entries
+        cache_key = _segment_cache_fp(
+            seg, sr, cache_dir, engine_name=engine_name, parler_model=parler_model, parler_seed=parler_seed
+        ).stem
         if engine_name == "parler":
             desc = seg.get("description") or ""
             desc_hash = hashlib.sha256(desc.encode("utf-8")).hexdigest()
@@ -171,6 +460,7 @@ def render_chapter(
                     "seed": seg.get("seed", parler_seed),
                     "description_sha": desc_hash,
                     "text": seg["text"],
+                    "cache_key": cache_key,
                 }
             )
         else:
@@ -180,42 +470,39 @@ def render_chapter(
                     "engine": engine_name,
                     "voice": seg["voice"],
                     "text": seg["text"],
+                    "cache_key": cache_key,
                 }
             )
-    if not audio:
+    if not raw:
         return out_wav
-    mix = audio[0]
-    for idx, y in enumerate(audio[1:], start=1):
-        # If a pause follows the previous segment, insert it and disable crossfade for this join
-        p_ms = int(pauses[idx - 1] if idx - 1 < len(pauses) else 0)
-        if p_ms > 0:
-            n_sil = int(sr * (p_ms / 1000.0))
-            if n_sil > 0:
-                mix = np.concatenate([mix, np.zeros(n_sil, dtype=np.float32)]).astype(np.float32)
-            cf_ms = 0
-        else:
-            cf_ms = crossfade_ms
-        mix = equal_power_crossfade(mix, y, sr, cf_ms)
+    t_assemble = time.perf_counter()
+    mix = join_segments(raw, pauses, sr, crossfade_ms)
     # Optional debug: print total planned pauses and segments if requested
     if os.getenv("ABM_DEBUG_PAUSES"):
         total_pause_ms = int(sum(pauses[:-1]) if pauses else 0)
-        print(f"[render_chapter] segments={len(audio)} total_pause_ms={total_pause_ms}")
+        print(f"[render_chapter] segments={len(raw)} total_pause_ms={total_pause_ms}")
+    timing["assemble_s"] = round(time.perf_counter() - t_assemble, 3)
     out_wav.parent.mkdir(parents=True, exist_ok=True)
     sf.write(out_wav, mix, sr)
     qc_path = out_wav.with_suffix(".qc.json")
     engines_used = sorted({meta["engine"] for meta in utterances})
     voices_used = sorted({meta["voice"] for meta in utterances if "voice" in meta})
     model_used = parler_model if "parler" in engines_used else None
+    lufs = measure_lufs(mix, sr)
+    timing["total_s"] = round(time.perf_counter() - t_start, 3)
+    if timing_out is not None:
+        timing_out.update(timing)
     write_qc_json(
         qc_path,
-        lufs=measure_lufs(mix, sr),
+        lufs=lufs,
         peak_dbfs=peak_dbfs(mix),
         duration_s=duration_s(mix, sr),
-        segments=len(audio),
+        segments=len(raw),
         engines=engines_used,
         voices=voices_used,
         model=model_used,
         utterances=utterances,
+        timing=timing,
     )
     return out_wav
 
@@ -241,13 +528,44 @@ def main(argv: list[str] | None = None) -> None:
         default=None,
         help="Default seed for Parler (renders are deterministic when a seed is set)",
     )
+    parser.add_argument(
+        "--parler-batch-tokens",
+        type=int,
+        default=2048,
+        help="Padded prompt-token budget per batched Parler generate call",
+    )
+    parser.add_argument(
+        "--parler-max-batch",
+        type=int,
+        default=16,
+        help="Maximum unseeded segments per Parler generate call (1 disables batching)",
+    )
+    parser.add_argument(
+        "--parler-threads",
+        type=int,
+        default=None,
+        help="CPU threads for Parler inference (default: PyTorch default)",
+    )
     parser.add_argument(
         "--add-pause-ms",
         type=int,
         default=0,
         help="Add this many milliseconds of extra silence after every segment",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Synthesize up to this many uncached segments concurrently (output is identical for any value)",
+    )
+    parser.add_argument(
+        "--cache-codec",
+        choices=sorted(CODECS),
+        default="wav",
+        help="Storage format for new cache entries; existing entries in any format are reused",
+    )
     args = parser.parse_args(argv)
+    timing: dict[str, Any] = {}
     render_chapter(
         args.chapter_plan,
         args.out_wav,
@@ -259,4 +577,17 @@ def main(argv: list[str] | None = None) -> None:
         parler_seed=args.parler_seed,
         prefer_engine=args.prefer_engine,
         add_pause_ms=args.add_pause_ms,
+        workers=args.workers,
+        timing_out=timing,
+        cache_codec=args.cache_codec,
+        parler_batch_tokens=args.parler_batch_tokens,
+        parler_max_batch=args.parler_max_batch,
+        parler_threads=args.parler_threads,
     )
+    if timing:
+        print(
+            f"[render_chapter] {args.out_wav.name}: segments={timing['segments']} "
+            f"cache_hits={timing['cache_hits']} synthesized={timing['synthesized']} "
+            f"workers={timing['workers']} synth_s={timing['synth_s']:.2f} "
+            f"assemble_s={timing['assemble_s']:.2f} total_s={timing['total_s']:.2f}"
+        )
@@ -0,0 +1,73 @@
+"""Bulk COPY loader against a real, throwaway Postgres.
+
+Set ABM_TEST_PG_DSN (e.g. postgresql://postgres@localhost/abm_test) to run;
+the test drops and recreates the welldone_* tables in that database.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from abm.ingestion.db_insert import PgInserter
+
+DSN = os.environ.get("ABM_TEST_PG_DSN", "")
+pytestmark = pytest.mark.skipif(not DSN, reason="ABM_TEST_PG_DSN not set")
+
+
+def _write(tmp_path: Path, texts: list[str]) -> tuple[Path, Path]:
+    jl = tmp_path / "book_well_done.jsonl"
+    jl.write_text("".join(json.dumps({"index": i, "text": t}) + "\n" for i, t in enumerate(texts)), encoding="utf-8")
+    meta = tmp_path / "book_well_done_meta.json"
+    meta.write_text(
+        json.dumps(
+            {"block_count": len(texts), "created_at": "2024-01-01T00:00:00Z", "source_well_done": "pg_test.txt"}
+        ),
+        encoding="utf-8",
+    )
+    return jl, meta
+
+
+def test_copy_load_is_idempotent_and_updates_text(tmp_path: Path) -> None:
+    import psycopg
+
+    with psycopg.connect(DSN, autocommit=True) as conn:
+        conn.execute("DROP TABLE IF EXISTS welldone_blocks, welldone_documents")
+
+    texts = [f"Paragraph {i} with “quotes” and tabs\t." for i in range(2_500)]
+    jl, meta = _write(tmp_path, texts)
+    ins = PgInserter(dsn=DSN, bulk_copy=True, commit_every=1_000)
+    first = ins.insert_from_jsonl(jl, meta)
+    texts[10] = "Changed."
+    jl, meta = _write(tmp_path, texts)
+    second = ins.insert_from_jsonl(jl, meta)
+
+    assert first.inserted_blocks == second.inserted_blocks == 2_500
+    assert first.doc_id == second.doc_id
+    with psycopg.connect(DSN) as conn:
+        rows = conn.execute(
+            "SELECT block_index, text FROM welldone_blocks WHERE doc_id = %s ORDER BY block_index", (first.doc_id,)
+        ).fetchall()
+    assert [t for _, t in rows] == texts
+
+
+def test_copy_load_deletes_blocks_the_file_dropped(tmp_path: Path) -> None:
+    import psycopg
+
+    with psycopg.connect(DSN, autocommit=True) as conn:
+        conn.execute("DROP TABLE IF EXISTS welldone_blocks, welldone_documents")
+
+    texts = [f"Paragraph {i}." for i in range(2_500)]
+    ins = PgInserter(dsn=DSN, bulk_copy=True, commit_every=1_000)
+    first = ins.insert_from_jsonl(*_write(tmp_path, texts))
+    texts = texts[:1_200]
+    ins.insert_from_jsonl(*_write(tmp_path, texts))
+
+    with psycopg.connect(DSN) as conn:
+        rows = conn.execute(
+            "SELECT block_index, text FROM welldone_blocks WHERE doc_id = %s ORDER BY block_index", (first.doc_id,)
+        ).fetchall()
+    assert [t for _, t in rows] == texts
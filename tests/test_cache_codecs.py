@@ -0,0 +1,156 @@
+import ast
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from abm.audio.cache_codecs import CODECS, codec_for_path, find_entry, get_codec
+from abm.audio.tts_base import TTSAdapter, TTSTask
+from abm.audio.tts_cache import INDEX_NAME, TTSCacheIndex
+from abm.audio.tts_manager import TTSManager
+
+
+def _speech(n: int = 4000, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / 16000
+    y = 0.4 * np.sin(2 * np.pi * 180 * t) * np.hanning(n) + 0.01 * rng.standard_normal(n)
+    return y.astype(np.float32)
+
+
+class PcmAdapter(TTSAdapter):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def preload(self) -> None:
+        pass
+
+    def synth(self, task: TTSTask) -> Path:
+        self.calls += 1
+        task.out_path.parent.mkdir(parents=True, exist_ok=True)
+        sf.write(task.out_path, _speech(seed=len(task.text)), 16000, subtype="PCM_16")
+        return task.out_path
+
+
+def _task(out: Path, text: str = "hello there") -> TTSTask:
+    return TTSTask(text, "narrator", "dummy", "ryan", None, [], out, 0, "")
+
+
+@pytest.mark.parametrize("name", sorted(CODECS))
+def test_codec_round_trip_and_check(tmp_path, name):
+    codec = get_codec(name)
+    y = _speech()
+    path = tmp_path / f"entry{codec.suffix}"
+    codec.write(path, y, 16000)
+    assert codec_for_path(path) is codec
+    got, sr = codec.read(path, mmap=True)
+    if name == "npy":
+        assert sr is None and isinstance(got, np.memmap) and not got.flags.writeable
+        np.testing.assert_array_equal(got, y)
+    else:
+        sf.write(tmp_path / "ref.wav", y, 16000, subtype="PCM_16")
+        assert sr == 16000
+        np.testing.assert_array_equal(got, sf.read(tmp_path / "ref.wav", dtype="float32")[0])  # 16-bit, lossless
+    assert codec.check(path)[:2] == (None, len(y))
+
+    data = path.read_bytes()
+    path.write_bytes(data[: len(data) // 3])
+    assert codec.check(path)[0] is not None
+
+
+def test_npy_headers_are_never_parsed_concurrently(tmp_path, monkeypatch):
+    # On Python 3.11 concurrent ast.literal_eval calls (NumPy's header parser)
+    # can raise SystemError; fail deterministically whenever two calls overlap.
+    real, lock, active = ast.literal_eval, threading.Lock(), [0]
+
+    def literal_eval(source):
+        with lock:
+            active[0] += 1
+            overlap = active[0] > 1
+        try:
+            time.sleep(0.002)
+            if overlap:
+                raise SystemError("AST constructor recursion depth mismatch")
+            return real(source)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    codec = get_codec("npy")
+    paths = [tmp_path / f"{i}.npy" for i in range(4)]
+    for i, path in enumerate(paths):
+        codec.write(path, _speech(seed=i), 16000)
+    monkeypatch.setattr(ast, "literal_eval", literal_eval)
+
+    def read_and_check(i):
+        path = paths[i % len(paths)]
+        assert codec.check(path)[0] is None
+        return codec.read(path, mmap=bool(i % 2))[0]
+
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(read_and_check, range(32)))
+    for i, y in enumerate(results):
+        np.testing.assert_array_equal(y, _speech(seed=i % len(paths)))
+
+
+def test_find_entry_prefers_configured_codec(tmp_path):
+    base = tmp_path / "abc.wav"
+    assert find_entry(base, get_codec("flac")) is None
+    for name in ("wav", "npy"):
+        get_codec(name).write(base.with_suffix(get_codec(name).suffix), _speech(), 16000)
+    assert find_entry(base, get_codec("npy")) == base.with_suffix(".npy")
+    assert find_entry(base, get_codec("flac")) == base  # falls back to what exists
+    with pytest.raises(ValueError, match="unknown cache codec"):
+        get_codec("mp3")
+
+
+@pytest.mark.parametrize("name", ["flac", "npy"])
+def test_manager_codec_spans_match_wav_cache(tmp_path, name):
+    wav = TTSManager(PcmAdapter(), cache_dir=tmp_path / "wav_cache", show_progress=False)
+    wav.render_one(_task(tmp_path / "wav" / "a.wav"))
+    adapter = PcmAdapter()
+    manager = TTSManager(adapter, cache_dir=tmp_path / "cache", show_progress=False, codec=name)
+    miss = manager.render_one(_task(tmp_path / "miss" / "a.wav"))
+    hit = manager.render_one(_task(tmp_path / "hit" / "a.wav"))
+    assert adapter.calls == 1 and manager.stats.cache_hits == 1
+    (entry,) = manager.index.entries()
+    assert entry.codec == name and entry.path.endswith(f".{name}") and entry.samplerate == 16000
+    want, _ = sf.read(tmp_path / "wav" / "a.wav", dtype="float32")
+    for span in (miss, hit):
+        got, sr = sf.read(span, dtype="float32")
+        assert sr == 16000
+        np.testing.assert_array_equal(got, want)
+    if name == "flac":
+        assert entry.size < (tmp_path / "wav" / "a.wav").stat().st_size
+
+
+def test_mixed_cache_reuses_entries_of_other_codecs(tmp_path):
+    cache = tmp_path / "cache"
+    first = TTSManager(PcmAdapter(), cache_dir=cache, show_progress=False, codec="flac")
+    first.render_batch([_task(tmp_path / "a" / f"{i}.wav", f"line {i}") for i in range(3)])
+    adapter = PcmAdapter()
+    second = TTSManager(adapter, cache_dir=cache, show_progress=False, codec="npy")
+    second.render_batch([_task(tmp_path / "b" / f"{i}.wav", f"line {i}") for i in range(4)])
+    assert adapter.calls == 1 and second.stats.cache_hits == 3
+    assert sorted(e.codec for e in second.index.entries()) == ["flac", "flac", "flac", "npy"]
+    assert second.index.usage()[0]["codecs"] == ["flac", "npy"]
+    for i in range(3):
+        a, _ = sf.read(tmp_path / "a" / f"{i}.wav")
+        b, _ = sf.read(tmp_path / "b" / f"{i}.wav")
+        np.testing.assert_array_equal(a, b)
+
+
+def test_npy_entry_without_recorded_rate_is_resynthesized(tmp_path):
+    cache = tmp_path / "cache"
+    TTSManager(PcmAdapter(), cache_dir=cache, show_progress=False, codec="npy").render_one(_task(tmp_path / "a.wav"))
+    for path in cache.glob(INDEX_NAME + "*"):
+        path.unlink()  # the index, and with it the sample rate, is lost
+    adapter = PcmAdapter()
+    manager = TTSManager(adapter, cache_dir=cache, show_progress=False, codec="npy")
+    manager.render_one(_task(tmp_path / "b.wav"))
+    assert adapter.calls == 1
+    assert any((cache / ".quarantine").rglob("*.npy.reason"))
+    assert TTSCacheIndex(cache).verify().quarantined == []
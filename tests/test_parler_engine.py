@@ -1,16 +1,26 @@
+import json
+from dataclasses import dataclass
+from types import SimpleNamespace
+
 import pytest
 
 np = pytest.importorskip("numpy")
-pytest.importorskip("torch")
+torch = pytest.importorskip("torch")
 pytest.importorskip("torchaudio")
-pytest.importorskip("transformers")
-pytest.importorskip("parler_tts")
+sf = pytest.importorskip("soundfile")
+
+from abm.voice.engines import ParlerConfig, ParlerEngine  # noqa: E402
+from abm.voice.engines.parler_engine import plan_batches  # noqa: E402
+
 
-from abm.voice.engines import ParlerEngine
+def _real_model_deps():
+    pytest.importorskip("transformers")
+    pytest.importorskip("parler_tts")
 
 
 @pytest.mark.slow
 def test_parler_audio_invariants():
+    _real_model_deps()
     eng = ParlerEngine()
     y = eng.synthesize_to_array(
         "Hello there.",
@@ -26,6 +36,7 @@ def test_parler_audio_invariants():
 
 @pytest.mark.slow
 def test_parler_determinism_with_seed():
+    _real_model_deps()
     eng = ParlerEngine()
     params = dict(
         text="Testing determinism.",
@@ -40,6 +51,7 @@ def test_parler_determinism_with_seed():
 
 @pytest.mark.slow
 def test_parler_two_voices_distinct():
+    _real_model_deps()
     eng = ParlerEngine()
     text = "Checking distinct voices."
     rebecca = eng.synthesize_to_array(
@@ -55,3 +67,191 @@ def test_parler_two_voices_distinct():
         seed=222,
     )
     assert not np.array_equal(rebecca, will)
+
+
+class _Tok:
+    """Word-level stand-in tokenizer (pad id 0)."""
+
+    pad_token_id = 0
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text, return_tensors="pt"):
+        self.calls += 1
+        ids = [1 + sum(map(ord, w)) % 997 for w in text.split()] + [1]
+        ids_t = torch.tensor([ids])
+        return SimpleNamespace(input_ids=ids_t, attention_mask=torch.ones_like(ids_t))
+
+
+@dataclass
+class _EncoderOutput:
+    last_hidden_state: object
+
+
+class _FakeParler:
+    """Pad-invariant fake: audio depends only on the real prompt tokens and the voice.
+
+    With ``sampling`` each row also gets noise from torch's global random
+    stream, row after row, like sampling in a real batched ``generate``.
+    """
+
+    def __init__(self, *, sampling=False, report_lengths=True):
+        self.config = SimpleNamespace(sampling_rate=48000)
+        self.generation_config = SimpleNamespace(guidance_scale=None)
+        self.sampling = sampling
+        self.report_lengths = report_lengths
+        self.encoded: list[int] = []
+        self.batches: list[int] = []
+
+    def to(self, *args, **kwargs):
+        return self
+
+    def eval(self):
+        return self
+
+    def _prepare_text_encoder_kwargs_for_generation(self, input_ids, model_kwargs, name, generation_config):
+        self.encoded.append(input_ids.shape[1])
+        return {"encoder_outputs": _EncoderOutput(input_ids.float()[..., None].repeat(1, 1, 4))}
+
+    def generate(self, *, input_ids, attention_mask, prompt_input_ids, prompt_attention_mask, **kwargs):
+        assert kwargs["return_dict_in_generate"]
+        hidden = kwargs["encoder_outputs"].last_hidden_state
+        b = prompt_input_ids.shape[0]
+        assert input_ids.shape[0] == attention_mask.shape[0] == hidden.shape[0] == b
+        self.batches.append(b)
+        lengths = 1200 * prompt_attention_mask.sum(dim=1)
+        audio = torch.full((b, int(lengths.max())), 0.9)  # padding garbage past each item's end
+        t = torch.arange(audio.shape[1], dtype=torch.float32)
+        for row in range(b):
+            ids = prompt_input_ids[row][prompt_attention_mask[row] == 1].float()
+            freq = 0.001 * (ids.sum() + hidden[row].sum() % 101)
+            audio[row, : lengths[row]] = 0.5 * torch.sin(freq * t[: lengths[row]])
+            if self.sampling:
+                audio[row, : lengths[row]] += 0.1 * torch.rand(int(lengths[row]))
+        if not self.report_lengths:
+            return SimpleNamespace(sequences=audio)
+        return SimpleNamespace(sequences=audio, audios_length=lengths)
+
+
+def _engine(*, sampling=False, report_lengths=True, **cfg):
+    model = _FakeParler(sampling=sampling, report_lengths=report_lengths)
+    return ParlerEngine(ParlerConfig(device="cpu", **cfg), model=model, tokenizer=_Tok())
+
+
+def test_plan_batches_bounds_padded_tokens():
+    rng = np.random.default_rng(0)
+    lengths = [int(n) for n in rng.integers(1, 80, size=200)]
+    batches = plan_batches(lengths, 256, 8)
+    assert sorted(i for b in batches for i in b) == list(range(200))
+    for b in batches:
+        assert len(b) <= 8
+        assert len(b) == 1 or len(b) * max(lengths[i] for i in b) <= 256
+    assert plan_batches([500, 3], 256, 8) == [[0], [1]]
+
+
+def test_description_encoded_once_and_batches_trimmed():
+    eng = _engine(max_batch_tokens=40, max_batch_size=4)
+    texts = [" ".join(["word"] * n) for n in (3, 9, 1, 4, 4, 12, 2, 6)]
+    batched = eng.synthesize_batch(texts, "Quinn", description="is calm.")
+    assert len(eng.model.encoded) == 1 and eng.model.batches != [1] * len(texts)
+    assert all(b <= 4 for b in eng.model.batches) and len(eng.model.batches) < len(texts)
+    single = [eng.synthesize_to_array(t, "Quinn", description="is calm.") for t in texts]
+    assert len(eng.model.encoded) == 1  # still cached
+    for a, b, text in zip(batched, single, texts, strict=True):
+        assert a.dtype == np.float32 and len(a) == 1200 * (len(text.split()) + 1)
+        np.testing.assert_array_equal(a, b)
+    eng.synthesize_to_array("Hello.", "Mara")
+    assert len(eng.model.encoded) == 2
+
+
+def test_seeded_segments_do_not_depend_on_their_batch():
+    eng = _engine(sampling=True, max_batch_tokens=1000, max_batch_size=8)
+    texts = ["One two three.", "Four.", "Five six seven eight nine."]
+    together = eng.synthesize_batch(texts, "Quinn", seed=7)
+    assert eng.model.batches == [1, 1, 1]
+    for text, y in zip(texts, together, strict=True):
+        np.testing.assert_array_equal(y, eng.synthesize_to_array(text, "Quinn", seed=7))
+    eng.model.batches.clear()
+    eng.synthesize_batch(texts, "Quinn")  # unseeded segments are still batched
+    assert eng.model.batches == [3]
+
+
+def test_missing_audio_lengths_fall_back_to_single_segments():
+    eng = _engine(report_lengths=False, max_batch_tokens=1000, max_batch_size=8)
+    texts = ["One two three.", "Four.", "Five six seven eight nine."]
+    waves = eng.synthesize_batch(texts, "Quinn")
+    assert [len(y) for y in waves] == [1200 * (len(t.split()) + 1) for t in texts]  # no padded tails
+    assert eng.model.batches == [3, 1, 1, 1]
+    eng.synthesize_batch(texts, "Quinn")
+    assert eng.model.batches[4:] == [1, 1, 1]  # batching stays off
+
+
+def test_thread_settings_are_applied():
+    before = torch.get_num_threads()
+    try:
+        _engine(num_threads=2)
+        assert torch.get_num_threads() == 2
+    finally:
+        torch.set_num_threads(before)
+
+
+def test_render_chapter_batches_parler_segments(tmp_path, monkeypatch):
+    from abm.voice import render_chapter as rc
+
+    engines = {}
+
+    def load(name, **kw):
+        opts = dict(kw["parler_opts"])
+        engines[opts["max_batch_size"]] = _engine(**opts)
+        return engines[opts["max_batch_size"]]
+
+    monkeypatch.setattr(rc, "_load_engine", load)
+    monkeypatch.setattr(rc, "_ENGINE_POOLS", {})
+    segments = [
+        {"id": f"s{i}", "engine": "parler", "voice": "Quinn" if i % 3 else "Mara", "text": f"Line {i} " * (i % 5 + 1)}
+        for i in range(12)
+    ]
+    plan = tmp_path / "plan.json"
+    plan.write_text(json.dumps({"sample_rate": 48000, "segments": segments}))
+    outs = {}
+    for max_batch in (1, 8):
+        timing = {}
+        out = rc.render_chapter(
+            plan,
+            tmp_path / f"b{max_batch}.wav",
+            tmp_path / f"cache{max_batch}",
+            tmp_path / "tmp",
+            parler_max_batch=max_batch,
+            timing_out=timing,
+        )
+        outs[max_batch] = sf.read(out)[0]
+        assert timing["synthesized"] == 12 and timing["synth_units"] == 2
+    unbatched, batched = engines[1], engines[8]
+    assert unbatched.model.batches == [1] * 12
+    assert sum(batched.model.batches) == 12 and len(batched.model.batches) == 2
+    assert len(batched.model.encoded) == 2  # one encoder pass per voice
+    np.testing.assert_array_equal(outs[1], outs[8])
+
+
+def test_render_chapter_seeded_parler_is_stable_when_partly_cached(tmp_path, monkeypatch):
+    from abm.voice import render_chapter as rc
+
+    monkeypatch.setattr(rc, "_load_engine", lambda name, **kw: _engine(sampling=True, **dict(kw["parler_opts"])))
+    monkeypatch.setattr(rc, "_ENGINE_POOLS", {})
+    segments = [
+        {"id": f"s{i}", "engine": "parler", "voice": "Quinn", "text": f"Line {i} " * (i % 4 + 1)} for i in range(6)
+    ]
+    plan = tmp_path / "plan.json"
+    plan.write_text(json.dumps({"sample_rate": 48000, "segments": segments}))
+    cache = tmp_path / "cache"
+    rc.render_chapter(plan, tmp_path / "cold.wav", cache, tmp_path / "tmp", parler_seed=7)
+    # A partly warm cache leaves a different set of misses; they must get the same audio again
+    dropped = {p: sf.read(p)[0] for p in sorted(cache.rglob("*.wav"))[::2]}
+    for path in dropped:
+        path.unlink()
+    timing = {}
+    rc.render_chapter(plan, tmp_path / "warm.wav", cache, tmp_path / "tmp", parler_seed=7, timing_out=timing)
+    assert timing["synthesized"] == len(dropped) == 3 and timing["synth_units"] == 3
+    for path, before in dropped.items():
+        np.testing.assert_array_equal(sf.read(path)[0], before)
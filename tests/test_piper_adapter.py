@@ -37,6 +37,7 @@ def test_piper_timeout(tmp_path, monkeypatch):
     ad = EngineRegistry.create("piper", voice="en_US-ryan-medium")
     ad._dryrun = False
     ad._available = True
+    ad.use_pool = False
 
     def fake_run(*args, **kwargs):
         raise subprocess.TimeoutExpired(cmd=args[0], timeout=60)
@@ -19,7 +19,7 @@ def test_piper_engine_subprocess(monkeypatch, tmp_path):
         return subprocess.CompletedProcess(cmd, 0, b"", b"")
 
     monkeypatch.setattr("abm.voice.engines.piper_engine.subprocess.run", fake_run)
-    engine = PiperEngine(use_subprocess=True)
+    engine = PiperEngine(use_subprocess=True, pool=False)
     y = engine.synthesize("hi", "voice")
     assert y.dtype == np.float32
     assert y.shape[0] == int(48000 * 0.1)
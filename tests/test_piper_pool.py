@@ -0,0 +1,171 @@
+import gc
+import sys
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import abm.audio.piper_pool as piper_pool
+from abm.audio.piper_adapter import PiperAdapter
+from abm.audio.piper_pool import PiperModel, PiperPool
+from abm.audio.tts_base import SynthesisError, TTSTask
+
+# Stand-in for `piper --json-input`: one WAV per JSON line, path echoed on stdout.
+# Every start is logged; "crash" exits once (or always with "crash!"), "hang" stalls.
+_FAKE_PIPER = """\
+import json, os, sys, time, wave
+from pathlib import Path
+
+log = Path(os.environ["FAKE_PIPER_LOG"])
+with log.open("a") as f:
+    f.write("start\\n")
+for line in sys.stdin:
+    req = json.loads(line)
+    text = req["text"]
+    marker = log.with_suffix(".crashed")
+    if text == "crash!" or (text == "crash" and not marker.exists()):
+        marker.touch()
+        sys.exit(3)
+    if text == "hang":
+        time.sleep(30)
+    samples = bytearray()
+    for i, ch in enumerate(text * 20):
+        samples += ((ord(ch) * 37 + i) % 2000 - 1000).to_bytes(2, "little", signed=True)
+    with wave.open(req["output_file"], "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(22050)
+        wf.writeframes(bytes(samples))
+    print("loaded model", flush=True)
+    print(req["output_file"], flush=True)
+"""
+
+
+def _expected(text: str) -> np.ndarray:
+    return np.array([(ord(ch) * 37 + i) % 2000 - 1000 for i, ch in enumerate(text * 20)], dtype=np.int16)
+
+
+@pytest.fixture()
+def fake_piper(tmp_path, monkeypatch):
+    script = tmp_path / "fake_piper.py"
+    script.write_text(_FAKE_PIPER)
+    binary = tmp_path / "piper"
+    binary.write_text(f"#!{sys.executable}\nexec(open({str(script)!r}).read())\n")
+    binary.chmod(0o755)
+    log = tmp_path / "starts.log"
+    monkeypatch.setenv("FAKE_PIPER_LOG", str(log))
+    return binary, log
+
+
+def _starts(log: Path) -> int:
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+def test_pool_reuses_resident_worker(fake_piper):
+    binary, log = fake_piper
+    pool = PiperPool(workers=2)
+    model = PiperModel(str(binary), "voice.onnx")
+    try:
+        futures = [(t, pool.submit(model, t)) for t in ["Hi.", "Yes", "A longer line of dialogue.", "No!"] * 5]
+        for text, fut in futures:
+            pcm, sr = fut.result(timeout=30)
+            assert sr == 22050
+            np.testing.assert_array_equal(pcm, _expected(text))
+    finally:
+        pool.close()
+    assert _starts(log) == 2
+    assert pool.stats.tasks == 20 and pool.stats.restarts == 0
+
+
+@pytest.mark.filterwarnings("error::ResourceWarning", "error::pytest.PytestUnraisableExceptionWarning")
+def test_pool_restarts_after_crash_and_timeout(fake_piper):
+    binary, log = fake_piper
+    pool = PiperPool(workers=1, timeout_s=1.0)
+    model = PiperModel(str(binary), "voice.onnx")
+    try:
+        # A crash restarts the worker and the task is retried once
+        pcm, _ = pool.synth(model, "crash")
+        np.testing.assert_array_equal(pcm, _expected("crash"))
+        assert _starts(log) == 2
+        with pytest.raises(SynthesisError, match="crashed"):
+            pool.synth(model, "crash!")
+        with pytest.raises(SynthesisError, match="timed out"):
+            pool.synth(model, "hang")
+        pcm, _ = pool.synth(model, "ok")
+        np.testing.assert_array_equal(pcm, _expected("ok"))
+    finally:
+        pool.close()
+    gc.collect()  # leaked pipes of killed workers would warn here
+    assert pool.stats.restarts == 4
+    assert pool.stats.failures == 2
+    assert _starts(log) == 5
+
+
+def test_missing_binary_raises(tmp_path):
+    pool = PiperPool()
+    try:
+        with pytest.raises(SynthesisError, match="failed to start"):
+            pool.synth(PiperModel(str(tmp_path / "no-piper"), "voice.onnx"), "hello")
+    finally:
+        pool.close()
+
+
+def _use_fresh_shared_pool(monkeypatch):
+    monkeypatch.setattr(piper_pool, "_SHARED", PiperPool())
+    monkeypatch.setattr(piper_pool, "_SHARED_PID", piper_pool.os.getpid())
+
+
+def _adapter_synth(binary, out):
+    adapter = PiperAdapter(binary=str(binary), pool=True)
+    adapter._available = True
+    task = TTSTask("Hello there.", "N", "piper", "voice.onnx", None, [], out, 120, "neutral")
+    assert adapter.synth(task) == out
+    with wave.open(str(out), "rb") as wf:
+        assert wf.getframerate() == 22050 and wf.getsampwidth() == 2
+        data = np.frombuffer(wf.readframes(wf.getnframes()), dtype="<i2")
+    np.testing.assert_array_equal(data, _expected("Hello there."))
+
+
+def test_adapter_reuses_shared_worker(fake_piper, tmp_path, monkeypatch):
+    binary, log = fake_piper
+    _use_fresh_shared_pool(monkeypatch)
+    monkeypatch.delenv("ABM_PIPER_DRYRUN", raising=False)
+    for i in range(3):
+        _adapter_synth(binary, tmp_path / f"span{i}.wav")
+    piper_pool.shared_pool().close()
+    assert _starts(log) == 1
+
+
+def test_adapter_and_engine_share_pool(fake_piper, tmp_path, monkeypatch):
+    from abm.voice.engines.piper_engine import PiperEngine
+
+    binary, log = fake_piper
+    _use_fresh_shared_pool(monkeypatch)
+    monkeypatch.delenv("ABM_PIPER_DRYRUN", raising=False)
+    _adapter_synth(binary, tmp_path / "span.wav")
+
+    engine = PiperEngine(use_subprocess=True, pool=True)
+    engine._piper_bin = str(binary)
+    y = engine.synthesize("General Kenobi.", "voice.onnx")
+    assert y.dtype == np.float32 and engine.last_sample_rate == 22050
+    np.testing.assert_array_equal(y, _expected("General Kenobi.").astype(np.float32) / 32768.0)
+
+    piper_pool.shared_pool().close()
+    assert _starts(log) == 1
+
+
+def test_grow_adds_workers_to_running_models(fake_piper):
+    binary, log = fake_piper
+    pool = PiperPool(workers=1)
+    model = PiperModel(str(binary), "voice.onnx")
+    try:
+        pool.synth(model, "warm")
+        pool.grow(3)
+        futures = [pool.submit(model, f"line {i}") for i in range(12)]
+        for i, fut in enumerate(futures):
+            np.testing.assert_array_equal(fut.result(timeout=30)[0], _expected(f"line {i}"))
+    finally:
+        pool.close()
+    assert pool.workers == 3
+    assert 1 < _starts(log) <= 3
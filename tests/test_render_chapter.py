@@ -2,6 +2,7 @@ import json
 from pathlib import Path
 
 import numpy as np
+import pytest
 import soundfile as sf
 
 from abm.audio.engine_registry import EngineRegistry
@@ -72,9 +73,9 @@ def test_render_chapter_end_to_end(tmp_path, monkeypatch):
     captured_workers: list[int] = []
     orig_init = TTSManager.__init__
 
-    def spy_init(self, adapter, max_workers=2, cache_dir=None, show_progress=True):
+    def spy_init(self, adapter, max_workers=2, cache_dir=None, show_progress=True, **kwargs):
         captured_workers.append(max_workers)
-        orig_init(self, adapter, max_workers, cache_dir, show_progress)
+        orig_init(self, adapter, max_workers, cache_dir, show_progress, **kwargs)
 
     monkeypatch.setattr(TTSManager, "__init__", spy_init)
 
@@ -106,5 +107,46 @@ def test_render_chapter_end_to_end(tmp_path, monkeypatch):
     assert manifest["chapters"][0]["duration_s"] > 0
     assert isinstance(manifest["chapters"][0]["integrated_lufs"], float)
     assert manifest["provenance"]["engine_workers"]["dummy"] == 1
+    stats = manifest["provenance"]["render_stats"]["dummy"]
+    assert stats["synthesized"] == 1 and stats["dedup_rate"] == 0.0
 
     EngineRegistry.unregister("dummy")
+
+
+def test_render_chapter_in_memory_matches_keep_spans(tmp_path, monkeypatch):
+    EngineRegistry.unregister("dummy")
+    EngineRegistry.register("dummy", lambda **_: DummyAdapter())
+    items = [{"text": f"line {i}", "engine": "dummy", "pause_ms": 0 if i % 2 else 80} for i in range(5)]
+    script_path = tmp_path / "script.json"
+    script_path.write_text(json.dumps({"index": 1, "items": items}))
+
+    orig_read = sf.read
+    reads = []
+
+    def counting_read(*args, **kwargs):
+        reads.append(args[0])
+        return orig_read(*args, **kwargs)
+
+    def render(name, tmp_name, *extra):
+        out_dir = tmp_path / name
+        reads.clear()
+        monkeypatch.setattr(sf, "read", counting_read)
+        render_main(
+            ["--script", str(script_path), "--out-dir", str(out_dir), "--tmp-dir", str(tmp_path / tmp_name)]
+            + ["--no-show-progress", *extra]
+        )
+        monkeypatch.setattr(sf, "read", orig_read)
+        return orig_read(out_dir / "chapters" / "ch_001.wav")[0]
+
+    kept = render("kept", "tmp_kept", "--keep-spans")
+    assert len(list((tmp_path / "tmp_kept" / "spans").glob("c*.wav"))) == 5
+    cold = render("cold", "tmp")
+    assert not (tmp_path / "tmp" / "spans").exists()
+    np.testing.assert_array_equal(cold, kept)
+
+    # Warm cache: nothing synthesized, one cache read per span and no span files
+    monkeypatch.setattr(DummyAdapter, "synth", lambda self, task: pytest.fail("synthesized on a warm cache"))
+    warm = render("warm", "tmp")
+    assert len(reads) == 5 and all("cache" in Path(p).parts for p in reads)
+    np.testing.assert_array_equal(warm, kept)
+    EngineRegistry.unregister("dummy")
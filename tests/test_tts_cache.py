@@ -0,0 +1,175 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from abm.audio.tts_base import TTSAdapter, TTSTask
+from abm.audio.tts_cache import QUARANTINE_DIR, TTSCacheIndex, check_wav, main, parse_bytes
+from abm.audio.tts_manager import TTSManager
+from abm.voice.cache import cache_path, make_cache_key
+
+
+class CountingAdapter(TTSAdapter):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def preload(self) -> None:
+        pass
+
+    def synth(self, task: TTSTask) -> Path:
+        self.calls += 1
+        task.out_path.parent.mkdir(parents=True, exist_ok=True)
+        sf.write(task.out_path, np.full(1600, 0.1, dtype=np.float32), 16000, subtype="PCM_16")
+        return task.out_path
+
+
+def _task(out: Path, text: str = "hello") -> TTSTask:
+    return TTSTask(text, "Quinn", "dummy", "quinn_v1", None, [], out, 0, "")
+
+
+def _wav(path: Path, frames: int = 1600) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    sf.write(path, np.zeros(frames, dtype=np.float32), 16000, subtype="PCM_16")
+    return path
+
+
+def _voice_entry(root: Path, engine: str, voice: str, text: str, frames: int = 1600) -> Path:
+    key = make_cache_key({"engine": engine, "voice": voice, "text": text})
+    return _wav(cache_path(root, engine, voice, key), frames)
+
+
+def test_check_wav_detects_truncation(tmp_path):
+    good = _wav(tmp_path / "good.wav")
+    assert check_wav(good) == (None, 1600, 16000)
+    data = good.read_bytes()
+    (tmp_path / "cut.wav").write_bytes(data[: len(data) // 2])
+    problem, _, _ = check_wav(tmp_path / "cut.wav")
+    assert problem is not None and problem.startswith("truncated")
+    (tmp_path / "junk.wav").write_bytes(b"not audio at all")
+    assert check_wav(tmp_path / "junk.wav")[0] == "not a RIFF/WAVE file"
+    assert check_wav(_wav(tmp_path / "empty.wav", frames=0))[0] == "no audio frames"
+
+
+def test_manager_indexes_writes_and_quarantines_corrupt_hits(tmp_path):
+    adapter = CountingAdapter()
+    manager = TTSManager(adapter, cache_dir=tmp_path / "cache", show_progress=False)
+    manager.render_one(_task(tmp_path / "a.wav"))
+    (entry,) = manager.index.entries()
+    assert entry.engine == "dummy" and entry.voice == "quinn_v1" and entry.frames == 1600
+    cached = manager.index.root / entry.path
+    assert len(entry.sha256) == 64 and entry.size == cached.stat().st_size
+
+    # A killed render from before atomic writes left a truncated entry behind
+    data = cached.read_bytes()
+    cached.unlink()
+    cached.write_bytes(data[:100])
+    manager.render_one(_task(tmp_path / "b.wav"))
+    assert adapter.calls == 2
+    assert check_wav(cached)[0] is None and check_wav(tmp_path / "b.wav")[0] is None
+    quarantined = tmp_path / "cache" / QUARANTINE_DIR / entry.path
+    assert quarantined.read_bytes() == data[:100]
+    assert "truncated" in quarantined.with_name(quarantined.name + ".reason").read_text()
+
+    before = manager.index.entries()[0].last_access
+    manager.render_one(_task(tmp_path / "c.wav"))
+    assert adapter.calls == 2 and manager.index.entries()[0].last_access >= before
+
+
+def test_verify_quarantines_checksum_and_duration_mismatches(tmp_path):
+    root = tmp_path / "cache"
+    index = TTSCacheIndex(root)
+    ok = _voice_entry(root, "piper", "narrator", "ok")
+    flipped = _voice_entry(root, "piper", "narrator", "flipped")
+    shortened = _voice_entry(root, "xtts", "quinn", "shortened")
+    for p in (ok, flipped, shortened):
+        index.record_write(p)
+    raw = bytearray(flipped.read_bytes())
+    raw[-1] ^= 0xFF  # same header, different audio
+    flipped.write_bytes(bytes(raw))
+    _wav(shortened, frames=800)  # rewritten in place with a valid but shorter header
+    unindexed = _voice_entry(root, "xtts", "quinn", "unindexed")
+
+    report = index.verify()
+    reasons = dict(report.quarantined)
+    assert report.checked == 4
+    assert reasons == {
+        flipped.relative_to(root).as_posix(): "checksum mismatch",
+        shortened.relative_to(root).as_posix(): "duration changed: 800 frames, 1600 when written",
+    }
+    assert ok.exists() and unindexed.exists() and not flipped.exists()
+    assert {e.path for e in index.entries()} == {p.relative_to(root).as_posix() for p in (ok, unindexed)}
+
+
+def test_evict_lru_under_budget_keeps_manifest_references(tmp_path):
+    root = tmp_path / "cache"
+    index = TTSCacheIndex(root)
+    paths = [_voice_entry(root, "piper", "narrator", f"line {i}") for i in range(6)]
+    for i, p in enumerate(paths):
+        index.record_write(p)
+        os.utime(p, (1000 + i, 1000 + i))
+    # Access order (oldest first): 0, 2, 3, 4, 5, 1
+    stamps = {0: 10.0, 2: 20.0, 3: 30.0, 4: 40.0, 5: 50.0, 1: 60.0}
+    with index._lock:
+        for i, t in stamps.items():
+            index._db.execute(
+                "UPDATE entries SET last_access=?, created=? WHERE path=?",
+                (t, 100.0 - t, paths[i].relative_to(root).as_posix()),
+            )
+        index._db.commit()
+    manifest = tmp_path / "qc.json"
+    manifest.write_text(json.dumps({"utterances": [{"cache_key": paths[0].stem}]}))
+    assert index.set_references([manifest]) == 1
+
+    size = paths[0].stat().st_size
+    dry = index.evict(max_bytes=3 * size, dry_run=True)
+    assert all(p.exists() for p in paths)
+    report = index.evict(max_bytes=3 * size)
+    assert report.evicted == dry.evicted
+    assert [Path(e).stem for e in report.evicted] == [paths[i].stem for i in (2, 3, 4)]
+    assert report.kept_referenced == 1 and report.remaining_bytes == 3 * size
+    assert [p.exists() for p in paths] == [True, True, False, False, False, True]
+
+    # Age policy goes by write time: entry 1 (t=40) is older than 55 s, entry 5 (t=50) is not
+    aged = index.evict(max_age_s=55.0, policy="age", now=100.0)
+    assert [Path(e).stem for e in aged.evicted] == [paths[1].stem]
+    with pytest.raises(ValueError):
+        index.evict(max_bytes=0, policy="random")
+
+
+def test_cli_report_gc_and_verify(tmp_path, capsys):
+    root = tmp_path / "cache"
+    manager = TTSManager(CountingAdapter(), cache_dir=root, show_progress=False)
+    manager.render_batch([_task(tmp_path / f"{i}.wav", f"line {i}") for i in range(3)])
+    _voice_entry(root, "piper", "narrator", "voice cache line")
+    manifest = tmp_path / "book_manifest.json"
+    manifest.write_text(
+        json.dumps({"chapters": [{"cache_keys": [manager.cache_key(_task(tmp_path / "x.wav", "line 1"))]}]})
+    )
+
+    assert main(["report", "--cache-dir", str(root), "--json", "--manifest", str(manifest)]) == 0
+    usage = {(r["engine"], r["voice"]): r for r in json.loads(capsys.readouterr().out)["usage"]}
+    assert usage[("dummy", "quinn_v1")]["entries"] == 3 and usage[("dummy", "quinn_v1")]["referenced"] == 1
+    assert usage[("piper", "narrator")]["entries"] == 1
+
+    assert main(["gc", "--cache-dir", str(root), "--max-bytes", "0", "--manifest", str(manifest)]) == 0
+    assert "evicted 3 entries" in capsys.readouterr().out
+    assert [e.voice for e in TTSCacheIndex(root).entries()] == ["quinn_v1"]
+
+    assert main(["verify", "--cache-dir", str(root)]) == 0
+    assert "checked 1 entries, quarantined 0" in capsys.readouterr().out
+
+    # Without the manifest, the reference recorded by the earlier run no longer pins the entry
+    assert main(["gc", "--cache-dir", str(root), "--max-bytes", "0"]) == 0
+    assert "evicted 1 entries" in capsys.readouterr().out
+    assert TTSCacheIndex(root).entries() == []
+
+
+def test_parse_bytes():
+    assert parse_bytes("1048576") == 1 << 20
+    assert parse_bytes("500M") == 500 << 20
+    assert parse_bytes("1.5GiB") == 3 << 29
+    with pytest.raises(ValueError):
+        parse_bytes("lots")
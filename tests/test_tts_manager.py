@@ -1,9 +1,13 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
+import pytest
 import soundfile as sf
 
-from abm.audio.tts_base import TTSAdapter, TTSTask
+from abm.audio.tts_base import SynthesisError, TTSAdapter, TTSTask
 from abm.audio.tts_manager import TTSManager
 
 
@@ -68,3 +72,151 @@ def test_render_batch_uses_cache(tmp_path, monkeypatch):
     for t1, t2 in zip(tasks1, tasks2, strict=False):
         assert t2.out_path.exists()
         assert t1.out_path.read_bytes() == t2.out_path.read_bytes()
+
+
+class SlowCountingAdapter(DummyAdapter):
+    def __init__(self, fail: bool = False) -> None:
+        self.calls = 0
+        self.fail = fail
+        self.lock = threading.Lock()
+
+    def synth(self, task: TTSTask) -> Path:
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.05)
+        if self.fail:
+            task.out_path.parent.mkdir(parents=True, exist_ok=True)
+            task.out_path.write_bytes(b"partial")
+            raise SynthesisError("boom")
+        return super().synth(task)
+
+
+def repeated_tasks(out_dir: Path, texts: list[str]) -> list[TTSTask]:
+    return [
+        TTSTask(text, "narrator", "dummy", None, None, [], out_dir / f"{i}.wav", 0, "") for i, text in enumerate(texts)
+    ]
+
+
+def test_render_batch_synthesizes_each_key_once(tmp_path):
+    adapter = SlowCountingAdapter()
+    manager = TTSManager(adapter, max_workers=4, cache_dir=tmp_path / "cache", show_progress=False)
+    tasks = repeated_tasks(tmp_path / "out", ["<Level Up>", "Run!", "<Level Up>", "<Level Up>", "Run!", "Hi"])
+    paths = manager.render_batch(tasks)
+    assert adapter.calls == 3
+    assert paths == [t.out_path for t in tasks]
+    assert tasks[0].out_path.read_bytes() == tasks[3].out_path.read_bytes()
+    assert manager.stats.as_dict() == {
+        "tasks": 6,
+        "cache_hits": 0,
+        "synthesized": 3,
+        "deduplicated": 3,
+        "dedup_rate": 0.5,
+    }
+    assert not list((tmp_path / "cache").rglob("*.tmp*"))
+
+
+def test_render_batch_dedups_without_cache(tmp_path):
+    adapter = SlowCountingAdapter()
+    manager = TTSManager(adapter, max_workers=2, cache_dir=None, show_progress=False)
+    tasks = repeated_tasks(tmp_path / "out", ["same"] * 4)
+    manager.render_batch(tasks)
+    assert adapter.calls == 1
+    assert all(t.out_path.read_bytes() == tasks[0].out_path.read_bytes() for t in tasks)
+
+
+def test_concurrent_render_one_waits_on_inflight(tmp_path):
+    adapter = SlowCountingAdapter()
+    manager = TTSManager(adapter, cache_dir=tmp_path / "cache", show_progress=False)
+    tasks = repeated_tasks(tmp_path / "out", ["<Notification>"] * 5)
+    with ThreadPoolExecutor(max_workers=5) as ex:
+        list(ex.map(manager.render_one, tasks))
+    assert adapter.calls == 1
+    assert manager.stats.synthesized == 1
+    assert manager.stats.deduplicated + manager.stats.cache_hits == 4
+    assert all(t.out_path.exists() for t in tasks)
+
+
+def test_failed_synthesis_leaves_no_cache_entry(tmp_path):
+    adapter = SlowCountingAdapter(fail=True)
+    manager = TTSManager(adapter, cache_dir=tmp_path / "cache", show_progress=False)
+    tasks = repeated_tasks(tmp_path / "out", ["x"] * 3)
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        futures = [ex.submit(manager.render_one, t) for t in tasks]
+    for fut in futures:
+        with pytest.raises(SynthesisError):
+            fut.result()
+    assert adapter.calls == 1
+    assert not list((tmp_path / "cache").rglob("*.wav"))
+    assert not manager._inflight
+
+
+class ArrayAdapter(DummyAdapter):
+    """Native in-memory synthesis with full-precision output; never writes files."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def synth(self, task: TTSTask) -> Path:  # pragma: no cover - must not be reached
+        raise AssertionError("file synthesis used on the in-memory path")
+
+    def synth_array(self, task: TTSTask) -> tuple[np.ndarray, int]:
+        with self.lock:
+            self.calls += 1
+        rng = np.random.default_rng(len(task.text))
+        return rng.uniform(-0.5, 0.5, 1600), 16000
+
+
+@pytest.mark.parametrize("codec", ["wav", "npy"])
+def test_render_arrays_match_cache_and_write_behind(tmp_path, codec):
+    adapter = ArrayAdapter()
+    manager = TTSManager(adapter, max_workers=2, cache_dir=tmp_path / "cache", show_progress=False, codec=codec)
+    tasks = repeated_tasks(tmp_path / "out", ["a", "bb", "a", "ccc"])
+    cold = manager.render_arrays(tasks)
+    manager.flush()
+    assert adapter.calls == 3 and cold[0] is cold[2]
+    assert manager.stats.synthesized == 3 and manager.stats.deduplicated == 1
+    assert not (tmp_path / "out").exists()  # no span files
+    assert len(manager.index.entries()) == 3
+
+    warm_adapter = ArrayAdapter()
+    warm = TTSManager(warm_adapter, cache_dir=tmp_path / "cache", show_progress=False, codec=codec)
+    again = warm.render_arrays(tasks)
+    assert warm_adapter.calls == 0 and warm.stats.cache_hits == 3
+    for (y0, sr0), (y1, sr1) in zip(cold, again, strict=True):
+        assert sr0 == sr1 == 16000 and y0.dtype == np.float32
+        np.testing.assert_array_equal(y0, y1)  # a cold render already returns what the cache holds
+
+    # The file path reuses the same entries
+    paths = warm.render_batch(tasks)
+    np.testing.assert_array_equal(sf.read(paths[1], dtype="float32")[0], cold[1][0])
+
+
+def test_pending_cache_write_is_served_from_memory(tmp_path, monkeypatch):
+    adapter = ArrayAdapter()
+    manager = TTSManager(adapter, cache_dir=tmp_path / "cache", show_progress=False)
+    release = threading.Event()
+    store = manager._store
+
+    def slow_store(*args):
+        release.wait(5)
+        store(*args)
+
+    monkeypatch.setattr(manager, "_store", slow_store)
+    (task,) = repeated_tasks(tmp_path / "out", ["slow disk"])
+    first = manager.render_array(task)
+    assert not manager.index.entries()
+    second = manager.render_array(task)
+    assert adapter.calls == 1 and manager.stats.cache_hits == 1 and second[0] is first[0]
+    release.set()
+    manager.flush()
+    assert len(manager.index.entries()) == 1 and not manager._unwritten
+
+
+def test_default_synth_array_goes_through_synth(tmp_path):
+    manager = TTSManager(SlowCountingAdapter(), cache_dir=None, show_progress=False)
+    tasks = make_tasks(tmp_path / "out")
+    (y, sr), *_ = manager.render_arrays(tasks)
+    assert sr == 16000 and len(y) == 2400
+    assert not (tmp_path / "out").exists()
+    np.testing.assert_array_equal(y, sf.read(manager.render_one(tasks[0]), dtype="float32")[0])
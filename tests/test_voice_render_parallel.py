@@ -0,0 +1,145 @@
+import hashlib
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from abm.voice import render_chapter as rc
+
+
+class _FakeEngine:
+    calls: list[tuple[str, int]] = []
+    lock = threading.Lock()
+
+    def synthesize(self, text, voice_id, style=None):
+        with self.lock:
+            self.calls.append((text, threading.get_ident()))
+        time.sleep(0.01)
+        seed = int(hashlib.sha256(f"{voice_id}:{text}".encode()).hexdigest()[:8], 16)
+        rng = np.random.default_rng(seed)
+        return (0.3 * rng.standard_normal(800 + len(text) * 40)).clip(-0.9, 0.9).astype(np.float32)
+
+
+def _plan(tmp_path):
+    texts = [f"Line number {i % 13}." for i in range(40)]  # repeats hit the in-chapter cache
+    segments = [
+        {
+            "id": f"s{i}",
+            "engine": "piper" if i % 3 else "xtts",
+            "voice": "narrator" if i % 2 else "quinn",
+            "text": t,
+            "pause_ms": 120 if i % 5 == 0 else 0,
+        }
+        for i, t in enumerate(texts)
+    ]
+    path = tmp_path / "plan.json"
+    path.write_text(json.dumps({"sample_rate": 16000, "crossfade_ms": 10, "segments": segments}))
+    return path
+
+
+@pytest.fixture()
+def fake_engines(monkeypatch):
+    _FakeEngine.calls = []
+    loaded: list[str] = []
+
+    def load(name, **kw):
+        loaded.append(name)
+        return _FakeEngine()
+
+    monkeypatch.setattr(rc, "_load_engine", load)
+    monkeypatch.setattr(rc, "_ENGINE_POOLS", {})
+    monkeypatch.setattr(rc, "shared_pool", lambda min_workers=None: None)
+    return loaded
+
+
+def test_parallel_render_matches_sequential(tmp_path, fake_engines):
+    plan = _plan(tmp_path)
+    outs = {}
+    for workers in (1, 4):
+        timing = {}
+        out = rc.render_chapter(
+            plan,
+            tmp_path / f"w{workers}.wav",
+            tmp_path / f"cache{workers}",
+            tmp_path / "tmp",
+            workers=workers,
+            timing_out=timing,
+        )
+        outs[workers] = out.read_bytes()
+        assert timing["segments"] == 40 and timing["workers"] == workers
+        assert timing["cache_hits"] == 0
+        assert timing["synthesized"] + timing["repeats"] == 40 and timing["repeats"] > 0
+    assert outs[1] == outs[4]
+    # Each distinct (engine, voice, text) is synthesized once per render
+    segments = json.loads(plan.read_text())["segments"]
+    distinct = len({(s["engine"], s["voice"], s["text"]) for s in segments})
+    assert distinct < 40 and len(_FakeEngine.calls) == 2 * distinct
+    assert len({tid for _, tid in _FakeEngine.calls}) > 1
+
+
+def test_cache_hits_skip_workers(tmp_path, fake_engines):
+    plan = _plan(tmp_path)
+    cache = tmp_path / "cache"
+    first = rc.render_chapter(plan, tmp_path / "a.wav", cache, tmp_path / "tmp", workers=3)
+    _FakeEngine.calls = []
+    timing = {}
+    second = rc.render_chapter(plan, tmp_path / "b.wav", cache, tmp_path / "tmp", workers=3, timing_out=timing)
+    assert _FakeEngine.calls == []
+    assert timing["cache_hits"] == 40 and timing["synthesized"] == 0
+    qc = json.loads(second.with_suffix(".qc.json").read_text())
+    assert qc["timing"]["cache_hits"] == 40 and qc["segments"] == 40
+    assert first.exists()
+
+
+def test_cache_codecs_and_mixed_caches(tmp_path, fake_engines):
+    plan = _plan(tmp_path)
+    outs = {}
+    for codec in ("wav", "flac", "npy"):
+        cache = tmp_path / f"cache_{codec}"
+        first = rc.render_chapter(plan, tmp_path / f"{codec}_1.wav", cache, tmp_path / "tmp", cache_codec=codec)
+        timing = {}
+        second = rc.render_chapter(
+            plan, tmp_path / f"{codec}_2.wav", cache, tmp_path / "tmp", cache_codec=codec, timing_out=timing
+        )
+        assert timing["cache_hits"] == 40
+        assert {p.suffix for p in cache.rglob("*") if p.is_file() and not p.name.startswith(".")} == {f".{codec}"}
+        outs[codec] = (first.read_bytes(), second.read_bytes())
+    # FLAC stores exactly the 16-bit samples a WAV entry holds
+    assert outs["flac"] == outs["wav"]
+    # float32 .npy entries reproduce the synthesized audio, so hits match a fresh render
+    assert outs["npy"][0] == outs["npy"][1]
+
+    _FakeEngine.calls = []
+    timing = {}
+    rc.render_chapter(
+        plan, tmp_path / "mixed.wav", tmp_path / "cache_wav", tmp_path / "tmp", cache_codec="npy", timing_out=timing
+    )
+    assert _FakeEngine.calls == [] and timing["cache_hits"] == 40
+    assert (tmp_path / "mixed.wav").read_bytes() == outs["wav"][1]
+
+
+def test_engines_are_reused_across_renders(tmp_path, fake_engines):
+    plan = _plan(tmp_path)
+    for run in range(3):
+        rc.render_chapter(plan, tmp_path / f"r{run}.wav", tmp_path / f"cache{run}", tmp_path / "tmp", workers=4)
+    # One shared Piper engine; at most one XTTS instance per concurrent worker, reused by later renders
+    assert fake_engines.count("piper") == 1
+    assert 1 <= fake_engines.count("xtts") <= 4
+    assert sum(len(idle) for key, idle in rc._ENGINE_POOLS.items() if key[0] == "xtts") == fake_engines.count("xtts")
+
+
+def test_unreadable_repeat_entries_keep_every_segment(tmp_path, fake_engines, monkeypatch):
+    plan = _plan(tmp_path)
+    full = rc.render_chapter(plan, tmp_path / "full.wav", tmp_path / "cache_full", tmp_path / "tmp", workers=3)
+    # Entries written during the render cannot be read back (e.g. evicted by a concurrent gc)
+    monkeypatch.setattr(rc, "_read_cached", lambda fp, codec, index: None)
+    timing = {}
+    out = rc.render_chapter(
+        plan, tmp_path / "lost.wav", tmp_path / "cache_lost", tmp_path / "tmp", workers=3, timing_out=timing
+    )
+    assert timing["repeats"] > 0
+    assert json.loads(out.with_suffix(".qc.json").read_text())["segments"] == 40
+    assert sf.info(str(out)).frames == sf.info(str(full)).frames
@@ -1,4 +1,14 @@
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import soundfile as sf
 
 from abm.audio import register_builtins
 from abm.audio.engine_registry import EngineRegistry
@@ -25,3 +35,132 @@ def test_xtts_dryrun_writes_wav(tmp_path, monkeypatch):
     )
     assert isinstance(out, Path)
     assert out.exists() and out.stat().st_size > 100
+
+
+class FakeXtts:
+    """Stand-in for Coqui's Xtts model that counts conditioning computations."""
+
+    def __init__(self, torch) -> None:
+        self.torch = torch
+        self.config = SimpleNamespace(gpt_cond_len=30, max_ref_len=10, sound_norm_refs=False, temperature=0.7)
+        self.latent_calls: list[tuple[list[str], dict]] = []
+        self.lock = threading.Lock()
+
+    def get_conditioning_latents(self, audio_path, **kwargs):
+        with self.lock:
+            self.latent_calls.append((audio_path, kwargs))
+        time.sleep(0.02)
+        seed = sum(Path(p).read_bytes()[-1] for p in audio_path)
+        gen = self.torch.Generator().manual_seed(seed)
+        return self.torch.randn(1, 4, 8, generator=gen), self.torch.randn(1, 8, 1, generator=gen)
+
+    def inference(self, text, language, gpt_cond_latent, speaker_embedding, **kwargs):
+        assert language == "en" and kwargs == {"temperature": 0.7}
+        t = self.torch.arange(200 * len(text), dtype=self.torch.float32)
+        return {"wav": 0.3 * self.torch.sin(t * 0.01 * (1 + speaker_embedding.abs().sum()))}
+
+
+def _fake_adapter(tmp_path, torch, **kwargs):
+    from abm.audio.xtts_adapter import XTTSAdapter
+
+    ad = XTTSAdapter(device="cpu", latent_dir=tmp_path / "latents", **kwargs)
+    model = FakeXtts(torch)
+    ad._tts = SimpleNamespace(
+        synthesizer=SimpleNamespace(
+            tts_model=model,
+            output_sample_rate=24000,
+            split_into_sentences=lambda text: [s for s in re.split(r"(?<=[.!?])\s+", text) if s],
+        )
+    )
+    return ad, model
+
+
+def _ref(path: Path, seed: int) -> str:
+    sf.write(path, np.random.default_rng(seed).uniform(-0.5, 0.5, 2400), 24000, subtype="PCM_16")
+    return str(path)
+
+
+def _cloned_task(out: Path, profile_id: str, refs: list[str], text: str = "One line. And another!") -> TTSTask:
+    return TTSTask(text, profile_id, "xtts", None, profile_id, refs, out, 0, "")
+
+
+def test_xtts_latents_computed_once_per_profile_and_persisted(tmp_path, monkeypatch):
+    torch = pytest.importorskip("torch")
+    monkeypatch.delenv("ABM_XTTS_DRYRUN", raising=False)
+    quinn = [_ref(tmp_path / "quinn.wav", 1)]
+    mara = [_ref(tmp_path / "mara_a.wav", 2), _ref(tmp_path / "mara_b.wav", 3)]
+    ad, model = _fake_adapter(tmp_path, torch, voices={"quinn_v1": quinn, "mara_v1": mara})
+
+    ad.preload()
+    ad.preload()
+    assert len(model.latent_calls) == 2  # the casting is warmed once
+    assert model.latent_calls[0][1] == {"gpt_cond_len": 30, "max_ref_length": 10, "sound_norm_refs": False}
+
+    tasks = [_cloned_task(tmp_path / "out" / f"{i}.wav", "quinn_v1", quinn) for i in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        list(ex.map(ad.synth, tasks))
+    y, sr = ad.synth_array(_cloned_task(tmp_path / "unused.wav", "mara_v1", mara))
+    assert len(model.latent_calls) == 2 and ad.latents.stats.hits >= 5
+    assert not (tmp_path / "unused.wav").exists()
+    first, sr_first = sf.read(tasks[0].out_path, dtype="float32")
+    assert sr == sr_first == 24000
+    # Two sentences, each followed by Coqui's 10000-sample gap, peak-normalized
+    assert len(first) == 200 * (len("One line.") + len("And another!")) + 2 * 10000
+    assert np.abs(first).max() == pytest.approx(32767 / 32768)
+
+    # A new process reuses the persisted tensors
+    ad2, model2 = _fake_adapter(tmp_path, torch, voices={"quinn_v1": quinn, "mara_v1": mara})
+    ad2.preload()
+    assert model2.latent_calls == [] and ad2.latents.stats.loaded == 2
+    ad2.synth(_cloned_task(tmp_path / "again.wav", "quinn_v1", quinn))
+    np.testing.assert_array_equal(sf.read(tmp_path / "again.wav", dtype="float32")[0], first)
+
+    # Re-recorded reference under the same name: new hash, new latents
+    _ref(tmp_path / "quinn.wav", 9)
+    ad2.synth(_cloned_task(tmp_path / "rerecorded.wav", "quinn_v1", quinn))
+    assert len(model2.latent_calls) == 1
+    assert len(list((tmp_path / "latents").glob("quinn_v1-*.pt"))) == 2
+
+
+def test_xtts_latent_key_covers_model_arguments_and_reference_order(tmp_path, monkeypatch):
+    torch = pytest.importorskip("torch")
+    monkeypatch.delenv("ABM_XTTS_DRYRUN", raising=False)
+    refs = [_ref(tmp_path / "a.wav", 1), _ref(tmp_path / "b.wav", 2)]
+    ad, _ = _fake_adapter(tmp_path, torch, voices={"mara_v1": refs})
+    ad.preload()
+
+    def computed(voices=None, **kwargs):
+        other, model = _fake_adapter(tmp_path, torch, voices=voices or {"mara_v1": refs}, **kwargs)
+        other.preload()
+        return len(model.latent_calls)
+
+    assert computed() == 0  # same model, arguments and references: loaded from disk
+    assert computed(model_name="tts_models/multilingual/multi-dataset/xtts_v1.1") == 1
+    assert computed(voices={"mara_v1": refs[::-1]}) == 1
+    other, model = _fake_adapter(tmp_path, torch, voices={"mara_v1": refs})
+    model.config.gpt_cond_len = 12
+    other.preload()
+    assert len(model.latent_calls) == 1 and model.latent_calls[0][1]["gpt_cond_len"] == 12
+
+
+def test_render_chapter_warms_xtts_casting(tmp_path):
+    from abm.audio.render_chapter import _engine_options
+
+    profiles = tmp_path / "profiles.json"
+    profiles.write_text(
+        json.dumps(
+            {
+                "profiles": [
+                    {"id": "quinn_v1", "label": "Quinn", "engine": "xtts", "voice": "", "refs": ["q.wav"], "style": ""},
+                    {"id": "narr", "label": "Narrator", "engine": "piper", "voice": "ryan", "refs": [], "style": ""},
+                ]
+            }
+        )
+    )
+    tasks = [_cloned_task(tmp_path / "0.wav", "mara_v1", ["m.wav"])]
+    opts = _engine_options("xtts", tasks, tmp_path / "cache", profiles)
+    assert opts == {
+        "latent_dir": tmp_path / "cache" / "xtts_latents",
+        "voices": {"quinn_v1": ["q.wav"], "mara_v1": ["m.wav"]},
+    }
+    assert _engine_options("piper", tasks, tmp_path / "cache", profiles) == {}
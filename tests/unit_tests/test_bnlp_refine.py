@@ -0,0 +1,183 @@
+"""Offline tests for whole-book BookNLP fusion using a fake adapter."""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+from abm.annotate.bnlp_refine import BNLPRefinePolicy, refine_with_bnlp
+from abm.sidecar.booknlp_adapter import BookNLPAdapter, BookNLPConfig, build_book_text, split_book_quotes
+
+_QUOTE_RE = re.compile(r"“[^”]*”")
+
+
+class FakeBookNLPAdapter(BookNLPAdapter):
+    """Attributes every quote to the name right after it ("…,” Name said)."""
+
+    def __init__(self, cfg: BookNLPConfig | None = None, *, verbose: bool = False, api_ok: bool = True) -> None:
+        super().__init__(cfg, verbose=verbose)
+        self.api_ok = api_ok
+        self.calls: list[tuple[str, str]] = []  # (backend, input text)
+
+    def _probe_available(self) -> bool:
+        return True
+
+    def _fake_run(self, backend: str, in_txt: Path) -> list[dict[str, Any]]:
+        text = in_txt.read_text(encoding="utf-8")
+        self.calls.append((backend, text))
+        out: list[dict[str, Any]] = []
+        for m in _QUOTE_RE.finditer(text):
+            after = re.match(r"\s*(\w+) said", text[m.end() :])
+            speaker = after.group(1) if after else "Unknown"
+            out.append({"start": m.start(), "end": m.end(), "speaker": speaker, "prob": 0.8})
+        return out
+
+    def _run_python_api(self, in_txt: Path, out_dir: Path, work_id: str) -> list[dict[str, Any]]:
+        if not self.api_ok:
+            raise RuntimeError("no python api")
+        return self._fake_run("api", in_txt)
+
+    def _run_cli(self, in_txt: Path, out_dir: Path, work_id: str) -> list[dict[str, Any]]:
+        return self._fake_run("cli", in_txt)
+
+
+def _chapter(idx: int, text: str) -> dict[str, Any]:
+    spans = [
+        {"start": m.start(), "end": m.end(), "type": "Dialogue", "speaker": "Unknown", "confidence": 0.2}
+        for m in _QUOTE_RE.finditer(text)
+    ]
+    return {"chapter_index": idx, "title": f"Ch{idx}", "text": text, "spans": spans}
+
+
+def _write_doc(tmp_path: Path) -> Path:
+    doc = {
+        "chapters": [
+            _chapter(0, "“Hello,” Quinn said. Rain fell."),
+            _chapter(1, "Later. “Who goes?” Mira said. The gate creaked open in the wind. “Me,” Quinn said."),
+        ]
+    }
+    p = tmp_path / "combined.json"
+    p.write_text(json.dumps(doc), encoding="utf-8")
+    return p
+
+
+def test_book_offsets_roundtrip() -> None:
+    chapters = [(3, "abc “x”"), (4, "“yy” d")]
+    book, offsets = build_book_text(chapters)
+    quotes = [{"start": m.start(), "end": m.end(), "speaker": "S", "prob": 1.0} for m in _QUOTE_RE.finditer(book)]
+    per_ch = split_book_quotes(quotes, offsets)
+    assert [(q["start"], q["end"]) for q in per_ch[3]] == [(4, 7)]
+    assert [(q["start"], q["end"]) for q in per_ch[4]] == [(0, 4)]
+    assert chapters[0][1][4:7] == "“x”" and chapters[1][1][0:4] == "“yy”"
+
+
+def test_whole_book_single_run_maps_to_chapters(tmp_path) -> None:
+    tagged = _write_doc(tmp_path)
+    out = tmp_path / "out.json"
+    adapter = FakeBookNLPAdapter()
+
+    refine_with_bnlp(tagged, out, policy=BNLPRefinePolicy(), bnlp_gate_threshold=None, adapter=adapter)
+
+    assert len(adapter.calls) == 1  # one run for the whole book
+    res = json.loads(out.read_text(encoding="utf-8"))
+    speakers = [[s["speaker"] for s in ch["spans"]] for ch in res["chapters"]]
+    assert speakers == [["Quinn"], ["Mira", "Quinn"]]
+    assert res["meta"]["bnlp"]["mode"] == "book"
+    assert res["meta"]["bnlp"]["backend"] == "api"
+
+
+def test_whole_book_matches_per_chapter(tmp_path) -> None:
+    tagged = _write_doc(tmp_path)
+    book_out, ch_out = tmp_path / "book.json", tmp_path / "chapter.json"
+    refine_with_bnlp(
+        tagged, book_out, policy=BNLPRefinePolicy(), bnlp_gate_threshold=None, adapter=FakeBookNLPAdapter()
+    )
+    refine_with_bnlp(
+        tagged,
+        ch_out,
+        policy=BNLPRefinePolicy(),
+        bnlp_gate_threshold=None,
+        per_chapter=True,
+        adapter=FakeBookNLPAdapter(),
+    )
+    book = json.loads(book_out.read_text(encoding="utf-8"))["chapters"]
+    per_ch = json.loads(ch_out.read_text(encoding="utf-8"))["chapters"]
+    assert book == per_ch
+
+
+def test_result_cache_skips_second_run(tmp_path) -> None:
+    tagged = _write_doc(tmp_path)
+    cache = tmp_path / "bnlp_cache"
+    first, second = FakeBookNLPAdapter(), FakeBookNLPAdapter()
+    refine_with_bnlp(
+        tagged,
+        tmp_path / "a.json",
+        policy=BNLPRefinePolicy(),
+        bnlp_gate_threshold=None,
+        bnlp_cache_dir=str(cache),
+        adapter=first,
+    )
+    refine_with_bnlp(
+        tagged,
+        tmp_path / "b.json",
+        policy=BNLPRefinePolicy(),
+        bnlp_gate_threshold=None,
+        bnlp_cache_dir=str(cache),
+        adapter=second,
+    )
+    assert len(first.calls) == 1 and second.calls == []
+    assert len(list(cache.glob("*.json"))) == 1
+    a = json.loads((tmp_path / "a.json").read_text(encoding="utf-8"))["chapters"]
+    b = json.loads((tmp_path / "b.json").read_text(encoding="utf-8"))["chapters"]
+    assert a == b
+
+
+def test_backend_choice_is_remembered(tmp_path) -> None:
+    adapter = FakeBookNLPAdapter(api_ok=False)
+    adapter.annotate_text("“A,” Bo said.")
+    adapter.annotate_text("“B,” Cy said.")
+    assert [b for b, _ in adapter.calls] == ["cli", "cli"]
+    assert adapter.backend == "cli"
+    assert adapter.variant(size="big").backend == "cli"
+
+
+def _match_quotes_naive(spans, bnlp, max_char_gap):
+    """Reference O(spans × quotes) matcher (the pre-sweep implementation)."""
+    index = {}
+    bnlp_sorted = sorted(bnlp, key=lambda q: (q["start"], q["end"]))
+    for s in spans:
+        if s.get("type") not in {"Dialogue", "Thought"}:
+            continue
+        a = (int(s["start"]), int(s["end"]))
+        best, best_ol = None, 0
+        for q in bnlp_sorted:
+            b = (int(q["start"]), int(q["end"]))
+            ol = max(0, min(a[1], b[1]) - max(a[0], b[0]))
+            if ol > best_ol or (ol == 0 and abs(a[0] - b[0]) <= max_char_gap):
+                best, best_ol = q, ol
+        if best is not None:
+            index[a] = best
+    return index
+
+
+def test_sweep_matcher_identical_to_naive() -> None:
+    import random
+
+    from abm.annotate.bnlp_refine import _match_quotes
+
+    rng = random.Random(7)
+    for _ in range(300):
+        n = rng.randint(0, 400)
+        spans = []
+        for _i in range(rng.randint(0, 40)):
+            st = rng.randint(0, n)
+            spans.append({"start": st, "end": st + rng.randint(0, 60), "type": rng.choice(["Dialogue", "Narration"])})
+        quotes = []
+        for k in range(rng.randint(0, 40)):
+            st = rng.randint(0, n)
+            ln = rng.choice([0, 3, 20, 80, 300])
+            quotes.append({"start": st, "end": st + ln, "speaker": f"S{k}", "prob": 0.5})
+        gap = rng.choice([0, 5, 40])
+        assert _match_quotes(spans, quotes, gap) == _match_quotes_naive(spans, quotes, gap)
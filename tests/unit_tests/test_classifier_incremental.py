@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+from abm.classifier.classifier_cli import main
+
+BOOK = (
+    "Table of Contents\n"
+    "Chapter 1: Arrival .... 2\n"
+    "Chapter 2: The Gate .... 3\n\n"
+    "Preface text\n\n"
+    "Chapter 1: Arrival\n"
+    "Body one\n\n"
+    "Chapter 2: The Gate\n"
+    "Body two\n"
+)
+
+
+def _read(out: Path, name: str) -> Any:
+    return json.loads((out / name).read_text(encoding="utf-8"))
+
+
+def _run(tmp_path: Path, text: str, out: Path) -> int:
+    src = tmp_path / "book.txt"
+    src.write_text(text, encoding="utf-8")
+    return main([str(src), str(out), "--incremental"])
+
+
+def test_appended_chapters_keep_earlier_entries_stable(tmp_path: Path) -> None:
+    out = tmp_path / "classified"
+    assert _run(tmp_path, BOOK, out) == 0
+    first = _read(out, "chapters.json")["chapters"]
+    assert _read(out, "changes.json")["mode"] == "full"
+    assert _read(out, "changes.json")["new_chapters"] == [0, 1]
+
+    grown = BOOK + "More of two\n\nChapter 3: Beyond\nBody three\nChapter 4\nBody four\n"
+    assert _run(tmp_path, grown, out) == 0
+    changes = _read(out, "changes.json")
+    assert changes["mode"] == "append"
+    assert changes["new_chapters"] == [2, 3]
+    assert changes["changed_chapters"] == [1]
+    assert changes["reprocess"] == [1, 2, 3]
+
+    chapters = _read(out, "chapters.json")["chapters"]
+    assert chapters[0] == first[0]
+    assert chapters[1]["paragraphs"] == ["Chapter 2: The Gate", "Body two", "More of two"]
+    assert [(c["chapter_index"], c["title"]) for c in chapters[2:]] == [(2, "Beyond"), (3, "Chapter 4")]
+    assert chapters[-1]["end_block"] == _read(out, "classify_state.json")["block_count"] - 1
+    toc = _read(out, "toc.json")
+    assert [e["chapter_index"] for e in toc["entries"]] == [0, 1, 2, 3]
+    assert any("appended chapter 'Beyond'" in w for w in toc["warnings"])
+
+    # Running again on the same input is a no-op
+    assert _run(tmp_path, grown, out) == 0
+    assert _read(out, "changes.json")["mode"] == "unchanged"
+    assert _read(out, "changes.json")["reprocess"] == []
+    assert _read(out, "chapters.json")["chapters"] == chapters
+
+
+def test_edited_prefix_falls_back_to_full_classification(tmp_path: Path) -> None:
+    out = tmp_path / "classified"
+    assert _run(tmp_path, BOOK, out) == 0
+    assert _run(tmp_path, BOOK.replace("Body one", "Body one, revised"), out) == 0
+    changes = _read(out, "changes.json")
+    assert changes["mode"] == "full"
+    assert changes["changed_chapters"] == [0]
+    assert changes["new_chapters"] == [] and changes["removed_chapters"] == []
@@ -117,3 +117,90 @@ def test_inserted_path_with_mocked_psycopg(tmp_path: Path, monkeypatch: pytest.M
     # Ensure schema DDLs executed and commit called
     assert any("CREATE TABLE IF NOT EXISTS welldone_documents" in s for s in fake_psycopg._conn.executed)
     assert fake_psycopg._conn.committed is True
+
+
+class _FakeCopy:
+    def __init__(self, sink: list[tuple[Any, ...]]) -> None:
+        self._sink = sink
+        self.types: list[str] | None = None
+
+    def set_types(self, types: list[str]) -> None:  # noqa: D401 - stub
+        self.types = types
+
+    def write_row(self, row: tuple[Any, ...]) -> None:  # noqa: D401 - stub
+        self._sink.append(tuple(row))
+
+    def __enter__(self) -> _FakeCopy:  # noqa: D401 - stub
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:  # noqa: D401 - stub
+        return None
+
+
+class _FakeCopyCursor(_FakeCursor):
+    def __init__(self, ret_id: int) -> None:
+        super().__init__(ret_id)
+        self.copied: list[list[tuple[Any, ...]]] = []
+
+    def copy(self, sql: str) -> _FakeCopy:  # noqa: D401 - stub
+        assert "FORMAT BINARY" in sql
+        self.statements.append((sql, None))
+        self.copied.append([])
+        return _FakeCopy(self.copied[-1])
+
+
+class _FakeCopyConn(_FakeConn):
+    def __init__(self) -> None:
+        super().__init__()
+        self._cursor = _FakeCopyCursor(ret_id=7)
+        self.commits = 0
+
+    def commit(self) -> None:  # noqa: D401 - stub
+        self.committed = True
+        self.commits += 1
+
+
+def test_bulk_copy_path_batches_and_upserts(tmp_path: Path) -> None:
+    jl = tmp_path / "d.jsonl"
+    jl.write_text("".join(json.dumps({"index": i, "text": f"T{i}"}) + "\n" for i in range(5)), encoding="utf-8")
+    meta = tmp_path / "d_meta.json"
+    meta.write_text(json.dumps({"block_count": 5, "created_at": "x"}), encoding="utf-8")
+    fake_psycopg = _FakePsycopgModule()
+    fake_psycopg._conn = _FakeCopyConn()
+    sys.modules["psycopg"] = fake_psycopg  # type: ignore[assignment]
+    sys.modules["psycopg.rows"] = _FakeRowsModule()  # type: ignore[assignment]
+
+    res = PgInserter(dsn="postgresql://localhost/db", bulk_copy=True, commit_every=2).insert_from_jsonl(jl, meta)
+
+    assert res.status == "inserted" and res.inserted_blocks == 5
+    cur = fake_psycopg._conn._cursor
+    assert cur.copied == [[(0, "T0"), (1, "T1")], [(2, "T2"), (3, "T3")], [(4, "T4")]]
+    merges = [p for sql, p in cur.statements if "ON CONFLICT (doc_id, block_index) DO UPDATE" in sql]
+    assert merges == [(7,), (7,), (7,)]
+    # every index range is pruned of rows the file no longer has, then everything past the end
+    prunes = [p for sql, p in cur.statements if sql.lstrip().startswith("DELETE FROM welldone_blocks")]
+    assert prunes == [(7, -(2**31) - 1, 1), (7, 1, 3), (7, 3, 4), (7, 4)]
+    assert cur._executemany_batches == []
+    # two intermediate batch commits + the final one
+    assert fake_psycopg._conn.commits == 3
+
+
+def test_bulk_copy_deletes_blocks_past_a_shorter_file(tmp_path: Path) -> None:
+    jl = tmp_path / "e.jsonl"
+    jl.write_text("".join(json.dumps({"index": i, "text": f"T{i}"}) + "\n" for i in range(3)), encoding="utf-8")
+    meta = tmp_path / "e_meta.json"
+    meta.write_text(json.dumps({"block_count": 3, "created_at": "x"}), encoding="utf-8")
+    fake_psycopg = _FakePsycopgModule()
+    fake_psycopg._conn = _FakeCopyConn()
+    sys.modules["psycopg"] = fake_psycopg  # type: ignore[assignment]
+    sys.modules["psycopg.rows"] = _FakeRowsModule()  # type: ignore[assignment]
+
+    PgInserter(dsn="postgresql://localhost/db", bulk_copy=True).insert_from_jsonl(jl, meta)
+
+    cur = fake_psycopg._conn._cursor
+    sqls = [sql for sql, _ in cur.statements]
+    merge = next(i for i, sql in enumerate(sqls) if "ON CONFLICT (doc_id, block_index)" in sql)
+    prune = next(i for i, sql in enumerate(sqls) if "NOT EXISTS (SELECT" in sql)
+    # the staged rows must still be there when stale rows are pruned against them
+    assert merge < prune < sqls.index("TRUNCATE welldone_blocks_stage")
+    assert cur.statements[-1] == ("DELETE FROM welldone_blocks WHERE doc_id = %s AND block_index > %s", (7, 2))
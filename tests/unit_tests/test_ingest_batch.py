@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from abm.ingestion import pdf_to_raw_text as raw_mod
+from abm.ingestion.ingest_batch import BatchIngestor, BookTask, discover_books
+from abm.ingestion.ingest_pdf import PdfIngestPipeline, PipelineOptions
+from abm.ingestion.raw_to_welldone import RawToWellDone
+
+
+def _write_pdf(path: Path, n_pages: int) -> None:
+    doc = raw_mod.fitz.open()
+    for i in range(n_pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Chapter {i + 1}\nThe rain fell on page {i}.\nIt kept falling.")
+    doc.save(str(path))
+    doc.close()
+
+
+def _books(tmp_path: Path) -> Path:
+    books = tmp_path / "books"
+    books.mkdir()
+    _write_pdf(books / "Alpha.pdf", 3)
+    _write_pdf(books / "Beta.pdf", 2)
+    (books / "Broken.pdf").write_bytes(b"not a pdf at all")
+    return books
+
+
+def _by_name(summary: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    return {Path(b["pdf"]).stem: b for b in summary["books"]}
+
+
+def test_discover_books_from_manifest(tmp_path: Path) -> None:
+    (tmp_path / "list.txt").write_text("# books\nA.pdf\n\nsub/B.pdf\n", encoding="utf-8")
+    tasks = discover_books(manifest=tmp_path / "list.txt", out_root=tmp_path / "out")
+    assert tasks == [
+        BookTask(pdf=str(tmp_path / "A.pdf"), out_dir=str(tmp_path / "out" / "A")),
+        BookTask(pdf=str(tmp_path / "sub" / "B.pdf"), out_dir=str(tmp_path / "out" / "B")),
+    ]
+    (tmp_path / "list.json").write_text(json.dumps(["A.pdf", {"pdf": "x/A.pdf"}]), encoding="utf-8")
+    with pytest.raises(ValueError):
+        discover_books(manifest=tmp_path / "list.json", out_root=tmp_path / "out")
+
+
+def test_failing_book_does_not_stop_the_pool(tmp_path: Path) -> None:
+    out = tmp_path / "out"
+    tasks = discover_books(directory=_books(tmp_path), out_root=out)
+    opts = PipelineOptions(cache_dir=str(out / ".cache"))
+
+    summary = BatchIngestor(opts, workers=2, summary_path=out / "summary.json").run(tasks)
+
+    assert summary["counts"] == {"total": 3, "ok": 2, "failed": 1, "pending": 0}
+    books = _by_name(summary)
+    assert [Path(b["pdf"]).stem for b in summary["books"]] == ["Alpha", "Beta", "Broken"]
+    assert books["Broken"]["failed_step"] == "extract"
+    assert "Cannot open PDF" in books["Broken"]["error"]
+    for name in ("Alpha", "Beta"):
+        assert books[name]["status"] == "ok"
+        assert set(books[name]["step_timings"]) == {"extract", "well_done", "meta", "jsonl"}
+        assert Path(books[name]["outputs"]["jsonl"]).exists()
+    assert json.loads((out / "summary.json").read_text(encoding="utf-8")) == summary
+
+
+def test_worker_crash_fails_only_its_book(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    out = tmp_path / "out"
+    books = tmp_path / "books"
+    books.mkdir()
+    for name in ("Alpha", "Beta", "Crash", "Delta", "Echo"):
+        _write_pdf(books / f"{name}.pdf", 2)
+    tasks = discover_books(directory=books, out_root=out)
+    original = PdfIngestPipeline.run
+
+    def _run(self: PdfIngestPipeline, pdf: str, *args: Any, **kwargs: Any) -> Any:
+        if Path(pdf).stem == "Crash":
+            os._exit(1)  # the worker dies like a segfault in MuPDF would
+        return original(self, pdf, *args, **kwargs)
+
+    # workers are forked after the patch, so they inherit it
+    monkeypatch.setattr(PdfIngestPipeline, "run", _run)
+    opts = PipelineOptions(cache_dir=str(out / ".cache"))
+    summary = BatchIngestor(opts, workers=3, summary_path=out / "summary.json").run(tasks)
+
+    assert summary["counts"] == {"total": 5, "ok": 4, "failed": 1, "pending": 0}
+    statuses = {name: b["status"] for name, b in _by_name(summary).items()}
+    assert statuses == {"Alpha": "ok", "Beta": "ok", "Crash": "failed", "Delta": "ok", "Echo": "ok"}
+    assert _by_name(summary)["Crash"]["error"].startswith("worker crashed: BrokenProcessPool")
+
+
+def test_resume_restarts_failed_book_at_failed_step(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    out = tmp_path / "out"
+    books = tmp_path / "books"
+    books.mkdir()
+    _write_pdf(books / "Alpha.pdf", 3)
+    tasks = discover_books(directory=books, out_root=out)
+    opts = PipelineOptions(cache_dir=str(out / ".cache"))
+    summary_path = out / "summary.json"
+
+    original = RawToWellDone.process_text
+
+    def _boom(self: RawToWellDone, text: str, opts: Any = None) -> str:
+        raise RuntimeError("reflow crashed")
+
+    monkeypatch.setattr(RawToWellDone, "process_text", _boom)
+    first = BatchIngestor(opts, workers=1, summary_path=summary_path).run(tasks)
+    assert _by_name(first)["Alpha"]["failed_step"] == "well_done"
+    assert _by_name(first)["Alpha"]["error"] == "RuntimeError: reflow crashed"
+
+    monkeypatch.setattr(RawToWellDone, "process_text", original)
+    second = BatchIngestor(opts, workers=1, summary_path=summary_path).run(tasks, resume=True)
+    alpha = _by_name(second)["Alpha"]
+    assert alpha["status"] == "ok" and alpha["resumed_from"] == "well_done"
+    # extraction was finished before the failure, so it comes from the cache
+    assert alpha["cache"]["steps"]["raw"] == {"hits": 1, "misses": 0}
+    assert alpha["cache"]["steps"]["well_done"] == {"hits": 0, "misses": 1}
+
+    third = BatchIngestor(opts, workers=1, summary_path=summary_path).run(tasks, resume=True)
+    assert _by_name(third)["Alpha"]["skipped"] is True
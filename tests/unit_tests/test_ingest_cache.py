@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from abm.ingestion import pdf_to_raw_text as raw_mod
+from abm.ingestion.artifact_cache import ArtifactCache
+from abm.ingestion.ingest_pdf import PdfIngestPipeline, PipelineOptions
+
+
+def _write_pdf(path: Path, pages: list[str]) -> None:
+    doc = raw_mod.fitz.open()
+    for text in pages:
+        page = doc.new_page()
+        page.insert_text((72, 72), text)
+    doc.save(str(path))
+    doc.close()
+
+
+def _pages(n: int, changed: dict[int, str] | None = None) -> list[str]:
+    out = [f"Chapter {i + 1}\nThe rain fell on page {i}.\nIt kept falling." for i in range(n)]
+    for i, text in (changed or {}).items():
+        out[i] = text
+    return out
+
+
+def _outputs(out_dir: Path) -> dict[str, str]:
+    names = ["Book_raw.txt", "Book_well_done.txt", "Book_well_done.jsonl"]
+    return {n: (out_dir / n).read_text(encoding="utf-8") for n in names}
+
+
+def _steps(pipeline: PdfIngestPipeline) -> dict[str, dict[str, int]]:
+    assert pipeline.cache_report is not None
+    return pipeline.cache_report["steps"]
+
+
+def test_second_run_skips_all_steps(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    pdf = tmp_path / "Book.pdf"
+    _write_pdf(pdf, _pages(6))
+    cache = str(tmp_path / "cache")
+
+    first = PdfIngestPipeline()
+    first.run(pdf, tmp_path / "a", PipelineOptions(cache_dir=cache))
+    assert _steps(first)["page"] == {"hits": 0, "misses": 6}
+
+    second = PdfIngestPipeline()
+    second.run(pdf, tmp_path / "b", PipelineOptions(cache_dir=cache))
+    assert _steps(second) == {
+        "jsonl": {"hits": 1, "misses": 0},
+        "raw": {"hits": 1, "misses": 0},
+        "well_done": {"hits": 1, "misses": 0},
+    }
+    assert "[CACHE] jsonl=hit raw=hit well_done=hit" in capsys.readouterr().out
+    assert _outputs(tmp_path / "a") == _outputs(tmp_path / "b")
+
+
+def test_corrected_pages_are_the_only_ones_reextracted(tmp_path: Path) -> None:
+    pdf = tmp_path / "Book.pdf"
+    cache = str(tmp_path / "cache")
+    _write_pdf(pdf, _pages(8))
+    PdfIngestPipeline().run(pdf, tmp_path / "a", PipelineOptions(cache_dir=cache))
+
+    _write_pdf(pdf, _pages(8, {2: "Chapter 3\nA corrected page.", 5: "Chapter 6\nFixed typo here."}))
+    cached = PdfIngestPipeline()
+    cached.run(pdf, tmp_path / "b", PipelineOptions(cache_dir=cache))
+    assert _steps(cached)["page"] == {"hits": 6, "misses": 2}
+    assert _steps(cached)["raw"] == {"hits": 0, "misses": 1}
+
+    PdfIngestPipeline().run(pdf, tmp_path / "c", PipelineOptions())
+    assert _outputs(tmp_path / "b") == _outputs(tmp_path / "c")
+    assert "A corrected page." in _outputs(tmp_path / "b")["Book_raw.txt"]
+
+
+def test_changed_options_rerun_only_downstream_steps(tmp_path: Path) -> None:
+    pdf = tmp_path / "Book.pdf"
+    _write_pdf(pdf, _pages(3))
+    cache = str(tmp_path / "cache")
+    PdfIngestPipeline().run(pdf, tmp_path / "a", PipelineOptions(cache_dir=cache))
+
+    again = PdfIngestPipeline()
+    again.run(pdf, tmp_path / "b", PipelineOptions(cache_dir=cache, reflow_paragraphs=False))
+    steps = _steps(again)
+    assert steps["raw"] == {"hits": 1, "misses": 0}
+    assert steps["well_done"] == {"hits": 0, "misses": 1}
+    assert "page" not in steps
+
+
+def test_cache_keys_depend_on_every_component() -> None:
+    base = ArtifactCache.key("raw", "abc", {"x": 1}, "v1")
+    assert base == ArtifactCache.key("raw", "abc", {"x": 1}, "v1")
+    assert (
+        len(
+            {
+                base,
+                ArtifactCache.key("well_done", "abc", {"x": 1}, "v1"),
+                ArtifactCache.key("raw", "abd", {"x": 1}, "v1"),
+                ArtifactCache.key("raw", "abc", {"x": 2}, "v1"),
+                ArtifactCache.key("raw", "abc", {"x": 1}, "v2"),
+            }
+        )
+        == 5
+    )
+
+
+def test_text_roundtrip_preserves_newlines(tmp_path: Path) -> None:
+    cache = ArtifactCache(tmp_path)
+    cache.put_text("raw", "k" * 64, "a\r\nb\rc\n")
+    assert cache.get_text("raw", "k" * 64) == "a\r\nb\rc\n"
+    assert cache.get_text("raw", "j" * 64) is None
+    assert cache.report()["steps"]["raw"] == {"hits": 1, "misses": 1}
+
+
+def _write_form_pdf(path: Path, text: str) -> None:
+    """One page whose text is drawn only through a Form XObject."""
+    src = raw_mod.fitz.open()
+    src.new_page().insert_text((72, 72), text)
+    doc = raw_mod.fitz.open()
+    page = doc.new_page()
+    page.show_pdf_page(page.rect, src, 0)
+    doc.save(str(path))
+    doc.close()
+    src.close()
+
+
+def test_page_fingerprint_covers_form_xobjects(tmp_path: Path) -> None:
+    def fingerprint(path: Path) -> str:
+        with raw_mod.fitz.open(str(path)) as doc:
+            return raw_mod._page_fingerprint(doc.load_page(0))
+
+    a, b, c = tmp_path / "a.pdf", tmp_path / "b.pdf", tmp_path / "c.pdf"
+    _write_form_pdf(a, "The rain fell.")
+    _write_form_pdf(b, "The snow fell.")
+    with raw_mod.fitz.open(str(a)) as doc, raw_mod.fitz.open(str(b)) as other:
+        assert doc.load_page(0).read_contents() == other.load_page(0).read_contents()
+        doc.save(str(c), garbage=4)  # rewritten with renumbered objects
+    assert fingerprint(a) != fingerprint(b)
+    assert fingerprint(a) == fingerprint(c)
+
+    cache = str(tmp_path / "cache")
+    _write_form_pdf(tmp_path / "Book.pdf", "Chapter 1\nThe rain fell.")
+    PdfIngestPipeline().run(tmp_path / "Book.pdf", tmp_path / "x", PipelineOptions(cache_dir=cache))
+    _write_form_pdf(tmp_path / "Book.pdf", "Chapter 1\nThe snow fell.")
+    again = PdfIngestPipeline()
+    again.run(tmp_path / "Book.pdf", tmp_path / "y", PipelineOptions(cache_dir=cache))
+    assert _steps(again)["page"] == {"hits": 0, "misses": 1}
+    assert "The snow fell." in _outputs(tmp_path / "y")["Book_raw.txt"]
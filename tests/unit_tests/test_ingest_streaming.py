@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from abm.ingestion import pdf_to_raw_text as raw_mod
+from abm.ingestion.ingest_pdf import PdfIngestPipeline, PipelineOptions
+from abm.ingestion.pdf_to_raw_text import RawExtractOptions, RawPdfTextExtractor
+from abm.ingestion.raw_to_welldone import iter_lines
+
+
+def _write_pdf(path: Path, n_pages: int) -> None:
+    doc = raw_mod.fitz.open()
+    for i in range(n_pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Chapter {i + 1}\nThe rain fell on page {i} and it kept on fall-\ning.")
+        page.insert_text((72, 160), f"“Who goes there?” said the guard of page {i}.\nNobody answered.")
+    doc.save(str(path))
+    doc.close()
+
+
+def _artifacts(out_dir: Path) -> dict[str, str]:
+    names = ["Book_raw.txt", "Book_well_done.txt", "Book_well_done.jsonl"]
+    return {n: (out_dir / n).read_text(encoding="utf-8") for n in names}
+
+
+def test_streaming_dev_matches_batch_artifacts(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    pdf = tmp_path / "Book.pdf"
+    _write_pdf(pdf, 5)
+    PdfIngestPipeline().run(pdf, tmp_path / "batch", PipelineOptions())
+    streaming = PdfIngestPipeline()
+    written = streaming.run(pdf, tmp_path / "stream", PipelineOptions(streaming=True))
+
+    assert _artifacts(tmp_path / "batch") == _artifacts(tmp_path / "stream")
+    assert set(written) == {"raw", "well_done", "meta", "jsonl", "jsonl_meta"}
+    batch_meta = json.loads((tmp_path / "batch" / "Book_ingest_meta.json").read_text(encoding="utf-8"))
+    stream_meta = json.loads(written["meta"].read_text(encoding="utf-8"))
+    assert stream_meta["raw_sha256"] == batch_meta["raw_sha256"]
+    assert stream_meta["well_done_sha256"] == batch_meta["well_done_sha256"]
+    jsonl_meta = json.loads(written["jsonl_meta"].read_text(encoding="utf-8"))
+    assert jsonl_meta["block_count"] == len(_artifacts(tmp_path / "stream")["Book_well_done.jsonl"].splitlines())
+
+    stats = streaming.stream_stats
+    assert stats is not None and stats["pages"] == 5 and stats["records"] == jsonl_meta["block_count"]
+    assert 0 < stats["first_record_s"] <= stats["total_s"]
+    assert "[STREAM] first JSONL record after" in capsys.readouterr().out
+
+
+def test_streaming_without_intermediates_and_prod(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    pdf = tmp_path / "Book.pdf"
+    _write_pdf(pdf, 3)
+    out = tmp_path / "out"
+    written = PdfIngestPipeline().run(pdf, out, PipelineOptions(streaming=True, keep_intermediates=False))
+    assert set(written) == {"meta", "jsonl", "jsonl_meta"}
+    assert not (out / "Book_raw.txt").exists()
+
+    prod = PdfIngestPipeline()
+    assert prod.run(pdf, tmp_path / "prod", PipelineOptions(mode="prod", streaming=True)) == {}
+    assert not (tmp_path / "prod").exists()
+    assert prod.stream_stats is not None and prod.stream_stats["records"] > 0
+    assert "streamed records" in capsys.readouterr().out
+
+
+def test_streaming_rejects_cache_and_workers(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        PdfIngestPipeline().run(tmp_path / "x.pdf", tmp_path, PipelineOptions(streaming=True, cache_dir="c"))
+
+
+def test_iter_assembled_matches_assemble_output() -> None:
+    rng = random.Random(11)
+    pieces = ["a", "b ", "  ", "\n", "\r\n", "\r", "x-", "\f", ""]
+    ex = RawPdfTextExtractor()
+    for _ in range(300):
+        pages = ["".join(rng.choice(pieces) for _ in range(rng.randint(0, 8))) for _ in range(rng.randint(0, 4))]
+        opts = RawExtractOptions(
+            newline=rng.choice(["\n", "\r\n"]),
+            preserve_form_feeds=rng.random() < 0.5,
+            strip_trailing_spaces=rng.random() < 0.5,
+            dedupe_inline_spaces=rng.random() < 0.5,
+            fix_short_wraps=rng.random() < 0.5,
+        )
+        assert "".join(ex.iter_assembled(iter(pages), opts)) == ex.assemble_output(pages, opts)
+
+
+def test_iter_lines_handles_crlf_split_across_chunks() -> None:
+    assert list(iter_lines(["a\r", "\nb\r", "c", "\n", "d\r"])) == ["a\r\n", "b\r", "c\n", "d\r"]
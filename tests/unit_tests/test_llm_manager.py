@@ -0,0 +1,109 @@
+"""Tests for LLMService warmup and keep-alive handling."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import abm.llm.client as client_mod
+import abm.llm.manager as manager_mod
+from abm.llm.client import OpenAICompatClient
+from abm.llm.manager import LLMBackend, LLMService
+
+
+class _Resp:
+    def __init__(self, body: dict[str, Any], status: int = 200) -> None:
+        self._body = body
+        self.status_code = status
+
+    def json(self) -> dict[str, Any]:
+        return self._body
+
+    def raise_for_status(self) -> None:
+        return None
+
+
+def _fake_ollama(monkeypatch, *, max_loaded: int = 4) -> list[dict[str, Any]]:
+    """Patch requests with a tiny Ollama that tracks loaded models."""
+
+    posts: list[dict[str, Any]] = []
+    loaded: list[str] = []
+
+    def post(url: str, headers=None, json=None, timeout=None) -> _Resp:
+        posts.append({"url": url, **(json or {})})
+        model = json["model"]
+        if model not in loaded:
+            loaded.append(model)
+            del loaded[:-max_loaded]
+        return _Resp({"response": "", "done": True, "load_duration": 2_500_000_000})
+
+    def get(url: str, timeout=None) -> _Resp:
+        assert url.endswith("/api/ps")
+        return _Resp({"models": [{"name": m, "model": m} for m in loaded]})
+
+    monkeypatch.setattr(manager_mod.requests, "post", post)
+    monkeypatch.setattr(manager_mod.requests, "get", get)
+    return posts
+
+
+def test_warmup_sends_keep_alive_and_checks_residency(monkeypatch) -> None:
+    posts = _fake_ollama(monkeypatch)
+    svc = LLMService(LLMBackend(endpoint="http://h:11434/v1", model="m1", keep_alive="45m"))
+
+    res = svc.warmup()
+
+    assert posts == [
+        {"url": "http://h:11434/api/generate", "model": "m1", "prompt": "", "stream": False, "keep_alive": "45m"}
+    ]
+    assert res.model == "m1" and res.resident is True
+    assert res.load_ms == 2500.0
+
+
+def test_pin_models_reports_evicted_models(monkeypatch) -> None:
+    _fake_ollama(monkeypatch, max_loaded=2)
+    svc = LLMService(LLMBackend(endpoint="http://h:11434"))
+
+    res = svc.pin_models(["small", "mid", "large"], keep_alive="-1")
+
+    assert [(r.model, r.resident) for r in res] == [("small", False), ("mid", True), ("large", True)]
+
+
+def test_warmup_is_noop_for_non_ollama(monkeypatch) -> None:
+    posts = _fake_ollama(monkeypatch)
+    res = LLMService(LLMBackend(kind="openai_compatible", model="x")).warmup()
+    assert posts == [] and res.resident is None
+
+
+def test_client_sends_keep_alive_on_every_request(monkeypatch) -> None:
+    payloads: list[dict[str, Any]] = []
+
+    def post(url: str, headers=None, json=None, timeout=None) -> _Resp:
+        payloads.append(json)
+        return _Resp({"choices": [{"message": {"content": '{"speaker": "A", "confidence": 1}'}}]})
+
+    monkeypatch.setattr(client_mod.requests, "post", post)
+    client = OpenAICompatClient(base_url="http://h/v1", keep_alive="30m")
+    client.chat_json("s", "u")
+    client.chat_json("s", "u")
+    assert [p["keep_alive"] for p in payloads] == ["30m", "30m"]
+
+    payloads.clear()
+    OpenAICompatClient(base_url="http://h/v1").chat_json("s", "u")
+    assert "keep_alive" not in payloads[0]
+
+
+def test_unitless_keep_alive_is_sent_as_seconds(monkeypatch) -> None:
+    posts = _fake_ollama(monkeypatch)
+    svc = LLMService(LLMBackend(endpoint="http://h:11434/v1", model="m1", keep_alive="-1"))
+    svc.warmup()
+    svc.warmup(keep_alive="300")
+    assert [p["keep_alive"] for p in posts] == [-1, 300]
+
+    payloads: list[dict[str, Any]] = []
+
+    def post(url: str, headers=None, json=None, timeout=None) -> _Resp:
+        payloads.append(json)
+        return _Resp({"choices": [{"message": {"content": '{"speaker": "A", "confidence": 1}'}}]})
+
+    monkeypatch.setattr(client_mod.requests, "post", post)
+    OpenAICompatClient(base_url="http://h/v1", keep_alive="-1").chat_json("s", "u")
+    assert payloads[0]["keep_alive"] == -1
@@ -0,0 +1,165 @@
+"""Tests for the multi-endpoint LLM pool client against local mock servers."""
+
+from __future__ import annotations
+
+import json
+import socket
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from abm.annotate.llm_refine import LLMRefineConfig, refine_document
+from abm.llm.manager import LLMBackend
+from abm.llm.pool import EndpointPoolClient, PoolEndpoint
+
+
+class _MockLLM:
+    """OpenAI-compatible mock server with a fixed latency and failure switch."""
+
+    def __init__(self, delay_s: float, speaker: str = "Alice") -> None:
+        self.delay_s = delay_s
+        self.speaker = speaker
+        self.fail = False
+        self.hits = 0
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *_args: object) -> None:
+                return
+
+            def _reply(self, code: int, body: dict) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:  # noqa: N802
+                self._reply(500 if mock.fail else 200, {"data": []})
+
+            def do_POST(self) -> None:  # noqa: N802
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                mock.hits += 1
+                time.sleep(mock.delay_s)
+                if mock.fail:
+                    self._reply(500, {"error": "boom"})
+                    return
+                content = json.dumps({"speaker": mock.speaker, "confidence": 0.9})
+                self._reply(
+                    200,
+                    {"choices": [{"message": {"content": content}}], "usage": {"prompt_tokens": 10}},
+                )
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def servers() -> Iterator[list[_MockLLM]]:
+    mocks = [_MockLLM(0.005), _MockLLM(0.08)]
+    yield mocks
+    for m in mocks:
+        m.close()
+
+
+def _ask(pool: EndpointPoolClient) -> dict:
+    return pool.chat_json("sys", "user")
+
+
+def test_least_outstanding_prefers_fast_endpoint(servers) -> None:
+    fast, slow = servers
+    pool = EndpointPoolClient([PoolEndpoint(slow.url), PoolEndpoint(fast.url)], model="m")
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        results = list(ex.map(lambda _i: _ask(pool), range(40)))
+    assert all(r["speaker"] == "Alice" for r in results)
+    stats = pool.endpoint_stats()
+    assert stats[fast.url]["requests"] + stats[slow.url]["requests"] == 40
+    assert stats[fast.url]["requests"] > 2 * stats[slow.url]["requests"]
+
+
+def test_failing_endpoint_is_ejected_and_requests_retried(servers) -> None:
+    good, bad = servers
+    bad.fail = True
+    pool = EndpointPoolClient([PoolEndpoint(bad.url), PoolEndpoint(good.url)], model="m", max_failures=2)
+    for _ in range(6):
+        assert _ask(pool)["speaker"] == "Alice"
+        assert pool.last_usage is not None and pool.last_usage.endpoint == good.url
+    stats = pool.endpoint_stats()
+    assert bad.hits == 2
+    assert stats[bad.url]["ejections"] == 1 and stats[bad.url]["ejected"]
+
+
+def test_ejected_endpoint_readmitted_after_cooldown(servers) -> None:
+    good, bad = servers
+    bad.fail = True
+    pool = EndpointPoolClient(
+        [PoolEndpoint(bad.url), PoolEndpoint(good.url)], model="m", max_failures=1, cooldown_s=0.05
+    )
+    _ask(pool)
+    assert pool.endpoint_stats()[bad.url]["ejected"]
+    time.sleep(0.06)
+    _ask(pool)  # probation attempt fails and ejects again
+    assert bad.hits == 2 and pool.endpoint_stats()[bad.url]["ejections"] == 2
+    bad.fail = False
+    time.sleep(0.06)
+    _ask(pool)
+    assert pool.last_usage is not None and pool.last_usage.endpoint == bad.url
+
+
+def test_health_check_ejects_dead_endpoint(servers) -> None:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        dead = f"http://127.0.0.1:{s.getsockname()[1]}/v1"
+    pool = EndpointPoolClient([PoolEndpoint(dead, weight=5), PoolEndpoint(servers[0].url)], model="m")
+    assert pool.check_health() == {dead: False, servers[0].url: True}
+    _ask(pool)
+    assert pool.endpoint_stats()[dead]["requests"] == 0
+
+
+def test_parse_endpoint_spec() -> None:
+    assert PoolEndpoint.parse("http://a:1/v1@2.5") == PoolEndpoint("http://a:1/v1", 2.5)
+    assert PoolEndpoint.parse("http://a:1/v1") == PoolEndpoint("http://a:1/v1", 1.0)
+    with pytest.raises(ValueError):
+        PoolEndpoint.parse("http://a:1/v1@0")
+    # Credentials in the URL are not mistaken for a weight
+    creds = "http://user:pw@gpu2:11434/v1"
+    assert PoolEndpoint.parse(creds) == PoolEndpoint(creds, 1.0)
+    assert PoolEndpoint.parse(f"{creds}@3") == PoolEndpoint(creds, 3.0)
+    assert PoolEndpoint.parse("http://user@gpu2") == PoolEndpoint("http://user@gpu2", 1.0)
+
+
+def test_refine_records_per_endpoint_throughput(tmp_path, servers) -> None:
+    spans = [
+        {"start": i * 5, "end": i * 5 + 4, "type": "Dialogue", "speaker": "Unknown", "confidence": 0.1}
+        for i in range(6)
+    ]
+    doc = {"chapters": [{"chapter_index": 0, "text": "“Hi” " * 6, "roster": {"Alice": []}, "spans": spans}]}
+    tagged = tmp_path / "combined.json"
+    tagged.write_text(json.dumps(doc), encoding="utf-8")
+    out_md = tmp_path / "review.md"
+    metrics = tmp_path / "m.jsonl"
+    refine_document(
+        tagged,
+        tmp_path / "out.json",
+        out_md,
+        LLMBackend(endpoint=servers[0].url),
+        LLMRefineConfig(votes=1, max_concurrency=3),
+        cache_path=tmp_path / "c.sqlite",
+        metrics_path=metrics,
+        endpoints=[PoolEndpoint(s.url) for s in servers],
+    )
+    recs = [json.loads(line) for line in metrics.read_text(encoding="utf-8").splitlines()]
+    used = {url for r in recs for url in r["endpoints"]}
+    assert used <= {s.url for s in servers} and used
+    md = out_md.read_text(encoding="utf-8")
+    assert f"endpoint {servers[0].url}:" in md and "req/s" in md
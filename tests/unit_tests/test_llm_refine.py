@@ -76,3 +76,90 @@ def test_llm_cache_roundtrip(tmp_path) -> None:
     cache.set({"speaker": "A", "confidence": 0.9}, **key_args)
     assert cache.get(**key_args) == {"speaker": "A", "confidence": 0.9}
     cache.close()
+
+
+def test_prompt_prefix_is_shared_across_spans() -> None:
+    """Spans of one chapter should share a byte-identical prompt prefix."""
+
+    from abm.annotate.prompts import speaker_prompt_prefix, speaker_user_prompt
+
+    roster = {"Bob": [], "Alice": ["Al"]}
+    p1 = speaker_user_prompt(roster, "left one", "“Hi.”", "right one", "Dialogue")
+    p2 = speaker_user_prompt(dict(reversed(roster.items())), "other", "“Yo.”", "more", "Thought")
+    prefix = speaker_prompt_prefix(roster)
+    assert p1.startswith(prefix) and p2.startswith(prefix)
+    assert "left one" not in prefix
+
+
+def test_refine_groups_by_chapter_and_writes_metrics(tmp_path, monkeypatch) -> None:
+    """Candidates are dispatched chapter by chapter and usage is recorded."""
+
+    from abm.llm.client import ChatUsage
+
+    def chapter(idx: int, name: str) -> dict:
+        return {
+            "chapter_index": idx,
+            "title": f"Ch{idx}",
+            "text": "“A.” “B.”",
+            "roster": {name: []},
+            "spans": [
+                {"start": 0, "end": 4, "type": "Dialogue", "speaker": "Unknown", "confidence": 0.1},
+                {"start": 5, "end": 9, "type": "Dialogue", "speaker": "Unknown", "confidence": 0.1},
+            ],
+        }
+
+    tagged = tmp_path / "combined.json"
+    tagged.write_text(json.dumps({"chapters": [chapter(2, "Cid"), chapter(1, "Ann")]}), encoding="utf-8")
+    seen: list[str] = []
+
+    def fake_chat_json(self, system_prompt, user_prompt, temperature, top_p, max_tokens):
+        seen.append(user_prompt.split("\n", 1)[0])
+        self._local.usage = ChatUsage(prompt_tokens=100, cached_tokens=80, ttft_ms=12.0)
+        return {"speaker": user_prompt.split("\n", 1)[0].split(": ")[1], "confidence": 0.9}
+
+    monkeypatch.setattr(OpenAICompatClient, "chat_json", fake_chat_json)
+    metrics = tmp_path / "llm_metrics.jsonl"
+    out_md = tmp_path / "review.md"
+    refine_document(
+        tagged,
+        tmp_path / "out.json",
+        out_md,
+        LLMBackend(endpoint="http://dummy"),
+        LLMRefineConfig(votes=1, max_concurrency=1),
+        cache_path=tmp_path / "c.sqlite",
+        metrics_path=metrics,
+    )
+
+    assert seen == ["ROSTER: Ann", "ROSTER: Ann", "ROSTER: Cid", "ROSTER: Cid"]
+    recs = [json.loads(line) for line in metrics.read_text(encoding="utf-8").splitlines()]
+    assert [r["chapter"] for r in recs] == [1, 1, 2, 2]
+    assert all(r["cached_tokens"] == 80 and r["ttft_ms"] == [12.0] for r in recs)
+    assert "prompt prefix cache: 320/400 tokens" in out_md.read_text(encoding="utf-8")
+
+
+def test_cache_key_includes_prompt_version(tmp_path) -> None:
+    """A prompt template change must not reuse older cached decisions."""
+
+    cache = LLMCache(tmp_path / "c.sqlite")
+    key_args = {"roster": {}, "left": "", "mid": "x", "right": "", "span_type": "Dialogue", "model": "m"}
+    cache.set({"speaker": "A", "confidence": 0.9}, prompt_version="v1", **key_args)
+    assert cache.get(prompt_version="v1", **key_args) is not None
+    assert cache.get(prompt_version="v2", **key_args) is None
+    cache.close()
+
+
+def test_client_usage_parsing() -> None:
+    """Usage counters are read from llama.cpp and Ollama response shapes."""
+
+    from abm.llm.client import _usage_from_body
+
+    llama = _usage_from_body(
+        {"usage": {"prompt_tokens": 50}, "timings": {"cache_n": 40, "prompt_ms": 7.5}}, "openai", 20.0
+    )
+    assert (llama.prompt_tokens, llama.cached_tokens, llama.ttft_ms) == (50, 40, 7.5)
+    ollama = _usage_from_body(
+        {"prompt_eval_count": 12, "eval_count": 3, "load_duration": 1_000_000, "prompt_eval_duration": 2_000_000},
+        "ollama_chat",
+        20.0,
+    )
+    assert (ollama.prompt_tokens, ollama.cached_tokens, ollama.ttft_ms) == (12, None, 3.0)
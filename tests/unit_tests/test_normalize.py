@@ -0,0 +1,238 @@
+"""The single-pass ChapterNormalizer must tag and rewrite exactly like the rule-by-rule version."""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+import unicodedata
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any
+
+from abm.annotate.normalize import ChapterNormalizer, InlineTag, LineTag, NormalizerConfig, NormalizeReport
+
+_SAMPLE = Path(__file__).resolve().parents[1] / "data" / "jsonl" / "tiny_book.jsonl"
+
+_RE_HEADING = re.compile(r"^Chapter\s+\d+[:\s]", re.IGNORECASE)
+_RE_SCENE_BREAK = re.compile(r"^\s*\*{3,}\s*$")
+_RE_META = re.compile(
+    r"(patr?eon|p\.a\.t\.r\.e\.o\.n|instagram|author.?s note|vote|webnovel|discord|donate|paypal|privilege)",
+    re.IGNORECASE,
+)
+_RE_SYSTEM_ANGLE_LINE = re.compile(r"^\s*<[^>]+>\s*[.?!]?\s*$")
+_RE_SYSTEM_SQUARE_LINE = re.compile(r"^\s*\[[^\]]+\]\s*[.?!]?\s*$")
+_RE_SYSTEM_ANGLE_MULTI = re.compile(r"^\s*(<[^>]+>\s*){2,}\s*$")
+_RE_SYSTEM_SQUARE_MULTI = re.compile(r"^\s*(\[[^\]]+\]\s*){2,}\s*$")
+_RE_CONTROL = re.compile(r"[\u0000-\u001F\u007F\u0080-\u009F\uFEFF]")
+
+
+def _reference_classify(line: str) -> LineTag:
+    if _RE_SCENE_BREAK.match(line):
+        return LineTag.SECTION_BREAK
+    if _RE_META.search(line):
+        return LineTag.META
+    if _RE_SYSTEM_ANGLE_LINE.match(line) or _RE_SYSTEM_ANGLE_MULTI.match(line):
+        return LineTag.SYSTEM_ANGLE
+    if _RE_SYSTEM_SQUARE_LINE.match(line) or _RE_SYSTEM_SQUARE_MULTI.match(line):
+        return LineTag.SYSTEM_SQUARE
+    if _RE_HEADING.match(line):
+        return LineTag.HEADING
+    return LineTag.NONE
+
+
+def _reference_angle_fix(line: str) -> tuple[str, int]:
+    fixes = 0
+    trailing_punct = ""
+    m = re.match(r"^(.*?)([.?!])\s*$", line)
+    core = line
+    if m:
+        core, trailing_punct = m.group(1), m.group(2)
+
+    def _trim_token(match: re.Match[str]) -> str:
+        nonlocal fixes
+        inner = match.group(1)
+        trimmed = inner.strip()
+        if trimmed != inner:
+            fixes += 1
+        return f"<{trimmed}>"
+
+    core_fixed = re.sub(r"<\s*(.*?)\s*>", _trim_token, core)
+    return f"{core_fixed}{trailing_punct}", fixes
+
+
+def _reference_normalize(chapter: dict[str, Any], config: NormalizerConfig) -> dict[str, Any]:
+    """Rule-by-rule normalizer as it was before the rules were merged into one regex."""
+
+    paragraphs = [p.rstrip() for p in chapter.get("paragraphs") or []]
+    if config.strip_control_chars:
+        paragraphs = [_RE_CONTROL.sub("", p) for p in paragraphs]
+    if config.unicode_normalization:
+        paragraphs = [unicodedata.normalize(config.unicode_normalization, p) for p in paragraphs]
+    report = NormalizeReport()
+    is_heading = bool(paragraphs and _RE_HEADING.match(paragraphs[0]))
+    report.is_heading = is_heading
+    removed: list[int] = []
+    if is_heading and config.treat_heading_as_removable:
+        paragraphs.pop(0)
+        removed.append(0)
+        report.removed_heading_index = 0
+    line_tags: list[LineTag] = []
+    inline_tags: dict[int, list[InlineTag]] = {}
+    for idx, line in enumerate(paragraphs):
+        tag = _reference_classify(line)
+        if idx == 0 and is_heading and not config.treat_heading_as_removable:
+            report.counts[LineTag.HEADING.value] += 1
+        if tag == LineTag.SYSTEM_ANGLE:
+            line, nfix = _reference_angle_fix(line)
+            report.spaced_angle_fixes += nfix
+        elif tag != LineTag.SYSTEM_SQUARE:
+            spans = [InlineTag(m.start(), m.end(), "SystemInlineAngle") for m in re.finditer(r"<[^>]+>", line)]
+            spans += [InlineTag(m.start(), m.end(), "SystemInlineSquare") for m in re.finditer(r"\[[^\]]+\]", line)]
+            if spans:
+                inline_tags[idx] = spans
+        line_tags.append(tag)
+        paragraphs[idx] = line
+        if tag in (LineTag.SYSTEM_ANGLE, LineTag.SYSTEM_SQUARE, LineTag.SECTION_BREAK, LineTag.META):
+            report.counts[tag.value] += 1
+    text = config.join_with.join(paragraphs).replace("\r\n", "\n").replace("\r", "\n")
+    title = chapter.get("title", "")
+    out = dict(chapter)
+    out.update(
+        paragraphs=paragraphs,
+        text=text,
+        display_title=title.title() if title else title,
+        line_tags=[t.value for t in line_tags],
+        inline_tags={str(k): [asdict(s) for s in v] for k, v in inline_tags.items()},
+        normalize_report=report.to_dict(),
+        text_normalized=True,
+    )
+    if removed:
+        out["removed_paragraph_indices"] = removed
+    return out
+
+
+_PIECES = [
+    "Chapter 12: ",
+    "chapter 3 ",
+    "Chapter",
+    "***",
+    " *** ",
+    "**",
+    "<Level 2>",
+    "<  Level 3  >",
+    "< A >",
+    "[Quest: Gate]",
+    "[ ",
+    "]",
+    "<",
+    ">",
+    ".",
+    "!",
+    "?",
+    " ",
+    "  ",
+    "\t",
+    "\n",
+    "\r\n",
+    "\u00a0",
+    "\ufeff",
+    "\x07",
+    "Patreon",
+    "PAT",
+    "p.a.t.r.e.o.n",
+    "Author's note",
+    "author’s note",
+    "vote",
+    "devote",
+    "Discord",
+    "The road was long",
+    '"Hello," she said.',
+    "'Hmm,' he thought",
+    "9",
+    ":",
+]
+
+_SAMPLE_CHAPTER = [
+    "Chapter 7: The Dungeon",
+    "Quinn opened his eyes.",
+    "<  Level Up  >",
+    "<Strength +1> <  Agility +1>",
+    "[Skill: Blood Bank]",
+    "[Quest] [Reward]",
+    "He read the <Status> screen and the [Inventory] twice.",
+    "  ***  ",
+    '"Are you okay?" Vorden asked.',
+    "Chapter 8 continues the story",
+    "Thanks for reading! Please vote and join the Discord.",
+    "If you want to support me, check my P.a.t.r.e.o.n.",
+]
+
+
+def _random_line(rng: random.Random) -> str:
+    return "".join(rng.choice(_PIECES) for _ in range(rng.randint(0, 6)))
+
+
+def _sample_book_chapters() -> list[dict[str, Any]]:
+    # Every text block of the sample book becomes a paragraph (blocks may hold several lines)
+    blocks = [json.loads(line)["text"] for line in _SAMPLE.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return [
+        {"chapter_index": 0, "title": "tiny book", "paragraphs": blocks},
+        {"chapter_index": 1, "title": "the dungeon", "paragraphs": _SAMPLE_CHAPTER},
+    ]
+
+
+def _configs() -> list[NormalizerConfig]:
+    return [
+        NormalizerConfig(),
+        NormalizerConfig(strip_control_chars=False),
+        NormalizerConfig(treat_heading_as_removable=True, unicode_normalization="NFKC"),
+    ]
+
+
+def test_line_rules_keep_priority_on_random_lines() -> None:
+    rng = random.Random(40)
+    normalizer = ChapterNormalizer()
+    for _ in range(20000):
+        line = _random_line(rng)
+        assert normalizer._classify_line(line) == _reference_classify(line), repr(line)
+
+
+def test_sample_books_match_reference() -> None:
+    for config in _configs():
+        normalizer = ChapterNormalizer(config)
+        for chapter in _sample_book_chapters():
+            assert normalizer.normalize(chapter) == _reference_normalize(chapter, config)
+
+
+def test_random_chapters_match_reference() -> None:
+    rng = random.Random(41)
+    for config in _configs():
+        normalizer = ChapterNormalizer(config)
+        for i in range(300):
+            paras = [_random_line(rng) for _ in range(rng.randint(0, 12))]
+            if rng.random() < 0.3:
+                paras.insert(0, rng.choice(["Chapter 1: Start", "Chapter 2 ", "chapter 40:"]))
+            chapter = {"chapter_index": i, "title": "t", "paragraphs": paras}
+            assert normalizer.normalize(chapter) == _reference_normalize(chapter, config)
+
+
+def test_sample_chapter_tags() -> None:
+    out = ChapterNormalizer().normalize({"title": "x", "paragraphs": _SAMPLE_CHAPTER})
+    assert out["line_tags"] == [
+        "Heading",
+        "None",
+        "SystemAngle",
+        "SystemAngle",
+        "SystemSquare",
+        "SystemSquare",
+        "None",
+        "SectionBreak",
+        "None",
+        "Heading",
+        "Meta",
+        "Meta",
+    ]
+    assert out["paragraphs"][2] == "<Level Up>"
+    assert out["paragraphs"][3] == "<Strength +1> <Agility +1>"
+    assert [t["tag"] for t in out["inline_tags"]["6"]] == ["SystemInlineAngle", "SystemInlineSquare"]
@@ -0,0 +1,134 @@
+"""Incremental re-annotation must equal a full re-annotation after random edits."""
+
+from __future__ import annotations
+
+import copy
+import random
+import re
+from pathlib import Path
+from typing import Any
+
+from abm.annotate.annotate_cli import AnnotateRunner
+from abm.annotate.attribute import AttributeEngine
+
+_PARAS = [
+    '"We leave at dawn," said Bob.',
+    "'Too early,' Alice thought.",
+    "The female voice said nothing for a while.",
+    '"Fine." Bob shrugged. "Then at noon."',
+    "<Level 2 reached>",
+    "[Quest: Find the gate]",
+    "***",
+    "Author's note: please vote!",
+    "Chapter 9: The Gate",
+    "Rain fell on the road and the carts rolled on. " * 6,
+    "It was late.",
+    "He said 'maybe' and left [Skill: Dash] behind.",
+    '"Unclosed quote runs to the end',
+    "",
+]
+
+
+class _WindowEngine(AttributeEngine):
+    """Deterministic engine whose answers depend on text up to ``reach`` chars away and on neighbours."""
+
+    reach = 300
+
+    def context_reach(self) -> int | None:
+        return self.reach
+
+    def attribute_span(
+        self,
+        text: str,
+        span_chars: tuple[int, int],
+        span_type: str,
+        roster: dict[str, list[str]],
+        neighbors: Any = None,
+        doc: Any = None,
+    ) -> tuple[str, str, float]:
+        if span_type not in {"Dialogue", "Thought"}:
+            return super().attribute_span(text, span_chars, span_type, roster, neighbors=neighbors)
+        s, e = span_chars
+        prev_n, next_n = neighbors or (None, None)
+        lo = max(0, s - self.reach, int(prev_n["end"]) if prev_n else 0)
+        hi = min(len(text), e + self.reach)
+        names = re.findall(r"\b[A-Z][a-z]+\b", text[lo:s] + " " + text[e:hi])
+        stop = int(next_n["start"]) - e if next_n else -1
+        return (names[-1] if names else "Unknown"), f"test:{len(names)}:{stop}", 0.5 + 0.01 * (hi - lo) / self.reach
+
+
+def _chapter(rng: random.Random, idx: int) -> dict[str, Any]:
+    paras = [rng.choice(_PARAS) for _ in range(rng.randint(3, 25))]
+    return {"chapter_index": idx, "title": f"Ch{idx}", "paragraphs": paras}
+
+
+def _edit(rng: random.Random, doc: dict[str, Any]) -> None:
+    ch = rng.choice(doc["chapters"])
+    paras: list[str] = ch["paragraphs"]
+    op = rng.choice(["typo", "replace", "insert", "delete"])
+    i = rng.randrange(len(paras))
+    if op == "typo" and paras[i]:
+        k = rng.randrange(len(paras[i]))
+        paras[i] = paras[i][:k] + rng.choice("xQ '\"") + paras[i][k + 1 :]
+    elif op == "replace":
+        paras[i] = rng.choice(_PARAS)
+    elif op == "insert":
+        paras.insert(i, rng.choice(_PARAS))
+    elif len(paras) > 1:
+        paras.pop(i)
+
+
+def _runner(engine_cls: type[AttributeEngine] | None, cache_dir: Path | None) -> AnnotateRunner:
+    runner = AnnotateRunner(
+        mode="fast", use_coref=False, roster_use_ner=False, parse_mode="window", para_cache_dir=cache_dir
+    )
+    if engine_cls is not None:
+        runner.engine = engine_cls(mode="fast", use_coref=False)
+        if runner.para_cache is not None:
+            runner.para_cache.engine = runner.engine
+    return runner
+
+
+def _check_random_edits(tmp_path: Path, engine_cls: type[AttributeEngine] | None, seed: int) -> int:
+    rng = random.Random(seed)
+    doc = {"chapters": [_chapter(rng, i) for i in range(3)]}
+    incremental = _runner(engine_cls, tmp_path / f"cache_{seed}")
+    reused = 0
+    for _ in range(25):
+        got = incremental.run_streaming(copy.deepcopy(doc), out_dir=None, metrics=None, status_mode="none")
+        full = _runner(engine_cls, None).run_streaming(
+            copy.deepcopy(doc), out_dir=None, metrics=None, status_mode="none"
+        )
+        assert got == full
+        assert incremental.para_cache is not None
+        reused += incremental.para_cache.stats.attribute_reused
+        _edit(rng, doc)
+    return reused
+
+
+def test_random_edits_match_full_reannotation(tmp_path: Path) -> None:
+    assert _check_random_edits(tmp_path, None, seed=39) > 0
+
+
+def test_random_edits_match_full_reannotation_with_context_engine(tmp_path: Path) -> None:
+    assert _check_random_edits(tmp_path, _WindowEngine, seed=40) > 0
+
+
+def test_typo_reannotates_only_the_context_window(tmp_path: Path) -> None:
+    paras = [f"Narration line {i} before Tom spoke." if i % 2 else f'"Line {i}," said Ann.' for i in range(40)]
+    doc = {"chapters": [{"chapter_index": 0, "title": "One", "paragraphs": paras}]}
+    runner = _runner(_WindowEngine, tmp_path / "cache")
+    runner.run_streaming(copy.deepcopy(doc), out_dir=None, metrics=None, status_mode="none")
+    assert (tmp_path / "cache" / "ch_0000.json").exists()
+
+    doc["chapters"][0]["paragraphs"][20] = '"Line 20," said Anne.'
+    fresh = _runner(_WindowEngine, tmp_path / "cache")  # loads entries from disk
+    out = fresh.run_streaming(copy.deepcopy(doc), out_dir=None, metrics=None, status_mode="none")
+    stats = fresh.para_cache.stats  # type: ignore[union-attr]
+    # ~30-char paragraphs and a 300-char reach: the edit reaches about ten neighbours per side
+    assert 1 < stats.reannotated < 25
+    assert stats.segment_reused == 39
+    full = _runner(_WindowEngine, None).run_streaming(
+        copy.deepcopy(doc), out_dir=None, metrics=None, status_mode="none"
+    )
+    assert out == full
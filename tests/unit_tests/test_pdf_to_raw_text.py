@@ -217,3 +217,29 @@ def test_assemble_output_normalizations() -> None:
 
 def test_default_output_for_input() -> None:
     assert _default_output_for_input(Path("/a/b/c.pdf")).name == "c.txt"
+
+
+def _write_synthetic_pdf(path: Path, n_pages: int) -> None:
+    from abm.ingestion import pdf_to_raw_text as mod
+
+    doc = mod.fitz.open()
+    for i in range(n_pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Chapter {i + 1}\nPage {i} first line.\nSecond line of page {i}.")
+        page.insert_text((72, 200), f"Another block on page {i}.")
+    doc.save(str(path))
+    doc.close()
+
+
+def test_parallel_extract_pages_matches_serial(tmp_path: Path) -> None:
+    pdf = tmp_path / "synthetic.pdf"
+    _write_synthetic_pdf(pdf, 7)
+
+    serial = RawPdfTextExtractor()
+    expected = serial.extract_pages(pdf)
+    parallel = RawPdfTextExtractor()
+    pages = parallel.extract_pages(pdf, workers=2, chunk_size=3)
+
+    assert pages == expected
+    assert "Page 6 first line." in pages[6]
+    assert len(parallel.page_timings) == len(serial.page_timings) == 7
@@ -66,3 +66,85 @@ def test_strip_trailing_spaces_disabled_keeps_spaces() -> None:
     )
     # Because we didn't strip trailing spaces and didn't reflow, spaces at line ends persist
     assert out.splitlines()[0].endswith("  ")
+
+
+def _reference_process_text(text: str, opts: WellDoneOptions) -> str:
+    """The previous whole-text implementation (chain of re.sub over the full string)."""
+    import re
+
+    def split_headings(paragraphs: list[str]) -> list[str]:
+        heading_re = re.compile(r"^\s*(?:chapter|chap\.?|ch\.?|prologue|epilogue)\b[\s.:IVXLCDM0-9-]*.*$", re.I)
+        result: list[str] = []
+        for para in paragraphs:
+            lines = [(ln.rstrip() if opts.strip_trailing_spaces else ln) for ln in para.split("\n")]
+            if len(lines) <= 1:
+                result.append(para)
+                continue
+            buf: list[str] = []
+            for ln in lines:
+                s = ln.strip()
+                if s and len(s) <= 120 and heading_re.match(s):
+                    if buf:
+                        result.append("\n".join(buf))
+                        buf = []
+                    result.append(ln)
+                else:
+                    buf.append(ln)
+            if buf:
+                result.append("\n".join(buf))
+        return result
+
+    def process(para: str) -> str:
+        lines = [ln.rstrip() if opts.strip_trailing_spaces else ln for ln in para.splitlines()]
+        joined = "\n".join(lines)
+        if opts.dehyphenate_wraps:
+            joined = re.sub(r"(\w)-\n(\w)", r"\1\2", joined)
+        if joined.count("•") >= 3:
+            items = [f"• {seg}" for seg in (s.strip() for s in joined.split("•")) if seg]
+            if items:
+                out = "\n\n".join(items)
+                return re.sub(r" {2,}", " ", out) if opts.dedupe_inline_spaces else out
+        if opts.reflow_paragraphs:
+            joined = re.sub(r"(?<=\S)\n(?=\S)", " ", joined)
+            if opts.dedupe_inline_spaces:
+                joined = re.sub(r" {2,}", " ", joined)
+        elif opts.dedupe_inline_spaces:
+            joined = "\n".join(re.sub(r" {2,}", " ", ln) for ln in joined.splitlines())
+        return joined
+
+    parts = re.split(r"\n\s*\n+", text.replace("\r\n", "\n").replace("\r", "\n"))
+    paragraphs = [p for p in parts if p and p.strip()]
+    if opts.split_headings:
+        paragraphs = split_headings(paragraphs)
+    if opts.split_each_line:
+        paragraphs = [
+            (ln.rstrip() if opts.strip_trailing_spaces else ln)
+            for para in paragraphs
+            for ln in para.split("\n")
+            if ln and ln.strip()
+        ]
+    return "\n\n".join(process(p) for p in paragraphs) + ("\n" if text.endswith("\n") else "")
+
+
+def test_streaming_matches_reference_on_random_text() -> None:
+    import itertools
+    import random
+
+    rng = random.Random(3)
+    pieces = ["word", "wrap-", "x", "•", " ", "  ", "\t", "\n", "\n", "\n\n", " \n", "\r\n", "\r", "\f", " "]
+    pieces += ["Chapter 2: Go", "Epilogue", "-", "a-\nb-\nc", "r-\ns-\nt-\nu", "\xa0", "\x85", "end."]
+    flags = list(itertools.product([False, True], repeat=6))
+    for _ in range(2000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+        opts = WellDoneOptions(*rng.choice(flags))
+        assert RawToWellDone().process_text(text, opts) == _reference_process_text(text, opts), (text, opts)
+
+
+def test_process_file_streams_to_disk(tmp_path) -> None:
+    src = tmp_path / "book_raw.txt"
+    text = "Chapter 1\r\nIt was a dark and storm-\r\ny night.\r\n\r\n  Rain   fell.\r\n"
+    src.write_bytes(text.encode("utf-8"))
+    out = tmp_path / "book_well_done.txt"
+    RawToWellDone().process_file(src, out)
+    assert out.read_bytes().decode("utf-8") == RawToWellDone().process_text(text)
+    assert out.read_text(encoding="utf-8") == "Chapter 1 It was a dark and stormy night.\n\n Rain fell.\n"
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import copy
 import json
+import random
 from pathlib import Path
+from typing import Any
 
 import pytest
 
-from abm.classifier.section_classifier import classify_blocks
+from abm.classifier.section_classifier import (
+    _is_body_heading_block,
+    _load_jsonl_blocks,
+    _match_chapters,
+    canon_title,
+    classify_blocks,
+)
 
 
 def _write_blocks_to_jsonl(tmp_path: Path, blocks: list[str]) -> Path:
@@ -126,3 +135,131 @@ def test_chapter_heading_not_found_for_toc_entry_raises(tmp_path: Path) -> None:
         jsonl_path = _write_blocks_to_jsonl(tmp_path, blocks)
         classify_blocks(str(jsonl_path))
     assert "TOC heading found but no TOC items ahead" in str(exc.value)
+
+
+def _reference_match_chapters(
+    blocks: list[dict[str, Any]], toc_entries: list[dict[str, Any]], start_search: int
+) -> tuple[list[dict[str, Any]], list[str]]:
+    """Previous block-scanning matcher, kept to check the indexed one against."""
+    warnings: list[str] = []
+    claimed_src: set[int] = set()
+    search_pos = max(start_search, 0)
+    min_start_line = -1
+    if search_pos > 0 and (search_pos - 1) < len(blocks):
+        prev_end_line = blocks[search_pos - 1].get("end_line")
+        if isinstance(prev_end_line, int):
+            min_start_line = prev_end_line
+    for entry in toc_entries:
+        title = entry["title"]
+        ctitle = canon_title(title)
+        ordinal = entry.get("ordinal")
+        found_idx: int | None = None
+        mode = ""
+        for i in range(search_pos, len(blocks)):
+            blk = blocks[i]
+            sl = blk.get("start_line")
+            if isinstance(sl, int) and sl <= min_start_line:
+                continue
+            m = _is_body_heading_block(blk)
+            if not m:
+                continue
+            src_idx = blk.get("index")
+            if isinstance(src_idx, int) and src_idx in claimed_src:
+                continue
+            h_title = (m.group("title") or "").strip()
+            h_digits = m.group("digits")
+            if h_title and h_title.strip() == title.strip():
+                found_idx, mode = i, "exact"
+                break
+            if h_title and canon_title(h_title) == ctitle:
+                found_idx, mode = i, "normalized"
+                break
+            if ordinal is not None and h_digits and int(h_digits) == ordinal:
+                found_idx, mode = i, "ordinal"
+                break
+        if found_idx is None:
+            raise ValueError(f"Chapter heading not found for TOC entry: '{title}'")
+        entry["start_block"] = found_idx
+        src_idx2 = blocks[found_idx].get("index")
+        if isinstance(src_idx2, int):
+            claimed_src.add(src_idx2)
+        next_min_sl = blocks[found_idx].get("start_line")
+        if isinstance(next_min_sl, int):
+            min_start_line = max(min_start_line, next_min_sl)
+        if mode == "normalized":
+            warnings.append(f"title normalized match used for TOC entry '{title}' matched at block {found_idx}")
+        elif mode == "ordinal":
+            warnings.append(
+                f"ordinal fallback used for TOC entry '{title}' (chapter {ordinal}) matched at block {found_idx}"
+            )
+        search_pos = found_idx + 1
+    for idx, entry in enumerate(toc_entries):
+        entry["end_block"] = toc_entries[idx + 1]["start_block"] - 1 if idx < len(toc_entries) - 1 else len(blocks) - 1
+    return toc_entries, warnings
+
+
+def _random_book(rng: random.Random) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    titles = ["The Rain", "the rain!", "Déjà Vu", "Deja vu", "Night", "—", "Night Falls", ""]
+    entries = [
+        {"chapter_index": ci, "title": rng.choice(titles[:-1]), "ordinal": rng.choice([None, ci + 1])}
+        for ci in range(rng.randint(1, 12))
+    ]
+    blocks: list[dict[str, Any]] = []
+    line = 0
+    for _ in range(rng.randint(5, 80)):
+        kind = rng.random()
+        if kind < 0.35:
+            t = rng.choice(titles)
+            head = rng.choice(["Chapter " + str(rng.randint(1, 12)), "Prologue", "Epilogue"])
+            text = f"{head}: {t}" if t else head
+        elif kind < 0.4:
+            text = "Chapter 3: Night .... 12"
+        else:
+            text = rng.choice(["Body text here.", "More prose follows", "x"])
+        blk: dict[str, Any] = {"text": text, "line_count": 1}
+        if rng.random() < 0.9:
+            blk["index"] = rng.randint(0, 40)
+        if rng.random() < 0.7:
+            line += rng.randint(-1, 3)
+            blk["start_line"] = line
+            blk["end_line"] = line
+        blocks.append(blk)
+    return blocks, entries
+
+
+def test_indexed_matcher_matches_block_scan_on_random_books() -> None:
+    rng = random.Random(37)
+    compared = 0
+    for _ in range(400):
+        blocks, entries = _random_book(rng)
+        start = rng.randint(0, 3)
+        try:
+            expected: Any = _reference_match_chapters(blocks, copy.deepcopy(entries), start)
+        except ValueError as exc:
+            expected = str(exc)
+        try:
+            got: Any = _match_chapters(blocks, copy.deepcopy(entries), start)
+        except ValueError as exc:
+            got = str(exc)
+        assert got == expected
+        compared += not isinstance(expected, str)
+    # make sure the generator produces enough successful matches to be meaningful
+    assert compared > 50
+
+
+def test_fixture_books_classify_identically(tmp_path: Path) -> None:
+    blocks = ["Table of Contents"]
+    blocks += [f"Chapter {i}: Title {i % 7}" for i in range(1, 41)]
+    blocks.append("Preface")
+    for i in range(1, 41):
+        blocks += [f"Chapter {i}: Title {i % 7}" if i % 5 else f"Chapter {i}", f"Body of {i}", "More body"]
+    out = classify_blocks(str(_write_blocks_to_jsonl(tmp_path, blocks)))
+    loaded = _load_jsonl_blocks(str(tmp_path / "blocks.jsonl"))
+    entries = [{k: e[k] for k in ("chapter_index", "title")} for e in out["toc"]["entries"]]
+    ref_entries = [{**e, "ordinal": e["chapter_index"] + 1} for e in entries]
+    ref, ref_warn = _reference_match_chapters(loaded, ref_entries, 42)
+    assert [(e["start_block"], e["end_block"]) for e in ref] == [
+        (e["start_block"], e["end_block"]) for e in out["toc"]["entries"]
+    ]
+    assert out["toc"]["warnings"] == ref_warn
+    assert len(ref_warn) == 8  # "Chapter 5", "Chapter 10", ... fall back to the ordinal